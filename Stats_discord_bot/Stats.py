@@ -6,6 +6,11 @@ import logging
 from discord import app_commands
 from discord.ext import commands
 import discord
+from utils.assets import asset_cache
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.emoji_store import emoji_store, sync_guild_emojis
+from utils.render_service import render_service
 
 # Load environment variables
 load_dotenv()
@@ -72,6 +77,12 @@ async def on_ready():
     except Exception as e:
         print(f'❌ Failed to sync commands: {e}')
 
+    # Custom emojis go into the glyph store so cards draw them offline
+    added = 0
+    for joined_guild in bot.guilds:
+        added += await sync_guild_emojis(joined_guild)
+    print(f'😀 Stored {added} new custom emojis')
+
 
 # sync up commands on rejoins/joins
 
@@ -83,6 +94,25 @@ async def on_guild_join(guild):
     except Exception as e:
         print(f"❌ Failed to sync to {guild.name}: {e}")
 
+    await sync_guild_emojis(guild)
+
+
+@bot.event
+async def on_guild_emojis_update(guild, before, after):
+    await sync_guild_emojis(guild)
+
+
+@bot.event
+async def on_guild_update(before, after):
+    # Card bases show the server icon and name; redraw them on next use
+    if before.name != after.name or before.icon != after.icon:
+        layer_cache.invalidate(after.id)
+
+
+@bot.event
+async def on_guild_remove(guild):
+    layer_cache.invalidate(guild.id)
+
 
 async def main():
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -96,7 +126,23 @@ async def main():
             except Exception as e:
                 print(f'❌ Failed to load cog {filename}: {e}')
 
-    await bot.start(token)
+    # Decode the card templates once, off the event loop
+    loaded = await asyncio.to_thread(template_registry.preload)
+    print(f'✅ Preloaded {loaded} card templates')
+
+    # Twemoji PNGs dropped into assets/emoji/twemoji go into the glyph store
+    imported = await asyncio.to_thread(emoji_store.import_directory)
+    print(f'✅ Imported {imported} emojis')
+    if not len(emoji_store):
+        print('⚠️ Emoji store is empty, emojis are fetched from the CDN on first use. '
+              'Run `python -m utils.emoji_store` once to fill it.')
+
+    try:
+        await bot.start(token)
+    finally:
+        # Shared HTTP session used by every card renderer
+        await asset_cache.close()
+        render_service.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -7,7 +7,7 @@ import time
 import uuid
 from datetime import datetime, timedelta, date, timezone
 from typing import Dict, List, Optional, Tuple, Any, Set, Union
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import discord
 from discord.ext import commands, tasks
 import asyncpg
@@ -27,9 +27,32 @@ import emoji
 import unicodedata
 from emoji import is_emoji
 import base64
+import contextvars
+import functools
+import inspect
+from utils.query_builders import (
+    BUCKET_ORIGIN, floor_to_bucket, fold_series_rows, plan_rollup_ranges, series_bucket_sql,
+    series_bucket_starts, trailing_window_starts, user_rank_result, user_rank_sql,
+    windowed_select_sql
+)
+from utils.query_cache import (
+    QueryCacheVersions, decode_cached_value, encode_cached_value, normalize_cache_arguments,
+    query_cache_key
+)
+from utils.single_flight import SingleFlight
+from utils.sketches import HyperLogLog, SketchConfig, SpaceSaving
 
 logger = logging.getLogger(__name__)
 
+# (guild_id, blacklists) shared by every query of one composite request
+blacklist_snapshot: contextvars.ContextVar[Optional[Tuple[int, Dict[str, Any]]]] = \
+    contextvars.ContextVar('blacklist_snapshot', default=None)
+
+# Failures noted while one cached q_* call runs; its fallback result is then
+# not stored
+query_failures: contextvars.ContextVar[Optional[List[str]]] = \
+    contextvars.ContextVar('query_failures', default=None)
+
 load_dotenv()
 
 # Constants
@@ -84,12 +107,232 @@ class Constants:
         'activities': 365
     }
 
+    # Continuous aggregate tiers (real-time, keyed by guild/user/channel/category).
+    # Each tier is built from the one before it; the query router reads the
+    # coarsest tier whose buckets fit inside the requested range.
+    ROLLUP_BUCKET_ORIGIN = BUCKET_ORIGIN
+    ROLLUP_TIERS = [
+        {'prefix': 'hourly', 'width': timedelta(hours=1), 'interval': '1 hour',
+         'start_offset': '3 days', 'end_offset': '1 hour', 'schedule': '30 minutes'},
+        {'prefix': 'daily', 'width': timedelta(days=1), 'interval': '1 day',
+         'start_offset': '7 days', 'end_offset': '1 day', 'schedule': '1 hour'},
+        {'prefix': 'weekly', 'width': timedelta(days=7), 'interval': '7 days',
+         'start_offset': '35 days', 'end_offset': '7 days', 'schedule': '1 day'}
+    ]
+    # Each column maps to (aggregate over the raw table, per-row value in the
+    # raw table, function that re-aggregates a finer tier).
+    ROLLUP_SOURCES = {
+        'message_stats': {
+            'table': 'message_tracking',
+            'time_column': 'created_at',
+            'base_filter': 'NOT is_bot',
+            'keys': ['guild_id', 'user_id', 'channel_id', 'category_id'],
+            'columns': {
+                'message_count': ('COUNT(*)', '1', 'SUM'),
+                'total_chars': ('SUM(message_length)', 'message_length', 'SUM'),
+                'attachment_count': ('SUM(CASE WHEN has_attachment THEN 1 ELSE 0 END)',
+                                     'CASE WHEN has_attachment THEN 1 ELSE 0 END', 'SUM'),
+                'embed_count': ('SUM(CASE WHEN has_embed THEN 1 ELSE 0 END)',
+                                'CASE WHEN has_embed THEN 1 ELSE 0 END', 'SUM'),
+                'first_at': ('MIN(created_at)', 'created_at', 'MIN'),
+                'last_at': ('MAX(created_at)', 'created_at', 'MAX')
+            }
+        },
+        'voice_stats': {
+            'table': 'voice_session_history',
+            'time_column': 'join_time',
+            'base_filter': None,
+            'keys': ['guild_id', 'user_id', 'channel_id', 'category_id'],
+            'columns': {
+                'total_seconds': ('SUM(duration_seconds)', 'duration_seconds', 'SUM'),
+                'session_count': ('COUNT(*)', '1', 'SUM'),
+                'first_at': ('MIN(join_time)', 'join_time', 'MIN'),
+                'last_at': ('MAX(leave_time)', 'leave_time', 'MAX')
+            }
+        },
+        'emoji_stats': {
+            'table': 'emoji_usage',
+            'time_column': 'last_used',
+            'base_filter': None,
+            'keys': ['guild_id', 'user_id', 'channel_id', 'category_id',
+                     'emoji_str', 'is_custom', 'usage_type'],
+            'columns': {
+                'usage_count': ('SUM(usage_count)', 'usage_count', 'SUM')
+            }
+        },
+        'activity_stats': {
+            'table': 'activity_sessions',
+            'time_column': 'start_time',
+            'base_filter': None,
+            'keys': ['guild_id', 'user_id', 'channel_id', 'category_id', 'activity_type'],
+            'columns': {
+                'session_count': ('COUNT(*)', '1', 'SUM'),
+                'total_seconds': ('SUM(duration_seconds)', 'duration_seconds', 'SUM')
+            }
+        }
+    }
+
+    # Unique-user sketches: one HyperLogLog per guild/channel/metric/hour,
+    # merged per query (~0.8% error at precision 14). Exact mode always
+    # counts distinct users from the rollups instead.
+    UNIQUE_USERS_EXACT = False
+    HLL_PRECISION = SketchConfig.HLL_PRECISION
+    UNIQUE_USER_SKETCH_WIDTH = timedelta(hours=1)
+
+    # Heavy-hitter summaries: one Space-Saving summary per guild/dimension/hour,
+    # merged per query to pick top-N candidates that are then ranked exactly
+    HEAVY_HITTER_CAPACITY = SketchConfig.HEAVY_HITTER_CAPACITY
+    HEAVY_HITTER_CANDIDATE_FACTOR = 3
+    HEAVY_HITTER_WIDTH = timedelta(hours=1)
+    HEAVY_HITTER_DIMENSIONS = {
+        'emojis': {'metric': 'emojis', 'column': 'emoji_str'},
+        'text_channels': {'metric': 'messages', 'column': 'channel_id'},
+        'voice_channels': {'metric': 'voice', 'column': 'channel_id'}
+    }
+
+    # Resets: the sketches and summaries over the deleted range are rebuilt
+    # from the remaining raw rows, this much time per pass
+    SUMMARY_REBUILD_CHUNK = timedelta(days=7)
+    # Raw table -> (sketch metric, heavy-hitter dimension) it feeds
+    SUMMARY_SOURCES = {
+        'message_tracking': ('messages', 'text_channels'),
+        'voice_session_history': ('voice', 'voice_channels'),
+        'emoji_usage': (None, 'emojis')
+    }
+
+    # Ranking snapshots: a leaderboard view pages through one frozen ranking,
+    # aggregated once and stored whole
+    RANKING_SNAPSHOT_TTL = 300
+
+    # Read replica (DB_REPLICA_DSN): q_* reads fall back to the primary while
+    # the replica's replay lag is over budget or hasn't been measured recently
+    REPLICA_STALENESS_BUDGET = 10.0
+    REPLICA_LAG_CHECK_INTERVAL = 15
+    # Reads also stay on the primary until the replica has replayed the last
+    # write that bumped a data version; its replay position is re-read at most
+    # this often (seconds) while it's behind
+    REPLICA_LSN_CHECK_INTERVAL = 0.5
+
+    # q_* result cache: in-process LRU in front of Redis. Entries are keyed on
+    # the guild's data and blacklist versions; the TTL bounds what versions
+    # can't see (role membership, continuous aggregate refreshes)
+    QUERY_CACHE_SIZE = 1024
+    QUERY_CACHE_TTL = 300
+    QUERY_CACHE_WINDOW = timedelta(hours=1)
+    # Seconds a guild's versions read from Redis are reused before the next
+    # read. Bumps from this process drop them at once.
+    QUERY_CACHE_VERSION_TTL = 2.0
+
+    # Composite queries (dashboard/profile): parts run concurrently per request
+    COMPOSITE_QUERY_CONCURRENCY = 4
+
+    # Windowed query settings
+    TRAILING_WINDOW_DAYS = [1, 5, 10, 20, 30]
+    METRIC_SOURCES = {
+        'messages': {
+            'table': 'message_tracking',
+            'rollup': 'message_stats',
+            'time_column': 'bucket',
+            'user_column': 'user_id',
+            'base_filter': None,
+            'value': 'COALESCE(SUM(message_count), 0)',
+            'windowed_value': 'COALESCE(SUM(message_count) FILTER (WHERE {cond}), 0)'
+        },
+        'voice': {
+            'table': 'voice_session_history',
+            'rollup': 'voice_stats',
+            'time_column': 'bucket',
+            'user_column': 'user_id',
+            'base_filter': None,
+            'value': 'COALESCE(SUM(total_seconds), 0)',
+            'windowed_value': 'COALESCE(SUM(total_seconds) FILTER (WHERE {cond}), 0)'
+        },
+        'emojis': {
+            'table': 'emoji_usage',
+            'rollup': 'emoji_stats',
+            'time_column': 'bucket',
+            'user_column': 'user_id',
+            'base_filter': None,
+            'value': 'COALESCE(SUM(usage_count), 0)',
+            'windowed_value': 'COALESCE(SUM(usage_count) FILTER (WHERE {cond}), 0)'
+        },
+        'activities': {
+            'table': 'activity_sessions',
+            'rollup': 'activity_stats',
+            'time_column': 'bucket',
+            'user_column': 'user_id',
+            'base_filter': None,
+            'value': 'COALESCE(SUM(session_count), 0)',
+            'windowed_value': 'COALESCE(SUM(session_count) FILTER (WHERE {cond}), 0)'
+        },
+        'invites': {
+            'table': 'invite_tracking',
+            'rollup': None,
+            'time_column': 'created_at',
+            'user_column': 'inviter_id',
+            'base_filter': None,
+            'value': 'COUNT(*)',
+            'windowed_value': 'COUNT(*) FILTER (WHERE {cond})'
+        },
+        'valid_invites': {
+            'table': 'invite_tracking',
+            'rollup': None,
+            'time_column': 'created_at',
+            'user_column': 'inviter_id',
+            'base_filter': None,
+            'value': "COUNT(*) FILTER (WHERE invite_type = 'valid')",
+            'windowed_value': "COUNT(*) FILTER (WHERE invite_type = 'valid' AND {cond})"
+        }
+    }
+    # Live leaderboards (Redis sorted sets maintained at flush time)
+    LIVE_LEADERBOARD_METRICS = ('messages', 'voice')
+    LIVE_LEADERBOARD_WINDOWS = [1, 7, 14, 30]
+    LIVE_LEADERBOARD_RETENTION_DAYS = 32
+    LIVE_LEADERBOARD_UNION_TTL = 60
+
+    SCOPE_COLUMNS = {
+        'server': None,
+        'user': None,
+        'channel': 'channel_id',
+        'category': 'category_id'
+    }
+
+
+
+def cached_query(func):
+
+    # Serves a q_* call through DatabaseStats._cached_call
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        return await self._cached_call(func, signature, args, kwargs)
+
+    return wrapper
+
+
+def note_query_failure(name: str):
+
+    # Called from a q_* except branch that returns an empty or zeroed result
+    failures = query_failures.get()
+    if failures is not None:
+        failures.append(name)
+
 
 class DatabaseStats(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.pool: Optional[asyncpg.Pool] = None
+        self.read_pool: Optional[asyncpg.Pool] = None
+        self.replica_lag: Optional[float] = None
+        self.replica_lag_checked_at = 0.0
+        # WAL positions: the primary's after the last data write, and the
+        # replica's last replayed one (None when it isn't a standby)
+        self.primary_write_lsn = 0
+        self.replica_replay_lsn: Optional[int] = None
+        self.replica_lsn_checked_at = 0.0
+        self.replica_lsn_check: Optional[asyncio.Task] = None
         self.redis: Optional[Redis] = None
         self.fernet: Optional[Fernet] = None
 
@@ -101,6 +344,9 @@ class DatabaseStats(commands.Cog):
 
         self.timescale_lock = asyncio.Lock()
         self.redis_batch_lock = asyncio.Lock()
+        # Held by the write paths from commit to live leaderboard increment,
+        # and by live leaderboard backfills and clears
+        self.live_leaderboard_lock = asyncio.Lock()
 
         # State tracking
         self.shutting_down = False
@@ -109,6 +355,17 @@ class DatabaseStats(commands.Cog):
         self.redis_connected = False
 
         self.is_timescale_initialized = False
+        self.available_rollups: Set[str] = set()
+        # Fallback store for ranking snapshots while Redis is down
+        self.ranking_snapshots: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # key -> (expires_at, result), least recently used first
+        self.query_cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self.query_cache_versions = QueryCacheVersions(Constants.QUERY_CACHE_VERSION_TTL)
+        self.query_flights = SingleFlight()
+        # A guild's sorted sets are read only while their coverage marker holds
+        # this epoch; it's replaced whenever an increment may have been lost
+        self.live_leaderboard_epoch = uuid.uuid4().hex
+        self.live_leaderboard_backfills: Dict[Tuple[int, str], asyncio.Task] = {}
         self.processed_messages: Dict[str, datetime] = {}
         self.invite_locks: Dict[int, asyncio.Lock] = {}
         self.rate_limits: Dict[str, list] = {}
@@ -184,6 +441,7 @@ class DatabaseStats(commands.Cog):
         self.timescale_maintenance.start()
 
         self.redis_batch_flusher.start()
+        self.replica_lag_monitor.start()
         self.cleanup_task = asyncio.create_task(self._periodic_cleanup())
 
     # BUFFERING
@@ -393,113 +651,129 @@ class DatabaseStats(commands.Cog):
             return False
 
         try:
-            async with self.pool.acquire() as conn:
-                if batch_type == 'messages':
-                    if len(data['params']) >= 5:
-                        message_id = data['params'][4]
-                        exists = await conn.fetchval('''
-                            SELECT EXISTS (
-                                SELECT 1 FROM message_tracking 
-                                WHERE message_id = $1
-                            )
-                        ''', message_id)
-                        if exists:
-                            return True
+            # Held from the write to the live leaderboard increments, as in
+            # _flush_batch_to_postgresql
+            async with self.live_leaderboard_lock:
+                async with self.pool.acquire() as conn:
+                    if batch_type == 'messages':
+                        if len(data['params']) >= 5:
+                            message_id = data['params'][4]
+                            exists = await conn.fetchval('''
+                                SELECT EXISTS (
+                                    SELECT 1 FROM message_tracking 
+                                    WHERE message_id = $1
+                                )
+                            ''', message_id)
+                            if exists:
+                                return True
 
-                    await conn.execute('''
-                        INSERT INTO message_tracking 
-                        (guild_id, user_id, channel_id, category_id, message_id,
-                        encrypted_username, message_length, mentions, has_attachment,
-                        has_embed, created_at, is_bot)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                    ''', *data['params'])
-
-                elif batch_type == 'voice_sessions':
-                    await conn.execute('''
-                        INSERT INTO voice_session_history 
-                        (guild_id, user_id, channel_id, category_id, encrypted_username,
-                        join_time, leave_time, duration_seconds, state_flags,
-                        was_muted, was_deafened, was_streaming, was_video)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-                    ''', *data['params'])
-
-                elif batch_type == 'voice_time':
-                    params = data['params']
-                    if len(params) >= 9:
-                        exists = await conn.fetchval('''
-                            SELECT EXISTS (
-                                SELECT 1 FROM voice_time_by_state 
-                                WHERE guild_id = $1 AND user_id = $2 
-                                AND channel_id = $3 AND state_flags = $4
-                            )
-                        ''', params[0], params[1], params[2], params[5])
+                        await conn.execute('''
+                            INSERT INTO message_tracking 
+                            (guild_id, user_id, channel_id, category_id, message_id,
+                            encrypted_username, message_length, mentions, has_attachment,
+                            has_embed, created_at, is_bot)
+                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                        ''', *data['params'])
+
+                        await self._update_batch_summaries(conn, batch_type, [data['params']])
+
+                    elif batch_type == 'voice_sessions':
+                        await conn.execute('''
+                            INSERT INTO voice_session_history 
+                            (guild_id, user_id, channel_id, category_id, encrypted_username,
+                            join_time, leave_time, duration_seconds, state_flags,
+                            was_muted, was_deafened, was_streaming, was_video)
+                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+                        ''', *data['params'])
+
+                        await self._insert_voice_hourly(conn, *data['params'][:8])
+                        await self._update_batch_summaries(conn, batch_type, [data['params']])
+
+                    elif batch_type == 'voice_time':
+                        params = data['params']
+                        if len(params) >= 9:
+                            exists = await conn.fetchval('''
+                                SELECT EXISTS (
+                                    SELECT 1 FROM voice_time_by_state 
+                                    WHERE guild_id = $1 AND user_id = $2 
+                                    AND channel_id = $3 AND state_flags = $4
+                                )
+                            ''', params[0], params[1], params[2], params[5])
+
+                            if exists:
+                                await conn.execute('''
+                                    UPDATE voice_time_by_state 
+                                    SET duration_seconds = duration_seconds + $5,
+                                        last_updated = $6
+                                    WHERE guild_id = $1 AND user_id = $2 
+                                    AND channel_id = $3 AND state_flags = $4
+                                ''', params[0], params[1], params[2], params[5], params[7], params[8])
+                            else:
+                                await conn.execute('''
+                                    INSERT INTO voice_time_by_state 
+                                    (guild_id, user_id, channel_id, category_id, encrypted_username,
+                                    state_flags, state_category, duration_seconds, last_updated)
+                                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                                ''', *params)
 
-                        if exists:
+                    elif batch_type == 'mentions':
+                        if len(data['params']) >= 8:
+
+                            message_id = data['params'][5]
+                            created_at = data['params'][6]
+
+                            exists = await conn.fetchval('''
+                                SELECT EXISTS (
+                                    SELECT 1 FROM user_mentions 
+                                    WHERE message_id = $1
+                                )
+                            ''', message_id)
+                            if exists:
+                                return True
+
+                        if len(data['params']) >= 8:
                             await conn.execute('''
-                                UPDATE voice_time_by_state 
-                                SET duration_seconds = duration_seconds + $5,
-                                    last_updated = $6
-                                WHERE guild_id = $1 AND user_id = $2 
-                                AND channel_id = $3 AND state_flags = $4
-                            ''', params[0], params[1], params[2], params[5], params[7], params[8])
+                                INSERT INTO user_mentions 
+                                (guild_id, mentioned_user_id, mentioner_user_id, channel_id, 
+                                category_id, message_id, created_at, encrypted_username)
+                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                            ''', *data['params'])
                         else:
+
+                            logger.warning(
+                                f"Mentions batch has {len(data['params'])} params, expected 8")
+                            return False
+
+                    elif batch_type == 'emojis':
+                        params = data['params']
+                        if len(params) >= 10:
                             await conn.execute('''
-                                INSERT INTO voice_time_by_state 
+                                INSERT INTO emoji_usage 
                                 (guild_id, user_id, channel_id, category_id, encrypted_username,
-                                state_flags, state_category, duration_seconds, last_updated)
-                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                                emoji_str, is_custom, usage_count, last_used, usage_type)
+                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
                             ''', *params)
 
-                elif batch_type == 'mentions':
-                    if len(data['params']) >= 8:
-
-                        message_id = data['params'][5]
-                        created_at = data['params'][6]
+                            await self._update_batch_summaries(conn, batch_type, [params])
 
-                        exists = await conn.fetchval('''
-                            SELECT EXISTS (
-                                SELECT 1 FROM user_mentions 
-                                WHERE message_id = $1
-                            )
-                        ''', message_id)
-                        if exists:
-                            return True
+                    elif batch_type == 'invites':
 
-                    if len(data['params']) >= 8:
                         await conn.execute('''
-                            INSERT INTO user_mentions 
-                            (guild_id, mentioned_user_id, mentioner_user_id, channel_id, 
-                            category_id, message_id, created_at, encrypted_username)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                        ''', *data['params'])
-                    else:
+                            INSERT INTO invite_tracking 
+                            (guild_id, inviter_id, invitee_id, invite_code, invite_type, created_at)
+                            VALUES ($1, $2, $3, $4, $5, $6)
+                        ''', *data['params'][:6])
 
-                        logger.warning(
-                            f"Mentions batch has {len(data['params'])} params, expected 8")
+                    else:
                         return False
 
-                elif batch_type == 'emojis':
-                    params = data['params']
-                    if len(params) >= 10:
-                        await conn.execute('''
-                            INSERT INTO emoji_usage 
-                            (guild_id, user_id, channel_id, category_id, encrypted_username,
-                            emoji_str, is_custom, usage_count, last_used, usage_type)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                        ''', *params)
-
-                elif batch_type == 'invites':
-
-                    await conn.execute('''
-                        INSERT INTO invite_tracking 
-                        (guild_id, inviter_id, invitee_id, invite_code, invite_type, created_at)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                    ''', *data['params'][:6])
-
-                else:
-                    return False
+                if batch_type in ('messages', 'voice_sessions'):
+                    await self._record_live_leaderboard_increments(
+                        'messages' if batch_type == 'messages' else 'voice',
+                        self._live_leaderboard_increments(batch_type, data['params']))
 
-                return True
+            await self._bump_query_cache_versions('data', [data['params'][0]])
+            return True
 
         except asyncpg.exceptions.PostgresError as e:
             logger.error(f"Direct write {batch_type}: PostgreSQL error: {e}")
@@ -510,6 +784,176 @@ class DatabaseStats(commands.Cog):
             traceback.print_exc()
             return False
 
+    # VOICE HOUR SLICES
+
+    @staticmethod
+    def _voice_hour_slices(join_time: datetime, leave_time: datetime,
+                           duration: int) -> List[Tuple[datetime, int]]:
+
+        # Split a session at UTC hour boundaries so each hour is credited with
+        # the seconds actually spent in it, not just the join hour
+        slices = []
+        cursor = join_time
+        while cursor < leave_time:
+            hour_bucket = cursor.replace(minute=0, second=0, microsecond=0)
+            slice_end = min(hour_bucket + timedelta(hours=1), leave_time)
+            slices.append(
+                [hour_bucket, int((slice_end - cursor).total_seconds())])
+            cursor = slice_end
+
+        if slices:
+            slices[-1][1] += duration - sum(seconds for _, seconds in slices)
+
+        return [(hour_bucket, seconds) for hour_bucket, seconds in slices if seconds > 0]
+
+    async def _insert_voice_hourly(self, conn, guild_id: int, user_id: int, channel_id: int,
+                                   category_id: Optional[int], encrypted_username: Optional[str],
+                                   join_time: datetime, leave_time: datetime, duration: int):
+
+        slices = self._voice_hour_slices(join_time, leave_time, duration)
+        if not slices:
+            return
+
+        await conn.executemany('''
+            INSERT INTO voice_hourly
+            (guild_id, user_id, channel_id, category_id, hour_bucket, seconds)
+            VALUES ($1, $2, $3, $4, $5, $6)
+        ''', [(guild_id, user_id, channel_id, category_id, hour_bucket, seconds)
+              for hour_bucket, seconds in slices])
+
+    # UNIQUE-USER SKETCHES
+
+    async def _merge_unique_user_sketches(self, conn, metric: str,
+                                          events: List[Tuple[int, int, Optional[int], datetime, int]]):
+
+        # events are (guild_id, channel_id, category_id, event_time, user_id);
+        # users are folded into the hourly sketch of their channel
+        if not events:
+            return
+
+        width = Constants.UNIQUE_USER_SKETCH_WIDTH
+        users = defaultdict(set)
+        categories = {}
+        for guild_id, channel_id, category_id, event_time, user_id in events:
+            if event_time.tzinfo is not None:
+                event_time = event_time.astimezone(timezone.utc).replace(tzinfo=None)
+            key = (guild_id, channel_id, floor_to_bucket(event_time, width))
+            users[key].add(user_id)
+            categories[key] = category_id
+
+        keys = list(users)
+        try:
+            async with conn.transaction():
+                rows = await conn.fetch('''
+                    SELECT guild_id, channel_id, bucket, sketch
+                    FROM unique_user_sketches
+                    WHERE metric = $1
+                    AND (guild_id, channel_id, bucket) IN (
+                        SELECT * FROM unnest($2::bigint[], $3::bigint[], $4::timestamptz[])
+                    )
+                    FOR UPDATE
+                ''', metric, [key[0] for key in keys], [key[1] for key in keys],
+                    [key[2] for key in keys])
+
+                existing = {
+                    (row['guild_id'], row['channel_id'],
+                     row['bucket'].astimezone(timezone.utc).replace(tzinfo=None)):
+                    HyperLogLog.from_bytes(row['sketch'])
+                    for row in rows
+                }
+
+                await conn.executemany('''
+                    INSERT INTO unique_user_sketches
+                    (guild_id, channel_id, category_id, metric, bucket, sketch)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (guild_id, metric, channel_id, bucket)
+                    DO UPDATE SET sketch = EXCLUDED.sketch, category_id = EXCLUDED.category_id
+                ''', [
+                    (key[0], key[1], categories[key], metric, key[2],
+                     existing.get(key, HyperLogLog()).add(list(users[key])).to_bytes())
+                    for key in keys
+                ])
+
+        except Exception as e:
+            logger.warning(f"Error updating {metric} unique-user sketches: {e}")
+
+    async def _merge_heavy_hitter_summaries(self, conn,
+                                            events: List[Tuple[int, str, datetime, str, int]]):
+
+        # events are (guild_id, dimension, event_time, item, weight)
+        if not events:
+            return
+
+        width = Constants.HEAVY_HITTER_WIDTH
+        batches = defaultdict(SpaceSaving)
+        for guild_id, dimension, event_time, item, weight in events:
+            if not weight:
+                continue
+            if event_time.tzinfo is not None:
+                event_time = event_time.astimezone(timezone.utc).replace(tzinfo=None)
+            batches[(guild_id, dimension, floor_to_bucket(event_time, width))].add(item, weight)
+
+        keys = list(batches)
+        if not keys:
+            return
+
+        try:
+            async with conn.transaction():
+                rows = await conn.fetch('''
+                    SELECT guild_id, dimension, bucket, summary::text AS summary
+                    FROM heavy_hitter_summaries
+                    WHERE (guild_id, dimension, bucket) IN (
+                        SELECT * FROM unnest($1::bigint[], $2::text[], $3::timestamptz[])
+                    )
+                    FOR UPDATE
+                ''', [key[0] for key in keys], [key[1] for key in keys], [key[2] for key in keys])
+
+                for row in rows:
+                    key = (row['guild_id'], row['dimension'],
+                           row['bucket'].astimezone(timezone.utc).replace(tzinfo=None))
+                    if key in batches:
+                        batches[key] = SpaceSaving.from_json(row['summary']).merge(batches[key])
+
+                await conn.executemany('''
+                    INSERT INTO heavy_hitter_summaries (guild_id, dimension, bucket, summary)
+                    VALUES ($1, $2, $3, $4::jsonb)
+                    ON CONFLICT (guild_id, dimension, bucket)
+                    DO UPDATE SET summary = EXCLUDED.summary
+                ''', [(key[0], key[1], key[2], batches[key].to_json()) for key in keys])
+
+        except Exception as e:
+            logger.warning(f"Error updating heavy-hitter summaries: {e}")
+
+    async def _update_batch_summaries(self, conn, batch_type: str, rows: List[List]):
+
+        # Feeds written rows into the unique-user sketches and heavy-hitter
+        # summaries; rows use the same params layout as the batch inserts
+        sketch_events = []
+        hitter_events = []
+
+        for params in rows:
+            if batch_type == 'messages':
+                if len(params) < 12 or params[11]:
+                    continue
+                sketch_events.append((params[0], params[2], params[3], params[10], params[1]))
+                hitter_events.append((params[0], 'text_channels', params[10], str(params[2]), 1))
+
+            elif batch_type == 'voice_sessions':
+                for hour_bucket, seconds in self._voice_hour_slices(params[5], params[6], params[7]):
+                    sketch_events.append((params[0], params[2], params[3], hour_bucket, params[1]))
+                    hitter_events.append(
+                        (params[0], 'voice_channels', hour_bucket, str(params[2]), seconds))
+
+            elif batch_type == 'emojis':
+                hitter_events.append(
+                    (params[0], 'emojis', params[8], f"{params[9]}:{params[5]}", params[7]))
+
+        if sketch_events:
+            await self._merge_unique_user_sketches(
+                conn, 'messages' if batch_type == 'messages' else 'voice', sketch_events)
+
+        await self._merge_heavy_hitter_summaries(conn, hitter_events)
+
     # BATCH FLUSHING METHODS
 
     async def _flush_batch_to_postgresql(self, batch_type: str):
@@ -528,118 +972,147 @@ class DatabaseStats(commands.Cog):
         if not batch_data:
             return
 
+        # (guild_id, user_id, bucket_time, amount) for the live leaderboards
+        live_increments = []
+        # params of the rows actually written, for the sketches and summaries
+        flushed_params = []
+
         try:
-            async with self.pool.acquire() as conn:
-                async with conn.transaction():
-                    for data in batch_data:
-                        try:
-                            if batch_type == 'messages':
-                                message_id = data['params'][4]
-                                exists = await conn.fetchval('''
-                                    SELECT EXISTS (
-                                        SELECT 1 FROM message_tracking 
-                                        WHERE message_id = $1
-                                    )
-                                ''', message_id)
-                                if exists:
-                                    continue
+            # Held from the commit to the live leaderboard increments, so a
+            # backfill sees each row either in SQL or as an increment, never both
+            async with self.live_leaderboard_lock:
+                async with self.pool.acquire() as conn:
+                    async with conn.transaction():
+                        for data in batch_data:
+                            try:
+                                if batch_type == 'messages':
+                                    message_id = data['params'][4]
+                                    exists = await conn.fetchval('''
+                                        SELECT EXISTS (
+                                            SELECT 1 FROM message_tracking 
+                                            WHERE message_id = $1
+                                        )
+                                    ''', message_id)
+                                    if exists:
+                                        continue
 
-                                await conn.execute('''
-                                    INSERT INTO message_tracking 
-                                    (guild_id, user_id, channel_id, category_id, message_id,
-                                    encrypted_username, message_length, mentions, has_attachment,
-                                    has_embed, created_at, is_bot)
-                                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                                ''', *data['params'])
-
-                            elif batch_type == 'voice_sessions':
-                                await conn.execute('''
-                                    INSERT INTO voice_session_history 
-                                    (guild_id, user_id, channel_id, category_id, encrypted_username,
-                                    join_time, leave_time, duration_seconds, state_flags,
-                                    was_muted, was_deafened, was_streaming, was_video)
-                                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-                                ''', *data['params'])
-
-                            elif batch_type == 'voice_time':
-                                params = data['params']
-                                exists = await conn.fetchval('''
-                                    SELECT EXISTS (
-                                        SELECT 1 FROM voice_time_by_state 
-                                        WHERE guild_id = $1 AND user_id = $2 
-                                        AND channel_id = $3 AND state_flags = $4
-                                    )
-                                ''', params[0], params[1], params[2], params[5])
-
-                                if exists:
                                     await conn.execute('''
-                                        UPDATE voice_time_by_state 
-                                        SET duration_seconds = duration_seconds + $6,
-                                            last_updated = $7
-                                        WHERE guild_id = $1 AND user_id = $2 
-                                        AND channel_id = $3 AND state_flags = $5
-                                    ''', params[0], params[1], params[2], params[3], params[5], params[7], params[8])
-                                else:
+                                        INSERT INTO message_tracking 
+                                        (guild_id, user_id, channel_id, category_id, message_id,
+                                        encrypted_username, message_length, mentions, has_attachment,
+                                        has_embed, created_at, is_bot)
+                                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                                    ''', *data['params'])
+
+                                    params = data['params']
+                                    flushed_params.append(params)
+                                    live_increments.extend(
+                                        self._live_leaderboard_increments(batch_type, params))
+
+                                elif batch_type == 'voice_sessions':
                                     await conn.execute('''
-                                        INSERT INTO voice_time_by_state 
+                                        INSERT INTO voice_session_history 
                                         (guild_id, user_id, channel_id, category_id, encrypted_username,
-                                        state_flags, state_category, duration_seconds, last_updated)
-                                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                                    ''', *params)
+                                        join_time, leave_time, duration_seconds, state_flags,
+                                        was_muted, was_deafened, was_streaming, was_video)
+                                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+                                    ''', *data['params'])
 
-                            elif batch_type == 'mentions':
+                                    params = data['params']
+                                    await self._insert_voice_hourly(conn, *params[:8])
+                                    flushed_params.append(params)
+                                    live_increments.extend(
+                                        self._live_leaderboard_increments(batch_type, params))
 
-                                if len(data['params']) >= 8:
-                                    message_id = data['params'][5]
+                                elif batch_type == 'voice_time':
+                                    params = data['params']
                                     exists = await conn.fetchval('''
                                         SELECT EXISTS (
-                                            SELECT 1 FROM user_mentions 
-                                            WHERE message_id = $1
+                                            SELECT 1 FROM voice_time_by_state 
+                                            WHERE guild_id = $1 AND user_id = $2 
+                                            AND channel_id = $3 AND state_flags = $4
                                         )
-                                    ''', message_id)
+                                    ''', params[0], params[1], params[2], params[5])
+
                                     if exists:
+                                        await conn.execute('''
+                                            UPDATE voice_time_by_state 
+                                            SET duration_seconds = duration_seconds + $6,
+                                                last_updated = $7
+                                            WHERE guild_id = $1 AND user_id = $2 
+                                            AND channel_id = $3 AND state_flags = $5
+                                        ''', params[0], params[1], params[2], params[3], params[5], params[7], params[8])
+                                    else:
+                                        await conn.execute('''
+                                            INSERT INTO voice_time_by_state 
+                                            (guild_id, user_id, channel_id, category_id, encrypted_username,
+                                            state_flags, state_category, duration_seconds, last_updated)
+                                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                                        ''', *params)
+
+                                elif batch_type == 'mentions':
+
+                                    if len(data['params']) >= 8:
+                                        message_id = data['params'][5]
+                                        exists = await conn.fetchval('''
+                                            SELECT EXISTS (
+                                                SELECT 1 FROM user_mentions 
+                                                WHERE message_id = $1
+                                            )
+                                        ''', message_id)
+                                        if exists:
+                                            continue
+
+                                    if len(data['params']) >= 8:
+                                        await conn.execute('''
+                                            INSERT INTO user_mentions 
+                                            (guild_id, mentioned_user_id, mentioner_user_id, channel_id, 
+                                            category_id, message_id, created_at, encrypted_username)
+                                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                                        ''', *data['params'])
+                                    else:
+                                        logger.warning(
+                                            f"Mentions batch in flush has {len(data['params'])} params")
                                         continue
+                                elif batch_type == 'emojis':
+                                    params = data['params']
+                                    await conn.execute('''
+                                        INSERT INTO emoji_usage 
+                                        (guild_id, user_id, channel_id, category_id, encrypted_username,
+                                        emoji_str, is_custom, usage_count, last_used, usage_type)
+                                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                                    ''', *params)
+                                    flushed_params.append(params)
+
+                                elif batch_type == 'invites':
 
-                                if len(data['params']) >= 8:
                                     await conn.execute('''
-                                        INSERT INTO user_mentions 
-                                        (guild_id, mentioned_user_id, mentioner_user_id, channel_id, 
-                                        category_id, message_id, created_at, encrypted_username)
-                                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                                        INSERT INTO invite_tracking 
+                                        (guild_id, inviter_id, invitee_id, invite_code, invite_type, created_at)
+                                        VALUES ($1, $2, $3, $4, $5, $6)
                                     ''', *data['params'])
+
                                 else:
-                                    logger.warning(
-                                        f"Mentions batch in flush has {len(data['params'])} params")
                                     continue
-                            elif batch_type == 'emojis':
-                                params = data['params']
-                                await conn.execute('''
-                                    INSERT INTO emoji_usage 
-                                    (guild_id, user_id, channel_id, category_id, encrypted_username,
-                                    emoji_str, is_custom, usage_count, last_used, usage_type)
-                                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                                ''', *params)
 
-                            elif batch_type == 'invites':
+                            except Exception as e:
+                                logger.error(
+                                    f"Error flushing individual {batch_type} record: {e}")
+                                continue
 
-                                await conn.execute('''
-                                    INSERT INTO invite_tracking 
-                                    (guild_id, inviter_id, invitee_id, invite_code, invite_type, created_at)
-                                    VALUES ($1, $2, $3, $4, $5, $6)
-                                ''', *data['params'])
+                        await self._update_batch_summaries(conn, batch_type, flushed_params)
 
-                            else:
-                                continue
+                        async with self.metrics_lock:
+                            self.metrics['redis_batch_flushes'] += 1
+                            if batch_type in self.metrics['redis_batch_sizes']:
+                                self.metrics['redis_batch_sizes'][batch_type] = 0
 
-                        except Exception as e:
-                            logger.error(
-                                f"Error flushing individual {batch_type} record: {e}")
-                            continue
+                if live_increments:
+                    metric = 'messages' if batch_type == 'messages' else 'voice'
+                    await self._record_live_leaderboard_increments(metric, live_increments)
 
-                    async with self.metrics_lock:
-                        self.metrics['redis_batch_flushes'] += 1
-                        if batch_type in self.metrics['redis_batch_sizes']:
-                            self.metrics['redis_batch_sizes'][batch_type] = 0
+            await self._bump_query_cache_versions(
+                'data', {data['params'][0] for data in batch_data if data.get('params')})
 
         except Exception as e:
             logger.error(
@@ -667,4265 +1140,2939 @@ class DatabaseStats(commands.Cog):
         except Exception as e:
             logger.error(f"Error in redis_batch_flusher: {e}")
 
-    # TIMESCALEDB INITIALIZATION
+    # LIVE LEADERBOARDS
 
-    async def _create_continuous_aggregates_safely(self, conn):
+    def _live_leaderboard_key(self, guild_id: int, metric: str, bucket_time: datetime,
+                              hourly: bool) -> str:
 
-        try:
+        if hourly:
+            return f"lb:{guild_id}:{metric}:h:{bucket_time.strftime('%Y%m%d%H')}"
+        return f"lb:{guild_id}:{metric}:d:{bucket_time.strftime('%Y%m%d')}"
 
-            is_hypertable = await conn.fetchval('''
-                SELECT EXISTS (
-                    SELECT 1 FROM timescaledb_information.hypertables 
-                    WHERE hypertable_name = 'message_tracking'
-                )
-            ''')
+    def _live_leaderboard_increments(self, batch_type: str,
+                                     params: List) -> List[Tuple[int, int, datetime, int]]:
 
-            if is_hypertable:
+        # (guild_id, user_id, bucket_time, amount) a written row adds to the
+        # live leaderboards; a voice session is split across the hours it
+        # spanned, the way voice_hourly is
+        if batch_type == 'messages':
+            return [] if params[11] else [(params[0], params[1], params[10], 1)]
+        if batch_type == 'voice_sessions':
+            return [(params[0], params[1], hour_bucket, seconds)
+                    for hour_bucket, seconds in self._voice_hour_slices(params[5], params[6], params[7])]
+        return []
 
-                await conn.execute('''
-                    CREATE MATERIALIZED VIEW IF NOT EXISTS daily_message_counts
-                    WITH (timescaledb.continuous) AS
-                    SELECT
-                        time_bucket('1 day', created_at) AS bucket,
-                        guild_id,
-                        COUNT(*) as message_count,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        SUM(message_length) as total_chars
-                    FROM message_tracking
-                    WHERE NOT is_bot
-                    GROUP BY bucket, guild_id;
-                ''')
+    def _live_leaderboard_marker_key(self, guild_id: int, metric: str) -> str:
 
-                try:
-                    await conn.execute('''
-                        SELECT add_continuous_aggregate_policy('daily_message_counts',
-                            start_offset => INTERVAL '30 days',
-                            end_offset => INTERVAL '1 hour',
-                            schedule_interval => INTERVAL '1 hour');
-                    ''')
-                except Exception:
-                    pass
+        return f"lb:{guild_id}:{metric}:covered"
 
-        except Exception as e:
-            print(
-                f"Failed to create daily_message_counts aggregate: {e}")
+    async def _record_live_leaderboard_increments(self, metric: str,
+                                                  increments: List[Tuple[int, int, datetime, int]]):
+
+        # Callers hold live_leaderboard_lock from their commit until this returns
+        if not increments:
+            return
+
+        if not self.redis or not self.redis_connected:
+            # The sorted sets miss these rows now; every guild backfills again
+            self.live_leaderboard_epoch = uuid.uuid4().hex
+            return
+
+        retention = Constants.LIVE_LEADERBOARD_RETENTION_DAYS * 86400
 
         try:
-            is_hypertable = await conn.fetchval('''
-                SELECT EXISTS (
-                    SELECT 1 FROM timescaledb_information.hypertables 
-                    WHERE hypertable_name = 'voice_session_history'
-                )
-            ''')
+            touched_keys = set()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for guild_id, user_id, bucket_time, amount in increments:
+                    if not amount or bucket_time is None:
+                        continue
 
-            if is_hypertable:
+                    if bucket_time.tzinfo is not None:
+                        bucket_time = bucket_time.astimezone(
+                            timezone.utc).replace(tzinfo=None)
 
-                await conn.execute('''
-                    CREATE MATERIALIZED VIEW IF NOT EXISTS daily_voice_time
-                    WITH (timescaledb.continuous) AS
-                    SELECT
-                        time_bucket('1 day', join_time) AS bucket,
-                        guild_id,
-                        SUM(duration_seconds) as total_seconds,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    GROUP BY bucket, guild_id;
-                ''')
+                    for hourly in (True, False):
+                        key = self._live_leaderboard_key(
+                            guild_id, metric, bucket_time, hourly)
+                        pipe.zincrby(key, amount, str(user_id))
+                        touched_keys.add(key)
 
-                try:
-                    await conn.execute('''
-                        SELECT add_continuous_aggregate_policy('daily_voice_time',
-                            start_offset => INTERVAL '30 days',
-                            end_offset => INTERVAL '1 hour',
-                            schedule_interval => INTERVAL '1 hour');
-                    ''')
-                except Exception:
-                    pass
+                for key in touched_keys:
+                    pipe.expire(key, retention)
+
+                await pipe.execute()
 
-                logger.info("Set up daily_voice_time continuous aggregate")
-            else:
-                logger.warning(
-                    "Cannot create daily_voice_time aggregate - voice_session_history not a hypertable")
         except Exception as e:
-            logger.warning(f"Failed to create daily_voice_time aggregate: {e}")
+            self.live_leaderboard_epoch = uuid.uuid4().hex
+            logger.warning(
+                f"Error updating live {metric} leaderboards: {e}")
 
-    # DATABASE INITIALIZATION
+    def _live_leaderboard_window_keys(self, guild_id: int, metric: str, days: int,
+                                      now: datetime) -> List[str]:
 
-    async def _initialize_database_schema(self):
+        # Hourly keys for the partial first day, daily keys for the rest
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        hour = current_hour - timedelta(hours=days * 24 - 1)
 
-        if not self.pool or not self.db_connected:
-            logger.error("No database connection for initialization")
-            return False
+        keys = []
+        while hour.hour != 0 and hour <= current_hour:
+            keys.append(self._live_leaderboard_key(guild_id, metric, hour, True))
+            hour += timedelta(hours=1)
 
-        try:
-            async with self.pool.acquire() as conn:
+        day = hour
+        while day <= current_hour:
+            keys.append(self._live_leaderboard_key(guild_id, metric, day, False))
+            day += timedelta(days=1)
 
-                # 1. Blacklist tables
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS blacklisted_users (
-                        id SERIAL PRIMARY KEY,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        created_at TIMESTAMP DEFAULT NOW(),
-                        UNIQUE(guild_id, user_id)
-                    )
-                ''')
+        return keys
 
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS blacklisted_channels (
-                        id SERIAL PRIMARY KEY,
-                        guild_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        created_at TIMESTAMP DEFAULT NOW(),
-                        UNIQUE(guild_id, channel_id)
-                    )
-                ''')
+    def _excluded_user_ids(self, guild: discord.Guild, blacklists: Dict[str, Set[int]]) -> Set[int]:
 
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS blacklisted_categories (
-                        id SERIAL PRIMARY KEY,
-                        guild_id BIGINT NOT NULL,
-                        category_id BIGINT NOT NULL,
-                        created_at TIMESTAMP DEFAULT NOW(),
-                        UNIQUE(guild_id, category_id)
-                    )
-                ''')
+        excluded_users = set(blacklists['users'])
 
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS blacklisted_roles (
-                        id SERIAL PRIMARY KEY,
-                        guild_id BIGINT NOT NULL,
-                        role_id BIGINT NOT NULL,
-                        created_at TIMESTAMP DEFAULT NOW(),
-                        UNIQUE(guild_id, role_id)
-                    )
-                ''')
+        if blacklists['roles']:
+            for member in guild.members:
+                if any(role.id in blacklists['roles'] for role in member.roles):
+                    excluded_users.add(member.id)
 
-                # 2. Invite tracking helper table
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS invite_uses (
-                        id SERIAL PRIMARY KEY,
-                        guild_id BIGINT NOT NULL,
-                        invite_code TEXT NOT NULL,
-                        uses INT DEFAULT 0,
-                        inviter_id BIGINT,
-                        deleted BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMP DEFAULT NOW(),
-                        updated_at TIMESTAMP DEFAULT NOW(),
-                        UNIQUE(guild_id, invite_code)
-                    )
-                ''')
+        return excluded_users
 
-                # HYPERTABLES
+    async def _backfill_live_leaderboard(self, guild_id: int, metric: str):
 
-                # 1. message_tracking
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS message_tracking (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        category_id BIGINT,
-                        message_id BIGINT NOT NULL,
-                        encrypted_username TEXT,
-                        message_length INT NOT NULL DEFAULT 0,
-                        mentions JSONB,
-                        has_attachment BOOLEAN DEFAULT FALSE,
-                        has_embed BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        is_bot BOOLEAN DEFAULT FALSE,
-                        
-                        PRIMARY KEY (id, created_at),
-                        UNIQUE(message_id, created_at)
-                    )
-                ''')
+        # Rebuilds the guild's hourly and daily sorted sets for metric from
+        # SQL, then sets its coverage marker. Holding live_leaderboard_lock,
+        # every committed row is either in the query or still to be
+        # incremented, so nothing is counted twice or missed.
+        retention = Constants.LIVE_LEADERBOARD_RETENTION_DAYS * 86400
 
-                # 2. voice_session_history
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS voice_session_history (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        category_id BIGINT,
-                        encrypted_username TEXT,
-                        join_time TIMESTAMPTZ NOT NULL,
-                        leave_time TIMESTAMPTZ NOT NULL,
-                        duration_seconds INT NOT NULL,
-                        state_flags INT DEFAULT 0,
-                        was_muted BOOLEAN DEFAULT FALSE,
-                        was_deafened BOOLEAN DEFAULT FALSE,
-                        was_streaming BOOLEAN DEFAULT FALSE,
-                        was_video BOOLEAN DEFAULT FALSE,
-                        
-                        PRIMARY KEY (id, join_time)
-                    )
-                ''')
+        try:
+            async with self.live_leaderboard_lock:
+                epoch = self.live_leaderboard_epoch
+                now = datetime.utcnow()
+                current_hour = now.replace(minute=0, second=0, microsecond=0)
+                first_day = (current_hour - timedelta(
+                    days=max(Constants.LIVE_LEADERBOARD_WINDOWS))).replace(hour=0)
+
+                if metric == 'voice':
+                    # Sliced at hour boundaries, like the increments
+                    query = '''
+                        SELECT hour_bucket, user_id, SUM(seconds) AS amount
+                        FROM voice_hourly
+                        WHERE guild_id = $1 AND hour_bucket >= $2
+                        GROUP BY hour_bucket, user_id
+                    '''
+                elif 'hourly_message_stats' in self.available_rollups:
+                    query = '''
+                        SELECT bucket AS hour_bucket, user_id, SUM(message_count) AS amount
+                        FROM hourly_message_stats
+                        WHERE guild_id = $1 AND bucket >= $2
+                        GROUP BY bucket, user_id
+                    '''
+                else:
+                    query = '''
+                        SELECT date_trunc('hour', created_at AT TIME ZONE 'UTC') AS hour_bucket,
+                               user_id, COUNT(*) AS amount
+                        FROM message_tracking
+                        WHERE guild_id = $1 AND NOT is_bot AND created_at >= $2
+                        GROUP BY 1, user_id
+                    '''
 
-                # 3. emoji_usage
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS emoji_usage (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        category_id BIGINT,
-                        encrypted_username TEXT,
-                        emoji_str TEXT NOT NULL,
-                        is_custom BOOLEAN DEFAULT FALSE,
-                        usage_count INT DEFAULT 1,
-                        last_used TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        usage_type TEXT NOT NULL,  -- 'message' or 'reaction'
-                        
-                        PRIMARY KEY (id, last_used),
-                        UNIQUE(guild_id, user_id, channel_id, emoji_str, usage_type, last_used)
-                    )
-                ''')
+                # The primary: a lagging replica would miss committed rows
+                async with self.pool.acquire() as conn:
+                    rows = await conn.fetch(query, guild_id, first_day)
 
-                # 4. invite_tracking
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS invite_tracking (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        inviter_id BIGINT NOT NULL,
-                        invitee_id BIGINT,
-                        invite_code TEXT NOT NULL,
-                        invite_type TEXT NOT NULL,  -- 'valid', 'suspicious', 'left'
-                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        
-                        PRIMARY KEY (id, created_at)
-                    )
-                ''')
+                scores = defaultdict(lambda: defaultdict(int))
+                for row in rows:
+                    if not row['amount']:
+                        continue
+                    hour_bucket = row['hour_bucket']
+                    if hour_bucket.tzinfo is not None:
+                        hour_bucket = hour_bucket.astimezone(timezone.utc).replace(tzinfo=None)
+                    for hourly in (True, False):
+                        key = self._live_leaderboard_key(guild_id, metric, hour_bucket, hourly)
+                        scores[key][str(row['user_id'])] += int(row['amount'])
+
+                # Replaces whatever partial sets were there, including unions
+                # built from them
+                stale_keys = [f"lb:{guild_id}:{metric}:u:{days}:{current_hour.strftime('%Y%m%d%H')}"
+                              for days in Constants.LIVE_LEADERBOARD_WINDOWS]
+                hour = first_day
+                while hour <= current_hour:
+                    stale_keys.append(self._live_leaderboard_key(guild_id, metric, hour, True))
+                    if hour.hour == 0:
+                        stale_keys.append(self._live_leaderboard_key(guild_id, metric, hour, False))
+                    hour += timedelta(hours=1)
+
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(*stale_keys)
+                    for key, members in scores.items():
+                        pipe.zadd(key, members)
+                        pipe.expire(key, retention)
+                    pipe.set(self._live_leaderboard_marker_key(guild_id, metric), epoch)
+                    await pipe.execute()
 
-                # 5. user_mentions
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS user_mentions (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        mentioned_user_id BIGINT NOT NULL,
-                        mentioner_user_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        category_id BIGINT,
-                        message_id BIGINT NOT NULL,
-                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        encrypted_username TEXT,
-                        
-                        PRIMARY KEY (id, created_at),
-                        UNIQUE(message_id, created_at)
-                    )
-                ''')
+        except Exception as e:
+            logger.warning(f"Could not backfill live {metric} leaderboards for {guild_id}: {e}")
 
-                # 6. voice_time_by_state
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS voice_time_by_state (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        channel_id BIGINT NOT NULL,
-                        category_id BIGINT,
-                        encrypted_username TEXT,
-                        state_flags INT NOT NULL,
-                        state_category TEXT NOT NULL,
-                        duration_seconds INT NOT NULL DEFAULT 0,
-                        last_updated TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        
-                        PRIMARY KEY (id, last_updated),
-                        UNIQUE(guild_id, user_id, channel_id, state_flags, state_category)
-                    )
-                ''')
+    def _schedule_live_leaderboard_backfill(self, guild_id: int, metric: str):
 
-                # 7. activity_sessions
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS activity_sessions (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        channel_id BIGINT,
-                        category_id BIGINT,
-                        encrypted_username TEXT,
-                        activity_type TEXT NOT NULL,
-                        start_time TIMESTAMPTZ NOT NULL,
-                        end_time TIMESTAMPTZ,
-                        duration_seconds INT,
-                        
-                        PRIMARY KEY (id, start_time)
-                    )
-                ''')
+        key = (guild_id, metric)
+        if key in self.live_leaderboard_backfills:
+            return
 
-                # 8. activities
-                await conn.execute('''
-                    CREATE TABLE IF NOT EXISTS activities (
-                        id BIGSERIAL,
-                        guild_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        encrypted_username TEXT,
-                        activity_name TEXT NOT NULL,
-                        activity_type TEXT NOT NULL,
-                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                        
-                        PRIMARY KEY (id, created_at)
-                    )
-                ''')
+        task = asyncio.create_task(self._backfill_live_leaderboard(guild_id, metric))
+        self.live_leaderboard_backfills[key] = task
+        task.add_done_callback(lambda _: self.live_leaderboard_backfills.pop(key, None))
 
-                logger.info("✅ Created all base tables")
+    async def clear_live_leaderboards(self, guild_id: int):
 
-                # HYPERTABLE CONVERSION
+        # Drops the guild's sorted sets and coverage markers; the next read
+        # backfills them from SQL
+        async with self.live_leaderboard_lock:
+            if not self.redis or not self.redis_connected:
+                self.live_leaderboard_epoch = uuid.uuid4().hex
+                return
 
-                hypertables = [
-                    ('message_tracking', 'created_at'),
-                    ('voice_session_history', 'join_time'),
-                    ('emoji_usage', 'last_used'),
-                    ('invite_tracking', 'created_at'),
-                    ('user_mentions', 'created_at'),
-                    ('voice_time_by_state', 'last_updated'),
-                    ('activity_sessions', 'start_time'),
-                    ('activities', 'created_at')
-                ]
+            try:
+                keys = [key async for key in self.redis.scan_iter(match=f"lb:{guild_id}:*", count=1000)]
+                for index in range(0, len(keys), 1000):
+                    await self.redis.delete(*keys[index:index + 1000])
+            except Exception as e:
+                self.live_leaderboard_epoch = uuid.uuid4().hex
+                logger.warning(f"Could not clear live leaderboards for {guild_id}: {e}")
+
+    @cached_query
+    async def q_live_leaderboard(self, guild_id: int, metric: str, days: int,
+                                 offset: int = 0, limit: int = 10) -> Optional[Dict[str, Any]]:
+
+        # Returns None when the request can't be answered from Redis and
+        # the caller should fall back to SQL
+        if (not self.redis or not self.redis_connected
+                or metric not in Constants.LIVE_LEADERBOARD_METRICS
+                or days not in Constants.LIVE_LEADERBOARD_WINDOWS):
+            return None
 
-                for table_name, time_column in hypertables:
-                    try:
-                        await conn.execute(f'''
-                            SELECT create_hypertable(
-                                '{table_name}', 
-                                '{time_column}', 
-                                chunk_time_interval => INTERVAL '7 days',
-                                if_not_exists => TRUE
-                            )
-                        ''')
-                        logger.info(f"✅ Converted {table_name} to hypertable")
-                    except Exception as e:
-                        logger.warning(
-                            f"⚠️ Could not create hypertable for {table_name}: {e}")
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return None
 
-                await self._create_continuous_aggregates_safely(conn)
+        blacklists = await self._get_cached_blacklists(guild_id)
 
-                # INDEXES
+        # Sorted sets are per guild, channel and category exclusions can't be applied
+        if blacklists['channels'] or blacklists['categories']:
+            return None
 
-                # Message tracking indexes
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_message_tracking_guild_user 
-                    ON message_tracking (guild_id, user_id, created_at DESC)
-                ''')
+        try:
+            # Until the sorted sets are backfilled they can't tell "no
+            # activity" from "not tracked yet" (a fresh deploy, a flush)
+            marker = await self.redis.get(self._live_leaderboard_marker_key(guild_id, metric))
+            if marker != self.live_leaderboard_epoch:
+                self._schedule_live_leaderboard_backfill(guild_id, metric)
+                note_query_failure('q_live_leaderboard')
+                return None
+
+            now = datetime.utcnow()
+            union_key = f"lb:{guild_id}:{metric}:u:{days}:{now.strftime('%Y%m%d%H')}"
+
+            if not await self.redis.exists(union_key):
+                keys = self._live_leaderboard_window_keys(guild_id, metric, days, now)
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.zunionstore(union_key, keys)
+                    pipe.expire(union_key, Constants.LIVE_LEADERBOARD_UNION_TTL)
+                    await pipe.execute()
+
+            excluded_users = self._excluded_user_ids(guild, blacklists)
+
+            rows = await self.redis.zrevrange(
+                union_key, 0, offset + limit + len(excluded_users) - 1, withscores=True)
+            total_users = await self.redis.zcard(union_key)
 
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_message_tracking_guild_channel 
-                    ON message_tracking (guild_id, channel_id, created_at DESC)
-                ''')
+            if excluded_users:
+                scores = await self.redis.zmscore(
+                    union_key, [str(user_id) for user_id in excluded_users])
+                total_users -= sum(1 for score in scores if score is not None)
 
-                # Voice session indexes
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_voice_session_guild_user 
-                    ON voice_session_history (guild_id, user_id, join_time DESC)
-                ''')
+            entries = [(int(member), score) for member, score in rows
+                       if int(member) not in excluded_users and score > 0]
 
-                # Emoji usage indexes
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_emoji_usage_guild_emoji 
-                    ON emoji_usage (guild_id, emoji_str, last_used DESC)
-                ''')
+            return {
+                'entries': entries[offset:offset + limit],
+                'total_users': max(total_users, 0)
+            }
 
-                # User mentions indexes
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_user_mentions_guild_mentioned 
-                    ON user_mentions (guild_id, mentioned_user_id, created_at DESC)
-                ''')
+        except Exception as e:
+            note_query_failure('q_live_leaderboard')
+            logger.warning(f"Error reading live {metric} leaderboard: {e}")
+            return None
 
-                await conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_user_mentions_guild_mentioner 
-                    ON user_mentions (guild_id, mentioner_user_id, created_at DESC)
-                ''')
+    # RESETS
 
-                logger.info("✅ Created all indexes")
+    async def rebuild_guild_summaries(self, conn, guild_id: int,
+                                      deleted_ranges: Dict[str, Tuple[datetime, datetime]]):
 
-                return True
+        # Called inside a reset's transaction once raw rows are gone. A sketch
+        # can't forget a single user, so every sketch and summary of the guild
+        # over the deleted range is dropped and rebuilt from the rows left.
+        # deleted_ranges maps raw table -> (first, last) time deleted from it.
+        def as_naive_utc(moment):
+            if moment.tzinfo is not None:
+                return moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
 
-        except Exception as e:
-            logger.error(f"❌ Error initializing database schema: {e}")
-            traceback.print_exc()
-            return False
-
-    # DIRECT POSTGRESQL QUERIES FOR BLACKLISTS
-
-    async def _get_cached_blacklists(self, guild_id: int) -> Dict[str, Any]:
+        width = Constants.UNIQUE_USER_SKETCH_WIDTH
+        chunk = Constants.SUMMARY_REBUILD_CHUNK
 
-        blacklists = {
-            'users': set(),
-            'channels': set(),
-            'categories': set(),
-            'roles': set()
-        }
-
-        if not self.pool or not self.db_connected:
-            return blacklists
+        for table, (metric, dimension) in Constants.SUMMARY_SOURCES.items():
+            if table not in deleted_ranges:
+                continue
 
-        try:
-            async with self.connection_semaphore:
-                async with self.pool.acquire() as conn:
+            first_at, last_at = deleted_ranges[table]
+            range_start = floor_to_bucket(as_naive_utc(first_at), width)
+            range_end = floor_to_bucket(as_naive_utc(last_at), width) + width
 
+            if metric:
+                await conn.execute('''
+                    DELETE FROM unique_user_sketches
+                    WHERE guild_id = $1 AND metric = $2 AND bucket >= $3 AND bucket < $4
+                ''', guild_id, metric, range_start, range_end)
+            await conn.execute('''
+                DELETE FROM heavy_hitter_summaries
+                WHERE guild_id = $1 AND dimension = $2 AND bucket >= $3 AND bucket < $4
+            ''', guild_id, dimension, range_start, range_end)
+
+            chunk_start = range_start
+            while chunk_start < range_end:
+                chunk_end = min(chunk_start + chunk, range_end)
+
+                if table == 'message_tracking':
                     rows = await conn.fetch('''
-                        SELECT user_id FROM blacklisted_users 
-                        WHERE guild_id = $1
-                    ''', guild_id)
-                    blacklists['users'] = {row['user_id'] for row in rows}
-
+                        SELECT channel_id, category_id, user_id,
+                               time_bucket($4::interval, created_at) AS bucket, COUNT(*) AS amount
+                        FROM message_tracking
+                        WHERE guild_id = $1 AND NOT is_bot
+                        AND created_at >= $2 AND created_at < $3
+                        GROUP BY channel_id, category_id, user_id, bucket
+                    ''', guild_id, chunk_start, chunk_end, width)
+                    await self._merge_unique_user_sketches(conn, metric, [
+                        (guild_id, row['channel_id'], row['category_id'], row['bucket'], row['user_id'])
+                        for row in rows
+                    ])
+                    await self._merge_heavy_hitter_summaries(conn, [
+                        (guild_id, dimension, row['bucket'], str(row['channel_id']), row['amount'])
+                        for row in rows
+                    ])
+
+                elif table == 'voice_session_history':
                     rows = await conn.fetch('''
-                        SELECT channel_id FROM blacklisted_channels 
-                        WHERE guild_id = $1
-                    ''', guild_id)
-                    blacklists['channels'] = {
-                        row['channel_id'] for row in rows}
+                        SELECT channel_id, category_id, user_id, hour_bucket AS bucket,
+                               SUM(seconds) AS amount
+                        FROM voice_hourly
+                        WHERE guild_id = $1 AND hour_bucket >= $2 AND hour_bucket < $3
+                        GROUP BY channel_id, category_id, user_id, hour_bucket
+                    ''', guild_id, chunk_start, chunk_end)
+                    await self._merge_unique_user_sketches(conn, metric, [
+                        (guild_id, row['channel_id'], row['category_id'], row['bucket'], row['user_id'])
+                        for row in rows if row['amount'] > 0
+                    ])
+                    await self._merge_heavy_hitter_summaries(conn, [
+                        (guild_id, dimension, row['bucket'], str(row['channel_id']), row['amount'])
+                        for row in rows
+                    ])
 
+                else:
                     rows = await conn.fetch('''
-                        SELECT category_id FROM blacklisted_categories 
-                        WHERE guild_id = $1
-                    ''', guild_id)
-                    blacklists['categories'] = {
-                        row['category_id'] for row in rows}
+                        SELECT usage_type, emoji_str, time_bucket($4::interval, last_used) AS bucket,
+                               SUM(usage_count) AS amount
+                        FROM emoji_usage
+                        WHERE guild_id = $1 AND last_used >= $2 AND last_used < $3
+                        GROUP BY usage_type, emoji_str, bucket
+                    ''', guild_id, chunk_start, chunk_end, width)
+                    await self._merge_heavy_hitter_summaries(conn, [
+                        (guild_id, dimension, row['bucket'],
+                         f"{row['usage_type']}:{row['emoji_str']}", row['amount'])
+                        for row in rows
+                    ])
+
+                chunk_start = chunk_end
+
+    async def refresh_rollups(self, deleted_ranges: Dict[str, Tuple[datetime, datetime]]):
+
+        # The aggregate policies only refresh their last few buckets, so rows
+        # deleted further back would stay in the rollups. Finer tiers go
+        # first, so each tier refreshes from an up-to-date parent.
+        if not self.pool:
+            return
 
-                    rows = await conn.fetch('''
-                        SELECT role_id FROM blacklisted_roles 
-                        WHERE guild_id = $1
-                    ''', guild_id)
-                    blacklists['roles'] = {row['role_id'] for row in rows}
+        def as_naive_utc(moment):
+            if moment.tzinfo is not None:
+                return moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
+
+        async with self.pool.acquire() as conn:
+            for tier in Constants.ROLLUP_TIERS:
+                width = tier['width']
+                for rollup_name, rollup in Constants.ROLLUP_SOURCES.items():
+                    view_name = f"{tier['prefix']}_{rollup_name}"
+                    if rollup['table'] not in deleted_ranges or view_name not in self.available_rollups:
+                        continue
 
-        except Exception as e:
-            logger.error(
-                f"Error fetching blacklists for guild {guild_id}: {e}")
+                    first_at, last_at = deleted_ranges[rollup['table']]
+                    window_start = floor_to_bucket(as_naive_utc(first_at), width)
+                    window_end = floor_to_bucket(as_naive_utc(last_at), width) + width
 
-        return blacklists
+                    try:
+                        await conn.execute(f'''
+                            CALL refresh_continuous_aggregate('{view_name}',
+                                $1::timestamptz, $2::timestamptz);
+                        ''', window_start, window_end)
+                    except Exception as e:
+                        logger.warning(f"Could not refresh {view_name} after a reset: {e}")
 
-    async def _apply_comprehensive_blacklist_filters(self, guild_id: int, guild: discord.Guild,
-                                                     base_query: str, params: List,
-                                                     table_name: str,
-                                                     include_users: bool = True,
-                                                     include_channels: bool = True,
-                                                     specific_channel_id: Optional[int] = None,
-                                                     specific_category_id: Optional[int] = None) -> Tuple[Optional[str], List]:
+    # QUERY CACHE
 
-        if not include_users and not include_channels:
-            return base_query, params
+    async def _get_query_cache_versions(self, guild_id: int) -> Tuple[str, str]:
 
-        blacklists = await self._get_cached_blacklists(guild_id)
+        if self.redis and self.redis_connected:
+            # Nested and back-to-back cached calls share one read
+            versions = self.query_cache_versions.recent(guild_id)
+            if versions:
+                return versions
 
-        # CHANNEL BLACKLISTING
-        if specific_channel_id is not None:
+            try:
+                bumps = self.query_cache_versions.bumps
+                raw_versions = await self.redis.mget(
+                    f"qv:data:{guild_id}", f"qv:blacklist:{guild_id}")
+                return self.query_cache_versions.remember(guild_id, raw_versions, bumps)
+            except Exception as e:
+                logger.debug(f"Query cache versions unavailable: {e}")
 
-            if specific_channel_id in blacklists['channels']:
-                return None, []
+        return self.query_cache_versions.local_versions(guild_id)
 
-            if guild:
-                channel = guild.get_channel(specific_channel_id)
-                if channel and hasattr(channel, 'category_id') and channel.category_id:
-                    if channel.category_id in blacklists['categories']:
-                        return None, []
+    async def _bump_query_cache_versions(self, kind: str, guild_ids):
 
-        # CATEGORY BLACKLISTING
-        if specific_category_id is not None and specific_category_id in blacklists['categories']:
-            return None, []
+        # kind is 'data' (new rows landed) or 'blacklist'
+        guild_ids = {guild_id for guild_id in guild_ids if guild_id}
+        if not guild_ids:
+            return
 
-        filter_parts = []
-        new_params = params.copy()
+        if kind == 'data':
+            await self._note_primary_write_lsn()
 
-        # USER BLACKLISTING
-        if include_users and guild:
-            excluded_users = set()
+        self.query_cache_versions.bump(kind, guild_ids)
 
-            if blacklists['users']:
-                excluded_users.update(blacklists['users'])
+        if self.redis and self.redis_connected:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for guild_id in guild_ids:
+                        pipe.incr(f"qv:{kind}:{guild_id}")
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Could not bump query cache versions: {e}")
 
-            if blacklists['roles'] and guild.members:
-                blacklisted_role_ids = blacklists['roles']
+        self.query_cache_versions.forget(guild_ids)
 
-                for member in guild.members:
-                    if any(role.id in blacklisted_role_ids for role in member.roles):
-                        excluded_users.add(member.id)
+    async def bump_blacklist_version(self, guild_id: int):
 
-            if excluded_users:
-                placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
-                                                                 len(new_params) + len(excluded_users) + 1)])
-                filter_parts.append(f"user_id NOT IN ({placeholders})")
-                new_params.extend(list(excluded_users))
+        await self._bump_query_cache_versions('blacklist', [guild_id])
 
-        # CHANNEL & CATEGORY BLACKLIST FILTERS
+    async def bump_data_version(self, guild_id: int):
 
-        if include_channels and guild:
-            channel_filters = []
+        await self._bump_query_cache_versions('data', [guild_id])
 
-            tables_with_channels = ['message_tracking', 'voice_session_history',
-                                    'emoji_usage', 'voice_time_by_state', 'activity_sessions']
+    async def _cached_call(self, func, signature: inspect.Signature,
+                           args: Tuple, kwargs: Dict[str, Any]) -> Any:
 
-            tables_without_channels = [
-                'user_mentions', 'invite_tracking', 'activities']
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop('self')
 
-            if table_name in tables_with_channels:
+        guild_id = arguments.get('guild_id')
+        if not self.pool or guild_id is None:
+            return await func(self, **arguments)
 
-                if specific_channel_id is None and blacklists['channels']:
-                    placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
-                                                                     len(new_params) + len(blacklists['channels']) + 1)])
-                    channel_filters.append(
-                        f"channel_id NOT IN ({placeholders})")
-                    new_params.extend(list(blacklists['channels']))
+        normalize_cache_arguments(arguments, Constants.QUERY_CACHE_WINDOW)
+        versions = await self._get_query_cache_versions(guild_id)
+        key = query_cache_key(func.__name__, guild_id, versions, arguments)
 
-                if specific_category_id is None and blacklists['categories']:
-                    placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
-                                                                     len(new_params) + len(blacklists['categories']) + 1)])
-                    channel_filters.append(
-                        f"(category_id IS NULL OR category_id NOT IN ({placeholders}))")
-                    new_params.extend(list(blacklists['categories']))
+        entry = self.query_cache.get(key)
+        if entry:
+            if entry[0] > time.time():
+                self.query_cache.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            del self.query_cache[key]
 
-            if channel_filters:
-                filter_parts.append("(" + " AND ".join(channel_filters) + ")")
+        # Concurrent misses for one key (a burst of identical commands) share
+        # one Redis lookup or query run
+        result, failed = await self.query_flights.do(
+            key, functools.partial(self._load_cached_query, func, arguments, key))
 
-        # APPLY FILTERS TO QUERY
-        if filter_parts:
-            if 'WHERE' in base_query.upper():
-                base_query += " AND " + " AND ".join(filter_parts)
-            else:
-                base_query += " WHERE " + " AND ".join(filter_parts)
+        # A composite built from this result mustn't be cached either
+        if failed:
+            note_query_failure(func.__name__)
 
-        return base_query, new_params
+        return copy.deepcopy(result)
 
-    # SHUTDOWN
+    async def _load_cached_query(self, func, arguments: Dict[str, Any], key: str) -> Tuple[Any, bool]:
 
-    async def cog_unload(self):
+        # (result, whether it's an error fallback that wasn't stored)
+        result = None
+        if self.redis and self.redis_connected:
+            try:
+                raw = await self.redis.get(key)
+                if raw is not None:
+                    result = decode_cached_value(json.loads(raw))
+            except Exception as e:
+                logger.debug(f"Query cache read failed for {key}: {e}")
 
-        async with self.shutdown_lock:
-            self.shutting_down = True
+        if result is None:
+            failures = []
+            token = query_failures.set(failures)
+            try:
+                result = await func(self, **arguments)
+            finally:
+                query_failures.reset(token)
 
-        tasks_to_stop = [
-            self.voice_activity_tracker,
-            self.connection_pool_health_check,
+            # A fallback returned after an error isn't real data; don't keep it
+            if failures:
+                return result, True
 
-            self.init_pools,
-            self.metrics_reset_task,
-            self.timescale_maintenance,
+            if self.redis and self.redis_connected:
+                try:
+                    await self.redis.setex(key, Constants.QUERY_CACHE_TTL,
+                                           json.dumps(encode_cached_value(result)))
+                except TypeError:
+                    pass
+                except Exception as e:
+                    logger.debug(f"Query cache write failed for {key}: {e}")
 
-            self.redis_batch_flusher,
-            self.cleanup_task
-        ]
+        self.query_cache[key] = (time.time() + Constants.QUERY_CACHE_TTL, result)
+        self.query_cache.move_to_end(key)
+        while len(self.query_cache) > Constants.QUERY_CACHE_SIZE:
+            self.query_cache.popitem(last=False)
 
-        for task in tasks_to_stop:
-            if task and not task.done():
-                task.cancel()
+        return result, False
 
-        try:
-            await asyncio.wait_for(
-                asyncio.gather(
-                    *[task for task in tasks_to_stop if task and not task.done()],
-                    return_exceptions=True
-                ),
-                timeout=Constants.SHUTDOWN_TIMEOUT
-            )
-        except (asyncio.TimeoutError, asyncio.CancelledError):
-            pass
-        except Exception as e:
-            logger.warning(f"Error during task shutdown: {e}")
+    # RANKING SNAPSHOTS
 
-        try:
-            await self._flush_all_batches_to_postgresql()
-        except Exception as e:
-            logger.warning(f"Error during final Redis batch flush: {e}")
+    async def _get_ranking_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
 
-        try:
-            await self._cleanup_all_voice_sessions()
-        except Exception as e:
-            logger.warning(f"Error during voice session cleanup: {e}")
+        if self.redis and self.redis_connected:
+            try:
+                cached = await self.redis.get(key)
+                return json.loads(cached) if cached else None
+            except Exception as e:
+                logger.warning(f"Error reading ranking snapshot {key}: {e}")
 
-        close_tasks = []
-        if self.pool:
-            close_tasks.append(self.pool.close())
-        if self.redis:
-            close_tasks.append(self.redis.close())
+        entry = self.ranking_snapshots.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        self.ranking_snapshots.pop(key, None)
+        return None
 
-        if close_tasks:
+    async def _store_ranking_snapshot(self, key: str, snapshot: Dict[str, Any]):
+
+        if self.redis and self.redis_connected:
             try:
-                await asyncio.wait_for(
-                    asyncio.gather(*close_tasks, return_exceptions=True),
-                    timeout=10
-                )
-            except (asyncio.TimeoutError, Exception) as e:
-                logger.error(f"Error closing connections: {e}")
+                await self.redis.setex(key, Constants.RANKING_SNAPSHOT_TTL, json.dumps(snapshot))
+                return
+            except Exception as e:
+                logger.warning(f"Error storing ranking snapshot {key}: {e}")
+
+        now = time.time()
+        for stale_key in [k for k, (expires, _) in self.ranking_snapshots.items() if expires <= now]:
+            del self.ranking_snapshots[stale_key]
+        self.ranking_snapshots[key] = (now + Constants.RANKING_SNAPSHOT_TTL, snapshot)
+
+    async def _q_ranking(self, guild: discord.Guild, metric: str, rank_column: str,
+                         scope: str, target_id: Optional[int],
+                         role_filter_ids: Optional[List[int]],
+                         start_time: datetime, end_time: datetime) -> List[List[int]]:
+
+        # The whole ranking as [id, value] pairs, ordered by value then id,
+        # both descending
+        source = Constants.METRIC_SOURCES[metric]
+        value_sql = source['value']
+
+        query, params = await self._build_scoped_query(
+            guild, metric, f"{rank_column} AS ranked_id, {value_sql} AS value",
+            scope, target_id, role_filter_ids, start_time=start_time, end_time=end_time
+        )
 
-        try:
-            await self._cleanup_all_memory()
-        except Exception as e:
-            logger.warning(f"Error during memory cleanup: {e}")
+        if query is None:
+            return []
 
-        logger.info("DatabaseStats cog shutdown complete")
+        if rank_column != source['user_column']:
+            query += f" AND {rank_column} IS NOT NULL"
 
-    async def _cleanup_all_memory(self):
+        query += f'''
+            GROUP BY {rank_column}
+            HAVING {value_sql} > 0
+            ORDER BY value DESC, ranked_id DESC
+        '''
 
-        self.processed_messages.clear()
+        async with self._read_pool().acquire() as conn:
+            rows = await conn.fetch(query, *params)
 
-        self.rate_limits.clear()
+        return [[row['ranked_id'], int(row['value'])] for row in rows]
 
-        self.invite_locks.clear()
+    async def _build_ranking_snapshot(self, key: str, guild: discord.Guild, metric: str,
+                                      rank_column: str, scope: str, target_id: Optional[int],
+                                      role_filter_ids: Optional[List[int]],
+                                      days_back: int) -> Dict[str, Any]:
 
-        if hasattr(self.bot, 'invites_cache'):
-            self.bot.invites_cache.clear()
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(days=days_back)
+        rows = await self._q_ranking(
+            guild, metric, rank_column, scope, target_id, role_filter_ids, start_time, end_time)
 
-        async with self.voice_lock:
-            self.active_voice_sessions.clear()
+        snapshot = {
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'rows': rows,
+            'total_items': len(rows),
+            'total_value': sum(value for _, value in rows)
+        }
+        await self._store_ranking_snapshot(key, snapshot)
+        return snapshot
 
-        logger.debug("All memory caches cleared")
+    async def q_ranking_page(self, guild_id: int, metric: str, page: int = 0,
+                             page_size: int = 10, scope: str = 'server',
+                             target_id: Optional[int] = None, rank_by: str = 'user',
+                             role_filter_ids: Optional[List[int]] = None,
+                             days_back: int = 30, refresh: bool = False) -> Dict[str, Any]:
 
-    async def _cleanup_all_voice_sessions(self):
+        # Serves a leaderboard page from the ranking snapshot of this
+        # (view, filter, window). The snapshot holds the whole ordered
+        # ranking for its TTL, so paging within it costs no query at all.
+        empty = {'entries': [], 'page': 0, 'total_items': 0, 'total_value': 0}
 
-        async with self.voice_lock:
-            sessions_copy = copy.deepcopy(self.active_voice_sessions)
-            self.active_voice_sessions.clear()
+        if not self.pool:
+            return empty
 
-        current_time = datetime.utcnow()
-        for user_id, session_data in sessions_copy.items():
-            try:
-                duration = int(
-                    (current_time - session_data['join_time']).total_seconds())
-                if duration > 0:
-                    await self._record_voice_session_history_direct(
-                        guild_id=session_data['guild_id'],
-                        user_id=user_id,
-                        channel_id=session_data['channel_id'],
-                        join_time=session_data['join_time'],
-                        leave_time=current_time,
-                        duration=duration,
-                        state_flags=self._calculate_state_flags(session_data)
-                    )
-            except Exception as e:
-                logger.warning(
-                    f"Error cleaning up voice session for user {user_id}: {e}")
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return empty
 
-    # DATABASE CONNECTION RETRY
+        source = Constants.METRIC_SOURCES[metric]
+        rank_column = source['user_column'] if rank_by == 'user' else rank_by
+        roles = ','.join(str(role_id) for role_id in sorted(role_filter_ids or []))
+        key = f"rank:{guild_id}:{metric}:{scope}:{target_id}:{rank_column}:{roles}:{days_back}"
 
-    @tasks.loop(minutes=5, count=None)
-    async def init_pools(self):
+        try:
+            snapshot = None if refresh else await self._get_ranking_snapshot(key)
 
-        print("🎯 INIT_POOLS TASK STARTED!")
+            if snapshot is None:
+                # Pages of a fresh view requested together share one aggregate
+                snapshot = await self.query_flights.do(key, functools.partial(
+                    self._build_ranking_snapshot, key, guild, metric, rank_column,
+                    scope, target_id, role_filter_ids, days_back))
 
-        if self.shutting_down:
-            return
+            last_page = max(0, (snapshot['total_items'] - 1) // page_size)
+            page = min(max(page, 0), last_page)
 
-        # POSTGRESQL CONNECTION
+            start = page * page_size
+            return {
+                'entries': [tuple(entry) for entry in snapshot['rows'][start:start + page_size]],
+                'page': page,
+                'total_items': snapshot['total_items'],
+                'total_value': snapshot['total_value']
+            }
 
-        if self.db_connected and self.pool and self.redis_connected and self.redis:
-            return
+        except Exception as e:
+            logger.error(f"Error in q_ranking_page: {e}")
+            return empty
 
-        print("🔄 Creating PostgreSQL pool...")
+    # TIMESCALEDB INITIALIZATION
 
-        try:
+    async def _create_continuous_aggregates_safely(self, conn):
 
-            self.pool = await asyncpg.create_pool(
-                host=os.getenv('DB_HOST'),
-                database=os.getenv('DB_NAME'),
-                user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD'),
-                port=int(os.getenv('DB_PORT')),
-                min_size=5,
-                max_size=20,
-                command_timeout=30
-            )
+        try:
 
-            async with self.pool.acquire() as conn:
-                await conn.fetchval('SELECT 1')
-
-            print("✅ PostgreSQL connection established")
-            self.db_connected = True
-            self.is_timescale_initialized = False
-
-            print("🔄 Initializing database schema...")
-            success = await self._initialize_database_schema()
-
-            if success:
-                self.is_timescale_initialized = True
-                print("✅ Database schema initialized")
-            else:
-                print("⚠️ Database schema initialization failed")
+            is_hypertable = await conn.fetchval('''
+                SELECT EXISTS (
+                    SELECT 1 FROM timescaledb_information.hypertables 
+                    WHERE hypertable_name = 'message_tracking'
+                )
+            ''')
 
-            # REDIS CONNECTION
+            if is_hypertable:
 
-            redis_host = os.getenv('REDIS_HOST', 'localhost')
-            redis_port = int(os.getenv('REDIS_PORT', '6379'))
-            redis_password = os.getenv('REDIS_PASSWORD')
-            redis_db = int(os.getenv('REDIS_DB', '0'))
+                await conn.execute('''
+                    CREATE MATERIALIZED VIEW IF NOT EXISTS daily_message_counts
+                    WITH (timescaledb.continuous) AS
+                    SELECT
+                        time_bucket('1 day', created_at) AS bucket,
+                        guild_id,
+                        COUNT(*) as message_count,
+                        COUNT(DISTINCT user_id) as unique_users,
+                        SUM(message_length) as total_chars
+                    FROM message_tracking
+                    WHERE NOT is_bot
+                    GROUP BY bucket, guild_id;
+                ''')
 
-            print("🔄 Connecting to Redis...")
-            try:
+                try:
+                    await conn.execute('''
+                        SELECT add_continuous_aggregate_policy('daily_message_counts',
+                            start_offset => INTERVAL '30 days',
+                            end_offset => INTERVAL '1 hour',
+                            schedule_interval => INTERVAL '1 hour');
+                    ''')
+                except Exception:
+                    pass
 
-                if redis_password:
-                    redis_url = f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
-                else:
-                    redis_url = f"redis://{redis_host}:{redis_port}/{redis_db}"
+        except Exception as e:
+            print(
+                f"Failed to create daily_message_counts aggregate: {e}")
 
-                self.redis = Redis.from_url(
-                    redis_url,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_keepalive=True,
-                    retry_on_timeout=True,
-                    encoding='utf-8'
+        try:
+            is_hypertable = await conn.fetchval('''
+                SELECT EXISTS (
+                    SELECT 1 FROM timescaledb_information.hypertables 
+                    WHERE hypertable_name = 'voice_session_history'
                 )
+            ''')
 
-                await self.redis.ping()
-                self.redis_connected = True
-                print("✅ Redis connection established")
-
-            except Exception as e:
-                print(f"⚠️ Redis connection failed: {e}")
-                self.redis_connected = False
-                self.redis = None
+            if is_hypertable:
 
-            # ENCRYPTION INITIALIZATION
+                await conn.execute('''
+                    CREATE MATERIALIZED VIEW IF NOT EXISTS daily_voice_time
+                    WITH (timescaledb.continuous) AS
+                    SELECT
+                        time_bucket('1 day', join_time) AS bucket,
+                        guild_id,
+                        SUM(duration_seconds) as total_seconds,
+                        COUNT(DISTINCT user_id) as unique_users,
+                        COUNT(*) as session_count
+                    FROM voice_session_history
+                    GROUP BY bucket, guild_id;
+                ''')
 
-            fernet_key = os.getenv('FERNET_KEY')
-            if fernet_key:
                 try:
+                    await conn.execute('''
+                        SELECT add_continuous_aggregate_policy('daily_voice_time',
+                            start_offset => INTERVAL '30 days',
+                            end_offset => INTERVAL '1 hour',
+                            schedule_interval => INTERVAL '1 hour');
+                    ''')
+                except Exception:
+                    pass
 
-                    fernet_key = fernet_key.strip()
-
-                    try:
-
-                        self.fernet = Fernet(fernet_key.encode())
-                        print("✅ Username encryption initialized with Fernet key")
-                    except (ValueError, TypeError):
-
-                        print("⚠️ Fernet key invalid, hashing to create valid key...")
-                        key_hash = hashlib.sha256(fernet_key.encode()).digest()
-                        valid_key = base64.urlsafe_b64encode(key_hash)
-                        self.fernet = Fernet(valid_key)
-                        print("✅ Username encryption initialized with hashed key")
-
-                except Exception as e:
-                    print(f"⚠️ Fernet encryption initialization failed: {e}")
-                    self.fernet = None
+                logger.info("Set up daily_voice_time continuous aggregate")
             else:
-                print("ℹ️ No FERNET_KEY in .env, username encryption disabled")
-                self.fernet = None
-
-            # VERIFICATION
-            print("🎉 Database verification complete")
-            print(
-                f"   PostgreSQL: {'✅ Connected' if self.db_connected else '❌ Disconnected'}")
-            print(
-                f"   Redis: {'✅ Connected' if self.redis_connected else '❌ Disconnected'}")
-            print(
-                f"   Encryption: {'✅ Enabled' if self.fernet else '❌ Disabled'}")
-            print(
-                f"   TimescaleDB: {'✅ Initialized' if self.is_timescale_initialized else '❌ Not initialized'}")
-
+                logger.warning(
+                    "Cannot create daily_voice_time aggregate - voice_session_history not a hypertable")
         except Exception as e:
-            print(f"❌ Connection failed: {e}")
-            traceback.print_exc()
-            self.db_connected = False
-            self.redis_connected = False
-            self.fernet = None
+            logger.warning(f"Failed to create daily_voice_time aggregate: {e}")
 
-    # HELPER METHODS
+        for rollup_name, rollup in Constants.ROLLUP_SOURCES.items():
+            try:
+                is_hypertable = await conn.fetchval('''
+                    SELECT EXISTS (
+                        SELECT 1 FROM timescaledb_information.hypertables
+                        WHERE hypertable_name = $1
+                    )
+                ''', rollup['table'])
+            except Exception as e:
+                logger.warning(f"Failed to check {rollup['table']} for {rollup_name} aggregates: {e}")
+                continue
 
-    def _calculate_state_flags(self, session_data: Dict[str, Any]) -> int:
+            if not is_hypertable:
+                logger.warning(
+                    f"Cannot create {rollup_name} aggregates - {rollup['table']} not a hypertable")
+                continue
 
-        state_flags = 0
+            keys = ', '.join(rollup['keys'])
+            parent_view = None
 
-        if session_data.get('is_afk_channel'):
-            state_flags |= self.voice_state_bits['afk_channel']
+            for tier in Constants.ROLLUP_TIERS:
+                view_name = f"{tier['prefix']}_{rollup_name}"
 
-        if session_data.get('server_mute'):
-            state_flags |= self.voice_state_bits['server_mute']
+                # The finest tier reads the raw table, coarser tiers re-aggregate the one below
+                if parent_view is None:
+                    time_column = rollup['time_column']
+                    source_table = rollup['table']
+                    where_clause = f"WHERE {rollup['base_filter']}" if rollup['base_filter'] else ''
+                    columns = ',\n'.join(f"                        {aggregate} AS {column}"
+                                         for column, (aggregate, _, _) in rollup['columns'].items())
+                else:
+                    time_column = 'bucket'
+                    source_table = parent_view
+                    where_clause = ''
+                    columns = ',\n'.join(f"                        {reaggregate}({column}) AS {column}"
+                                         for column, (_, _, reaggregate) in rollup['columns'].items())
 
-        if session_data.get('server_deaf'):
-            state_flags |= self.voice_state_bits['server_deaf']
+                try:
+                    await conn.execute(f'''
+                        CREATE MATERIALIZED VIEW IF NOT EXISTS {view_name}
+                        WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                        SELECT
+                            time_bucket('{tier['interval']}', {time_column}) AS bucket,
+                            {keys},
+{columns}
+                        FROM {source_table}
+                        {where_clause}
+                        GROUP BY time_bucket('{tier['interval']}', {time_column}), {keys};
+                    ''')
 
-        if session_data.get('self_mute'):
-            state_flags |= self.voice_state_bits['self_mute']
+                    try:
+                        await conn.execute(f'''
+                            SELECT add_continuous_aggregate_policy('{view_name}',
+                                start_offset => INTERVAL '{tier['start_offset']}',
+                                end_offset => INTERVAL '{tier['end_offset']}',
+                                schedule_interval => INTERVAL '{tier['schedule']}');
+                        ''')
+                    except Exception:
+                        pass
 
-        if session_data.get('self_deaf'):
-            state_flags |= self.voice_state_bits['self_deaf']
+                    logger.info(f"Set up {view_name} continuous aggregate")
+                    parent_view = view_name
+                except Exception as e:
+                    logger.warning(f"Failed to create {view_name} aggregate: {e}")
+                    break
 
-        if session_data.get('streaming'):
-            state_flags |= self.voice_state_bits['streaming']
+        await self._load_available_rollups(conn)
 
-        if session_data.get('video'):
-            state_flags |= self.voice_state_bits['video']
+    async def _load_available_rollups(self, conn):
 
-        if session_data.get('suppressed'):
-            state_flags |= self.voice_state_bits['suppressed']
+        try:
+            rows = await conn.fetch('''
+                SELECT view_name FROM timescaledb_information.continuous_aggregates
+            ''')
+            self.available_rollups = {row['view_name'] for row in rows}
+        except Exception as e:
+            logger.warning(f"Could not list continuous aggregates: {e}")
+            self.available_rollups = set()
 
-        return state_flags
+    # DATABASE INITIALIZATION
 
-    async def _record_voice_session_history_direct(self, guild_id: int, user_id: int, channel_id: int,
-                                                   join_time: datetime, leave_time: datetime,
-                                                   duration: int, state_flags: int):
+    async def _initialize_database_schema(self):
+
+        if not self.pool or not self.db_connected:
+            logger.error("No database connection for initialization")
+            return False
 
         try:
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                return False
+            async with self.pool.acquire() as conn:
 
-            member = guild.get_member(user_id)
-            if not member:
-                return False
+                # 1. Blacklist tables
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS blacklisted_users (
+                        id SERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        UNIQUE(guild_id, user_id)
+                    )
+                ''')
 
-            encrypted_username = self.encrypt_username(str(member))
-            category_id = None
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS blacklisted_channels (
+                        id SERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        UNIQUE(guild_id, channel_id)
+                    )
+                ''')
 
-            channel = guild.get_channel(channel_id)
-            if channel and hasattr(channel, 'category_id') and channel.category_id:
-                category_id = channel.category_id
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS blacklisted_categories (
+                        id SERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        category_id BIGINT NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        UNIQUE(guild_id, category_id)
+                    )
+                ''')
 
-            async with self.pool.acquire() as conn:
                 await conn.execute('''
-                    INSERT INTO voice_session_history 
-                    (guild_id, user_id, channel_id, category_id, encrypted_username,
-                     join_time, leave_time, duration_seconds, state_flags,
-                     was_muted, was_deafened, was_streaming, was_video)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-                ''', guild_id, user_id, channel_id, category_id, encrypted_username,
-                                   join_time, leave_time, duration, state_flags,
-                                   False, False, False, False)
+                    CREATE TABLE IF NOT EXISTS blacklisted_roles (
+                        id SERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        role_id BIGINT NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        UNIQUE(guild_id, role_id)
+                    )
+                ''')
 
-            return True
+                # 2. Invite tracking helper table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS invite_uses (
+                        id SERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        invite_code TEXT NOT NULL,
+                        uses INT DEFAULT 0,
+                        inviter_id BIGINT,
+                        deleted BOOLEAN DEFAULT FALSE,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        updated_at TIMESTAMP DEFAULT NOW(),
+                        UNIQUE(guild_id, invite_code)
+                    )
+                ''')
 
-        except Exception as e:
-            logger.error(f"Error recording voice session: {e}")
-            return False
+                # HYPERTABLES
 
-    def encrypt_username(self, username: str) -> Optional[str]:
-
-        if not username:
-            return None
-
-        if not self.fernet:
-            return hashlib.sha256(username.encode()).hexdigest()[:32]
-
-        try:
-            return self.fernet.encrypt(username.encode()).decode()
-        except Exception as e:
-            logger.warning(
-                f"Error encrypting username, falling back to hash: {e}")
-            return hashlib.sha256(username.encode()).hexdigest()[:32]
-
-    def decrypt_username(self, encrypted: Optional[str]) -> Optional[str]:
-
-        if not encrypted or not self.fernet:
-            return encrypted
-
-        try:
-            return self.fernet.decrypt(encrypted.encode()).decode()
-        except Exception as e:
-            logger.warning(f"Error decrypting username: {e}")
-            return None
-
-    def _serialize_datetime(self, obj: Any) -> Any:
-
-        if isinstance(obj, datetime):
-            if obj.tzinfo is None:
-                obj = obj.replace(tzinfo=timezone.utc)
-            return obj.isoformat()
-        elif isinstance(obj, (list, tuple)):
-            return [self._serialize_datetime(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self._serialize_datetime(value) for key, value in obj.items()}
-        elif isinstance(obj, date):
-            return obj.isoformat()
-        return obj
-
-    def _ensure_int(self, value: Any) -> Optional[int]:
-
-        if value is None:
-            return None
-        if isinstance(value, int):
-            return value
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return None
-
-    # TIMESCALEDB MAINTENANCE
-
-    @tasks.loop(hours=6)
-    async def timescale_maintenance(self):
-
-        if not self.pool or not self.db_connected or not self.is_timescale_initialized:
-            return
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                await self._update_compression_stats(conn)
-
-                await self._update_hypertable_sizes(conn)
-
-                try:
-                    await conn.execute("CALL refresh_continuous_aggregate('daily_message_counts', NULL, NULL);")
-                except:
-                    pass
-
-                try:
-                    await conn.execute("CALL refresh_continuous_aggregate('daily_voice_time', NULL, NULL);")
-                except:
-                    pass
-
-                logger.debug("TimescaleDB maintenance completed")
-
-        except Exception as e:
-            logger.warning(f"Error in TimescaleDB maintenance: {e}")
-
-    async def _update_compression_stats(self, conn):
-
-        try:
-            rows = await conn.fetch('''
-                SELECT 
-                    hypertable_name,
-                    ROUND(compression_ratio, 2) as compression_ratio,
-                    total_chunks,
-                    number_compressed_chunks
-                FROM timescaledb_information.compressed_hypertable_stats;
-            ''')
-
-            for row in rows:
-                async with self.metrics_lock:
-                    self.metrics['timescale_compression_ratio'] = row['compression_ratio'] or 0.0
-                    self.metrics['chunk_count'] = row['total_chunks'] or 0
-
-        except Exception as e:
-            logger.debug(f"Could not update compression stats: {e}")
-
-    async def _update_hypertable_sizes(self, conn):
-
-        try:
-            rows = await conn.fetch('''
-                SELECT 
-                    hypertable_name,
-                    pg_size_pretty(total_bytes) as total_size,
-                    pg_size_pretty(table_bytes) as table_size,
-                    pg_size_pretty(index_bytes) as index_size
-                FROM timescaledb_information.hypertable
-                JOIN LATERAL hypertable_detailed_size(hypertable_name::regclass)
-                    ON true
-                ORDER BY total_bytes DESC;
-            ''')
-
-            sizes = {}
-            for row in rows:
-                sizes[row['hypertable_name']] = {
-                    'total': row['total_size'],
-                    'table': row['table_size'],
-                    'index': row['index_size']
-                }
-
-            async with self.metrics_lock:
-                self.metrics['hypertable_sizes'] = sizes
-
-        except Exception as e:
-            logger.debug(f"Could not update hypertable sizes: {e}")
-
-    #  QUERY FUNCTIONS
-
-    # USER STATS (10 functions)
-
-    async def q_user_rank_messages(self, guild_id: int, user_id: int,
-                                   role_filter_ids: Optional[List[int]] = None,
-                                   start_time: Optional[datetime] = None,
-                                   end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'rank': 0, 'total_users': 0, 'message_count': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'rank': 0, 'total_users': 0, 'message_count': 0}
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                query = '''
-                    SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        RANK() OVER (ORDER BY COUNT(*) DESC) as rank
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += " AND created_at >= $2"
-                    params.append(start_time)
-                    if end_time:
-                        query += " AND created_at <= $3"
-                        params.append(end_time)
-                elif end_time:
-                    query += " AND created_at <= $2"
-                    params.append(end_time)
-
-                query += " GROUP BY user_id ORDER BY message_count DESC"
-
-                rows = await conn.fetch(query, *params)
-
-                user_rank = 0
-                user_count = 0
-                total_users = len(rows)
-
-                for idx, row in enumerate(rows, 1):
-                    if row['user_id'] == user_id:
-                        user_rank = idx
-                        user_count = row['message_count']
-                        break
-
-                return {
-                    'rank': user_rank,
-                    'total_users': total_users,
-                    'message_count': user_count
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_user_rank_messages: {e}")
-            traceback.print_exc()
-            return {'rank': 0, 'total_users': 0, 'message_count': 0}
-
-    async def q_user_rank_voice(self, guild_id: int, user_id: int,
-                                role_filter_ids: Optional[List[int]] = None,
-                                start_time: Optional[datetime] = None,
-                                end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'rank': 0, 'total_users': 0, 'voice_seconds': 0, 'voice_hours': 0.0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'rank': 0, 'total_users': 0, 'voice_seconds': 0, 'voice_hours': 0.0}
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                query = '''
-                    SELECT 
-                        user_id,
-                        SUM(duration_seconds) as total_seconds,
-                        RANK() OVER (ORDER BY SUM(duration_seconds) DESC) as rank
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += " AND join_time >= $2"
-                    params.append(start_time)
-                    if end_time:
-                        query += " AND join_time <= $3"
-                        params.append(end_time)
-                elif end_time:
-                    query += " AND join_time <= $2"
-                    params.append(end_time)
-
-                query += " GROUP BY user_id HAVING SUM(duration_seconds) > 0 ORDER BY total_seconds DESC"
-
-                rows = await conn.fetch(query, *params)
-
-                user_rank = 0
-                user_seconds = 0
-                total_users = len(rows)
-
-                for idx, row in enumerate(rows, 1):
-                    if row['user_id'] == user_id:
-                        user_rank = idx
-                        user_seconds = row['total_seconds']
-                        break
-
-                return {
-                    'rank': user_rank,
-                    'total_users': total_users,
-                    'voice_seconds': user_seconds,
-                    'voice_hours': round(user_seconds / 3600, 2) if user_seconds > 0 else 0.0
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_user_rank_voice: {e}")
-            traceback.print_exc()
-            return {'rank': 0, 'total_users': 0, 'voice_seconds': 0, 'voice_hours': 0.0}
-
-    async def q_user_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int, user_id: int,
-                                                           role_filter_ids: Optional[List[int]] = None,
-                                                           start_time: Optional[datetime] = None,
-                                                           end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-
-                for days in periods:
-
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=days)
-
-                    query = '''
-                        SELECT COUNT(*) as message_count
-                        FROM message_tracking
-                        WHERE guild_id = $1 
-                        AND user_id = $2 
-                        AND NOT is_bot
-                        AND created_at >= $3
-                        AND created_at <= $4
-                    '''
-                    params = [guild_id, user_id, window_start, window_end]
-
-                    if role_filter_ids:
-                        member = guild.get_member(user_id)
-                        if not member:
-                            result[f'{days}d'] = 0
-                            continue
-
-                        user_roles = [role.id for role in member.roles]
-                        if not any(role_id in role_filter_ids for role_id in user_roles):
-                            result[f'{days}d'] = 0
-                            continue
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'message_tracking',
-                        include_users=True, include_channels=True
-                    )
-
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['message_count'] or 0
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_user_timeseries_messages: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-    async def q_user_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int, user_id: int,
-                                                        role_filter_ids: Optional[List[int]] = None,
-                                                        start_time: Optional[datetime] = None,
-                                                        end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-
-                for days in periods:
-
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=days)
-
-                    query = '''
-                        SELECT COALESCE(SUM(duration_seconds), 0) as voice_seconds
-                        FROM voice_session_history
-                        WHERE guild_id = $1 
-                        AND user_id = $2 
-                        AND join_time >= $3
-                        AND join_time <= $4
-                    '''
-                    params = [guild_id, user_id, window_start, window_end]
-
-                    if role_filter_ids:
-                        member = guild.get_member(user_id)
-                        if not member:
-                            result[f'{days}d'] = 0
-                            continue
-
-                        user_roles = [role.id for role in member.roles]
-                        if not any(role_id in role_filter_ids for role_id in user_roles):
-                            result[f'{days}d'] = 0
-                            continue
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'voice_session_history',
-                        include_users=True, include_channels=True
-                    )
-
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['voice_seconds'] or 0
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_user_timeseries_voice: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-    async def q_user_total_messages(self, guild_id: int, user_id: int,
-                                    role_filter_ids: Optional[List[int]] = None,
-                                    start_time: Optional[datetime] = None,
-                                    end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool or not self.db_connected:
-            logger.error(
-                f"No database connection for query q_user_total_messages")
-            return {'total_messages': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'has_attachments': 0, 'has_embeds': 0,
-                'first_message': None, 'last_message': None
-            }
-
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COUNT(*) as total_messages,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars,
-                        COUNT(*) FILTER (WHERE has_attachment = TRUE) as has_attachments,
-                        COUNT(*) FILTER (WHERE has_embed = TRUE) as has_embeds,
-                        MIN(created_at) as first_message,
-                        MAX(created_at) as last_message
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND user_id = $2 AND NOT is_bot
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        return {
-                            'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                            'has_attachments': 0, 'has_embeds': 0,
-                            'first_message': None, 'last_message': None
-                        }
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        return {
-                            'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                            'has_attachments': 0, 'has_embeds': 0,
-                            'first_message': None, 'last_message': None
-                        }
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                row = await conn.fetchrow(query, *params)
-
-                return {
-                    'total_messages': row['total_messages'] or 0,
-                    'total_chars': row['total_chars'] or 0,
-                    'avg_chars': round(row['avg_chars'] or 0, 2),
-                    'has_attachments': row['has_attachments'] or 0,
-                    'has_embeds': row['has_embeds'] or 0,
-                    'first_message': row['first_message'].isoformat() if row['first_message'] else None,
-                    'last_message': row['last_message'].isoformat() if row['last_message'] else None
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_user_total_messages: {e}")
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'has_attachments': 0, 'has_embeds': 0,
-                'first_message': None, 'last_message': None
-            }
-        logger.debug(f"Query result: {row}")
-
-    async def q_user_total_voice(self, guild_id: int, user_id: int,
-                                 role_filter_ids: Optional[List[int]] = None,
-                                 start_time: Optional[datetime] = None,
-                                 end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool or not self.db_connected:
-            logger.error(
-                f"No database connection for query q_user_total_messages")
-            return {'total_messages': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'avg_session': 0.0, 'first_session': None, 'last_session': None
-            }
-
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session,
-                        MIN(join_time) as first_session,
-                        MAX(leave_time) as last_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND user_id = $2
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        return {
-                            'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                            'avg_session': 0.0, 'first_session': None, 'last_session': None
-                        }
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        return {
-                            'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                            'avg_session': 0.0, 'first_session': None, 'last_session': None
-                        }
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                row = await conn.fetchrow(query, *params)
-
-                total_seconds = row['total_seconds'] or 0
-
-                return {
-                    'total_seconds': total_seconds,
-                    'total_hours': round(total_seconds / 3600, 2),
-                    'session_count': row['session_count'] or 0,
-                    'avg_session': round(row['avg_session'] or 0, 2),
-                    'first_session': row['first_session'].isoformat() if row['first_session'] else None,
-                    'last_session': row['last_session'].isoformat() if row['last_session'] else None
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_user_total_voice: {e}")
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'avg_session': 0.0, 'first_session': None, 'last_session': None
-            }
-
-    async def q_user_messages_per_hour_distribution(self, guild_id: int, user_id: int,
-                                                    role_filter_ids: Optional[List[int]] = None,
-                                                    start_time: Optional[datetime] = None,
-                                                    end_time: Optional[datetime] = None,
-                                                    timezone_str: str = 'UTC') -> Dict[str, Any]:
-
-        if not self.pool:
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                query = f'''
-                    SELECT 
-                        EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COUNT(*) as message_count
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND user_id = $2 AND NOT is_bot
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        result = {f'hour_{i}': 0 for i in range(24)}
-                        result.update({'total': 0, 'peak_hour': -1})
-                        return result
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        result = {f'hour_{i}': 0 for i in range(24)}
-                        result.update({'total': 0, 'peak_hour': -1})
-                        return result
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY hour
-                    ORDER BY hour
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = {f'hour_{i}': 0 for i in range(24)}
-                total = 0
-                peak_hour = -1
-                peak_count = 0
-
-                for row in rows:
-                    hour = int(row['hour'])
-                    count = row['message_count'] or 0
-                    result[f'hour_{hour}'] = count
-                    total += count
-
-                    if count > peak_count:
-                        peak_count = count
-                        peak_hour = hour
-
-                result['total'] = total
-                result['peak_hour'] = peak_hour
-
-                return result
-
-        except Exception as e:
-            logger.error(
-                f"Error in q_user_messages_per_hour_distribution: {e}")
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
-
-    async def q_user_voice_per_hour_distribution(self, guild_id: int, user_id: int,
-                                                 role_filter_ids: Optional[List[int]] = None,
-                                                 start_time: Optional[datetime] = None,
-                                                 end_time: Optional[datetime] = None,
-                                                 timezone_str: str = 'UTC') -> Dict[str, Any]:
-
-        if not self.pool or not self.db_connected:
-            logger.error(
-                f"No database connection for query q_user_total_messages")
-            return {'total_messages': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                query = f'''
-                    SELECT 
-                        EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND user_id = $2
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY hour
-                    ORDER BY hour
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = {f'hour_{i}': 0 for i in range(24)}
-                total_seconds = 0
-                peak_hour = -1
-                peak_seconds = 0
-
-                for row in rows:
-                    hour = int(row['hour'])
-                    seconds = row['total_seconds'] or 0
-                    result[f'hour_{hour}'] = seconds
-                    total_seconds += seconds
-
-                    if seconds > peak_seconds:
-                        peak_seconds = seconds
-                        peak_hour = hour
-
-                result['total_seconds'] = total_seconds
-                result['peak_hour'] = peak_hour
-
-                return result
-
-        except Exception as e:
-            logger.error(
-                f"Error in q_user_voice_per_hour_distribution: {e}")
-            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
-
-    async def q_user_top3_voice_channels(self, guild_id: int, user_id: int,
-                                         role_filter_ids: Optional[List[int]] = None,
-                                         start_time: Optional[datetime] = None,
-                                         end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND user_id = $2
-                '''
-                total_params = [guild_id, user_id]
-
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        return []
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        return []
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
-
-                if total_seconds == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND user_id = $2
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-
-                    pass
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    channel_seconds = row['total_seconds'] or 0
-                    percentage = (channel_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
-
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'total_seconds': channel_seconds,
-                        'total_hours': round(channel_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'percentage': round(percentage, 1)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_user_top3_voice_channels: {e}")
-            return []
-
-    async def q_user_top3_text_channels(self, guild_id: int, user_id: int,
-                                        role_filter_ids: Optional[List[int]] = None,
-                                        start_time: Optional[datetime] = None,
-                                        end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND user_id = $2 AND NOT is_bot
-                '''
-                total_params = [guild_id, user_id]
-
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    member = guild.get_member(user_id)
-                    if not member:
-                        return []
-
-                    user_roles = [role.id for role in member.roles]
-                    if not any(role_id in role_filter_ids for role_id in user_roles):
-                        return []
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
-
-                if total_messages == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND user_id = $2 AND NOT is_bot
-                '''
-                params = [guild_id, user_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    channel_messages = row['message_count'] or 0
-                    percentage = (channel_messages / total_messages *
-                                  100) if total_messages > 0 else 0
-
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'message_count': channel_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_user_top3_text_channels: {e}")
-            return []
-
-    # SERVER STATS (8 functions)
-
-    async def q_server_top3_emojis(self, guild_id: int,
-                                   role_filter_ids: Optional[List[int]] = None,
-                                   start_time: Optional[datetime] = None,
-                                   end_time: Optional[datetime] = None,
-                                   usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        emoji_str,
-                        is_custom,
-                        SUM(usage_count) as total_usage,
-                        COUNT(DISTINCT user_id) as unique_users
-                    FROM emoji_usage
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
-
-                if usage_type:
-                    query += f" AND usage_type = ${len(params) + 1}"
-                    params.append(usage_type)
-
-                if start_time:
-                    query += f" AND last_used >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND last_used <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=True
-
-                )
-
-                query += '''
-                    GROUP BY emoji_str, is_custom
-                    HAVING SUM(usage_count) > 0
-                    ORDER BY total_usage DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    total_usage = row['total_usage'] or 0
-                    unique_users = row['unique_users'] or 0
-                    avg_usage = total_usage / max(unique_users, 1)
-
-                    result.append({
-                        'emoji_str': row['emoji_str'],
-                        'is_custom': row['is_custom'],
-                        'usage_count': total_usage,
-                        'unique_users': unique_users,
-                        'avg_usage_per_user': round(avg_usage, 2)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_top3_emojis: {e}")
-            return []
-
-    async def q_server_total_messages(self, guild_id: int,
-                                      role_filter_ids: Optional[List[int]] = None,
-                                      start_time: Optional[datetime] = None,
-                                      end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
-            }
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
-            }
-
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COUNT(*) as total_messages,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) FILTER (WHERE has_attachment = TRUE) as has_attachments,
-                        COUNT(*) FILTER (WHERE has_embed = TRUE) as has_embeds
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-
-                )
-
-                row = await conn.fetchrow(query, *params)
-
-                total_messages = row['total_messages'] or 0
-                unique_users = row['unique_users'] or 0
-                messages_per_user = total_messages / \
-                    max(unique_users, 1)
-
-                return {
-                    'total_messages': total_messages,
-                    'total_chars': row['total_chars'] or 0,
-                    'avg_chars': round(row['avg_chars'] or 0, 2),
-                    'unique_users': unique_users,
-                    'messages_per_user': round(messages_per_user, 2),
-                    'has_attachments': row['has_attachments'] or 0,
-                    'has_embeds': row['has_embeds'] or 0
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_server_total_messages: {e}")
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
-            }
-
-    async def q_server_total_voice(self, guild_id: int,
-                                   role_filter_ids: Optional[List[int]] = None,
-                                   start_time: Optional[datetime] = None,
-                                   end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
-            }
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
-            }
-
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                row = await conn.fetchrow(query, *params)
-
-                total_seconds = row['total_seconds'] or 0
-                unique_users = row['unique_users'] or 0
-                seconds_per_user = total_seconds / max(unique_users, 1)
-
-                return {
-                    'total_seconds': total_seconds,
-                    'total_hours': round(total_seconds / 3600, 2),
-                    'session_count': row['session_count'] or 0,
-                    'unique_users': unique_users,
-                    'avg_session': round(row['avg_session'] or 0, 2),
-                    'seconds_per_user': round(seconds_per_user, 2)
-                }
-
-        except Exception as e:
-            logger.error(f"Error in q_server_total_voice: {e}")
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
-            }
-
-    async def q_server_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int,
-                                                             role_filter_ids: Optional[List[int]] = None,
-                                                             start_time: Optional[datetime] = None,
-                                                             end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-
-                total_days_in_window = None
-                if start_time and end_time:
-                    total_days_in_window = (end_time - start_time).days
-                elif start_time:
-                    total_days_in_window = (
-                        datetime.utcnow() - start_time).days
-                elif end_time:
-
-                    total_days_in_window = None
-
-                for days in periods:
-
-                    if total_days_in_window is not None and days > total_days_in_window:
-                        result[f'{days}d'] = 0
-                        continue
-
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=days)
-
-                    if start_time and window_start < start_time:
-                        window_start = start_time
-
-                    query = '''
-                        SELECT COUNT(*) as message_count
-                        FROM message_tracking
-                        WHERE guild_id = $1 
-                        AND NOT is_bot
-                        AND created_at >= $2
-                        AND created_at <= $3
-                    '''
-                    params = [guild_id, window_start, window_end]
-
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
-
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'message_tracking',
-                        include_users=True, include_channels=True
-                    )
-
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['message_count'] or 0
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_timeseries_messages: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-    async def q_server_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int,
-                                                          role_filter_ids: Optional[List[int]] = None,
-                                                          start_time: Optional[datetime] = None,
-                                                          end_time: Optional[datetime] = None) -> Dict[str, Any]:
-
-        if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-        try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-
-                total_days_in_window = None
-                if start_time and end_time:
-                    total_days_in_window = (end_time - start_time).days
-                elif start_time:
-                    total_days_in_window = (
-                        datetime.utcnow() - start_time).days
-                elif end_time:
-
-                    total_days_in_window = None
-
-                for days in periods:
-
-                    if total_days_in_window is not None and days > total_days_in_window:
-                        result[f'{days}d'] = 0
-                        continue
-
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=days)
-
-                    if start_time and window_start < start_time:
-                        window_start = start_time
-
-                    query = '''
-                        SELECT COALESCE(SUM(duration_seconds), 0) as voice_seconds
-                        FROM voice_session_history
-                        WHERE guild_id = $1 
-                        AND join_time >= $2
-                        AND join_time <= $3
-                    '''
-                    params = [guild_id, window_start, window_end]
-
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
-
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'voice_session_history',
-                        include_users=True, include_channels=True
-                    )
-
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['voice_seconds'] or 0
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_timeseries_voice: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
-
-    async def q_server_top3_voice_channels(self, guild_id: int,
-                                           role_filter_ids: Optional[List[int]] = None,
-                                           start_time: Optional[datetime] = None,
-                                           end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
-
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
-
-                if total_seconds == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    channel_seconds = row['total_seconds'] or 0
-                    percentage = (channel_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
-
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'total_seconds': channel_seconds,
-                        'total_hours': round(channel_seconds / 3600, 2),
-                        'unique_users': row['unique_users'] or 0,
-                        'session_count': row['session_count'] or 0,
-                        'percentage': round(percentage, 1)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_top3_voice_channels: {e}")
-            return []
-
-    async def q_server_top3_text_channels(self, guild_id: int,
-                                          role_filter_ids: Optional[List[int]] = None,
-                                          start_time: Optional[datetime] = None,
-                                          end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                total_params = [guild_id]
-
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
-
-                if total_messages == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    channel_messages = row['message_count'] or 0
-                    percentage = (channel_messages / total_messages *
-                                  100) if total_messages > 0 else 0
-
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'message_count': channel_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'unique_users': row['unique_users'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_top3_text_channels: {e}")
-            return []
-
-    async def q_server_top3_users_messages(self, guild_id: int,
-                                           role_filter_ids: Optional[List[int]] = None,
-                                           start_time: Optional[datetime] = None,
-                                           end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                total_params = [guild_id]
-
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
-
-                if total_messages == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                params = [guild_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
-
-                query += '''
-                    GROUP BY user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 3
-                '''
-
-                rows = await conn.fetch(query, *params)
-
-                result = []
-                for row in rows:
-                    user_messages = row['message_count'] or 0
-                    percentage = (user_messages / total_messages *
-                                  100) if total_messages > 0 else 0
-
-                    result.append({
-                        'user_id': row['user_id'],
-                        'message_count': user_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
-
-                return result
-
-        except Exception as e:
-            logger.error(f"Error in q_server_top3_users_messages: {e}")
-            return []
-
-    async def q_server_top3_users_voice(self, guild_id: int,
-                                        role_filter_ids: Optional[List[int]] = None,
-                                        start_time: Optional[datetime] = None,
-                                        end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
-
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
-
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
-
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
-
-                if total_seconds == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        user_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
+                # 1. message_tracking
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS message_tracking (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        message_id BIGINT NOT NULL,
+                        encrypted_username TEXT,
+                        message_length INT NOT NULL DEFAULT 0,
+                        mentions JSONB,
+                        has_attachment BOOLEAN DEFAULT FALSE,
+                        has_embed BOOLEAN DEFAULT FALSE,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        is_bot BOOLEAN DEFAULT FALSE,
+                        
+                        PRIMARY KEY (id, created_at),
+                        UNIQUE(message_id, created_at)
+                    )
+                ''')
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+                # 2. voice_session_history
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS voice_session_history (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        encrypted_username TEXT,
+                        join_time TIMESTAMPTZ NOT NULL,
+                        leave_time TIMESTAMPTZ NOT NULL,
+                        duration_seconds INT NOT NULL,
+                        state_flags INT DEFAULT 0,
+                        was_muted BOOLEAN DEFAULT FALSE,
+                        was_deafened BOOLEAN DEFAULT FALSE,
+                        was_streaming BOOLEAN DEFAULT FALSE,
+                        was_video BOOLEAN DEFAULT FALSE,
+                        
+                        PRIMARY KEY (id, join_time)
+                    )
+                ''')
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                # 3. emoji_usage
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS emoji_usage (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        encrypted_username TEXT,
+                        emoji_str TEXT NOT NULL,
+                        is_custom BOOLEAN DEFAULT FALSE,
+                        usage_count INT DEFAULT 1,
+                        last_used TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        usage_type TEXT NOT NULL,  -- 'message' or 'reaction'
+                        
+                        PRIMARY KEY (id, last_used),
+                        UNIQUE(guild_id, user_id, channel_id, emoji_str, usage_type, last_used)
+                    )
+                ''')
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+                # 4. invite_tracking
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS invite_tracking (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        inviter_id BIGINT NOT NULL,
+                        invitee_id BIGINT,
+                        invite_code TEXT NOT NULL,
+                        invite_type TEXT NOT NULL,  -- 'valid', 'suspicious', 'left'
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        
+                        PRIMARY KEY (id, created_at)
+                    )
+                ''')
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
+                # 5. user_mentions
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS user_mentions (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        mentioned_user_id BIGINT NOT NULL,
+                        mentioner_user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        message_id BIGINT NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        encrypted_username TEXT,
+                        
+                        PRIMARY KEY (id, created_at),
+                        UNIQUE(message_id, created_at)
+                    )
+                ''')
 
-                query += '''
-                    GROUP BY user_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 3
-                '''
+                # 6. voice_time_by_state
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS voice_time_by_state (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        encrypted_username TEXT,
+                        state_flags INT NOT NULL,
+                        state_category TEXT NOT NULL,
+                        duration_seconds INT NOT NULL DEFAULT 0,
+                        last_updated TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        
+                        PRIMARY KEY (id, last_updated),
+                        UNIQUE(guild_id, user_id, channel_id, state_flags, state_category)
+                    )
+                ''')
 
-                rows = await conn.fetch(query, *params)
+                # 7. activity_sessions
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS activity_sessions (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT,
+                        category_id BIGINT,
+                        encrypted_username TEXT,
+                        activity_type TEXT NOT NULL,
+                        start_time TIMESTAMPTZ NOT NULL,
+                        end_time TIMESTAMPTZ,
+                        duration_seconds INT,
+                        
+                        PRIMARY KEY (id, start_time)
+                    )
+                ''')
 
-                result = []
-                for row in rows:
-                    user_seconds = row['total_seconds'] or 0
-                    percentage = (user_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+                # 8. activities
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS activities (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        encrypted_username TEXT,
+                        activity_name TEXT NOT NULL,
+                        activity_type TEXT NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        
+                        PRIMARY KEY (id, created_at)
+                    )
+                ''')
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'total_seconds': user_seconds,
-                        'total_hours': round(user_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'avg_session': round(row['avg_session'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+                # 9. voice_hourly (voice sessions split at hour boundaries)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS voice_hourly (
+                        id BIGSERIAL,
+                        guild_id BIGINT NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        hour_bucket TIMESTAMPTZ NOT NULL,
+                        seconds INT NOT NULL,
+                        
+                        PRIMARY KEY (id, hour_bucket)
+                    )
+                ''')
 
-                return result
+                # 10. unique_user_sketches (HyperLogLog per channel and hour)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS unique_user_sketches (
+                        guild_id BIGINT NOT NULL,
+                        channel_id BIGINT NOT NULL,
+                        category_id BIGINT,
+                        metric TEXT NOT NULL,
+                        bucket TIMESTAMPTZ NOT NULL,
+                        sketch BYTEA NOT NULL,
+                        
+                        PRIMARY KEY (guild_id, metric, channel_id, bucket)
+                    )
+                ''')
 
-        except Exception as e:
-            logger.error(f"Error in q_server_top3_users_voice: {e}")
-            return []
+                # 11. heavy_hitter_summaries (Space-Saving per dimension and hour)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS heavy_hitter_summaries (
+                        guild_id BIGINT NOT NULL,
+                        dimension TEXT NOT NULL,
+                        bucket TIMESTAMPTZ NOT NULL,
+                        summary JSONB NOT NULL,
+                        
+                        PRIMARY KEY (guild_id, dimension, bucket)
+                    )
+                ''')
 
-    # CATEGORY STATS (9 functions)
+                logger.info("✅ Created all base tables")
 
-    async def q_category_channel_count(self,  guild_id: int, category_id: int) -> Dict[str, Any]:
+                # HYPERTABLE CONVERSION
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {'text_channels': 0, 'voice_channels': 0, 'total_channels': 0}
+                hypertables = [
+                    ('message_tracking', 'created_at'),
+                    ('voice_session_history', 'join_time'),
+                    ('emoji_usage', 'last_used'),
+                    ('invite_tracking', 'created_at'),
+                    ('user_mentions', 'created_at'),
+                    ('voice_time_by_state', 'last_updated'),
+                    ('activity_sessions', 'start_time'),
+                    ('activities', 'created_at'),
+                    ('voice_hourly', 'hour_bucket'),
+                    ('unique_user_sketches', 'bucket'),
+                    ('heavy_hitter_summaries', 'bucket')
+                ]
 
-        try:
-            text_channels = 0
-            voice_channels = 0
+                for table_name, time_column in hypertables:
+                    try:
+                        await conn.execute(f'''
+                            SELECT create_hypertable(
+                                '{table_name}', 
+                                '{time_column}', 
+                                chunk_time_interval => INTERVAL '7 days',
+                                if_not_exists => TRUE
+                            )
+                        ''')
+                        logger.info(f"✅ Converted {table_name} to hypertable")
+                    except Exception as e:
+                        logger.warning(
+                            f"⚠️ Could not create hypertable for {table_name}: {e}")
 
-            for channel in guild.channels:
-                if hasattr(channel, 'category_id') and channel.category_id == category_id:
-                    if isinstance(channel, discord.TextChannel):
-                        text_channels += 1
-                    elif isinstance(channel, discord.VoiceChannel):
-                        voice_channels += 1
+                await self._create_continuous_aggregates_safely(conn)
 
-            return {
-                'text_channels': text_channels,
-                'voice_channels': voice_channels,
-                'total_channels': text_channels + voice_channels
-            }
+                # INDEXES
 
-        except Exception as e:
-            logger.error(f"Error in q_category_channel_count: {e}")
-            return {'text_channels': 0, 'voice_channels': 0, 'total_channels': 0}
+                # Message tracking indexes
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_message_tracking_guild_user 
+                    ON message_tracking (guild_id, user_id, created_at DESC)
+                ''')
 
-    async def q_category_total_messages(self, guild_id: int, category_id: int,
-                                        role_filter_ids: Optional[List[int]] = None,
-                                        start_time: Optional[datetime] = None,
-                                        end_time: Optional[datetime] = None) -> Dict[str, Any]:
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_message_tracking_guild_channel 
+                    ON message_tracking (guild_id, channel_id, created_at DESC)
+                ''')
 
-        if not self.pool:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0
-            }
+                # Voice session indexes
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_voice_session_guild_user 
+                    ON voice_session_history (guild_id, user_id, join_time DESC)
+                ''')
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0
-            }
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_voice_hourly_guild_user 
+                    ON voice_hourly (guild_id, user_id, hour_bucket DESC)
+                ''')
 
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COUNT(*) as total_messages,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars,
-                        COUNT(DISTINCT user_id) as unique_users
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND category_id = $2 
-                    AND NOT is_bot
-                '''
-                params = [guild_id, category_id]
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_voice_hourly_guild_channel 
+                    ON voice_hourly (guild_id, channel_id, hour_bucket DESC)
+                ''')
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+                await self._backfill_voice_hourly(conn)
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                # Emoji usage indexes
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_emoji_usage_guild_emoji 
+                    ON emoji_usage (guild_id, emoji_str, last_used DESC)
+                ''')
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+                # User mentions indexes
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_user_mentions_guild_mentioned 
+                    ON user_mentions (guild_id, mentioned_user_id, created_at DESC)
+                ''')
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_user_mentions_guild_mentioner 
+                    ON user_mentions (guild_id, mentioner_user_id, created_at DESC)
+                ''')
 
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+                logger.info("✅ Created all indexes")
 
-                row = await conn.fetchrow(query, *params)
+                return True
 
-                total_messages = row['total_messages'] or 0
-                unique_users = row['unique_users'] or 0
-                messages_per_user = total_messages / max(unique_users, 1)
+        except Exception as e:
+            logger.error(f"❌ Error initializing database schema: {e}")
+            traceback.print_exc()
+            return False
 
-                return {
-                    'total_messages': total_messages,
-                    'total_chars': row['total_chars'] or 0,
-                    'avg_chars': round(row['avg_chars'] or 0, 2),
-                    'unique_users': unique_users,
-                    'messages_per_user': round(messages_per_user, 2)
-                }
+    async def _backfill_voice_hourly(self, conn):
 
-        except Exception as e:
-            logger.error(f"Error in q_category_total_messages: {e}")
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0
-            }
+        # One-off: slice the sessions recorded before voice_hourly existed
+        try:
+            if await conn.fetchval('SELECT EXISTS (SELECT 1 FROM voice_hourly)'):
+                return
 
-    async def q_category_total_voice(self, guild_id: int, category_id: int,
-                                     role_filter_ids: Optional[List[int]] = None,
-                                     start_time: Optional[datetime] = None,
-                                     end_time: Optional[datetime] = None) -> Dict[str, Any]:
+            result = await conn.execute('''
+                INSERT INTO voice_hourly
+                (guild_id, user_id, channel_id, category_id, hour_bucket, seconds)
+                SELECT * FROM (
+                    SELECT
+                        v.guild_id, v.user_id, v.channel_id, v.category_id, h.hour_bucket,
+                        EXTRACT(EPOCH FROM
+                            LEAST(v.leave_time, h.hour_bucket + INTERVAL '1 hour')
+                            - GREATEST(v.join_time, h.hour_bucket))::int AS seconds
+                    FROM voice_session_history v
+                    CROSS JOIN LATERAL generate_series(
+                        date_trunc('hour', v.join_time), v.leave_time, INTERVAL '1 hour'
+                    ) AS h(hour_bucket)
+                ) AS slices
+                WHERE seconds > 0
+            ''')
+            logger.info(f"✅ Backfilled voice_hourly: {result}")
 
-        if not self.pool:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0
-            }
+        except Exception as e:
+            logger.warning(f"⚠️ Could not backfill voice_hourly: {e}")
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0
-            }
+    # DIRECT POSTGRESQL QUERIES FOR BLACKLISTS
 
-        try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND category_id = $2
-                '''
-                params = [guild_id, category_id]
+    async def _get_cached_blacklists(self, guild_id: int) -> Dict[str, Any]:
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+        snapshot = blacklist_snapshot.get()
+        if snapshot and snapshot[0] == guild_id:
+            return snapshot[1]
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        blacklists = {
+            'users': set(),
+            'channels': set(),
+            'categories': set(),
+            'roles': set()
+        }
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        if not self.pool or not self.db_connected:
+            return blacklists
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
+        try:
+            async with self.connection_semaphore:
+                async with self.pool.acquire() as conn:
 
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+                    rows = await conn.fetch('''
+                        SELECT user_id FROM blacklisted_users 
+                        WHERE guild_id = $1
+                    ''', guild_id)
+                    blacklists['users'] = {row['user_id'] for row in rows}
 
-                row = await conn.fetchrow(query, *params)
+                    rows = await conn.fetch('''
+                        SELECT channel_id FROM blacklisted_channels 
+                        WHERE guild_id = $1
+                    ''', guild_id)
+                    blacklists['channels'] = {
+                        row['channel_id'] for row in rows}
 
-                total_seconds = row['total_seconds'] or 0
+                    rows = await conn.fetch('''
+                        SELECT category_id FROM blacklisted_categories 
+                        WHERE guild_id = $1
+                    ''', guild_id)
+                    blacklists['categories'] = {
+                        row['category_id'] for row in rows}
 
-                return {
-                    'total_seconds': total_seconds,
-                    'total_hours': round(total_seconds / 3600, 2),
-                    'session_count': row['session_count'] or 0,
-                    'unique_users': row['unique_users'] or 0,
-                    'avg_session': round(row['avg_session'] or 0, 2)
-                }
+                    rows = await conn.fetch('''
+                        SELECT role_id FROM blacklisted_roles 
+                        WHERE guild_id = $1
+                    ''', guild_id)
+                    blacklists['roles'] = {row['role_id'] for row in rows}
 
         except Exception as e:
-            logger.error(f"Error in q_category_total_voice: {e}")
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0
-            }
+            logger.error(
+                f"Error fetching blacklists for guild {guild_id}: {e}")
 
-    async def q_category_timeseries_messages(self, guild_id: int, category_id: int,
-                                             days: List[int] = [
-                                                 1, 5, 10, 20, 30],
-                                             role_filter_ids: Optional[List[int]] = None,
-                                             start_time: Optional[datetime] = None,
-                                             end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        return blacklists
 
-        if not self.pool:
-            return {f'{d}d': 0 for d in days}
+    async def _apply_comprehensive_blacklist_filters(self, guild_id: int, guild: discord.Guild,
+                                                     base_query: str, params: List,
+                                                     table_name: str,
+                                                     include_users: bool = True,
+                                                     include_channels: bool = True,
+                                                     specific_channel_id: Optional[int] = None,
+                                                     specific_category_id: Optional[int] = None,
+                                                     user_column: str = 'user_id') -> Tuple[Optional[str], List]:
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {f'{d}d': 0 for d in days}
+        if not include_users and not include_channels:
+            return base_query, params
 
-        try:
-            async with self.pool.acquire() as conn:
-                result = {}
+        blacklists = await self._get_cached_blacklists(guild_id)
 
-                for d in days:
+        # CHANNEL BLACKLISTING
+        if specific_channel_id is not None:
 
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=d)
+            if specific_channel_id in blacklists['channels']:
+                return None, []
 
-                    query = '''
-                        SELECT COUNT(*) as message_count
-                        FROM message_tracking
-                        WHERE guild_id = $1 
-                        AND category_id = $2 
-                        AND NOT is_bot
-                        AND created_at >= $3
-                        AND created_at <= $4
-                    '''
-                    params = [guild_id, category_id, window_start, window_end]
+            if guild:
+                channel = guild.get_channel(specific_channel_id)
+                if channel and hasattr(channel, 'category_id') and channel.category_id:
+                    if channel.category_id in blacklists['categories']:
+                        return None, []
 
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
+        # CATEGORY BLACKLISTING
+        if specific_category_id is not None and specific_category_id in blacklists['categories']:
+            return None, []
 
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
+        filter_parts = []
+        new_params = params.copy()
 
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'message_tracking',
+        # USER BLACKLISTING
+        if include_users and guild:
+            excluded_users = set()
 
-                        include_users=True, include_channels=False,
-                        specific_category_id=category_id
-                    )
+            if blacklists['users']:
+                excluded_users.update(blacklists['users'])
 
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{d}d'] = row['message_count'] or 0
+            if blacklists['roles'] and guild.members:
+                blacklisted_role_ids = blacklists['roles']
 
-                return result
+                for member in guild.members:
+                    if any(role.id in blacklisted_role_ids for role in member.roles):
+                        excluded_users.add(member.id)
 
-        except Exception as e:
-            logger.error(f"Error in q_category_timeseries_messages: {e}")
-            return {f'{d}d': 0 for d in days}
+            if excluded_users:
+                placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
+                                                                 len(new_params) + len(excluded_users) + 1)])
+                filter_parts.append(f"{user_column} NOT IN ({placeholders})")
+                new_params.extend(list(excluded_users))
 
-    async def q_category_timeseries_voice(self, guild_id: int, category_id: int,
-                                          days: List[int] = [1, 5, 10, 20, 30],
-                                          role_filter_ids: Optional[List[int]] = None,
-                                          start_time: Optional[datetime] = None,
-                                          end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        # CHANNEL & CATEGORY BLACKLIST FILTERS
 
-        if not self.pool:
-            return {f'{d}d': 0 for d in days}
+        if include_channels and guild:
+            channel_filters = []
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {f'{d}d': 0 for d in days}
+            tables_with_channels = ['message_tracking', 'voice_session_history', 'voice_hourly',
+                                    'emoji_usage', 'voice_time_by_state', 'activity_sessions']
 
-        try:
-            async with self.pool.acquire() as conn:
-                result = {}
+            tables_without_channels = [
+                'user_mentions', 'invite_tracking', 'activities']
 
-                for d in days:
+            if table_name in tables_with_channels:
 
-                    window_end = end_time if end_time else datetime.utcnow()
-                    window_start = window_end - timedelta(days=d)
+                if specific_channel_id is None and blacklists['channels']:
+                    placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
+                                                                     len(new_params) + len(blacklists['channels']) + 1)])
+                    channel_filters.append(
+                        f"channel_id NOT IN ({placeholders})")
+                    new_params.extend(list(blacklists['channels']))
 
-                    query = '''
-                        SELECT COALESCE(SUM(duration_seconds), 0) as voice_seconds
-                        FROM voice_session_history
-                        WHERE guild_id = $1 
-                        AND category_id = $2 
-                        AND join_time >= $3
-                        AND join_time <= $4
-                    '''
-                    params = [guild_id, category_id, window_start, window_end]
+                if specific_category_id is None and blacklists['categories']:
+                    placeholders = ', '.join([f'${i}' for i in range(len(new_params) + 1,
+                                                                     len(new_params) + len(blacklists['categories']) + 1)])
+                    channel_filters.append(
+                        f"(category_id IS NULL OR category_id NOT IN ({placeholders}))")
+                    new_params.extend(list(blacklists['categories']))
 
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
+            if channel_filters:
+                filter_parts.append("(" + " AND ".join(channel_filters) + ")")
 
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
+        # APPLY FILTERS TO QUERY
+        if filter_parts:
+            if 'WHERE' in base_query.upper():
+                base_query += " AND " + " AND ".join(filter_parts)
+            else:
+                base_query += " WHERE " + " AND ".join(filter_parts)
 
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'voice_session_history',
+        return base_query, new_params
 
-                        include_users=True, include_channels=False,
-                        specific_category_id=category_id
-                    )
+    # SHUTDOWN
 
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{d}d'] = row['voice_seconds'] or 0
+    async def cog_unload(self):
 
-                return result
+        async with self.shutdown_lock:
+            self.shutting_down = True
 
-        except Exception as e:
-            logger.error(f"Error in q_category_timeseries_voice: {e}")
-            return {f'{d}d': 0 for d in days}
+        tasks_to_stop = [
+            self.voice_activity_tracker,
+            self.connection_pool_health_check,
 
-    async def q_category_top5_voice_channels(self, guild_id: int, category_id: int,
-                                             role_filter_ids: Optional[List[int]] = None,
-                                             start_time: Optional[datetime] = None,
-                                             end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+            self.init_pools,
+            self.metrics_reset_task,
+            self.timescale_maintenance,
 
-        if not self.pool:
-            return []
+            self.redis_batch_flusher,
+            self.replica_lag_monitor,
+            self.cleanup_task
+        ]
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
+        for task in tasks_to_stop:
+            if task and not task.done():
+                task.cancel()
 
         try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND category_id = $2
-                '''
-                total_params = [guild_id, category_id]
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *[task for task in tasks_to_stop if task and not task.done()],
+                    return_exceptions=True
+                ),
+                timeout=Constants.SHUTDOWN_TIMEOUT
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            logger.warning(f"Error during task shutdown: {e}")
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+        try:
+            await self._flush_all_batches_to_postgresql()
+        except Exception as e:
+            logger.warning(f"Error during final Redis batch flush: {e}")
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        try:
+            await self._cleanup_all_voice_sessions()
+        except Exception as e:
+            logger.warning(f"Error during voice session cleanup: {e}")
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        close_tasks = []
+        if self.pool:
+            close_tasks.append(self.pool.close())
+        if self.read_pool:
+            close_tasks.append(self.read_pool.close())
+        if self.redis:
+            close_tasks.append(self.redis.close())
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
+        if close_tasks:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*close_tasks, return_exceptions=True),
+                    timeout=10
                 )
+            except (asyncio.TimeoutError, Exception) as e:
+                logger.error(f"Error closing connections: {e}")
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
-
-                if total_seconds == 0:
-                    return []
-
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND category_id = $2
-                '''
-                params = [guild_id, category_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+        try:
+            await self._cleanup_all_memory()
+        except Exception as e:
+            logger.warning(f"Error during memory cleanup: {e}")
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        logger.info("DatabaseStats cog shutdown complete")
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+    async def _cleanup_all_memory(self):
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+        self.processed_messages.clear()
 
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 5
-                '''
+        self.rate_limits.clear()
 
-                rows = await conn.fetch(query, *params)
+        self.invite_locks.clear()
 
-                result = []
-                for row in rows:
-                    channel_seconds = row['total_seconds'] or 0
-                    percentage = (channel_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        if hasattr(self.bot, 'invites_cache'):
+            self.bot.invites_cache.clear()
 
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'total_seconds': channel_seconds,
-                        'total_hours': round(channel_seconds / 3600, 2),
-                        'unique_users': row['unique_users'] or 0,
-                        'session_count': row['session_count'] or 0,
-                        'percentage': round(percentage, 1)
-                    })
+        async with self.voice_lock:
+            self.active_voice_sessions.clear()
 
-                return result
+        logger.debug("All memory caches cleared")
 
-        except Exception as e:
-            logger.error(f"Error in q_category_top5_voice_channels: {e}")
-            return []
+    async def _cleanup_all_voice_sessions(self):
 
-    async def q_category_top5_text_channels(self, guild_id: int, category_id: int,
-                                            role_filter_ids: Optional[List[int]] = None,
-                                            start_time: Optional[datetime] = None,
-                                            end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        async with self.voice_lock:
+            sessions_copy = copy.deepcopy(self.active_voice_sessions)
+            self.active_voice_sessions.clear()
 
-        if not self.pool:
-            return []
+        current_time = datetime.utcnow()
+        for user_id, session_data in sessions_copy.items():
+            try:
+                duration = int(
+                    (current_time - session_data['join_time']).total_seconds())
+                if duration > 0:
+                    await self._record_voice_session_history_direct(
+                        guild_id=session_data['guild_id'],
+                        user_id=user_id,
+                        channel_id=session_data['channel_id'],
+                        join_time=session_data['join_time'],
+                        leave_time=current_time,
+                        duration=duration,
+                        state_flags=self._calculate_state_flags(session_data)
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Error cleaning up voice session for user {user_id}: {e}")
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
+    # DATABASE CONNECTION RETRY
 
-        try:
-            async with self.pool.acquire() as conn:
+    @tasks.loop(minutes=5, count=None)
+    async def init_pools(self):
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND category_id = $2 AND NOT is_bot
-                '''
-                total_params = [guild_id, category_id]
+        print("🎯 INIT_POOLS TASK STARTED!")
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+        if self.shutting_down:
+            return
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        # POSTGRESQL CONNECTION
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        if self.db_connected and self.pool and self.redis_connected and self.redis:
+            return
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+        print("🔄 Creating PostgreSQL pool...")
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+        try:
 
-                if total_messages == 0:
-                    return []
+            self.pool = await asyncpg.create_pool(
+                host=os.getenv('DB_HOST'),
+                database=os.getenv('DB_NAME'),
+                user=os.getenv('DB_USER'),
+                password=os.getenv('DB_PASSWORD'),
+                port=int(os.getenv('DB_PORT')),
+                min_size=5,
+                max_size=20,
+                command_timeout=30
+            )
 
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND category_id = $2 AND NOT is_bot
-                '''
-                params = [guild_id, category_id]
+            async with self.pool.acquire() as conn:
+                await conn.fetchval('SELECT 1')
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+            print("✅ PostgreSQL connection established")
+            self.db_connected = True
+            self.is_timescale_initialized = False
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            print("🔄 Initializing database schema...")
+            success = await self._initialize_database_schema()
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+            if success:
+                self.is_timescale_initialized = True
+                print("✅ Database schema initialized")
+            else:
+                print("⚠️ Database schema initialization failed")
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+            # READ REPLICA CONNECTION
 
-                query += '''
-                    GROUP BY channel_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 5
-                '''
+            if os.getenv('DB_REPLICA_DSN') and not self.read_pool:
+                await self._connect_read_replica()
 
-                rows = await conn.fetch(query, *params)
+            # REDIS CONNECTION
 
-                result = []
-                for row in rows:
-                    channel_messages = row['message_count'] or 0
-                    percentage = (channel_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+            redis_host = os.getenv('REDIS_HOST', 'localhost')
+            redis_port = int(os.getenv('REDIS_PORT', '6379'))
+            redis_password = os.getenv('REDIS_PASSWORD')
+            redis_db = int(os.getenv('REDIS_DB', '0'))
 
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'message_count': channel_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'unique_users': row['unique_users'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+            print("🔄 Connecting to Redis...")
+            try:
 
-                return result
+                if redis_password:
+                    redis_url = f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
+                else:
+                    redis_url = f"redis://{redis_host}:{redis_port}/{redis_db}"
 
-        except Exception as e:
-            logger.error(f"Error in q_category_top5_text_channels: {e}")
-            return []
+                self.redis = Redis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=5,
+                    socket_keepalive=True,
+                    retry_on_timeout=True,
+                    encoding='utf-8'
+                )
 
-    async def q_category_top5_users_messages(self, guild_id: int, category_id: int,
-                                             role_filter_ids: Optional[List[int]] = None,
-                                             start_time: Optional[datetime] = None,
-                                             end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+                await self.redis.ping()
+                self.redis_connected = True
+                print("✅ Redis connection established")
 
-        if not self.pool:
-            return []
+            except Exception as e:
+                print(f"⚠️ Redis connection failed: {e}")
+                self.redis_connected = False
+                self.redis = None
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
+            # ENCRYPTION INITIALIZATION
 
-        try:
-            async with self.pool.acquire() as conn:
+            fernet_key = os.getenv('FERNET_KEY')
+            if fernet_key:
+                try:
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND category_id = $2 AND NOT is_bot
-                '''
-                total_params = [guild_id, category_id]
+                    fernet_key = fernet_key.strip()
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                    try:
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                        self.fernet = Fernet(fernet_key.encode())
+                        print("✅ Username encryption initialized with Fernet key")
+                    except (ValueError, TypeError):
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+                        print("⚠️ Fernet key invalid, hashing to create valid key...")
+                        key_hash = hashlib.sha256(fernet_key.encode()).digest()
+                        valid_key = base64.urlsafe_b64encode(key_hash)
+                        self.fernet = Fernet(valid_key)
+                        print("✅ Username encryption initialized with hashed key")
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+                except Exception as e:
+                    print(f"⚠️ Fernet encryption initialization failed: {e}")
+                    self.fernet = None
+            else:
+                print("ℹ️ No FERNET_KEY in .env, username encryption disabled")
+                self.fernet = None
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+            # VERIFICATION
+            print("🎉 Database verification complete")
+            print(
+                f"   PostgreSQL: {'✅ Connected' if self.db_connected else '❌ Disconnected'}")
+            print(
+                f"   Redis: {'✅ Connected' if self.redis_connected else '❌ Disconnected'}")
+            print(
+                f"   Read replica: {'✅ Connected' if self.read_pool else '➖ Not configured'}")
+            print(
+                f"   Encryption: {'✅ Enabled' if self.fernet else '❌ Disabled'}")
+            print(
+                f"   TimescaleDB: {'✅ Initialized' if self.is_timescale_initialized else '❌ Not initialized'}")
 
-                if total_messages == 0:
-                    return []
+        except Exception as e:
+            print(f"❌ Connection failed: {e}")
+            traceback.print_exc()
+            self.db_connected = False
+            self.redis_connected = False
+            self.fernet = None
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND category_id = $2 AND NOT is_bot
-                '''
-                params = [guild_id, category_id]
+    # READ REPLICA
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+    async def _connect_read_replica(self):
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        print("🔄 Creating read replica pool...")
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        try:
+            self.read_pool = await asyncpg.create_pool(
+                dsn=os.getenv('DB_REPLICA_DSN'),
+                min_size=2,
+                max_size=20,
+                command_timeout=30
+            )
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+            await self._check_replica_lag()
+            print("✅ Read replica connection established")
 
-                query += '''
-                    GROUP BY user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 5
-                '''
+        except Exception as e:
+            print(f"⚠️ Read replica connection failed, reads stay on primary: {e}")
+            self.read_pool = None
+            self.replica_lag = None
 
-                rows = await conn.fetch(query, *params)
+    async def _check_replica_lag(self):
 
-                result = []
-                for row in rows:
-                    user_messages = row['message_count'] or 0
-                    percentage = (user_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+        # Replay lag in seconds; a replica that has replayed everything it
+        # received counts as current even if the primary has been idle
+        was_usable = self._read_pool() is self.read_pool
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'message_count': user_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+        try:
+            async with self.read_pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE COALESCE(
+                            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()),
+                            'Infinity')
+                    END::float8 AS lag,
+                    CASE WHEN pg_is_in_recovery()
+                        THEN (pg_last_wal_replay_lsn() - '0/0')::bigint
+                    END AS replay_lsn
+                ''')
 
-                return result
+            self.replica_lag = row['lag']
+            self.replica_replay_lsn = row['replay_lsn']
+            self.replica_lag_checked_at = self.replica_lsn_checked_at = time.monotonic()
 
         except Exception as e:
-            logger.error(f"Error in q_category_top5_users_messages: {e}")
-            return []
+            logger.warning(f"Read replica lag check failed: {e}")
+            self.replica_lag = None
 
-    async def q_category_top5_users_voice(self, guild_id: int, category_id: int,
-                                          role_filter_ids: Optional[List[int]] = None,
-                                          start_time: Optional[datetime] = None,
-                                          end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        usable = self._read_pool() is self.read_pool
+        if usable != was_usable:
+            if usable:
+                logger.info(f"Routing reads to replica (lag {self.replica_lag:.1f}s)")
+            else:
+                logger.warning(
+                    f"Routing reads to primary (replica lag {self.replica_lag}s, "
+                    f"budget {Constants.REPLICA_STALENESS_BUDGET}s)")
 
-        if not self.pool:
-            return []
+    async def _check_replica_replay_lsn(self):
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
+        try:
+            async with self.read_pool.acquire() as conn:
+                self.replica_replay_lsn = await conn.fetchval('''
+                    SELECT CASE WHEN pg_is_in_recovery()
+                        THEN (pg_last_wal_replay_lsn() - '0/0')::bigint
+                    END
+                ''')
+            self.replica_lsn_checked_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Read replica replay position check failed: {e}")
+            self.replica_lag = None
+
+    async def _note_primary_write_lsn(self):
+
+        # Called after a data write commits and before its data version is
+        # bumped: until the replica replays past this point, a result read
+        # there would be cached under the new version with the old data
+        if self.read_pool is None or not self.pool:
+            return
 
         try:
             async with self.pool.acquire() as conn:
+                lsn = await conn.fetchval("SELECT (pg_current_wal_lsn() - '0/0')::bigint")
+            self.primary_write_lsn = max(self.primary_write_lsn, lsn)
+        except Exception as e:
+            logger.warning(f"Could not read the primary's WAL position: {e}")
+            # Unknown write position: reads stay on the primary until the
+            # next lag check
+            self.replica_lag = None
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND category_id = $2
-                '''
-                total_params = [guild_id, category_id]
-
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+    def _read_pool(self) -> Optional[asyncpg.Pool]:
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        # The pool q_* reads go through
+        if (self.read_pool is None or self.replica_lag is None
+                or self.replica_lag > Constants.REPLICA_STALENESS_BUDGET):
+            return self.pool
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        if time.monotonic() - self.replica_lag_checked_at > 2 * Constants.REPLICA_LAG_CHECK_INTERVAL:
+            return self.pool
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+        if self.replica_replay_lsn is not None and self.replica_replay_lsn < self.primary_write_lsn:
+            # Behind the last write: poll its progress so reads move back soon
+            if (self.replica_lsn_check is None or self.replica_lsn_check.done()) and \
+                    time.monotonic() - self.replica_lsn_checked_at >= Constants.REPLICA_LSN_CHECK_INTERVAL:
+                self.replica_lsn_check = asyncio.create_task(self._check_replica_replay_lsn())
+            return self.pool
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+        return self.read_pool
 
-                if total_seconds == 0:
-                    return []
+    @tasks.loop(seconds=Constants.REPLICA_LAG_CHECK_INTERVAL)
+    async def replica_lag_monitor(self):
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 AND category_id = $2
-                '''
-                params = [guild_id, category_id]
+        if self.shutting_down or not self.db_connected or not os.getenv('DB_REPLICA_DSN'):
+            return
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+        if not self.read_pool:
+            await self._connect_read_replica()
+            return
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        await self._check_replica_lag()
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+    # HELPER METHODS
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+    def _calculate_state_flags(self, session_data: Dict[str, Any]) -> int:
 
-                query += '''
-                    GROUP BY user_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 5
-                '''
+        state_flags = 0
 
-                rows = await conn.fetch(query, *params)
+        if session_data.get('is_afk_channel'):
+            state_flags |= self.voice_state_bits['afk_channel']
 
-                result = []
-                for row in rows:
-                    user_seconds = row['total_seconds'] or 0
-                    percentage = (user_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        if session_data.get('server_mute'):
+            state_flags |= self.voice_state_bits['server_mute']
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'total_seconds': user_seconds,
-                        'total_hours': round(user_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'avg_session': round(row['avg_session'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+        if session_data.get('server_deaf'):
+            state_flags |= self.voice_state_bits['server_deaf']
 
-                return result
+        if session_data.get('self_mute'):
+            state_flags |= self.voice_state_bits['self_mute']
 
-        except Exception as e:
-            logger.error(f"Error in q_category_top5_users_voice: {e}")
-            return []
+        if session_data.get('self_deaf'):
+            state_flags |= self.voice_state_bits['self_deaf']
 
-    # CHANNEL STATS (8 functions)
+        if session_data.get('streaming'):
+            state_flags |= self.voice_state_bits['streaming']
 
-    async def q_channel_messages_per_hour(self, guild_id: int, channel_id: int,
-                                          role_filter_ids: Optional[List[int]] = None,
-                                          start_time: Optional[datetime] = None,
-                                          end_time: Optional[datetime] = None,
-                                          timezone_str: str = 'UTC') -> Dict[str, Any]:
+        if session_data.get('video'):
+            state_flags |= self.voice_state_bits['video']
 
-        if not self.pool:
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
+        if session_data.get('suppressed'):
+            state_flags |= self.voice_state_bits['suppressed']
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
+        return state_flags
+
+    async def _record_voice_session_history_direct(self, guild_id: int, user_id: int, channel_id: int,
+                                                   join_time: datetime, leave_time: datetime,
+                                                   duration: int, state_flags: int):
 
         try:
-            async with self.pool.acquire() as conn:
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                return False
 
-                query = f'''
-                    SELECT 
-                        EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COUNT(*) as message_count
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                params = [guild_id, channel_id]
+            member = guild.get_member(user_id)
+            if not member:
+                return False
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+            encrypted_username = self.encrypt_username(str(member))
+            category_id = None
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            channel = guild.get_channel(channel_id)
+            if channel and hasattr(channel, 'category_id') and channel.category_id:
+                category_id = channel.category_id
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+            params = [guild_id, user_id, channel_id, category_id, encrypted_username,
+                      join_time, leave_time, duration]
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
+            async with self.live_leaderboard_lock:
+                async with self.pool.acquire() as conn:
+                    await conn.execute('''
+                        INSERT INTO voice_session_history 
+                        (guild_id, user_id, channel_id, category_id, encrypted_username,
+                         join_time, leave_time, duration_seconds, state_flags,
+                         was_muted, was_deafened, was_streaming, was_video)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+                    ''', *params, state_flags, False, False, False, False)
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+                    await self._insert_voice_hourly(conn, *params)
+                    await self._update_batch_summaries(conn, 'voice_sessions', [params])
 
-                if query is None:
-                    result = {f'hour_{i}': 0 for i in range(24)}
-                    result.update({'total': 0, 'peak_hour': -1})
-                    return result
+                await self._record_live_leaderboard_increments(
+                    'voice', self._live_leaderboard_increments('voice_sessions', params))
 
-                query += '''
-                    GROUP BY hour
-                    ORDER BY hour
-                '''
+            await self._bump_query_cache_versions('data', [guild_id])
+            return True
 
-                rows = await conn.fetch(query, *params)
+        except Exception as e:
+            logger.error(f"Error recording voice session: {e}")
+            return False
 
-                result = {f'hour_{i}': 0 for i in range(24)}
-                total = 0
-                peak_hour = -1
-                peak_count = 0
+    def encrypt_username(self, username: str) -> Optional[str]:
 
-                for row in rows:
-                    hour = int(row['hour'])
-                    count = row['message_count'] or 0
-                    result[f'hour_{hour}'] = count
-                    total += count
+        if not username:
+            return None
 
-                    if count > peak_count:
-                        peak_count = count
-                        peak_hour = hour
+        if not self.fernet:
+            return hashlib.sha256(username.encode()).hexdigest()[:32]
 
-                result['total'] = total
-                result['peak_hour'] = peak_hour
+        try:
+            return self.fernet.encrypt(username.encode()).decode()
+        except Exception as e:
+            logger.warning(
+                f"Error encrypting username, falling back to hash: {e}")
+            return hashlib.sha256(username.encode()).hexdigest()[:32]
 
-                return result
+    def decrypt_username(self, encrypted: Optional[str]) -> Optional[str]:
+
+        if not encrypted or not self.fernet:
+            return encrypted
 
+        try:
+            return self.fernet.decrypt(encrypted.encode()).decode()
         except Exception as e:
-            logger.error(f"Error in q_channel_messages_per_hour: {e}")
-            result = {f'hour_{i}': 0 for i in range(24)}
-            result.update({'total': 0, 'peak_hour': -1})
-            return result
+            logger.warning(f"Error decrypting username: {e}")
+            return None
 
-    async def q_channel_voice_per_hour(self, guild_id: int, channel_id: int,
-                                       role_filter_ids: Optional[List[int]] = None,
-                                       start_time: Optional[datetime] = None,
-                                       end_time: Optional[datetime] = None,
-                                       timezone_str: str = 'UTC') -> Dict[str, Any]:
+    def _serialize_datetime(self, obj: Any) -> Any:
 
-        if not self.pool:
-            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+        if isinstance(obj, datetime):
+            if obj.tzinfo is None:
+                obj = obj.replace(tzinfo=timezone.utc)
+            return obj.isoformat()
+        elif isinstance(obj, (list, tuple)):
+            return [self._serialize_datetime(item) for item in obj]
+        elif isinstance(obj, dict):
+            return {key: self._serialize_datetime(value) for key, value in obj.items()}
+        elif isinstance(obj, date):
+            return obj.isoformat()
+        return obj
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+    def _ensure_int(self, value: Any) -> Optional[int]:
+
+        if value is None:
+            return None
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return None
+
+    # TIMESCALEDB MAINTENANCE
+
+    @tasks.loop(hours=6)
+    async def timescale_maintenance(self):
+
+        if not self.pool or not self.db_connected or not self.is_timescale_initialized:
+            return
 
         try:
             async with self.pool.acquire() as conn:
 
-                query = f'''
-                    SELECT 
-                        EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                params = [guild_id, channel_id]
+                await self._update_compression_stats(conn)
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+                await self._update_hypertable_sizes(conn)
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                try:
+                    await conn.execute("CALL refresh_continuous_aggregate('daily_message_counts', NULL, NULL);")
+                except:
+                    pass
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+                try:
+                    await conn.execute("CALL refresh_continuous_aggregate('daily_voice_time', NULL, NULL);")
+                except:
+                    pass
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
+                # Finer tiers first, so each tier refreshes from an up-to-date parent
+                for tier in Constants.ROLLUP_TIERS:
+                    for rollup_name in Constants.ROLLUP_SOURCES:
+                        view_name = f"{tier['prefix']}_{rollup_name}"
+                        if view_name not in self.available_rollups:
+                            continue
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+                        try:
+                            await conn.execute(f'''
+                                CALL refresh_continuous_aggregate('{view_name}',
+                                    NOW() - INTERVAL '{tier['start_offset']}', NULL);
+                            ''')
+                        except Exception as e:
+                            logger.debug(f"Could not refresh {view_name}: {e}")
 
-                if query is None:
-                    return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+                logger.debug("TimescaleDB maintenance completed")
 
-                query += '''
-                    GROUP BY hour
-                    ORDER BY hour
-                '''
+        except Exception as e:
+            logger.warning(f"Error in TimescaleDB maintenance: {e}")
+
+    async def _update_compression_stats(self, conn):
+
+        try:
+            rows = await conn.fetch('''
+                SELECT 
+                    hypertable_name,
+                    ROUND(compression_ratio, 2) as compression_ratio,
+                    total_chunks,
+                    number_compressed_chunks
+                FROM timescaledb_information.compressed_hypertable_stats;
+            ''')
 
-                rows = await conn.fetch(query, *params)
+            for row in rows:
+                async with self.metrics_lock:
+                    self.metrics['timescale_compression_ratio'] = row['compression_ratio'] or 0.0
+                    self.metrics['chunk_count'] = row['total_chunks'] or 0
 
-                result = {f'hour_{i}': 0 for i in range(24)}
-                total_seconds = 0
-                peak_hour = -1
-                peak_seconds = 0
+        except Exception as e:
+            logger.debug(f"Could not update compression stats: {e}")
 
-                for row in rows:
-                    hour = int(row['hour'])
-                    seconds = row['total_seconds'] or 0
-                    result[f'hour_{hour}'] = seconds
-                    total_seconds += seconds
+    async def _update_hypertable_sizes(self, conn):
 
-                    if seconds > peak_seconds:
-                        peak_seconds = seconds
-                        peak_hour = hour
+        try:
+            rows = await conn.fetch('''
+                SELECT 
+                    hypertable_name,
+                    pg_size_pretty(total_bytes) as total_size,
+                    pg_size_pretty(table_bytes) as table_size,
+                    pg_size_pretty(index_bytes) as index_size
+                FROM timescaledb_information.hypertable
+                JOIN LATERAL hypertable_detailed_size(hypertable_name::regclass)
+                    ON true
+                ORDER BY total_bytes DESC;
+            ''')
 
-                result['total_seconds'] = total_seconds
-                result['peak_hour'] = peak_hour
+            sizes = {}
+            for row in rows:
+                sizes[row['hypertable_name']] = {
+                    'total': row['total_size'],
+                    'table': row['table_size'],
+                    'index': row['index_size']
+                }
 
-                return result
+            async with self.metrics_lock:
+                self.metrics['hypertable_sizes'] = sizes
 
         except Exception as e:
-            logger.error(f"Error in q_channel_voice_per_hour: {e}")
-            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+            logger.debug(f"Could not update hypertable sizes: {e}")
 
-    async def q_channel_top5_users_messages(self, guild_id: int, channel_id: int,
-                                            role_filter_ids: Optional[List[int]] = None,
-                                            start_time: Optional[datetime] = None,
-                                            end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    # SCOPED QUERY HELPERS
 
-        if not self.pool:
-            return []
+    def _role_filtered_user_ids(self, guild: discord.Guild,
+                                role_filter_ids: Optional[List[int]]) -> List[int]:
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
+        if not role_filter_ids:
             return []
 
-        try:
-            async with self.pool.acquire() as conn:
+        return [member.id for member in guild.members
+                if any(role.id in role_filter_ids for role in member.roles)]
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                total_params = [guild_id, channel_id]
+    def _range_condition(self, column: str, ranges: List[Tuple], params: List) -> str:
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+        # Adjacent ranges are merged so aligned cut points don't add conditions
+        merged = []
+        for range_start, range_end in sorted(ranges, key=lambda r: r[1]):
+            if merged and merged[-1][1] == range_start:
+                merged[-1] = (merged[-1][0], range_end)
+            else:
+                merged.append((range_start, range_end))
+
+        conditions = []
+        for range_start, range_end in merged:
+            parts = []
+            if range_start is not None:
+                params.append(range_start)
+                parts.append(f"{column} >= ${len(params)}")
+            params.append(range_end)
+            parts.append(f"{column} < ${len(params)}")
+            conditions.append(f"({' AND '.join(parts)})")
+
+        return f"({' OR '.join(conditions)})"
+
+    def _rollup_source_sql(self, rollup_name: str, params: List,
+                           start_time: Optional[datetime] = None,
+                           end_time: Optional[datetime] = None,
+                           time_cuts: Optional[List[datetime]] = None) -> str:
+
+        # Routes a time range across the aggregate tiers: weekly and daily
+        # buckets for the bulk, hourly buckets for the edges and raw rows for
+        # partial hours (including the current one). Cut points such as window
+        # starts or series boundaries are never inside a bucket that is read.
+        # Every branch exposes the same columns, with the raw row time standing
+        # in for the bucket.
+        rollup = Constants.ROLLUP_SOURCES[rollup_name]
+        keys = ', '.join(rollup['keys'])
+        columns = ', '.join(rollup['columns'])
+        raw_columns = ', '.join(f"{raw_value} AS {column}"
+                                for column, (_, raw_value, _) in rollup['columns'].items())
+        time_column = rollup['time_column']
+
+        raw_select = f"SELECT {time_column} AS bucket, {keys}, {raw_columns} FROM {rollup['table']}"
+        raw_conditions = [rollup['base_filter']] if rollup['base_filter'] else []
+
+        tiers = []
+        for tier in Constants.ROLLUP_TIERS:
+            view_name = f"{tier['prefix']}_{rollup_name}"
+            if view_name not in self.available_rollups:
+                break
+            tiers.append((view_name, tier['width']))
+        tiers.reverse()
+
+        def as_naive_utc(moment):
+            if moment is not None and moment.tzinfo is not None:
+                return moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
+
+        # end_time is inclusive, so the planned range stops just after it
+        range_end = as_naive_utc(end_time or datetime.utcnow()) + timedelta(microseconds=1)
+        plan, raw_ranges = plan_rollup_ranges(
+            tiers, as_naive_utc(start_time), range_end,
+            [as_naive_utc(cut) for cut in time_cuts or []]
+        )
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        rollup_span = sum((bucket_end - bucket_start
+                           for ranges in plan.values()
+                           for bucket_start, bucket_end in ranges if bucket_start is not None),
+                          timedelta())
+        has_open_range = any(bucket_start is None
+                             for ranges in plan.values() for bucket_start, _ in ranges)
+
+        # Too many edges to be worth it: scan raw rows once instead
+        if not has_open_range and rollup_span < timedelta(hours=len(raw_ranges)):
+            if raw_conditions:
+                raw_select += f" WHERE {' AND '.join(raw_conditions)}"
+            return f"({raw_select}) AS rollup_source"
+
+        branches = []
+        for view_name, ranges in plan.items():
+            if ranges:
+                branches.append(
+                    f"SELECT bucket, {keys}, {columns} FROM {view_name} "
+                    f"WHERE {self._range_condition('bucket', ranges, params)}")
+
+        if raw_ranges:
+            raw_conditions.append(self._range_condition(time_column, raw_ranges, params))
+            branches.append(f"{raw_select} WHERE {' AND '.join(raw_conditions)}")
+
+        return f"({' UNION ALL '.join(branches)}) AS rollup_source"
+
+    async def _build_scoped_query(self, guild: discord.Guild, metric: str, select_sql: str,
+                                  scope: str = 'server',
+                                  target_id: Optional[int] = None,
+                                  role_filter_ids: Optional[List[int]] = None,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  params: Optional[List] = None,
+                                  filters: Optional[Dict[str, Any]] = None,
+                                  time_cuts: Optional[List[datetime]] = None) -> Tuple[Optional[str], List]:
+
+        # params passed in are bound first, so select_sql may reference $1..$n
+        source = Constants.METRIC_SOURCES[metric]
+        time_column = source['time_column']
+        user_column = source['user_column']
+        scope_column = user_column if scope == 'user' else Constants.SCOPE_COLUMNS[scope]
+        params = list(params) if params else []
+
+        if source['rollup']:
+            from_sql = self._rollup_source_sql(source['rollup'], params,
+                                               start_time, end_time, time_cuts)
+        else:
+            from_sql = source['table']
+
+        params.append(guild.id)
+        query = f"SELECT {select_sql} FROM {from_sql} WHERE guild_id = ${len(params)}"
+
+        if source['base_filter']:
+            query += f" AND {source['base_filter']}"
+
+        if scope_column:
+            params.append(target_id)
+            query += f" AND {scope_column} = ${len(params)}"
+
+        for column, value in (filters or {}).items():
+            params.append(value)
+            query += f" AND {column} = ${len(params)}"
+
+        if start_time:
+            params.append(start_time)
+            query += f" AND {time_column} >= ${len(params)}"
+        if end_time:
+            params.append(end_time)
+            query += f" AND {time_column} <= ${len(params)}"
+
+        if role_filter_ids:
+            if scope == 'user':
+                member = guild.get_member(target_id)
+                if not member:
+                    return None, []
+
+                user_roles = [role.id for role in member.roles]
+                if not any(role_id in role_filter_ids for role_id in user_roles):
+                    return None, []
+            else:
+                user_ids = self._role_filtered_user_ids(guild, role_filter_ids)
+                if user_ids:
+                    placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
+                                                                     len(params) + len(user_ids) + 1)])
+                    query += f" AND {user_column} IN ({placeholders})"
+                    params.extend(user_ids)
+
+        return await self._apply_comprehensive_blacklist_filters(
+            guild.id, guild, query, params, source['table'],
+            include_users=True,
+            user_column=user_column,
+            include_channels=scope in ('server', 'user'),
+            specific_channel_id=target_id if scope == 'channel' else None,
+            specific_category_id=target_id if scope == 'category' else None
+        )
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    async def _q_grouped_totals(self, guild: discord.Guild, metric: str,
+                                group_sql: str, select_sql: str, order_column: str, limit: int,
+                                scope: str = 'server',
+                                target_id: Optional[int] = None,
+                                role_filter_ids: Optional[List[int]] = None,
+                                start_time: Optional[datetime] = None,
+                                end_time: Optional[datetime] = None,
+                                filters: Optional[Dict[str, Any]] = None,
+                                group_condition: Optional[str] = None,
+                                heavy_hitters: Optional[str] = None) -> Tuple[int, List[asyncpg.Record]]:
+
+        # Returns the scope total and the top groups, for percentage breakdowns.
+        # Without candidates, one scan groups the scoped rows and the scope
+        # total is the window sum over every group, taken before
+        # group_condition narrows the ranking (it only references grouped
+        # columns). With heavy_hitters, the summaries' candidates go into the
+        # scan itself so only their rows are aggregated, and the scope total
+        # is a separate plain SUM over the same range.
+        source = Constants.METRIC_SOURCES[metric]
+
+        candidates = None
+        if heavy_hitters and scope == 'server':
+            candidates = await self._q_heavy_hitter_candidates(
+                guild, heavy_hitters, limit, role_filter_ids, start_time, end_time, filters)
+
+        inner_query, params = await self._build_scoped_query(
+            guild, metric, f"{group_sql}, {select_sql}, {source['value']} AS group_value",
+            scope, target_id, role_filter_ids,
+            start_time=start_time, end_time=end_time, filters=filters
+        )
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
+        if inner_query is None:
+            return 0, []
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+        total_query = None
+        if candidates is not None:
+            total_query, total_params = await self._build_scoped_query(
+                guild, metric, f"{source['value']} AS scope_total",
+                scope, target_id, role_filter_ids,
+                start_time=start_time, end_time=end_time, filters=filters
+            )
 
-                if total_query is None:
-                    return []
+            params.append(candidates)
+            inner_query += (f" AND {Constants.HEAVY_HITTER_DIMENSIONS[heavy_hitters]['column']}"
+                            f" = ANY(${len(params)})")
+
+        where_sql = f"WHERE {group_condition}" if group_condition else ''
+        total_sql = "" if total_query else ", SUM(group_value) OVER () AS scope_total"
+
+        query = f'''
+            WITH grouped AS (
+                {inner_query}
+                GROUP BY {group_sql}
+                HAVING {source['value']} > 0
+            ), ranked AS (
+                SELECT *{total_sql}
+                FROM grouped
+            )
+            SELECT * FROM ranked
+            {where_sql}
+            ORDER BY {order_column} DESC
+            LIMIT {limit}
+        '''
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+        async with self._read_pool().acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            if total_query:
+                return (await conn.fetchval(total_query, *total_params) or 0), rows
 
-                if total_messages == 0:
-                    return []
+        total = (rows[0]['scope_total'] or 0) if rows else 0
+        return total, rows
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                params = [guild_id, channel_id]
+    async def _q_heavy_hitter_candidates(self, guild: discord.Guild, dimension: str, limit: int,
+                                         role_filter_ids: Optional[List[int]] = None,
+                                         start_time: Optional[datetime] = None,
+                                         end_time: Optional[datetime] = None,
+                                         filters: Optional[Dict[str, Any]] = None) -> Optional[List]:
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+        # Candidate groups for a server top-N, or None to rank every group.
+        # Role filters reshape the ranking too much for guild-wide summaries.
+        if role_filter_ids or start_time is None:
+            return None
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        def as_naive_utc(moment):
+            if moment is not None and moment.tzinfo is not None:
+                return moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        width = Constants.HEAVY_HITTER_WIDTH
+        first_bucket = floor_to_bucket(as_naive_utc(start_time), width)
+        last_bucket = floor_to_bucket(
+            as_naive_utc(end_time or datetime.utcnow()), width)
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
+        try:
+            async with self._read_pool().acquire() as conn:
+                coverage_start = await conn.fetchval('''
+                    SELECT MIN(bucket) FROM heavy_hitter_summaries
+                    WHERE guild_id = $1 AND dimension = $2
+                ''', guild.id, dimension)
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+                if coverage_start is None or \
+                        as_naive_utc(coverage_start) > first_bucket:
+                    return None
 
-                if query is None:
-                    return []
+                rows = await conn.fetch('''
+                    SELECT summary::text AS summary FROM heavy_hitter_summaries
+                    WHERE guild_id = $1 AND dimension = $2 AND bucket >= $3 AND bucket <= $4
+                ''', guild.id, dimension, first_bucket, last_bucket)
 
-                query += '''
-                    GROUP BY user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT 5
-                '''
+        except Exception as e:
+            logger.warning(f"Heavy-hitter summaries unavailable: {e}")
+            return None
 
-                rows = await conn.fetch(query, *params)
+        merged = SpaceSaving()
+        for row in rows:
+            merged.merge(SpaceSaving.from_json(row['summary']))
 
-                result = []
-                for row in rows:
-                    user_messages = row['message_count'] or 0
-                    percentage = (user_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+        blacklists = await self._get_cached_blacklists(guild.id)
+        usage_type = (filters or {}).get('usage_type')
+        wanted = limit * Constants.HEAVY_HITTER_CANDIDATE_FACTOR
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'message_count': user_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+        candidates = []
+        for item, _ in merged.top(merged.capacity):
+            if dimension == 'emojis':
+                item_usage_type, value = item.split(':', 1)
+                if usage_type and item_usage_type != usage_type:
+                    continue
+            else:
+                value = int(item)
+                if value in blacklists['channels']:
+                    continue
+                channel = guild.get_channel(value)
+                if channel and getattr(channel, 'category_id', None) in blacklists['categories']:
+                    continue
 
-                return result
+            if value not in candidates:
+                candidates.append(value)
+            if len(candidates) >= wanted:
+                break
 
-        except Exception as e:
-            logger.error(f"Error in q_channel_top5_users_messages: {e}")
-            return []
+        # Too few groups to need candidates; the exact ranking is cheap then
+        if len(candidates) < wanted:
+            return None
 
-    async def q_channel_top5_users_voice(self, guild_id: int, channel_id: int,
-                                         role_filter_ids: Optional[List[int]] = None,
-                                         start_time: Optional[datetime] = None,
-                                         end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return candidates
 
-        if not self.pool:
-            return []
+    async def _q_unique_users_estimate(self, guild: discord.Guild, metric: str,
+                                       scope: str = 'server', target_id: Optional[int] = None,
+                                       role_filter_ids: Optional[List[int]] = None,
+                                       start_time: Optional[datetime] = None,
+                                       end_time: Optional[datetime] = None) -> Optional[int]:
 
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
+        # Returns None whenever the sketches can't answer: exact mode, role
+        # filters or blacklisted users/roles (a sketch can't drop members), or
+        # a window that starts before the guild's sketches do
+        if (Constants.UNIQUE_USERS_EXACT or role_filter_ids or start_time is None
+                or metric not in ('messages', 'voice') or scope == 'user'):
+            return None
 
-        try:
-            async with self.pool.acquire() as conn:
+        blacklists = await self._get_cached_blacklists(guild.id)
+        if blacklists['users'] or blacklists['roles']:
+            return None
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                total_params = [guild_id, channel_id]
+        def as_naive_utc(moment):
+            if moment is not None and moment.tzinfo is not None:
+                return moment.astimezone(timezone.utc).replace(tzinfo=None)
+            return moment
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+        width = Constants.UNIQUE_USER_SKETCH_WIDTH
+        first_bucket = floor_to_bucket(as_naive_utc(start_time), width)
+        last_bucket = floor_to_bucket(
+            as_naive_utc(end_time or datetime.utcnow()), width)
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        query = '''
+            SELECT channel_id, category_id, sketch
+            FROM unique_user_sketches
+            WHERE guild_id = $1 AND metric = $2 AND bucket >= $3 AND bucket <= $4
+        '''
+        params = [guild.id, metric, first_bucket, last_bucket]
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        scope_column = Constants.SCOPE_COLUMNS.get(scope)
+        if scope_column:
+            query += f" AND {scope_column} = $5"
+            params.append(target_id)
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
+        try:
+            async with self._read_pool().acquire() as conn:
+                coverage_start = await conn.fetchval('''
+                    SELECT MIN(bucket) FROM unique_user_sketches
+                    WHERE guild_id = $1 AND metric = $2
+                ''', guild.id, metric)
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+                if coverage_start is None or \
+                        as_naive_utc(coverage_start) > first_bucket:
+                    return None
 
-                if total_query is None:
-                    return []
+                rows = await conn.fetch(query, *params)
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+        except Exception as e:
+            logger.warning(f"Unique-user sketches unavailable: {e}")
+            return None
 
-                if total_seconds == 0:
-                    return []
+        merged = HyperLogLog()
+        for row in rows:
+            if row['channel_id'] in blacklists['channels'] or \
+                    row['category_id'] in blacklists['categories']:
+                continue
+            merged.merge(HyperLogLog.from_bytes(row['sketch']))
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                params = [guild_id, channel_id]
+        return merged.count()
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+    #  QUERY FUNCTIONS
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+    # WINDOWED COUNTS
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+    @cached_query
+    async def q_windowed_counts(self, guild_id: int, metric: str = 'messages',
+                                scope: str = 'server',
+                                target_id: Optional[int] = None,
+                                windows: Optional[List[int]] = None,
+                                role_filter_ids: Optional[List[int]] = None,
+                                start_time: Optional[datetime] = None,
+                                end_time: Optional[datetime] = None) -> Dict[str, int]:
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
+        windows = windows or Constants.TRAILING_WINDOW_DAYS
+        empty = {f'{days}d': 0 for days in windows}
 
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+        if not self.pool:
+            return empty
 
-                if query is None:
-                    return []
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return empty
 
-                query += '''
-                    GROUP BY user_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT 5
-                '''
+        try:
+            window_end = end_time if end_time else datetime.utcnow()
+            window_starts = trailing_window_starts(windows, window_end, start_time)
 
-                rows = await conn.fetch(query, *params)
+            source = Constants.METRIC_SOURCES[metric]
+            select_sql = windowed_select_sql(source, len(windows))
 
-                result = []
-                for row in rows:
-                    user_seconds = row['total_seconds'] or 0
-                    percentage = (user_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+            query, params = await self._build_scoped_query(
+                guild, metric, select_sql, scope, target_id, role_filter_ids,
+                start_time=min(window_starts), end_time=window_end,
+                params=window_starts, time_cuts=window_starts
+            )
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'total_seconds': user_seconds,
-                        'total_hours': round(user_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'avg_session': round(row['avg_session'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+            if query is None:
+                return empty
 
-                return result
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-        except Exception as e:
-            logger.error(f"Error in q_channel_top5_users_voice: {e}")
-            return []
+            return {f'{days}d': row[f'w{idx}'] or 0
+                    for idx, days in enumerate(windows, 1)}
 
-    async def q_channel_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int, channel_id: int,
-                                                              role_filter_ids: Optional[List[int]] = None,
-                                                              start_time: Optional[datetime] = None,
-                                                              end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        except Exception as e:
+            note_query_failure('q_windowed_counts')
+            logger.error(f"Error in q_windowed_counts: {e}")
+            return empty
+
+    # BUCKETED SERIES
+
+    @cached_query
+    async def q_metric_series(self, guild_id: int, scope: str, metric: str,
+                              start_time: datetime, end_time: datetime,
+                              bucket: timedelta,
+                              target_id: Optional[int] = None,
+                              role_filter_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+
+        # Buckets are anchored on end_time and half-open, so bucket_starts[i]
+        # covers [bucket_starts[i], bucket_starts[i] + bucket); the last bucket
+        # also takes rows at end_time itself. Half-open buckets line up with
+        # the aggregate tiers, so whole rollup buckets never straddle two points.
+        bucket_starts = series_bucket_starts(start_time, end_time, bucket)
+        bucket_count = len(bucket_starts)
+        empty = {'bucket_starts': bucket_starts,
+                 'values': [0] * bucket_count, 'total': 0}
 
         if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+            return empty
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+            return empty
 
         try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-                end_time_actual = end_time if end_time else datetime.utcnow()
+            source = Constants.METRIC_SOURCES[metric]
 
-                for days in periods:
+            query, params = await self._build_scoped_query(
+                guild, metric, series_bucket_sql(source), scope, target_id, role_filter_ids,
+                start_time=bucket_starts[0], end_time=end_time,
+                params=[bucket_starts[0], bucket.total_seconds()], time_cuts=bucket_starts
+            )
 
-                    window_start = end_time_actual - timedelta(days=days)
-                    window_end = end_time_actual
+            if query is None:
+                return empty
 
-                    if start_time and window_start < start_time:
-                        window_start = start_time
+            query += " GROUP BY bucket_idx"
 
-                    query = '''
-                        SELECT COUNT(*) as message_count
-                        FROM message_tracking
-                        WHERE guild_id = $1 
-                        AND channel_id = $2 
-                        AND NOT is_bot
-                        AND created_at >= $3
-                        AND created_at <= $4
-                    '''
-                    params = [guild_id, channel_id, window_start, window_end]
+            async with self._read_pool().acquire() as conn:
+                rows = await conn.fetch(query, *params)
 
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
+            values = fold_series_rows(rows, bucket_count)
 
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'message_tracking',
-                        include_users=True, include_channels=False,
-                        specific_channel_id=channel_id
-                    )
+            return {'bucket_starts': bucket_starts,
+                    'values': values, 'total': sum(values)}
 
-                    if query is None:
-                        result[f'{days}d'] = 0
-                        continue
+        except Exception as e:
+            note_query_failure('q_metric_series')
+            logger.error(f"Error in q_metric_series: {e}")
+            return empty
 
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['message_count'] or 0
+    # COMPOSITE QUERIES
 
-                return result
+    async def _run_composite(self, guild_id: int, parts: Dict[str, Any]) -> Dict[str, Any]:
 
-        except Exception as e:
-            logger.error(f"Error in q_channel_timeseries_messages: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+        # Every part sees the same blacklist snapshot (tasks copy the context
+        # when gather creates them) and at most COMPOSITE_QUERY_CONCURRENCY
+        # parts hold a pool connection at once
+        blacklists = await self._get_cached_blacklists(guild_id)
+        semaphore = asyncio.Semaphore(Constants.COMPOSITE_QUERY_CONCURRENCY)
 
-    async def q_channel_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int, channel_id: int,
-                                                           role_filter_ids: Optional[List[int]] = None,
-                                                           start_time: Optional[datetime] = None,
-                                                           end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        async def run_part(coro):
+            async with semaphore:
+                return await coro
+
+        token = blacklist_snapshot.set((guild_id, blacklists))
+        try:
+            results = await asyncio.gather(
+                *[run_part(coro) for coro in parts.values()],
+                return_exceptions=True
+            )
+        finally:
+            blacklist_snapshot.reset(token)
+
+        composite = {}
+        for name, result in zip(parts, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in composite part {name}: {result}")
+                result = None
+            composite[name] = result
+
+        return composite
+
+    @cached_query
+    async def q_server_dashboard(self, guild_id: int,
+                                 role_filter_ids: Optional[List[int]] = None,
+                                 start_time: Optional[datetime] = None,
+                                 end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        end_time = end_time or datetime.utcnow()
+        window = {'role_filter_ids': role_filter_ids,
+                  'start_time': start_time, 'end_time': end_time}
+
+        return await self._run_composite(guild_id, {
+            'total_messages': self.q_server_total_messages(guild_id, **window),
+            'total_voice': self.q_server_total_voice(guild_id, **window),
+            'messages_over_time': self.q_server_timeseries_messages_1d_5d_10d_20d_30d(guild_id, **window),
+            'voice_over_time': self.q_server_timeseries_voice_1d_5d_10d_20d_30d(guild_id, **window),
+            'top_emojis': self.q_server_top3_emojis(guild_id, **window),
+            'top_users_messages': self.q_server_top3_users_messages(guild_id, **window),
+            'top_users_voice': self.q_server_top3_users_voice(guild_id, **window),
+            'top_text_channels': self.q_server_top3_text_channels(guild_id, **window),
+            'top_voice_channels': self.q_server_top3_voice_channels(guild_id, **window)
+        })
+
+    @cached_query
+    async def q_user_profile(self, guild_id: int, user_id: int,
+                             windows: Optional[List[int]] = None,
+                             start_time: Optional[datetime] = None,
+                             end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        # The rank queries already total the user's own value, so the
+        # separate per-user total queries are not needed
+        end_time = end_time or datetime.utcnow()
+        window = {'start_time': start_time, 'end_time': end_time}
+        windows = windows or []
+
+        parts = {
+            'message_rank': self.q_user_rank(guild_id, user_id, 'messages', **window),
+            'voice_rank': self.q_user_rank(guild_id, user_id, 'voice', **window),
+            'top_text_channels': self.q_user_top3_text_channels(guild_id, user_id, **window),
+            'top_voice_channels': self.q_user_top3_voice_channels(guild_id, user_id, **window)
+        }
+        if windows:
+            parts['message_periods'] = self.q_windowed_counts(
+                guild_id, 'messages', 'user', user_id, windows, **window)
+            parts['voice_periods'] = self.q_windowed_counts(
+                guild_id, 'voice', 'user', user_id, windows, **window)
+
+        profile = await self._run_composite(guild_id, parts)
+
+        empty_rank = {'rank': 0, 'total_users': 0, 'value': 0}
+        message_rank = profile['message_rank'] or empty_rank
+        voice_rank = profile['voice_rank'] or empty_rank
+        empty_periods = {f'{days}d': 0 for days in windows}
+
+        return {
+            'total_messages': message_rank['value'],
+            'total_voice_seconds': voice_rank['value'],
+            'message_rank': message_rank['rank'],
+            'voice_rank': voice_rank['rank'],
+            'total_message_users': message_rank['total_users'],
+            'total_voice_users': voice_rank['total_users'],
+            'top_text_channels': profile['top_text_channels'] or [],
+            'top_voice_channels': profile['top_voice_channels'] or [],
+            'message_periods': profile.get('message_periods') or empty_periods,
+            'voice_periods': profile.get('voice_periods') or empty_periods
+        }
+
+    # USER STATS (10 functions)
+
+    @cached_query
+    async def q_user_rank(self, guild_id: int, user_id: int, metric: str = 'messages',
+                          role_filter_ids: Optional[List[int]] = None,
+                          start_time: Optional[datetime] = None,
+                          end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        empty = {'rank': 0, 'total_users': 0, 'value': 0}
 
         if not self.pool:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+            return empty
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+            return empty
 
         try:
-            async with self.pool.acquire() as conn:
-                periods = [1, 5, 10, 20, 30]
-                result = {}
-                end_time_actual = end_time if end_time else datetime.utcnow()
+            source = Constants.METRIC_SOURCES[metric]
+            user_column = source['user_column']
 
-                for days in periods:
+            inner_query, params = await self._build_scoped_query(
+                guild, metric, f"{user_column} AS ranked_user, {source['value']} AS total",
+                'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time, params=[user_id]
+            )
 
-                    window_start = end_time_actual - timedelta(days=days)
-                    window_end = end_time_actual
+            if inner_query is None:
+                return empty
 
-                    if start_time and window_start < start_time:
-                        window_start = start_time
+            query = user_rank_sql(inner_query, user_column, source['value'])
 
-                    query = '''
-                        SELECT COALESCE(SUM(duration_seconds), 0) as voice_seconds
-                        FROM voice_session_history
-                        WHERE guild_id = $1 
-                        AND channel_id = $2 
-                        AND join_time >= $3
-                        AND join_time <= $4
-                    '''
-                    params = [guild_id, channel_id, window_start, window_end]
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-                    if role_filter_ids:
-                        user_ids = []
-                        for member in guild.members:
-                            if any(role.id in role_filter_ids for role in member.roles):
-                                user_ids.append(member.id)
+            return user_rank_result(row)
 
-                        if user_ids:
-                            placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                             len(params) + len(user_ids) + 1)])
-                            query += f" AND user_id IN ({placeholders})"
-                            params.extend(user_ids)
-
-                    query, params = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query, params, 'voice_session_history',
-                        include_users=True, include_channels=False,
-                        specific_channel_id=channel_id
-                    )
+        except Exception as e:
+            note_query_failure('q_user_rank')
+            logger.error(f"Error in q_user_rank: {e}")
+            return empty
 
-                    if query is None:
-                        result[f'{days}d'] = 0
-                        continue
+    async def q_user_rank_messages(self, guild_id: int, user_id: int,
+                                   role_filter_ids: Optional[List[int]] = None,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                    row = await conn.fetchrow(query, *params)
-                    result[f'{days}d'] = row['voice_seconds'] or 0
+        rank = await self.q_user_rank(guild_id, user_id, 'messages', role_filter_ids,
+                                      start_time, end_time)
 
-                return result
+        return {
+            'rank': rank['rank'],
+            'total_users': rank['total_users'],
+            'message_count': rank['value']
+        }
 
-        except Exception as e:
-            logger.error(f"Error in q_channel_timeseries_voice: {e}")
-            return {'1d': 0, '5d': 0, '10d': 0, '20d': 0, '30d': 0}
+    async def q_user_rank_voice(self, guild_id: int, user_id: int,
+                                role_filter_ids: Optional[List[int]] = None,
+                                start_time: Optional[datetime] = None,
+                                end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-    async def q_channel_total_messages(self, guild_id: int, channel_id: int,
-                                       role_filter_ids: Optional[List[int]] = None,
-                                       start_time: Optional[datetime] = None,
-                                       end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        rank = await self.q_user_rank(guild_id, user_id, 'voice', role_filter_ids,
+                                      start_time, end_time)
+        user_seconds = rank['value']
 
-        if not self.pool:
-            return {
-                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
-            }
+        return {
+            'rank': rank['rank'],
+            'total_users': rank['total_users'],
+            'voice_seconds': user_seconds,
+            'voice_hours': round(user_seconds / 3600, 2) if user_seconds > 0 else 0.0
+        }
+
+    async def q_user_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int, user_id: int,
+                                                           role_filter_ids: Optional[List[int]] = None,
+                                                           start_time: Optional[datetime] = None,
+                                                           end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        return await self.q_windowed_counts(
+            guild_id, 'messages', scope='user', target_id=user_id,
+            role_filter_ids=role_filter_ids, end_time=end_time
+        )
+
+    async def q_user_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int, user_id: int,
+                                                        role_filter_ids: Optional[List[int]] = None,
+                                                        start_time: Optional[datetime] = None,
+                                                        end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        return await self.q_windowed_counts(
+            guild_id, 'voice', scope='user', target_id=user_id,
+            role_filter_ids=role_filter_ids, end_time=end_time
+        )
+
+    @cached_query
+    async def q_user_total_messages(self, guild_id: int, user_id: int,
+                                    role_filter_ids: Optional[List[int]] = None,
+                                    start_time: Optional[datetime] = None,
+                                    end_time: Optional[datetime] = None) -> Dict[str, Any]:
+
+        if not self.pool or not self.db_connected:
+            logger.error(
+                f"No database connection for query q_user_total_messages")
+            return {'total_messages': 0}
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return {
                 'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
+                'has_attachments': 0, 'has_embeds': 0,
+                'first_message': None, 'last_message': None
             }
 
         try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COUNT(*) as total_messages,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) FILTER (WHERE has_attachment = TRUE) as has_attachments,
-                        COUNT(*) FILTER (WHERE has_embed = TRUE) as has_embeds
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                params = [guild_id, channel_id]
-
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+            query, params = await self._build_scoped_query(
+                guild, 'messages', '''
+                    COALESCE(SUM(message_count), 0) as total_messages,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars,
+                    COALESCE(SUM(attachment_count), 0) as has_attachments,
+                    COALESCE(SUM(embed_count), 0) as has_embeds,
+                    MIN(first_at) as first_message,
+                    MAX(last_at) as last_message
+                ''', 'user', user_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if query is None:
-                    return {
-                        'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                        'unique_users': 0, 'messages_per_user': 0.0,
-                        'has_attachments': 0, 'has_embeds': 0
-                    }
+            if query is None:
+                return {
+                    'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                    'has_attachments': 0, 'has_embeds': 0,
+                    'first_message': None, 'last_message': None
+                }
 
+            async with self._read_pool().acquire() as conn:
                 row = await conn.fetchrow(query, *params)
 
-                total_messages = row['total_messages'] or 0
-                unique_users = row['unique_users'] or 0
-                messages_per_user = total_messages / max(unique_users, 1)
-
-                return {
-                    'total_messages': total_messages,
-                    'total_chars': row['total_chars'] or 0,
-                    'avg_chars': round(row['avg_chars'] or 0, 2),
-                    'unique_users': unique_users,
-                    'messages_per_user': round(messages_per_user, 2),
-                    'has_attachments': row['has_attachments'] or 0,
-                    'has_embeds': row['has_embeds'] or 0
-                }
+            return {
+                'total_messages': row['total_messages'] or 0,
+                'total_chars': row['total_chars'] or 0,
+                'avg_chars': round(row['avg_chars'] or 0, 2),
+                'has_attachments': row['has_attachments'] or 0,
+                'has_embeds': row['has_embeds'] or 0,
+                'first_message': row['first_message'].isoformat() if row['first_message'] else None,
+                'last_message': row['last_message'].isoformat() if row['last_message'] else None
+            }
 
         except Exception as e:
-            logger.error(f"Error in q_channel_total_messages: {e}")
+            note_query_failure('q_user_total_messages')
+            logger.error(f"Error in q_user_total_messages: {e}")
             return {
                 'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
-                'unique_users': 0, 'messages_per_user': 0.0,
-                'has_attachments': 0, 'has_embeds': 0
+                'has_attachments': 0, 'has_embeds': 0,
+                'first_message': None, 'last_message': None
             }
+        logger.debug(f"Query result: {row}")
 
-    async def q_channel_total_voice(self, guild_id: int, channel_id: int,
-                                    role_filter_ids: Optional[List[int]] = None,
-                                    start_time: Optional[datetime] = None,
-                                    end_time: Optional[datetime] = None) -> Dict[str, Any]:
+    @cached_query
+    async def q_user_total_voice(self, guild_id: int, user_id: int,
+                                 role_filter_ids: Optional[List[int]] = None,
+                                 start_time: Optional[datetime] = None,
+                                 end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-        if not self.pool:
-            return {
-                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
-            }
+        if not self.pool or not self.db_connected:
+            logger.error(
+                f"No database connection for query q_user_total_messages")
+            return {'total_messages': 0}
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return {
                 'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+                'avg_session': 0.0, 'first_session': None, 'last_session': None
             }
 
         try:
-            async with self.pool.acquire() as conn:
-                query = '''
-                    SELECT 
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                params = [guild_id, channel_id]
-
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
-
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
-
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
-                )
+            query, params = await self._build_scoped_query(
+                guild, 'voice', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session,
+                    MIN(first_at) as first_session,
+                    MAX(last_at) as last_session
+                ''', 'user', user_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if query is None:
-                    return {
-                        'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                        'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
-                    }
+            if query is None:
+                return {
+                    'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                    'avg_session': 0.0, 'first_session': None, 'last_session': None
+                }
 
+            async with self._read_pool().acquire() as conn:
                 row = await conn.fetchrow(query, *params)
 
-                total_seconds = row['total_seconds'] or 0
-                unique_users = row['unique_users'] or 0
-                seconds_per_user = total_seconds / max(unique_users, 1)
+            total_seconds = row['total_seconds'] or 0
 
-                return {
-                    'total_seconds': total_seconds,
-                    'total_hours': round(total_seconds / 3600, 2),
-                    'session_count': row['session_count'] or 0,
-                    'unique_users': unique_users,
-                    'avg_session': round(row['avg_session'] or 0, 2),
-                    'seconds_per_user': round(seconds_per_user, 2)
-                }
+            return {
+                'total_seconds': total_seconds,
+                'total_hours': round(total_seconds / 3600, 2),
+                'session_count': row['session_count'] or 0,
+                'avg_session': round(row['avg_session'] or 0, 2),
+                'first_session': row['first_session'].isoformat() if row['first_session'] else None,
+                'last_session': row['last_session'].isoformat() if row['last_session'] else None
+            }
 
         except Exception as e:
-            logger.error(f"Error in q_channel_total_voice: {e}")
+            note_query_failure('q_user_total_voice')
+            logger.error(f"Error in q_user_total_voice: {e}")
             return {
                 'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
-                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+                'avg_session': 0.0, 'first_session': None, 'last_session': None
             }
 
-    # LEADERBOARD SERVER (4 functions)
-
-    async def q_leaderboard_server_top_text_channels(self, guild_id: int,
-                                                     limit: int = 10,
-                                                     role_filter_ids: Optional[List[int]] = None,
-                                                     start_time: Optional[datetime] = None,
-                                                     end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_user_messages_per_hour_distribution(self, guild_id: int, user_id: int,
+                                                    role_filter_ids: Optional[List[int]] = None,
+                                                    start_time: Optional[datetime] = None,
+                                                    end_time: Optional[datetime] = None,
+                                                    timezone_str: str = 'UTC') -> Dict[str, Any]:
 
         if not self.pool:
-            return []
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            return []
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
+                query = f'''
+                    SELECT 
+                        EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COUNT(*) as message_count
                     FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
+                    WHERE guild_id = $1 AND user_id = $2 AND NOT is_bot
                 '''
-                total_params = [guild_id]
+                params = [guild_id, user_id]
 
                 if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
+                    query += f" AND created_at >= ${len(params) + 1}"
+                    params.append(start_time)
                 if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                    query += f" AND created_at <= ${len(params) + 1}"
+                    params.append(end_time)
 
                 if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                    member = guild.get_member(user_id)
+                    if not member:
+                        result = {f'hour_{i}': 0 for i in range(24)}
+                        result.update({'total': 0, 'peak_hour': -1})
+                        return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+                    user_roles = [role.id for role in member.roles]
+                    if not any(role_id in role_filter_ids for role_id in user_roles):
+                        result = {f'hour_{i}': 0 for i in range(24)}
+                        result.update({'total': 0, 'peak_hour': -1})
+                        return result
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
+                query, params = await self._apply_comprehensive_blacklist_filters(
+                    guild_id, guild, query, params, 'message_tracking',
                     include_users=True, include_channels=True
                 )
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+                query += '''
+                    GROUP BY hour
+                    ORDER BY hour
+                '''
 
-                if total_messages == 0:
-                    return []
+                rows = await conn.fetch(query, *params)
 
-                query = '''
+                result = {f'hour_{i}': 0 for i in range(24)}
+                total = 0
+                peak_hour = -1
+                peak_count = 0
+
+                for row in rows:
+                    hour = int(row['hour'])
+                    count = row['message_count'] or 0
+                    result[f'hour_{hour}'] = count
+                    total += count
+
+                    if count > peak_count:
+                        peak_count = count
+                        peak_hour = hour
+
+                result['total'] = total
+                result['peak_hour'] = peak_hour
+
+                return result
+
+        except Exception as e:
+            note_query_failure('q_user_messages_per_hour_distribution')
+            logger.error(
+                f"Error in q_user_messages_per_hour_distribution: {e}")
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
+
+    @cached_query
+    async def q_user_voice_per_hour_distribution(self, guild_id: int, user_id: int,
+                                                 role_filter_ids: Optional[List[int]] = None,
+                                                 start_time: Optional[datetime] = None,
+                                                 end_time: Optional[datetime] = None,
+                                                 timezone_str: str = 'UTC') -> Dict[str, Any]:
+
+        if not self.pool or not self.db_connected:
+            logger.error(
+                f"No database connection for query q_user_total_messages")
+            return {'total_messages': 0}
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+
+        try:
+            async with self._read_pool().acquire() as conn:
+
+                query = f'''
                     SELECT 
-                        channel_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
+                        EXTRACT(HOUR FROM hour_bucket AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COALESCE(SUM(seconds), 0) as total_seconds
+                    FROM voice_hourly
+                    WHERE guild_id = $1 AND user_id = $2
                 '''
-                params = [guild_id]
+                params = [guild_id, user_id]
 
                 if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
+                    query += f" AND hour_bucket >= ${len(params) + 1}"
                     params.append(start_time)
                 if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
+                    query += f" AND hour_bucket <= ${len(params) + 1}"
                     params.append(end_time)
 
                 if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                    member = guild.get_member(user_id)
+                    if not member:
+                        return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+                    user_roles = [role.id for role in member.roles]
+                    if not any(role_id in role_filter_ids for role_id in user_roles):
+                        return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
 
                 query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
+                    guild_id, guild, query, params, 'voice_hourly',
                     include_users=True, include_channels=True
                 )
 
-                query += f'''
-                    GROUP BY channel_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT {limit}
+                query += '''
+                    GROUP BY hour
+                    ORDER BY hour
                 '''
 
                 rows = await conn.fetch(query, *params)
 
-                result = []
+                result = {f'hour_{i}': 0 for i in range(24)}
+                total_seconds = 0
+                peak_hour = -1
+                peak_seconds = 0
+
                 for row in rows:
-                    channel_messages = row['message_count'] or 0
-                    percentage = (channel_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+                    hour = int(row['hour'])
+                    seconds = row['total_seconds'] or 0
+                    result[f'hour_{hour}'] = seconds
+                    total_seconds += seconds
 
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'message_count': channel_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'unique_users': row['unique_users'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+                    if seconds > peak_seconds:
+                        peak_seconds = seconds
+                        peak_hour = hour
+
+                result['total_seconds'] = total_seconds
+                result['peak_hour'] = peak_hour
 
                 return result
 
         except Exception as e:
+            note_query_failure('q_user_voice_per_hour_distribution')
             logger.error(
-                f"Error in q_leaderboard_server_top_text_channels: {e}")
+                f"Error in q_user_voice_per_hour_distribution: {e}")
+            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+
+    @cached_query
+    async def q_user_top3_voice_channels(self, guild_id: int, user_id: int,
+                                         role_filter_ids: Optional[List[int]] = None,
+                                         start_time: Optional[datetime] = None,
+                                         end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+
+        if not self.pool:
             return []
 
-    async def q_leaderboard_server_top_voice_channels(self, guild_id: int,
-                                                      limit: int = 10,
-                                                      role_filter_ids: Optional[List[int]] = None,
-                                                      start_time: Optional[datetime] = None,
-                                                      end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
+
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'channel_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count
+                ''', 'total_seconds', 3, 'user', user_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
+
+            result = []
+            for row in rows:
+                channel_seconds = row['total_seconds'] or 0
+                percentage = (channel_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'total_seconds': channel_seconds,
+                    'total_hours': round(channel_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
+
+        except Exception as e:
+            note_query_failure('q_user_top3_voice_channels')
+            logger.error(f"Error in q_user_top3_voice_channels: {e}")
+            return []
+
+    @cached_query
+    async def q_user_top3_text_channels(self, guild_id: int, user_id: int,
+                                        role_filter_ids: Optional[List[int]] = None,
+                                        start_time: Optional[datetime] = None,
+                                        end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -4935,238 +4082,324 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'channel_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', 3, 'user', user_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
+            result = []
+            for row in rows:
+                channel_messages = row['message_count'] or 0
+                percentage = (channel_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'message_count': channel_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_user_top3_text_channels')
+            logger.error(f"Error in q_user_top3_text_channels: {e}")
+            return []
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
+    # SERVER STATS (8 functions)
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+    @cached_query
+    async def q_server_top3_emojis(self, guild_id: int,
+                                   role_filter_ids: Optional[List[int]] = None,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None,
+                                   usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
 
-                if total_seconds == 0:
-                    return []
+        if not self.pool:
+            return []
 
-                query = '''
-                    SELECT 
-                        channel_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+        try:
+            query, params = await self._build_scoped_query(
+                guild, 'emojis', '''
+                    emoji_str,
+                    is_custom,
+                    SUM(usage_count) as total_usage,
+                    COUNT(DISTINCT user_id) as unique_users
+                ''', 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                filters={'usage_type': usage_type} if usage_type else None
+            )
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            if query is None:
+                return []
+
+            query += '''
+                GROUP BY emoji_str, is_custom
+                HAVING SUM(usage_count) > 0
+                ORDER BY total_usage DESC
+                LIMIT 3
+            '''
+
+            async with self._read_pool().acquire() as conn:
+                rows = await conn.fetch(query, *params)
+
+            result = []
+            for row in rows:
+                total_usage = row['total_usage'] or 0
+                unique_users = row['unique_users'] or 0
+                avg_usage = total_usage / max(unique_users, 1)
+
+                result.append({
+                    'emoji_str': row['emoji_str'],
+                    'is_custom': row['is_custom'],
+                    'usage_count': total_usage,
+                    'unique_users': unique_users,
+                    'avg_usage_per_user': round(avg_usage, 2)
+                })
+
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_server_top3_emojis')
+            logger.error(f"Error in q_server_top3_emojis: {e}")
+            return []
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_server_total_messages(self, guild_id: int,
+                                      role_filter_ids: Optional[List[int]] = None,
+                                      start_time: Optional[datetime] = None,
+                                      end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                query += f'''
-                    GROUP BY channel_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT {limit}
-                '''
+        if not self.pool:
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
 
-                rows = await conn.fetch(query, *params)
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
 
-                result = []
-                for row in rows:
-                    channel_seconds = row['total_seconds'] or 0
-                    percentage = (channel_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        try:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'messages', 'server', None, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'messages', f'''
+                    COALESCE(SUM(message_count), 0) as total_messages,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars,
+                    {unique_users_sql} as unique_users,
+                    COALESCE(SUM(attachment_count), 0) as has_attachments,
+                    COALESCE(SUM(embed_count), 0) as has_embeds
+                ''', 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                    result.append({
-                        'channel_id': row['channel_id'],
-                        'total_seconds': channel_seconds,
-                        'total_hours': round(channel_seconds / 3600, 2),
-                        'unique_users': row['unique_users'] or 0,
-                        'session_count': row['session_count'] or 0,
-                        'percentage': round(percentage, 1)
-                    })
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-                return result
+            total_messages = row['total_messages'] or 0
+            if unique_users is None:
+                unique_users = row['unique_users'] or 0
+            messages_per_user = total_messages / \
+                max(unique_users, 1)
+
+            return {
+                'total_messages': total_messages,
+                'total_chars': row['total_chars'] or 0,
+                'avg_chars': round(row['avg_chars'] or 0, 2),
+                'unique_users': unique_users,
+                'messages_per_user': round(messages_per_user, 2),
+                'has_attachments': row['has_attachments'] or 0,
+                'has_embeds': row['has_embeds'] or 0
+            }
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_server_top_voice_channels: {e}")
-            return []
+            note_query_failure('q_server_total_messages')
+            logger.error(f"Error in q_server_total_messages: {e}")
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
 
-    async def q_leaderboard_server_top_categories_messages(self, guild_id: int,
-                                                           limit: int = 10,
-                                                           role_filter_ids: Optional[List[int]] = None,
-                                                           start_time: Optional[datetime] = None,
-                                                           end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_server_total_voice(self, guild_id: int,
+                                   role_filter_ids: Optional[List[int]] = None,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
         if not self.pool:
-            return []
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            return []
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
 
         try:
-            async with self.pool.acquire() as conn:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'voice', 'server', None, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'voice', f'''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    {unique_users_sql} as unique_users,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 AND NOT is_bot
-                '''
-                total_params = [guild_id]
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            total_seconds = row['total_seconds'] or 0
+            if unique_users is None:
+                unique_users = row['unique_users'] or 0
+            seconds_per_user = total_seconds / max(unique_users, 1)
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return {
+                'total_seconds': total_seconds,
+                'total_hours': round(total_seconds / 3600, 2),
+                'session_count': row['session_count'] or 0,
+                'unique_users': unique_users,
+                'avg_session': round(row['avg_session'] or 0, 2),
+                'seconds_per_user': round(seconds_per_user, 2)
+            }
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_server_total_voice')
+            logger.error(f"Error in q_server_total_voice: {e}")
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
+    async def q_server_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int,
+                                                             role_filter_ids: Optional[List[int]] = None,
+                                                             start_time: Optional[datetime] = None,
+                                                             end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+        total_days_in_window = None
+        if start_time and end_time:
+            total_days_in_window = (end_time - start_time).days
+        elif start_time:
+            total_days_in_window = (datetime.utcnow() - start_time).days
 
-                if total_messages == 0:
-                    return []
+        windows = [days for days in Constants.TRAILING_WINDOW_DAYS
+                   if total_days_in_window is None or days <= total_days_in_window]
 
-                query = '''
-                    SELECT 
-                        category_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND NOT is_bot
-                    AND category_id IS NOT NULL
-                '''
-                params = [guild_id]
+        result = {f'{days}d': 0 for days in Constants.TRAILING_WINDOW_DAYS}
+        if windows:
+            result.update(await self.q_windowed_counts(
+                guild_id, 'messages', scope='server', windows=windows,
+                role_filter_ids=role_filter_ids,
+                start_time=start_time, end_time=end_time
+            ))
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+        return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+    async def q_server_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int,
+                                                          role_filter_ids: Optional[List[int]] = None,
+                                                          start_time: Optional[datetime] = None,
+                                                          end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        total_days_in_window = None
+        if start_time and end_time:
+            total_days_in_window = (end_time - start_time).days
+        elif start_time:
+            total_days_in_window = (datetime.utcnow() - start_time).days
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=True
-                )
+        windows = [days for days in Constants.TRAILING_WINDOW_DAYS
+                   if total_days_in_window is None or days <= total_days_in_window]
 
-                query += f'''
-                    GROUP BY category_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT {limit}
-                '''
+        result = {f'{days}d': 0 for days in Constants.TRAILING_WINDOW_DAYS}
+        if windows:
+            result.update(await self.q_windowed_counts(
+                guild_id, 'voice', scope='server', windows=windows,
+                role_filter_ids=role_filter_ids,
+                start_time=start_time, end_time=end_time
+            ))
 
-                rows = await conn.fetch(query, *params)
+        return result
 
-                result = []
-                for row in rows:
-                    category_messages = row['message_count'] or 0
-                    percentage = (category_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+    @cached_query
+    async def q_server_top3_voice_channels(self, guild_id: int,
+                                           role_filter_ids: Optional[List[int]] = None,
+                                           start_time: Optional[datetime] = None,
+                                           end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                    result.append({
-                        'category_id': row['category_id'],
-                        'message_count': category_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'unique_users': row['unique_users'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+        if not self.pool:
+            return []
 
-                return result
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
+
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'channel_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(session_count), 0) as session_count
+                ''', 'total_seconds', 3, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                heavy_hitters='voice_channels'
+            )
+
+            result = []
+            for row in rows:
+                channel_seconds = row['total_seconds'] or 0
+                percentage = (channel_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'total_seconds': channel_seconds,
+                    'total_hours': round(channel_seconds / 3600, 2),
+                    'unique_users': row['unique_users'] or 0,
+                    'session_count': row['session_count'] or 0,
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_server_top_categories_messages: {e}")
+            note_query_failure('q_server_top3_voice_channels')
+            logger.error(f"Error in q_server_top3_voice_channels: {e}")
             return []
 
-    async def q_leaderboard_server_top_categories_voice(self, guild_id: int,
-                                                        limit: int = 10,
-                                                        role_filter_ids: Optional[List[int]] = None,
-                                                        start_time: Optional[datetime] = None,
-                                                        end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_server_top3_text_channels(self, guild_id: int,
+                                          role_filter_ids: Optional[List[int]] = None,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -5176,241 +4409,315 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'channel_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', 3, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                heavy_hitters='text_channels'
+            )
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
+            result = []
+            for row in rows:
+                channel_messages = row['message_count'] or 0
+                percentage = (channel_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'message_count': channel_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'unique_users': row['unique_users'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_server_top3_text_channels')
+            logger.error(f"Error in q_server_top3_text_channels: {e}")
+            return []
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_server_top3_users_messages(self, guild_id: int,
+                                           role_filter_ids: Optional[List[int]] = None,
+                                           start_time: Optional[datetime] = None,
+                                           end_time: Optional[datetime] = None,
+                                           limit: int = 3) -> List[Dict[str, Any]]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+        if not self.pool:
+            return []
 
-                if total_seconds == 0:
-                    return []
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                query = '''
-                    SELECT 
-                        category_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(DISTINCT user_id) as unique_users,
-                        COUNT(*) as session_count
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND category_id IS NOT NULL
-                '''
-                params = [guild_id]
+        try:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'user_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+            result = []
+            for row in rows:
+                user_messages = row['message_count'] or 0
+                percentage = (user_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+                result.append({
+                    'user_id': row['user_id'],
+                    'message_count': user_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+            return result
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=True
-                )
+        except Exception as e:
+            note_query_failure('q_server_top3_users_messages')
+            logger.error(f"Error in q_server_top3_users_messages: {e}")
+            return []
 
-                query += f'''
-                    GROUP BY category_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT {limit}
-                '''
+    @cached_query
+    async def q_server_top3_users_voice(self, guild_id: int,
+                                        role_filter_ids: Optional[List[int]] = None,
+                                        start_time: Optional[datetime] = None,
+                                        end_time: Optional[datetime] = None,
+                                        limit: int = 3) -> List[Dict[str, Any]]:
 
-                rows = await conn.fetch(query, *params)
+        if not self.pool:
+            return []
 
-                result = []
-                for row in rows:
-                    category_seconds = row['total_seconds'] or 0
-                    percentage = (category_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                    result.append({
-                        'category_id': row['category_id'],
-                        'total_seconds': category_seconds,
-                        'total_hours': round(category_seconds / 3600, 2),
-                        'unique_users': row['unique_users'] or 0,
-                        'session_count': row['session_count'] or 0,
-                        'percentage': round(percentage, 1)
-                    })
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'user_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'total_seconds', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                return result
+            result = []
+            for row in rows:
+                user_seconds = row['total_seconds'] or 0
+                percentage = (user_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'total_seconds': user_seconds,
+                    'total_hours': round(user_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'avg_session': round(row['avg_session'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_server_top_categories_voice: {e}")
+            note_query_failure('q_server_top3_users_voice')
+            logger.error(f"Error in q_server_top3_users_voice: {e}")
             return []
 
-    # LEADERBOARD CHANNEL (2 functions)
+    # CATEGORY STATS (9 functions)
 
-    async def q_leaderboard_text_users_in_channel(self, guild_id: int, channel_id: int,
-                                                  limit: int = 10,
-                                                  role_filter_ids: Optional[List[int]] = None,
-                                                  start_time: Optional[datetime] = None,
-                                                  end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    async def q_category_channel_count(self,  guild_id: int, category_id: int) -> Dict[str, Any]:
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {'text_channels': 0, 'voice_channels': 0, 'total_channels': 0}
+
+        try:
+            text_channels = 0
+            voice_channels = 0
+
+            for channel in guild.channels:
+                if hasattr(channel, 'category_id') and channel.category_id == category_id:
+                    if isinstance(channel, discord.TextChannel):
+                        text_channels += 1
+                    elif isinstance(channel, discord.VoiceChannel):
+                        voice_channels += 1
+
+            return {
+                'text_channels': text_channels,
+                'voice_channels': voice_channels,
+                'total_channels': text_channels + voice_channels
+            }
+
+        except Exception as e:
+            logger.error(f"Error in q_category_channel_count: {e}")
+            return {'text_channels': 0, 'voice_channels': 0, 'total_channels': 0}
+
+    @cached_query
+    async def q_category_total_messages(self, guild_id: int, category_id: int,
+                                        role_filter_ids: Optional[List[int]] = None,
+                                        start_time: Optional[datetime] = None,
+                                        end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
         if not self.pool:
-            return []
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0
+            }
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            return []
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0
+            }
 
         try:
-            async with self.pool.acquire() as conn:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'messages', 'category', category_id, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'messages', f'''
+                    COALESCE(SUM(message_count), 0) as total_messages,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars,
+                    {unique_users_sql} as unique_users
+                ''', 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                total_params = [guild_id, channel_id]
+            if query is None:
+                return {
+                    'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                    'unique_users': 0, 'messages_per_user': 0.0
+                }
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            total_messages = row['total_messages'] or 0
+            if unique_users is None:
+                unique_users = row['unique_users'] or 0
+            messages_per_user = total_messages / max(unique_users, 1)
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+            return {
+                'total_messages': total_messages,
+                'total_chars': row['total_chars'] or 0,
+                'avg_chars': round(row['avg_chars'] or 0, 2),
+                'unique_users': unique_users,
+                'messages_per_user': round(messages_per_user, 2)
+            }
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=False
-                )
+        except Exception as e:
+            note_query_failure('q_category_total_messages')
+            logger.error(f"Error in q_category_total_messages: {e}")
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0
+            }
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+    @cached_query
+    async def q_category_total_voice(self, guild_id: int, category_id: int,
+                                     role_filter_ids: Optional[List[int]] = None,
+                                     start_time: Optional[datetime] = None,
+                                     end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                if total_messages == 0:
-                    return []
+        if not self.pool:
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0
+            }
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND channel_id = $2 
-                    AND NOT is_bot
-                '''
-                params = [guild_id, channel_id]
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0
+            }
 
-                if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
-                    params.append(end_time)
+        try:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'voice', 'category', category_id, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'voice', f'''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    {unique_users_sql} as unique_users,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            if query is None:
+                return {
+                    'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                    'unique_users': 0, 'avg_session': 0.0
+                }
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
-                    include_users=True, include_channels=False
-                )
+            total_seconds = row['total_seconds'] or 0
 
-                query += f'''
-                    GROUP BY user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT {limit}
-                '''
+            return {
+                'total_seconds': total_seconds,
+                'total_hours': round(total_seconds / 3600, 2),
+                'session_count': row['session_count'] or 0,
+                'unique_users': unique_users if unique_users is not None else row['unique_users'] or 0,
+                'avg_session': round(row['avg_session'] or 0, 2)
+            }
 
-                rows = await conn.fetch(query, *params)
+        except Exception as e:
+            note_query_failure('q_category_total_voice')
+            logger.error(f"Error in q_category_total_voice: {e}")
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0
+            }
 
-                result = []
-                for row in rows:
-                    user_messages = row['message_count'] or 0
-                    percentage = (user_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+    async def q_category_timeseries_messages(self, guild_id: int, category_id: int,
+                                             days: List[int] = [1, 5, 10, 20, 30],
+                                             role_filter_ids: Optional[List[int]] = None,
+                                             start_time: Optional[datetime] = None,
+                                             end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'message_count': user_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+        return await self.q_windowed_counts(
+            guild_id, 'messages', scope='category', target_id=category_id,
+            windows=list(days), role_filter_ids=role_filter_ids,
+            end_time=end_time
+        )
 
-                return result
+    async def q_category_timeseries_voice(self, guild_id: int, category_id: int,
+                                          days: List[int] = [1, 5, 10, 20, 30],
+                                          role_filter_ids: Optional[List[int]] = None,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-        except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_text_users_in_channel: {e}")
-            return []
+        return await self.q_windowed_counts(
+            guild_id, 'voice', scope='category', target_id=category_id,
+            windows=list(days), role_filter_ids=role_filter_ids,
+            end_time=end_time
+        )
 
-    async def q_leaderboard_voice_users_in_channel(self, guild_id: int, channel_id: int,
-                                                   limit: int = 10,
-                                                   role_filter_ids: Optional[List[int]] = None,
-                                                   start_time: Optional[datetime] = None,
-                                                   end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_category_top5_voice_channels(self, guild_id: int, category_id: int,
+                                             role_filter_ids: Optional[List[int]] = None,
+                                             start_time: Optional[datetime] = None,
+                                             end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -5420,189 +4727,205 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'channel_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(session_count), 0) as session_count
+                ''', 'total_seconds', 5, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                total_params = [guild_id, channel_id]
+            result = []
+            for row in rows:
+                channel_seconds = row['total_seconds'] or 0
+                percentage = (channel_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'total_seconds': channel_seconds,
+                    'total_hours': round(channel_seconds / 3600, 2),
+                    'unique_users': row['unique_users'] or 0,
+                    'session_count': row['session_count'] or 0,
+                    'percentage': round(percentage, 1)
+                })
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        except Exception as e:
+            note_query_failure('q_category_top5_voice_channels')
+            logger.error(f"Error in q_category_top5_voice_channels: {e}")
+            return []
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    @cached_query
+    async def q_category_top5_text_channels(self, guild_id: int, category_id: int,
+                                            role_filter_ids: Optional[List[int]] = None,
+                                            start_time: Optional[datetime] = None,
+                                            end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=False
-                )
+        if not self.pool:
+            return []
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                if total_seconds == 0:
-                    return []
+        try:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'channel_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', 5, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND channel_id = $2
-                '''
-                params = [guild_id, channel_id]
+            result = []
+            for row in rows:
+                channel_messages = row['message_count'] or 0
+                percentage = (channel_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'message_count': channel_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'unique_users': row['unique_users'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_category_top5_text_channels')
+            logger.error(f"Error in q_category_top5_text_channels: {e}")
+            return []
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=False
-                )
+    @cached_query
+    async def q_category_top5_users_messages(self, guild_id: int, category_id: int,
+                                             role_filter_ids: Optional[List[int]] = None,
+                                             start_time: Optional[datetime] = None,
+                                             end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                query += f'''
-                    GROUP BY user_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT {limit}
-                '''
+        if not self.pool:
+            return []
 
-                rows = await conn.fetch(query, *params)
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                result = []
-                for row in rows:
-                    user_seconds = row['total_seconds'] or 0
-                    percentage = (user_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        try:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'user_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', 5, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'total_seconds': user_seconds,
-                        'total_hours': round(user_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'avg_session': round(row['avg_session'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+            result = []
+            for row in rows:
+                user_messages = row['message_count'] or 0
+                percentage = (user_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                return result
+                result.append({
+                    'user_id': row['user_id'],
+                    'message_count': user_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_voice_users_in_channel: {e}")
+            note_query_failure('q_category_top5_users_messages')
+            logger.error(f"Error in q_category_top5_users_messages: {e}")
             return []
 
-    # LEADERBOARD MENTIONS (1 function)
-
-    async def q_leaderboard_mentions_target_user(self, guild_id: int, mentioned_user_id: int,
-                                                 limit: int = 10,
-                                                 role_filter_ids: Optional[List[int]] = None,
-                                                 start_time: Optional[datetime] = None,
-                                                 end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_category_top5_users_voice(self, guild_id: int, category_id: int,
+                                          role_filter_ids: Optional[List[int]] = None,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
-            print("❌ No database pool for mentions leaderboard")
             return []
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
-            print("❌ No guild found for mentions leaderboard")
             return []
 
         try:
-            async with self.pool.acquire() as conn:
-
-                total_count = await conn.fetchval('''
-                    SELECT COUNT(*) as total_mentions
-                    FROM user_mentions
-                    WHERE guild_id = $1 
-                    AND mentioned_user_id = $2
-                ''', guild_id, mentioned_user_id)
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'user_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'total_seconds', 5, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COUNT(*) as total_mentions
-                    FROM user_mentions
-                    WHERE guild_id = $1 
-                    AND mentioned_user_id = $2
-                '''
-                total_params = [guild_id, mentioned_user_id]
+            result = []
+            for row in rows:
+                user_seconds = row['total_seconds'] or 0
+                percentage = (user_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'total_seconds': user_seconds,
+                    'total_hours': round(user_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'avg_session': round(row['avg_session'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        except Exception as e:
+            note_query_failure('q_category_top5_users_voice')
+            logger.error(f"Error in q_category_top5_users_voice: {e}")
+            return []
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND mentioner_user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    # CHANNEL STATS (8 functions)
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'user_mentions',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_channel_messages_per_hour(self, guild_id: int, channel_id: int,
+                                          role_filter_ids: Optional[List[int]] = None,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None,
+                                          timezone_str: str = 'UTC') -> Dict[str, Any]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_mentions = total_row['total_mentions'] or 0
+        if not self.pool:
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
 
-                if total_mentions == 0:
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
 
-                    return []
+        try:
+            async with self._read_pool().acquire() as conn:
 
-                query = '''
+                query = f'''
                     SELECT 
-                        mentioner_user_id,
-                        COUNT(*) as mention_count,
-                        MAX(created_at) as last_mention
-                    FROM user_mentions
+                        EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COUNT(*) as message_count
+                    FROM message_tracking
                     WHERE guild_id = $1 
-                    AND mentioned_user_id = $2
+                    AND channel_id = $2 
+                    AND NOT is_bot
                 '''
-                params = [guild_id, mentioned_user_id]
+                params = [guild_id, channel_id]
 
                 if start_time:
                     query += f" AND created_at >= ${len(params) + 1}"
@@ -5620,119 +4943,87 @@ class DatabaseStats(commands.Cog):
                     if user_ids:
                         placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
                                                                          len(params) + len(user_ids) + 1)])
-                        query += f" AND mentioner_user_id IN ({placeholders})"
+                        query += f" AND user_id IN ({placeholders})"
                         params.extend(user_ids)
 
                 query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'user_mentions',
-                    include_users=True, include_channels=True
+                    guild_id, guild, query, params, 'message_tracking',
+
+                    include_users=True, include_channels=False,
+                    specific_channel_id=channel_id
                 )
 
-                query += f'''
-                    GROUP BY mentioner_user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY mention_count DESC
-                    LIMIT {limit}
+                if query is None:
+                    result = {f'hour_{i}': 0 for i in range(24)}
+                    result.update({'total': 0, 'peak_hour': -1})
+                    return result
+
+                query += '''
+                    GROUP BY hour
+                    ORDER BY hour
                 '''
 
                 rows = await conn.fetch(query, *params)
 
-                result = []
+                result = {f'hour_{i}': 0 for i in range(24)}
+                total = 0
+                peak_hour = -1
+                peak_count = 0
+
                 for row in rows:
-                    user_mentions = row['mention_count'] or 0
-                    percentage = (user_mentions / total_mentions *
-                                  100) if total_mentions > 0 else 0
+                    hour = int(row['hour'])
+                    count = row['message_count'] or 0
+                    result[f'hour_{hour}'] = count
+                    total += count
 
-                    result.append({
-                        'user_id': row['mentioner_user_id'],
-                        'mention_count': user_mentions,
-                        'last_mention': row['last_mention'].isoformat() if row['last_mention'] else None,
-                        'percentage': round(percentage, 1)
-                    })
+                    if count > peak_count:
+                        peak_count = count
+                        peak_hour = hour
+
+                result['total'] = total
+                result['peak_hour'] = peak_hour
 
                 return result
 
         except Exception as e:
-            print(f"❌ Error in q_leaderboard_mentions_target_user: {e}")
-            traceback.print_exc()
-            return []
-
-    # LEADERBOARD CATEGORY (2 functions)
-
-    async def q_leaderboard_category_users_messages(self, guild_id: int, category_id: int,
-                                                    limit: int = 10,
-                                                    role_filter_ids: Optional[List[int]] = None,
-                                                    start_time: Optional[datetime] = None,
-                                                    end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-
-        if not self.pool:
-            return []
-
-        guild = self.bot.get_guild(guild_id)
-        if not guild:
-            return []
-
-        try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COUNT(*) as total_messages
-                    FROM message_tracking
-                    WHERE guild_id = $1 
-                    AND category_id = $2 
-                    AND NOT is_bot
-                '''
-                total_params = [guild_id, category_id]
-
-                if start_time:
-                    total_query += f" AND created_at >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND created_at <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
-
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            note_query_failure('q_channel_messages_per_hour')
+            logger.error(f"Error in q_channel_messages_per_hour: {e}")
+            result = {f'hour_{i}': 0 for i in range(24)}
+            result.update({'total': 0, 'peak_hour': -1})
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    @cached_query
+    async def q_channel_voice_per_hour(self, guild_id: int, channel_id: int,
+                                       role_filter_ids: Optional[List[int]] = None,
+                                       start_time: Optional[datetime] = None,
+                                       end_time: Optional[datetime] = None,
+                                       timezone_str: str = 'UTC') -> Dict[str, Any]:
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'message_tracking',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+        if not self.pool:
+            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_messages = total_row['total_messages'] or 0
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
 
-                if total_messages == 0:
-                    return []
+        try:
+            async with self._read_pool().acquire() as conn:
 
-                query = '''
+                query = f'''
                     SELECT 
-                        user_id,
-                        COUNT(*) as message_count,
-                        COALESCE(SUM(message_length), 0) as total_chars,
-                        COALESCE(AVG(message_length), 0) as avg_chars
-                    FROM message_tracking
+                        EXTRACT(HOUR FROM hour_bucket AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COALESCE(SUM(seconds), 0) as total_seconds
+                    FROM voice_hourly
                     WHERE guild_id = $1 
-                    AND category_id = $2 
-                    AND NOT is_bot
+                    AND channel_id = $2
                 '''
-                params = [guild_id, category_id]
+                params = [guild_id, channel_id]
 
                 if start_time:
-                    query += f" AND created_at >= ${len(params) + 1}"
+                    query += f" AND hour_bucket >= ${len(params) + 1}"
                     params.append(start_time)
                 if end_time:
-                    query += f" AND created_at <= ${len(params) + 1}"
+                    query += f" AND hour_bucket <= ${len(params) + 1}"
                     params.append(end_time)
 
                 if role_filter_ids:
@@ -5748,46 +5039,52 @@ class DatabaseStats(commands.Cog):
                         params.extend(user_ids)
 
                 query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'message_tracking',
+                    guild_id, guild, query, params, 'voice_hourly',
+
                     include_users=True, include_channels=False,
-                    specific_category_id=category_id
+                    specific_channel_id=channel_id
                 )
 
-                query += f'''
-                    GROUP BY user_id
-                    HAVING COUNT(*) > 0
-                    ORDER BY message_count DESC
-                    LIMIT {limit}
+                if query is None:
+                    return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
+
+                query += '''
+                    GROUP BY hour
+                    ORDER BY hour
                 '''
 
                 rows = await conn.fetch(query, *params)
 
-                result = []
+                result = {f'hour_{i}': 0 for i in range(24)}
+                total_seconds = 0
+                peak_hour = -1
+                peak_seconds = 0
+
                 for row in rows:
-                    user_messages = row['message_count'] or 0
-                    percentage = (user_messages / total_messages *
-                                  100) if total_messages > 0 else 0
+                    hour = int(row['hour'])
+                    seconds = row['total_seconds'] or 0
+                    result[f'hour_{hour}'] = seconds
+                    total_seconds += seconds
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'message_count': user_messages,
-                        'total_chars': row['total_chars'] or 0,
-                        'avg_chars': round(row['avg_chars'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+                    if seconds > peak_seconds:
+                        peak_seconds = seconds
+                        peak_hour = hour
+
+                result['total_seconds'] = total_seconds
+                result['peak_hour'] = peak_hour
 
                 return result
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_category_users_messages: {e}")
-            return []
+            note_query_failure('q_channel_voice_per_hour')
+            logger.error(f"Error in q_channel_voice_per_hour: {e}")
+            return {f'hour_{i}': 0 for i in range(24)} | {'total_seconds': 0, 'peak_hour': -1}
 
-    async def q_leaderboard_category_users_voice(self, guild_id: int, category_id: int,
-                                                 limit: int = 10,
-                                                 role_filter_ids: Optional[List[int]] = None,
-                                                 start_time: Optional[datetime] = None,
-                                                 end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_channel_top5_users_messages(self, guild_id: int, channel_id: int,
+                                            role_filter_ids: Optional[List[int]] = None,
+                                            start_time: Optional[datetime] = None,
+                                            end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -5797,123 +5094,250 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'user_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', 5, 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND category_id = $2
-                '''
-                total_params = [guild_id, category_id]
+            result = []
+            for row in rows:
+                user_messages = row['message_count'] or 0
+                percentage = (user_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    total_query += f" AND join_time >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND join_time <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                result.append({
+                    'user_id': row['user_id'],
+                    'message_count': user_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_channel_top5_users_messages')
+            logger.error(f"Error in q_channel_top5_users_messages: {e}")
+            return []
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'voice_session_history',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+    @cached_query
+    async def q_channel_top5_users_voice(self, guild_id: int, channel_id: int,
+                                         role_filter_ids: Optional[List[int]] = None,
+                                         start_time: Optional[datetime] = None,
+                                         end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_seconds = total_row['total_seconds'] or 0
+        if not self.pool:
+            return []
 
-                if total_seconds == 0:
-                    return []
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds,
-                        COUNT(*) as session_count,
-                        COALESCE(AVG(duration_seconds), 0) as avg_session
-                    FROM voice_session_history
-                    WHERE guild_id = $1 
-                    AND category_id = $2
-                '''
-                params = [guild_id, category_id]
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'user_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'total_seconds', 5, 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if start_time:
-                    query += f" AND join_time >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND join_time <= ${len(params) + 1}"
-                    params.append(end_time)
+            result = []
+            for row in rows:
+                user_seconds = row['total_seconds'] or 0
+                percentage = (user_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'total_seconds': user_seconds,
+                    'total_hours': round(user_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'avg_session': round(row['avg_session'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_channel_top5_users_voice')
+            logger.error(f"Error in q_channel_top5_users_voice: {e}")
+            return []
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'voice_session_history',
-                    include_users=True, include_channels=False,
-                    specific_category_id=category_id
-                )
+    async def q_channel_timeseries_messages_1d_5d_10d_20d_30d(self, guild_id: int, channel_id: int,
+                                                              role_filter_ids: Optional[List[int]] = None,
+                                                              start_time: Optional[datetime] = None,
+                                                              end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                query += f'''
-                    GROUP BY user_id
-                    HAVING COALESCE(SUM(duration_seconds), 0) > 0
-                    ORDER BY total_seconds DESC
-                    LIMIT {limit}
-                '''
+        return await self.q_windowed_counts(
+            guild_id, 'messages', scope='channel', target_id=channel_id,
+            role_filter_ids=role_filter_ids,
+            start_time=start_time, end_time=end_time
+        )
 
-                rows = await conn.fetch(query, *params)
+    async def q_channel_timeseries_voice_1d_5d_10d_20d_30d(self, guild_id: int, channel_id: int,
+                                                           role_filter_ids: Optional[List[int]] = None,
+                                                           start_time: Optional[datetime] = None,
+                                                           end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                result = []
-                for row in rows:
-                    user_seconds = row['total_seconds'] or 0
-                    percentage = (user_seconds / total_seconds *
-                                  100) if total_seconds > 0 else 0
+        return await self.q_windowed_counts(
+            guild_id, 'voice', scope='channel', target_id=channel_id,
+            role_filter_ids=role_filter_ids,
+            start_time=start_time, end_time=end_time
+        )
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'total_seconds': user_seconds,
-                        'total_hours': round(user_seconds / 3600, 2),
-                        'session_count': row['session_count'] or 0,
-                        'avg_session': round(row['avg_session'] or 0, 2),
-                        'percentage': round(percentage, 1)
-                    })
+    @cached_query
+    async def q_channel_total_messages(self, guild_id: int, channel_id: int,
+                                       role_filter_ids: Optional[List[int]] = None,
+                                       start_time: Optional[datetime] = None,
+                                       end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-                return result
+        if not self.pool:
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
+
+        try:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'messages', 'channel', channel_id, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'messages', f'''
+                    COALESCE(SUM(message_count), 0) as total_messages,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars,
+                    {unique_users_sql} as unique_users,
+                    COALESCE(SUM(attachment_count), 0) as has_attachments,
+                    COALESCE(SUM(embed_count), 0) as has_embeds
+                ''', 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
+
+            if query is None:
+                return {
+                    'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                    'unique_users': 0, 'messages_per_user': 0.0,
+                    'has_attachments': 0, 'has_embeds': 0
+                }
+
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
+
+            total_messages = row['total_messages'] or 0
+            if unique_users is None:
+                unique_users = row['unique_users'] or 0
+            messages_per_user = total_messages / max(unique_users, 1)
+
+            return {
+                'total_messages': total_messages,
+                'total_chars': row['total_chars'] or 0,
+                'avg_chars': round(row['avg_chars'] or 0, 2),
+                'unique_users': unique_users,
+                'messages_per_user': round(messages_per_user, 2),
+                'has_attachments': row['has_attachments'] or 0,
+                'has_embeds': row['has_embeds'] or 0
+            }
 
         except Exception as e:
-            logger.error(
-                f"Error in q_leaderboard_category_users_voice: {e}")
-            return []
+            note_query_failure('q_channel_total_messages')
+            logger.error(f"Error in q_channel_total_messages: {e}")
+            return {
+                'total_messages': 0, 'total_chars': 0, 'avg_chars': 0.0,
+                'unique_users': 0, 'messages_per_user': 0.0,
+                'has_attachments': 0, 'has_embeds': 0
+            }
 
-    # EMOJI LEADERBOARDS (4 functions)
+    @cached_query
+    async def q_channel_total_voice(self, guild_id: int, channel_id: int,
+                                    role_filter_ids: Optional[List[int]] = None,
+                                    start_time: Optional[datetime] = None,
+                                    end_time: Optional[datetime] = None) -> Dict[str, Any]:
 
-    async def q_emoji_server_leaderboard(self, guild_id: int,
-                                         limit: int = 10,
-                                         role_filter_ids: Optional[List[int]] = None,
-                                         start_time: Optional[datetime] = None,
-                                         end_time: Optional[datetime] = None,
-                                         usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.pool:
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
+
+        try:
+            unique_users = await self._q_unique_users_estimate(
+                guild, 'voice', 'channel', channel_id, role_filter_ids, start_time, end_time
+            )
+            unique_users_sql = 'COUNT(DISTINCT user_id)' if unique_users is None else 'NULL::bigint'
+
+            query, params = await self._build_scoped_query(
+                guild, 'voice', f'''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    {unique_users_sql} as unique_users,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
+
+            if query is None:
+                return {
+                    'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                    'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+                }
+
+            async with self._read_pool().acquire() as conn:
+                row = await conn.fetchrow(query, *params)
+
+            total_seconds = row['total_seconds'] or 0
+            if unique_users is None:
+                unique_users = row['unique_users'] or 0
+            seconds_per_user = total_seconds / max(unique_users, 1)
+
+            return {
+                'total_seconds': total_seconds,
+                'total_hours': round(total_seconds / 3600, 2),
+                'session_count': row['session_count'] or 0,
+                'unique_users': unique_users,
+                'avg_session': round(row['avg_session'] or 0, 2),
+                'seconds_per_user': round(seconds_per_user, 2)
+            }
+
+        except Exception as e:
+            note_query_failure('q_channel_total_voice')
+            logger.error(f"Error in q_channel_total_voice: {e}")
+            return {
+                'total_seconds': 0, 'total_hours': 0.0, 'session_count': 0,
+                'unique_users': 0, 'avg_session': 0.0, 'seconds_per_user': 0.0
+            }
+
+    # LEADERBOARD SERVER (4 functions)
+
+    @cached_query
+    async def q_leaderboard_server_top_text_channels(self, guild_id: int,
+                                                     limit: int = 10,
+                                                     role_filter_ids: Optional[List[int]] = None,
+                                                     start_time: Optional[datetime] = None,
+                                                     end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -5923,126 +5347,143 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(usage_count), 0) as total_usage
-                    FROM emoji_usage
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'channel_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                heavy_hitters='text_channels'
+            )
 
-                if usage_type:
-                    total_query += f" AND usage_type = ${len(total_params) + 1}"
-                    total_params.append(usage_type)
+            result = []
+            for row in rows:
+                channel_messages = row['message_count'] or 0
+                percentage = (channel_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    total_query += f" AND last_used >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND last_used <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'message_count': channel_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'unique_users': row['unique_users'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_leaderboard_server_top_text_channels')
+            logger.error(
+                f"Error in q_leaderboard_server_top_text_channels: {e}")
+            return []
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_leaderboard_server_top_voice_channels(self, guild_id: int,
+                                                      limit: int = 10,
+                                                      role_filter_ids: Optional[List[int]] = None,
+                                                      start_time: Optional[datetime] = None,
+                                                      end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_usage = total_row['total_usage'] or 0
+        if not self.pool:
+            return []
 
-                if total_usage == 0:
-                    return []
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                query = '''
-                    SELECT 
-                        emoji_str,
-                        is_custom,
-                        SUM(usage_count) as total_usage,
-                        COUNT(DISTINCT user_id) as unique_users
-                    FROM emoji_usage
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'channel_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(session_count), 0) as session_count
+                ''', 'total_seconds', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                heavy_hitters='voice_channels'
+            )
 
-                if usage_type:
-                    query += f" AND usage_type = ${len(params) + 1}"
-                    params.append(usage_type)
+            result = []
+            for row in rows:
+                channel_seconds = row['total_seconds'] or 0
+                percentage = (channel_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'channel_id': row['channel_id'],
+                    'total_seconds': channel_seconds,
+                    'total_hours': round(channel_seconds / 3600, 2),
+                    'unique_users': row['unique_users'] or 0,
+                    'session_count': row['session_count'] or 0,
+                    'percentage': round(percentage, 1)
+                })
 
-                if start_time:
-                    query += f" AND last_used >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND last_used <= ${len(params) + 1}"
-                    params.append(end_time)
+            return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        except Exception as e:
+            note_query_failure('q_leaderboard_server_top_voice_channels')
+            logger.error(
+                f"Error in q_leaderboard_server_top_voice_channels: {e}")
+            return []
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+    @cached_query
+    async def q_leaderboard_server_top_categories_messages(self, guild_id: int,
+                                                           limit: int = 10,
+                                                           role_filter_ids: Optional[List[int]] = None,
+                                                           start_time: Optional[datetime] = None,
+                                                           end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=True
-                )
+        if not self.pool:
+            return []
 
-                query += f'''
-                    GROUP BY emoji_str, is_custom
-                    HAVING SUM(usage_count) > 0
-                    ORDER BY total_usage DESC
-                    LIMIT {limit}
-                '''
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                rows = await conn.fetch(query, *params)
+        try:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'category_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                group_condition='category_id IS NOT NULL'
+            )
 
-                result = []
-                for row in rows:
-                    emoji_usage = row['total_usage'] or 0
-                    unique_users = row['unique_users'] or 0
-                    percentage = (emoji_usage / total_usage *
-                                  100) if total_usage > 0 else 0
-                    avg_usage = emoji_usage / max(unique_users, 1)
+            result = []
+            for row in rows:
+                category_messages = row['message_count'] or 0
+                percentage = (category_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                    result.append({
-                        'emoji_str': row['emoji_str'],
-                        'is_custom': row['is_custom'],
-                        'usage_count': emoji_usage,
-                        'unique_users': unique_users,
-                        'avg_usage_per_user': round(avg_usage, 2),
-                        'percentage': round(percentage, 1)
-                    })
+                result.append({
+                    'category_id': row['category_id'],
+                    'message_count': category_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'unique_users': row['unique_users'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                return result
+            return result
 
         except Exception as e:
-            logger.error(f"Error in q_emoji_server_leaderboard: {e}")
+            note_query_failure('q_leaderboard_server_top_categories_messages')
+            logger.error(
+                f"Error in q_leaderboard_server_top_categories_messages: {e}")
             return []
 
-    async def q_emoji_user_leaderboard(self, guild_id: int,
-                                       limit: int = 10,
-                                       role_filter_ids: Optional[List[int]] = None,
-                                       start_time: Optional[datetime] = None,
-                                       end_time: Optional[datetime] = None,
-                                       usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    @cached_query
+    async def q_leaderboard_server_top_categories_voice(self, guild_id: int,
+                                                        limit: int = 10,
+                                                        role_filter_ids: Optional[List[int]] = None,
+                                                        start_time: Optional[datetime] = None,
+                                                        end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -6052,152 +5493,175 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
-
-                total_query = '''
-                    SELECT COALESCE(SUM(usage_count), 0) as total_usage
-                    FROM emoji_usage
-                    WHERE guild_id = $1
-                '''
-                total_params = [guild_id]
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'category_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COALESCE(SUM(session_count), 0) as session_count
+                ''', 'total_seconds', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                group_condition='category_id IS NOT NULL'
+            )
 
-                if usage_type:
-                    total_query += f" AND usage_type = ${len(total_params) + 1}"
-                    total_params.append(usage_type)
+            result = []
+            for row in rows:
+                category_seconds = row['total_seconds'] or 0
+                percentage = (category_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'category_id': row['category_id'],
+                    'total_seconds': category_seconds,
+                    'total_hours': round(category_seconds / 3600, 2),
+                    'unique_users': row['unique_users'] or 0,
+                    'session_count': row['session_count'] or 0,
+                    'percentage': round(percentage, 1)
+                })
 
-                if start_time:
-                    total_query += f" AND last_used >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND last_used <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        except Exception as e:
+            note_query_failure('q_leaderboard_server_top_categories_voice')
+            logger.error(
+                f"Error in q_leaderboard_server_top_categories_voice: {e}")
+            return []
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    # LEADERBOARD CHANNEL (2 functions)
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_leaderboard_text_users_in_channel(self, guild_id: int, channel_id: int,
+                                                  limit: int = 10,
+                                                  role_filter_ids: Optional[List[int]] = None,
+                                                  start_time: Optional[datetime] = None,
+                                                  end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_usage = total_row['total_usage'] or 0
+        if not self.pool:
+            return []
 
-                if total_usage == 0:
-                    return []
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                query = '''
-                    SELECT 
-                        user_id,
-                        SUM(usage_count) as total_usage,
-                        COUNT(DISTINCT emoji_str) as unique_emojis
-                    FROM emoji_usage
-                    WHERE guild_id = $1
-                '''
-                params = [guild_id]
+        try:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'user_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', limit, 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                if usage_type:
-                    query += f" AND usage_type = ${len(params) + 1}"
-                    params.append(usage_type)
+            result = []
+            for row in rows:
+                user_messages = row['message_count'] or 0
+                percentage = (user_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if start_time:
-                    query += f" AND last_used >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND last_used <= ${len(params) + 1}"
-                    params.append(end_time)
+                result.append({
+                    'user_id': row['user_id'],
+                    'message_count': user_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+            return result
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+        except Exception as e:
+            note_query_failure('q_leaderboard_text_users_in_channel')
+            logger.error(
+                f"Error in q_leaderboard_text_users_in_channel: {e}")
+            return []
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=True
-                )
+    @cached_query
+    async def q_leaderboard_voice_users_in_channel(self, guild_id: int, channel_id: int,
+                                                   limit: int = 10,
+                                                   role_filter_ids: Optional[List[int]] = None,
+                                                   start_time: Optional[datetime] = None,
+                                                   end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                query += f'''
-                    GROUP BY user_id
-                    HAVING SUM(usage_count) > 0
-                    ORDER BY total_usage DESC
-                    LIMIT {limit}
-                '''
+        if not self.pool:
+            return []
 
-                rows = await conn.fetch(query, *params)
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                result = []
-                for row in rows:
-                    user_usage = row['total_usage'] or 0
-                    unique_emojis = row['unique_emojis'] or 0
-                    percentage = (user_usage / total_usage *
-                                  100) if total_usage > 0 else 0
-                    avg_usage = user_usage / max(unique_emojis, 1)
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'user_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'total_seconds', limit, 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                    result.append({
-                        'user_id': row['user_id'],
-                        'usage_count': user_usage,
-                        'unique_emojis': unique_emojis,
-                        'avg_usage_per_emoji': round(avg_usage, 2),
-                        'percentage': round(percentage, 1)
-                    })
+            result = []
+            for row in rows:
+                user_seconds = row['total_seconds'] or 0
+                percentage = (user_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'total_seconds': user_seconds,
+                    'total_hours': round(user_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'avg_session': round(row['avg_session'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                return result
+            return result
 
         except Exception as e:
-            logger.error(f"Error in q_emoji_user_leaderboard: {e}")
+            note_query_failure('q_leaderboard_voice_users_in_channel')
+            logger.error(
+                f"Error in q_leaderboard_voice_users_in_channel: {e}")
             return []
 
-    async def q_emoji_channel_leaderboard(self, guild_id: int, channel_id: int,
-                                          limit: int = 10,
-                                          role_filter_ids: Optional[List[int]] = None,
-                                          start_time: Optional[datetime] = None,
-                                          end_time: Optional[datetime] = None,
-                                          usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    # LEADERBOARD MENTIONS (1 function)
+
+    @cached_query
+    async def q_leaderboard_mentions_target_user(self, guild_id: int, mentioned_user_id: int,
+                                                 limit: int = 10,
+                                                 role_filter_ids: Optional[List[int]] = None,
+                                                 start_time: Optional[datetime] = None,
+                                                 end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
+            print("❌ No database pool for mentions leaderboard")
             return []
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
+            print("❌ No guild found for mentions leaderboard")
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
+
+                total_count = await conn.fetchval('''
+                    SELECT COUNT(*) as total_mentions
+                    FROM user_mentions
+                    WHERE guild_id = $1 
+                    AND mentioned_user_id = $2
+                ''', guild_id, mentioned_user_id)
 
                 total_query = '''
-                    SELECT COALESCE(SUM(usage_count), 0) as total_usage
-                    FROM emoji_usage
+                    SELECT COUNT(*) as total_mentions
+                    FROM user_mentions
                     WHERE guild_id = $1 
-                    AND channel_id = $2
+                    AND mentioned_user_id = $2
                 '''
-                total_params = [guild_id, channel_id]
-
-                if usage_type:
-                    total_query += f" AND usage_type = ${len(total_params) + 1}"
-                    total_params.append(usage_type)
+                total_params = [guild_id, mentioned_user_id]
 
                 if start_time:
-                    total_query += f" AND last_used >= ${len(total_params) + 1}"
+                    total_query += f" AND created_at >= ${len(total_params) + 1}"
                     total_params.append(start_time)
                 if end_time:
-                    total_query += f" AND last_used <= ${len(total_params) + 1}"
+                    total_query += f" AND created_at <= ${len(total_params) + 1}"
                     total_params.append(end_time)
 
                 if role_filter_ids:
@@ -6209,43 +5673,37 @@ class DatabaseStats(commands.Cog):
                     if user_ids:
                         placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
                                                                          len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
+                        total_query += f" AND mentioner_user_id IN ({placeholders})"
                         total_params.extend(user_ids)
 
                 total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
+                    guild_id, guild, total_query, total_params, 'user_mentions',
+                    include_users=True, include_channels=True
                 )
 
                 total_row = await conn.fetchrow(total_query, *total_params)
-                total_usage = total_row['total_usage'] or 0
+                total_mentions = total_row['total_mentions'] or 0
+
+                if total_mentions == 0:
 
-                if total_usage == 0:
                     return []
 
                 query = '''
                     SELECT 
-                        emoji_str,
-                        is_custom,
-                        SUM(usage_count) as total_usage,
-                        COUNT(DISTINCT user_id) as unique_users
-                    FROM emoji_usage
+                        mentioner_user_id,
+                        COUNT(*) as mention_count,
+                        MAX(created_at) as last_mention
+                    FROM user_mentions
                     WHERE guild_id = $1 
-                    AND channel_id = $2
+                    AND mentioned_user_id = $2
                 '''
-                params = [guild_id, channel_id]
-
-                if usage_type:
-                    query += f" AND usage_type = ${len(params) + 1}"
-                    params.append(usage_type)
+                params = [guild_id, mentioned_user_id]
 
                 if start_time:
-                    query += f" AND last_used >= ${len(params) + 1}"
+                    query += f" AND created_at >= ${len(params) + 1}"
                     params.append(start_time)
                 if end_time:
-                    query += f" AND last_used <= ${len(params) + 1}"
+                    query += f" AND created_at <= ${len(params) + 1}"
                     params.append(end_time)
 
                 if role_filter_ids:
@@ -6257,20 +5715,18 @@ class DatabaseStats(commands.Cog):
                     if user_ids:
                         placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
                                                                          len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
+                        query += f" AND mentioner_user_id IN ({placeholders})"
                         params.extend(user_ids)
 
                 query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-
-                    include_users=True, include_channels=False,
-                    specific_channel_id=channel_id
+                    guild_id, guild, query, params, 'user_mentions',
+                    include_users=True, include_channels=True
                 )
 
                 query += f'''
-                    GROUP BY emoji_str, is_custom
-                    HAVING SUM(usage_count) > 0
-                    ORDER BY total_usage DESC
+                    GROUP BY mentioner_user_id
+                    HAVING COUNT(*) > 0
+                    ORDER BY mention_count DESC
                     LIMIT {limit}
                 '''
 
@@ -6278,33 +5734,33 @@ class DatabaseStats(commands.Cog):
 
                 result = []
                 for row in rows:
-                    emoji_usage = row['total_usage'] or 0
-                    unique_users = row['unique_users'] or 0
-                    percentage = (emoji_usage / total_usage *
-                                  100) if total_usage > 0 else 0
-                    avg_usage = emoji_usage / max(unique_users, 1)
+                    user_mentions = row['mention_count'] or 0
+                    percentage = (user_mentions / total_mentions *
+                                  100) if total_mentions > 0 else 0
 
                     result.append({
-                        'emoji_str': row['emoji_str'],
-                        'is_custom': row['is_custom'],
-                        'usage_count': emoji_usage,
-                        'unique_users': unique_users,
-                        'avg_usage_per_user': round(avg_usage, 2),
+                        'user_id': row['mentioner_user_id'],
+                        'mention_count': user_mentions,
+                        'last_mention': row['last_mention'].isoformat() if row['last_mention'] else None,
                         'percentage': round(percentage, 1)
                     })
 
                 return result
 
         except Exception as e:
-            logger.error(f"Error in q_emoji_channel_leaderboard: {e}")
+            note_query_failure('q_leaderboard_mentions_target_user')
+            print(f"❌ Error in q_leaderboard_mentions_target_user: {e}")
+            traceback.print_exc()
             return []
 
-    async def q_emoji_category_leaderboard(self, guild_id: int, category_id: int,
-                                           limit: int = 10,
-                                           role_filter_ids: Optional[List[int]] = None,
-                                           start_time: Optional[datetime] = None,
-                                           end_time: Optional[datetime] = None,
-                                           usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    # LEADERBOARD CATEGORY (2 functions)
+
+    @cached_query
+    async def q_leaderboard_category_users_messages(self, guild_id: int, category_id: int,
+                                                    limit: int = 10,
+                                                    role_filter_ids: Optional[List[int]] = None,
+                                                    start_time: Optional[datetime] = None,
+                                                    end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
         if not self.pool:
             return []
@@ -6314,124 +5770,285 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            total_messages, rows = await self._q_grouped_totals(
+                guild, 'messages', 'user_id', '''
+                    COALESCE(SUM(message_count), 0) as message_count,
+                    COALESCE(SUM(total_chars), 0) as total_chars,
+                    COALESCE(SUM(total_chars)::float8 / NULLIF(SUM(message_count), 0), 0) as avg_chars
+                ''', 'message_count', limit, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                total_query = '''
-                    SELECT COALESCE(SUM(usage_count), 0) as total_usage
-                    FROM emoji_usage
-                    WHERE guild_id = $1 
-                    AND category_id = $2
-                '''
-                total_params = [guild_id, category_id]
+            result = []
+            for row in rows:
+                user_messages = row['message_count'] or 0
+                percentage = (user_messages / total_messages *
+                              100) if total_messages > 0 else 0
 
-                if usage_type:
-                    total_query += f" AND usage_type = ${len(total_params) + 1}"
-                    total_params.append(usage_type)
+                result.append({
+                    'user_id': row['user_id'],
+                    'message_count': user_messages,
+                    'total_chars': row['total_chars'] or 0,
+                    'avg_chars': round(row['avg_chars'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if start_time:
-                    total_query += f" AND last_used >= ${len(total_params) + 1}"
-                    total_params.append(start_time)
-                if end_time:
-                    total_query += f" AND last_used <= ${len(total_params) + 1}"
-                    total_params.append(end_time)
+            return result
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+        except Exception as e:
+            note_query_failure('q_leaderboard_category_users_messages')
+            logger.error(
+                f"Error in q_leaderboard_category_users_messages: {e}")
+            return []
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(total_params) + 1,
-                                                                         len(total_params) + len(user_ids) + 1)])
-                        total_query += f" AND user_id IN ({placeholders})"
-                        total_params.extend(user_ids)
+    @cached_query
+    async def q_leaderboard_category_users_voice(self, guild_id: int, category_id: int,
+                                                 limit: int = 10,
+                                                 role_filter_ids: Optional[List[int]] = None,
+                                                 start_time: Optional[datetime] = None,
+                                                 end_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
 
-                total_query, total_params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, total_query, total_params, 'emoji_usage',
-                    include_users=True, include_channels=False
-                )
+        if not self.pool:
+            return []
 
-                total_row = await conn.fetchrow(total_query, *total_params)
-                total_usage = total_row['total_usage'] or 0
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                if total_usage == 0:
-                    return []
+        try:
+            total_seconds, rows = await self._q_grouped_totals(
+                guild, 'voice', 'user_id', '''
+                    COALESCE(SUM(total_seconds), 0) as total_seconds,
+                    COALESCE(SUM(session_count), 0) as session_count,
+                    COALESCE(SUM(total_seconds)::float8 / NULLIF(SUM(session_count), 0), 0) as avg_session
+                ''', 'total_seconds', limit, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time
+            )
 
-                query = '''
-                    SELECT 
-                        emoji_str,
-                        is_custom,
-                        SUM(usage_count) as total_usage,
-                        COUNT(DISTINCT user_id) as unique_users
-                    FROM emoji_usage
-                    WHERE guild_id = $1 
-                    AND category_id = $2
-                '''
-                params = [guild_id, category_id]
+            result = []
+            for row in rows:
+                user_seconds = row['total_seconds'] or 0
+                percentage = (user_seconds / total_seconds *
+                              100) if total_seconds > 0 else 0
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'total_seconds': user_seconds,
+                    'total_hours': round(user_seconds / 3600, 2),
+                    'session_count': row['session_count'] or 0,
+                    'avg_session': round(row['avg_session'] or 0, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                if usage_type:
-                    query += f" AND usage_type = ${len(params) + 1}"
-                    params.append(usage_type)
+            return result
 
-                if start_time:
-                    query += f" AND last_used >= ${len(params) + 1}"
-                    params.append(start_time)
-                if end_time:
-                    query += f" AND last_used <= ${len(params) + 1}"
-                    params.append(end_time)
+        except Exception as e:
+            note_query_failure('q_leaderboard_category_users_voice')
+            logger.error(
+                f"Error in q_leaderboard_category_users_voice: {e}")
+            return []
 
-                if role_filter_ids:
-                    user_ids = []
-                    for member in guild.members:
-                        if any(role.id in role_filter_ids for role in member.roles):
-                            user_ids.append(member.id)
+    # EMOJI LEADERBOARDS (4 functions)
 
-                    if user_ids:
-                        placeholders = ', '.join([f'${i}' for i in range(len(params) + 1,
-                                                                         len(params) + len(user_ids) + 1)])
-                        query += f" AND user_id IN ({placeholders})"
-                        params.extend(user_ids)
+    @cached_query
+    async def q_emoji_server_leaderboard(self, guild_id: int,
+                                         limit: int = 10,
+                                         role_filter_ids: Optional[List[int]] = None,
+                                         start_time: Optional[datetime] = None,
+                                         end_time: Optional[datetime] = None,
+                                         usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
 
-                query, params = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query, params, 'emoji_usage',
-                    include_users=True, include_channels=False
-                )
+        if not self.pool:
+            return []
 
-                query += f'''
-                    GROUP BY emoji_str, is_custom
-                    HAVING SUM(usage_count) > 0
-                    ORDER BY total_usage DESC
-                    LIMIT {limit}
-                '''
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
 
-                rows = await conn.fetch(query, *params)
+        try:
+            total_usage, rows = await self._q_grouped_totals(
+                guild, 'emojis', 'emoji_str, is_custom', '''
+                    SUM(usage_count) as total_usage,
+                    COUNT(DISTINCT user_id) as unique_users
+                ''', 'total_usage', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                filters={'usage_type': usage_type} if usage_type else None,
+                heavy_hitters='emojis'
+            )
 
-                result = []
-                for row in rows:
-                    emoji_usage = row['total_usage'] or 0
-                    unique_users = row['unique_users'] or 0
-                    percentage = (emoji_usage / total_usage *
-                                  100) if total_usage > 0 else 0
-                    avg_usage = emoji_usage / max(unique_users, 1)
+            result = []
+            for row in rows:
+                emoji_usage = row['total_usage'] or 0
+                unique_users = row['unique_users'] or 0
+                percentage = (emoji_usage / total_usage *
+                              100) if total_usage > 0 else 0
+                avg_usage = emoji_usage / max(unique_users, 1)
+
+                result.append({
+                    'emoji_str': row['emoji_str'],
+                    'is_custom': row['is_custom'],
+                    'usage_count': emoji_usage,
+                    'unique_users': unique_users,
+                    'avg_usage_per_user': round(avg_usage, 2),
+                    'percentage': round(percentage, 1)
+                })
 
-                    result.append({
-                        'emoji_str': row['emoji_str'],
-                        'is_custom': row['is_custom'],
-                        'usage_count': emoji_usage,
-                        'unique_users': unique_users,
-                        'avg_usage_per_user': round(avg_usage, 2),
-                        'percentage': round(percentage, 1)
-                    })
+            return result
 
-                return result
+        except Exception as e:
+            note_query_failure('q_emoji_server_leaderboard')
+            logger.error(f"Error in q_emoji_server_leaderboard: {e}")
+            return []
+
+    @cached_query
+    async def q_emoji_user_leaderboard(self, guild_id: int,
+                                       limit: int = 10,
+                                       role_filter_ids: Optional[List[int]] = None,
+                                       start_time: Optional[datetime] = None,
+                                       end_time: Optional[datetime] = None,
+                                       usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+
+        if not self.pool:
+            return []
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
+
+        try:
+            total_usage, rows = await self._q_grouped_totals(
+                guild, 'emojis', 'user_id', '''
+                    SUM(usage_count) as total_usage,
+                    COUNT(DISTINCT emoji_str) as unique_emojis
+                ''', 'total_usage', limit, 'server', None, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                filters={'usage_type': usage_type} if usage_type else None
+            )
+
+            result = []
+            for row in rows:
+                user_usage = row['total_usage'] or 0
+                unique_emojis = row['unique_emojis'] or 0
+                percentage = (user_usage / total_usage *
+                              100) if total_usage > 0 else 0
+                avg_usage = user_usage / max(unique_emojis, 1)
+
+                result.append({
+                    'user_id': row['user_id'],
+                    'usage_count': user_usage,
+                    'unique_emojis': unique_emojis,
+                    'avg_usage_per_emoji': round(avg_usage, 2),
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
+
+        except Exception as e:
+            note_query_failure('q_emoji_user_leaderboard')
+            logger.error(f"Error in q_emoji_user_leaderboard: {e}")
+            return []
+
+    @cached_query
+    async def q_emoji_channel_leaderboard(self, guild_id: int, channel_id: int,
+                                          limit: int = 10,
+                                          role_filter_ids: Optional[List[int]] = None,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None,
+                                          usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+
+        if not self.pool:
+            return []
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
+
+        try:
+            total_usage, rows = await self._q_grouped_totals(
+                guild, 'emojis', 'emoji_str, is_custom', '''
+                    SUM(usage_count) as total_usage,
+                    COUNT(DISTINCT user_id) as unique_users
+                ''', 'total_usage', limit, 'channel', channel_id, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                filters={'usage_type': usage_type} if usage_type else None
+            )
+
+            result = []
+            for row in rows:
+                emoji_usage = row['total_usage'] or 0
+                unique_users = row['unique_users'] or 0
+                percentage = (emoji_usage / total_usage *
+                              100) if total_usage > 0 else 0
+                avg_usage = emoji_usage / max(unique_users, 1)
+
+                result.append({
+                    'emoji_str': row['emoji_str'],
+                    'is_custom': row['is_custom'],
+                    'usage_count': emoji_usage,
+                    'unique_users': unique_users,
+                    'avg_usage_per_user': round(avg_usage, 2),
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
+
+        except Exception as e:
+            note_query_failure('q_emoji_channel_leaderboard')
+            logger.error(f"Error in q_emoji_channel_leaderboard: {e}")
+            return []
+
+    @cached_query
+    async def q_emoji_category_leaderboard(self, guild_id: int, category_id: int,
+                                           limit: int = 10,
+                                           role_filter_ids: Optional[List[int]] = None,
+                                           start_time: Optional[datetime] = None,
+                                           end_time: Optional[datetime] = None,
+                                           usage_type: Optional[str] = None) -> List[Dict[str, Any]]:
+
+        if not self.pool:
+            return []
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return []
+
+        try:
+            total_usage, rows = await self._q_grouped_totals(
+                guild, 'emojis', 'emoji_str, is_custom', '''
+                    SUM(usage_count) as total_usage,
+                    COUNT(DISTINCT user_id) as unique_users
+                ''', 'total_usage', limit, 'category', category_id, role_filter_ids,
+                start_time=start_time, end_time=end_time,
+                filters={'usage_type': usage_type} if usage_type else None
+            )
+
+            result = []
+            for row in rows:
+                emoji_usage = row['total_usage'] or 0
+                unique_users = row['unique_users'] or 0
+                percentage = (emoji_usage / total_usage *
+                              100) if total_usage > 0 else 0
+                avg_usage = emoji_usage / max(unique_users, 1)
+
+                result.append({
+                    'emoji_str': row['emoji_str'],
+                    'is_custom': row['is_custom'],
+                    'usage_count': emoji_usage,
+                    'unique_users': unique_users,
+                    'avg_usage_per_user': round(avg_usage, 2),
+                    'percentage': round(percentage, 1)
+                })
+
+            return result
 
         except Exception as e:
+            note_query_failure('q_emoji_category_leaderboard')
             logger.error(f"Error in q_emoji_category_leaderboard: {e}")
             return []
 
     # INVITE TRACKING (2 functions)
 
+    @cached_query
     async def q_user_invite_stats(self, guild_id: int, user_id: int,
                                   start_time: Optional[datetime] = None,
                                   end_time: Optional[datetime] = None) -> Dict[str, Any]:
@@ -6443,7 +6060,7 @@ class DatabaseStats(commands.Cog):
             }
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
                 query = '''
                     SELECT 
                         COUNT(*) as total_invites,
@@ -6479,6 +6096,7 @@ class DatabaseStats(commands.Cog):
                 }
 
         except Exception as e:
+            note_query_failure('q_user_invite_stats')
             print(f"❌ InviteTracker: Error in q_user_invite_stats: {e}")
             traceback.print_exc()
             return {
@@ -6486,6 +6104,7 @@ class DatabaseStats(commands.Cog):
                 'suspicious_invites': 0, 'percentage_valid': 0.0
             }
 
+    @cached_query
     async def q_invite_leaderboard(self, guild_id: int,
                                    limit: int = 10,
                                    role_filter_ids: Optional[List[int]] = None,
@@ -6500,7 +6119,7 @@ class DatabaseStats(commands.Cog):
             return []
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
 
                 filtered_inviter_ids = None
                 if role_filter_ids:
@@ -6571,12 +6190,14 @@ class DatabaseStats(commands.Cog):
                 return result
 
         except Exception as e:
+            note_query_failure('q_invite_leaderboard')
             print(f"❌ InviteTracker: Error in q_invite_leaderboard: {e}")
             traceback.print_exc()
             return []
 
     # TIMEZONE ACTIVITY DISTRIBUTION (3 functions)
 
+    @cached_query
     async def q_server_activity_distribution(self, guild_id: int,
                                              days_back: int = 30,
                                              role_filter_ids: Optional[List[int]] = None,
@@ -6603,7 +6224,7 @@ class DatabaseStats(commands.Cog):
             }
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
                 messages = {f'hour_{i}': 0 for i in range(24)}
                 voice = {f'hour_{i}': 0 for i in range(24)}
                 activities = {f'hour_{i}': 0 for i in range(24)}
@@ -6650,13 +6271,11 @@ class DatabaseStats(commands.Cog):
 
                 query_voice = f'''
                     SELECT 
-                        EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
+                        EXTRACT(HOUR FROM hour_bucket AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COALESCE(SUM(seconds), 0) as total_seconds
+                    FROM voice_hourly
                     WHERE guild_id = $1 
-                    AND join_time >= NOW() - INTERVAL '1 day' * $2
-                    GROUP BY EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}')
-                    ORDER BY hour
+                    AND hour_bucket >= NOW() - INTERVAL '1 day' * $2
                 '''
                 params_voice = [guild_id, days_back]
 
@@ -6673,10 +6292,12 @@ class DatabaseStats(commands.Cog):
                         params_voice.extend(user_ids)
 
                 query_voice, params_voice = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query_voice, params_voice, 'voice_session_history',
+                    guild_id, guild, query_voice, params_voice, 'voice_hourly',
                     include_users=True, include_channels=True
                 )
 
+                query_voice += " GROUP BY hour ORDER BY hour"
+
                 rows_voice = await conn.fetch(query_voice, *params_voice)
                 for row in rows_voice:
                     hour = int(row['hour'])
@@ -6704,6 +6325,7 @@ class DatabaseStats(commands.Cog):
                         activities[f'hour_{hour}'] = count
                         total_activities += count
                 except Exception as e:
+                    note_query_failure('q_server_activity_distribution')
                     logger.debug(f"Could not get activities: {e}")
 
                 return {
@@ -6716,6 +6338,7 @@ class DatabaseStats(commands.Cog):
                 }
 
         except Exception as e:
+            note_query_failure('q_server_activity_distribution')
             logger.error(f"Error in q_server_activity_distribution: {e}")
             return {
                 'messages': {f'hour_{i}': 0 for i in range(24)},
@@ -6726,6 +6349,7 @@ class DatabaseStats(commands.Cog):
                 'total_activities': 0
             }
 
+    @cached_query
     async def q_user_activity_distribution(self, guild_id: int, user_id: int,
                                            days_back: int = 30,
                                            role_filter_ids: Optional[List[int]] = None,
@@ -6752,7 +6376,7 @@ class DatabaseStats(commands.Cog):
             }
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
                 messages = {f'hour_{i}': 0 for i in range(24)}
                 voice = {f'hour_{i}': 0 for i in range(24)}
                 activities = {f'hour_{i}': 0 for i in range(24)}
@@ -6811,22 +6435,22 @@ class DatabaseStats(commands.Cog):
 
                 query_voice = f'''
                     SELECT 
-                        EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                        COALESCE(SUM(duration_seconds), 0) as total_seconds
-                    FROM voice_session_history
+                        EXTRACT(HOUR FROM hour_bucket AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                        COALESCE(SUM(seconds), 0) as total_seconds
+                    FROM voice_hourly
                     WHERE guild_id = $1 
                     AND user_id = $2 
-                    AND join_time >= NOW() - INTERVAL '1 day' * $3
-                    GROUP BY EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}')
-                    ORDER BY hour
+                    AND hour_bucket >= NOW() - INTERVAL '1 day' * $3
                 '''
                 params_voice = [guild_id, user_id, days_back]
 
                 query_voice, params_voice = await self._apply_comprehensive_blacklist_filters(
-                    guild_id, guild, query_voice, params_voice, 'voice_session_history',
+                    guild_id, guild, query_voice, params_voice, 'voice_hourly',
                     include_users=True, include_channels=True
                 )
 
+                query_voice += " GROUP BY hour ORDER BY hour"
+
                 rows_voice = await conn.fetch(query_voice, *params_voice)
                 for row in rows_voice:
                     hour = int(row['hour'])
@@ -6855,6 +6479,7 @@ class DatabaseStats(commands.Cog):
                         activities[f'hour_{hour}'] = count
                         total_activities += count
                 except Exception as e:
+                    note_query_failure('q_user_activity_distribution')
                     logger.debug(f"Could not get user activities: {e}")
 
                 return {
@@ -6867,6 +6492,7 @@ class DatabaseStats(commands.Cog):
                 }
 
         except Exception as e:
+            note_query_failure('q_user_activity_distribution')
             logger.error(f"Error in q_user_activity_distribution: {e}")
             return {
                 'messages': {f'hour_{i}': 0 for i in range(24)},
@@ -6877,6 +6503,7 @@ class DatabaseStats(commands.Cog):
                 'total_activities': 0
             }
 
+    @cached_query
     async def q_channel_activity_distribution(self, guild_id: int, channel_id: int,
                                               days_back: int = 30,
                                               role_filter_ids: Optional[List[int]] = None,
@@ -6900,7 +6527,7 @@ class DatabaseStats(commands.Cog):
             }
 
         try:
-            async with self.pool.acquire() as conn:
+            async with self._read_pool().acquire() as conn:
 
                 messages = {f'hour_{i}': 0 for i in range(24)}
                 voice = {f'hour_{i}': 0 for i in range(24)}
@@ -6960,12 +6587,12 @@ class DatabaseStats(commands.Cog):
 
                     query_voice = f'''
                         SELECT 
-                            EXTRACT(HOUR FROM join_time AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
-                            COALESCE(SUM(duration_seconds), 0) as total_seconds
-                        FROM voice_session_history
+                            EXTRACT(HOUR FROM hour_bucket AT TIME ZONE 'UTC' AT TIME ZONE '{timezone_str}') as hour,
+                            COALESCE(SUM(seconds), 0) as total_seconds
+                        FROM voice_hourly
                         WHERE guild_id = $1 
                         AND channel_id = $2 
-                        AND join_time >= NOW() - INTERVAL '1 day' * $3
+                        AND hour_bucket >= NOW() - INTERVAL '1 day' * $3
                     '''
                     params_voice = [guild_id, channel_id, days_back]
 
@@ -6982,7 +6609,7 @@ class DatabaseStats(commands.Cog):
                             params_voice.extend(user_ids)
 
                     query_voice, params_voice = await self._apply_comprehensive_blacklist_filters(
-                        guild_id, guild, query_voice, params_voice, 'voice_session_history',
+                        guild_id, guild, query_voice, params_voice, 'voice_hourly',
                         include_users=True, include_channels=False
                     )
 
@@ -7003,6 +6630,7 @@ class DatabaseStats(commands.Cog):
                 }
 
         except Exception as e:
+            note_query_failure('q_channel_activity_distribution')
             logger.error(f"Error in q_channel_activity_distribution: {e}")
             return {
                 'messages': {f'hour_{i}': 0 for i in range(24)},
@@ -7,13 +7,16 @@ from datetime import datetime, timedelta, date, time, timezone
 import asyncio
 from typing import List, Dict, Optional, Tuple
 import logging
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import io
-import aiohttp
 import redis.asyncio as redis
 import json
 import traceback
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.render_toolkit import get_fonts, draw_text_with_stroke, draw_rounded_rectangle, step_offsets, fit_text_to_rectangle, paste_avatar
+from utils.templates import template_registry
+from utils.render_service import render_service
 
 
 def ensure_timezone_aware(dt: datetime) -> datetime:
@@ -102,103 +105,10 @@ async def create_db_pool():
 # FONT MANAGEMENT
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
-
-def get_fonts():
-    try:
-
-        custom_font_path = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
-        if os.path.exists(custom_font_path):
-            font_small = ImageFont.truetype(custom_font_path, 16)
-            font_medium = ImageFont.truetype(custom_font_path, 20)
-            font_large = ImageFont.truetype(custom_font_path, 24)
-            font_larger = ImageFont.truetype(custom_font_path, 30)
-            font_huge = ImageFont.truetype(custom_font_path, 40)
-            font_giant = ImageFont.truetype(custom_font_path, 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        pass
-
-    try:
-        font_small = ImageFont.truetype("arial.ttf", 16)
-        font_medium = ImageFont.truetype("arial.ttf", 20)
-        font_large = ImageFont.truetype("arial.ttf", 24)
-        font_larger = ImageFont.truetype("arial.ttf", 30)
-        font_huge = ImageFont.truetype("arial.ttf", 40)
-        font_giant = ImageFont.truetype("arial.ttf", 60)
-        return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        font_small = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_large = ImageFont.load_default()
-        font_larger = ImageFont.load_default()
-        font_huge = ImageFont.load_default()
-        font_giant = ImageFont.load_default()
-        return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-
-
-# DRAWING
-
-def draw_text_with_stroke(draw, position, text, font, fill, stroke_fill, stroke_width):
-    x, y = position
-    for dx in [-stroke_width, 0, stroke_width]:
-        for dy in [-stroke_width, 0, stroke_width]:
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font, fill=stroke_fill)
-    draw.text((x, y), text, font=font, fill=fill)
-
-
-def draw_text_centered_with_stroke(draw, text, center_position, font, fill="white", stroke_fill="black", stroke_width=2, max_width=None):
-
-    center_x, center_y = center_position
-
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    x = center_x - (text_width // 2)
-    y = center_y - (text_height // 2)
-
-    if max_width and text_width > max_width:
-        current_font = font
-        original_size = font.size
-
-        for size in range(original_size - 2, 8, -2):
-            try:
-                smaller_font = ImageFont.truetype(current_font.path, size)
-                bbox = draw.textbbox((0, 0), text, font=smaller_font)
-                text_width = bbox[2] - bbox[0]
-
-                if text_width <= max_width:
-
-                    text_height = bbox[3] - bbox[1]
-                    x = center_x - (text_width // 2)
-                    y = center_y - (text_height // 2)
-                    draw_text_with_stroke(
-                        draw, (x, y), text, smaller_font, fill, stroke_fill, stroke_width)
-                    return
-            except:
-                continue
-
-    draw_text_with_stroke(draw, (x, y), text, font, fill,
-                          stroke_fill, stroke_width)
-
-
-def draw_rounded_rectangle(draw, xy, radius, fill=None, outline=None):
-
-    x1, y1, x2, y2 = xy
-    draw.rectangle([x1 + radius, y1, x2 - radius, y2],
-                   fill=fill, outline=outline)
-    draw.rectangle([x1, y1 + radius, x2, y2 - radius],
-                   fill=fill, outline=outline)
-    draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2],
-                  180, 270, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2],
-                  270, 360, fill=fill, outline=outline)
-    draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2],
-                  90, 180, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2],
-                  0, 90, fill=fill, outline=outline)
+SERVER_NAME_FONT_SIZES = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
+SERVER_NAME_OFFSETS = step_offsets(SERVER_NAME_FONT_SIZES, (40, 30, 20, 16))
 
 
 # FORMATS
@@ -2155,213 +2065,133 @@ async def generate_user_activity_image(guild: discord.Guild, user: discord.Membe
 
     try:
         template_path = BASE_DIR / "assets" / "images" / "activity user final png.png"
-        image = Image.open(template_path)
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+        image = template_registry.get(template_path, "RGB")
         draw = ImageDraw.Draw(image)
 
-        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(FONT_PATH)
 
         avatar_x, avatar_y = 10, 10
         avatar_size = (51, 51)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(user.display_avatar.url) as response:
-                    avatar_data = await response.read()
-
-            avatar_image = Image.open(io.BytesIO(avatar_data))
-            avatar_image = avatar_image.resize(
-                avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-            mask = Image.new('L', avatar_size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse((0, 0, avatar_size[0], avatar_size[1]), fill=255)
-            avatar_image.putalpha(mask)
+            avatar_image = await asset_cache.get_image(user.display_avatar, avatar_size, circle=True)
 
-            avatar_area = image.crop(
-                (avatar_x, avatar_y, avatar_x +
-                 avatar_size[0], avatar_y + avatar_size[1])
-            ).convert('RGBA')
-
-            avatar_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-            avatar_with_bg.paste(avatar_image, (0, 0), avatar_image)
-            avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-            image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+            paste_avatar(image, avatar_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"  ❌ Could not add user avatar: {e}")
 
-        username = user.name
-        text_start_x = 73
-        text_start_y = 28
-
-        username_rect_center = (145, 35)
-        username_rect_width = 160
-        username_rect_height = 32
-
-        def fit_text_to_username_rect(text, start_x, start_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            font_sizes = [36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(
-                        BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = start_x
-                text_y = start_y - (text_height // 2)
-
-                rect_left = rect_center_x - (rect_width // 2)
-                rect_right = rect_center_x + (rect_width // 2)
-                rect_top = rect_center_y - (rect_height // 2)
-                rect_bottom = rect_center_y + (rect_height // 2)
-
-                fits_h = (text_x >= rect_left - 1) and (text_x +
-                                                        text_width <= rect_right + 1)
-                fits_v = (text_y >= rect_top - 1) and (text_y +
-                                                       text_height <= rect_bottom + 1)
-
-                if fits_h and fits_v:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(
-                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", smallest_font)
-            except:
-                font = ImageFont.load_default()
-
-            current_text = text
-            while len(current_text) > 3:
-
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
+        def compose():
 
-                text_x = start_x
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_height = bbox[3] - bbox[1]
-                text_y = start_y - (text_height // 2)
+            username = user.name
+            text_start_x = 73
+            text_start_y = 28
 
-                if text_x + text_width <= rect_right:
-                    return current_text, font, (text_x, text_y)
+            username_rect_center = (145, 35)
+            username_rect_width = 160
+            username_rect_height = 32
 
-            return text[:3] + "...", font, (text_start_x, text_start_y)
+            fitted_username, username_font, username_pos = fit_text_to_rectangle(
+                username, FONT_PATH, [36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16],
+                (text_start_x, text_start_y),
+                (*username_rect_center, username_rect_width, username_rect_height),
+                ink=False, tolerance=1
+            )
 
-        fitted_username, username_font, username_pos = fit_text_to_username_rect(
-            username, text_start_x, text_start_y,
-            username_rect_center[0], username_rect_center[1],
-            username_rect_width, username_rect_height
-        )
+            draw_text_with_stroke(draw, username_pos, fitted_username,
+                                  username_font, "white", "black", 1)
 
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((username_pos[0] + dx, username_pos[1] + dy),
-                              fitted_username, font=username_font, fill="black")
+            # Created on and time period
+            draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+                "%B %d, %Y"), font_small, "white", "black", 1)
+            draw_text_with_stroke(
+                draw, (630, 422), f"{days} days", font_small, "white", "black", 1)
 
-        draw.text(username_pos, fitted_username,
-                  font=username_font, fill="white")
+            # Streak
+            if streak_stats and streak_stats.get('current_streak', 0) > 0:
+                current_streak = streak_stats['current_streak']
+                best_streak = streak_stats['best_streak']
 
-        # Created on and time period
-        draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-            "%B %d, %Y"), font_small, "white", "black", 1)
-        draw_text_with_stroke(
-            draw, (630, 422), f"{days} days", font_small, "white", "black", 1)
+                streak_text = f"Current Streak: {format_streak(current_streak)}"
+                draw_text_with_stroke(draw, (385, 75), streak_text,
+                                      font_large, "white", "black", 1)
 
-        # Streak
-        if streak_stats and streak_stats.get('current_streak', 0) > 0:
-            current_streak = streak_stats['current_streak']
-            best_streak = streak_stats['best_streak']
+                if best_streak > current_streak:
+                    best_streak_text = f"Best: {format_streak(best_streak)}"
+                    draw_text_with_stroke(draw, (385, 105), best_streak_text,
+                                          font_small, "white", "black", 1)
 
-            streak_text = f"Current Streak: {format_streak(current_streak)}"
-            draw_text_with_stroke(draw, (385, 75), streak_text,
-                                  font_large, "white", "black", 1)
+                if streak_stats.get('is_active_today', False):
+                    active_text = "Active Today ✓"
+                    draw_text_with_stroke(draw, (385, 125), active_text,
+                                          font_small, "#00FF00", "black", 1)
 
-            if best_streak > current_streak:
-                best_streak_text = f"Best: {format_streak(best_streak)}"
-                draw_text_with_stroke(draw, (385, 105), best_streak_text,
-                                      font_small, "white", "black", 1)
+            else:
 
-            if streak_stats.get('is_active_today', False):
-                active_text = "Active Today ✓"
-                draw_text_with_stroke(draw, (385, 125), active_text,
-                                      font_small, "#00FF00", "black", 1)
+                print("  No streak data available")
 
-        else:
+            if activity_data and len(activity_data) > 0:
 
-            print("  No streak data available")
+                activities_by_type = {
+                    'playing': [],
+                    'listening': [],
+                    'watching': [],
+                    'streaming': [],
+                    'competing': [],
+                    'custom': []
+                }
 
-        if activity_data and len(activity_data) > 0:
+                for activity in activity_data:
+                    activity_type = activity.get('activity_type', 'unknown')
+                    if activity_type in activities_by_type:
+                        activities_by_type[activity_type].append(activity)
 
-            activities_by_type = {
-                'playing': [],
-                'listening': [],
-                'watching': [],
-                'streaming': [],
-                'competing': [],
-                'custom': []
-            }
-
-            for activity in activity_data:
-                activity_type = activity.get('activity_type', 'unknown')
-                if activity_type in activities_by_type:
-                    activities_by_type[activity_type].append(activity)
+                for activity_type in activities_by_type:
+                    if sort_by == "sessions":
+                        activities_by_type[activity_type].sort(
+                            key=lambda x: x.get('session_count', 0), reverse=True)
+                    else:
+                        activities_by_type[activity_type].sort(
+                            key=lambda x: x.get('total_duration_seconds', 0), reverse=True)
+
+                print(f"Top activities by type:")
+                for activity_type, activities in activities_by_type.items():
+                    if activities:
+                        top_activity = activities[0]
+
+                type_positions = {
+                    'playing': (35, 155),
+                    'streaming': (35, 310),
+                    'listening': (265, 155),
+                    'watching': (265, 310),
+                    'competing': (500, 155),
+                    'custom': (500, 310)
+                }
 
-            for activity_type in activities_by_type:
-                if sort_by == "sessions":
-                    activities_by_type[activity_type].sort(
-                        key=lambda x: x.get('session_count', 0), reverse=True)
-                else:
-                    activities_by_type[activity_type].sort(
-                        key=lambda x: x.get('total_duration_seconds', 0), reverse=True)
-
-            print(f"Top activities by type:")
-            for activity_type, activities in activities_by_type.items():
-                if activities:
-                    top_activity = activities[0]
-
-            type_positions = {
-                'playing': (35, 155),
-                'streaming': (35, 310),
-                'listening': (265, 155),
-                'watching': (265, 310),
-                'competing': (500, 155),
-                'custom': (500, 310)
-            }
+                for activity_type, (x, y) in type_positions.items():
+                    activities = activities_by_type[activity_type]
+                    if activities:
 
-            for activity_type, (x, y) in type_positions.items():
-                activities = activities_by_type[activity_type]
-                if activities:
+                        top_activity = activities[0]
+                        display_name = top_activity['display_name'][:20]
 
-                    top_activity = activities[0]
-                    display_name = top_activity['display_name'][:20]
+                        if sort_by == "sessions":
+                            session_count = top_activity.get('session_count', 0)
+                            value_text = f"{session_count} session{'s' if session_count != 1 else ''}"
+                        else:
+                            total_seconds = top_activity.get(
+                                'total_duration_seconds', 0)
+                            value_text = format_duration(total_seconds)
 
-                    if sort_by == "sessions":
-                        session_count = top_activity.get('session_count', 0)
-                        value_text = f"{session_count} session{'s' if session_count != 1 else ''}"
-                    else:
-                        total_seconds = top_activity.get(
-                            'total_duration_seconds', 0)
-                        value_text = format_duration(total_seconds)
+                        draw_text_with_stroke(
+                            draw, (x, y), display_name, font_large, "white", "black", 1)
 
-                    draw_text_with_stroke(
-                        draw, (x, y), display_name, font_large, "white", "black", 1)
+                        draw_text_with_stroke(
+                            draw, (x, y + 40), value_text, font_medium, "white", "black", 1)
 
-                    draw_text_with_stroke(
-                        draw, (x, y + 40), value_text, font_medium, "white", "black", 1)
+            return image
 
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        img_bytes = await render_service.render_card(compose, guild.id)
         return discord.File(img_bytes, filename="user_activity.png")
     except Exception as e:
         print(f"Error generating user activity image: {e}")
@@ -2369,7 +2199,7 @@ async def generate_user_activity_image(guild: discord.Guild, user: discord.Membe
 
         image = Image.new('RGB', (800, 600), color='#2F3136')
         draw = ImageDraw.Draw(image)
-        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(FONT_PATH)
         draw_text_with_stroke(draw, (200, 250), "ERROR GENERATING IMAGE",
                               font_larger, "white", "black", 2)
         img_bytes = io.BytesIO()
@@ -2383,340 +2213,176 @@ async def generate_server_activity_image(guild: discord.Guild, days: int, activi
 
     try:
         template_path = BASE_DIR / "assets" / "images" / "activity server final png.png"
-        image = Image.open(template_path)
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+        image = template_registry.get(template_path, "RGB")
         draw = ImageDraw.Draw(image)
 
-        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(FONT_PATH)
 
         avatar_x, avatar_y = 7, 10
         avatar_size = (60, 60)
 
         try:
             if guild.icon:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(guild.icon.url) as response:
-                        avatar_data = await response.read()
-
-                avatar_image = Image.open(io.BytesIO(avatar_data))
-                avatar_image = avatar_image.resize(
-                    avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', avatar_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse(
-                    (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                avatar_image.putalpha(mask)
-
-                avatar_area = image.crop(
-                    (avatar_x, avatar_y, avatar_x +
-                     avatar_size[0], avatar_y + avatar_size[1])
-                ).convert('RGBA')
-
-                avatar_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                avatar_with_bg.paste(avatar_image, (0, 0), avatar_image)
-                avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-                image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+                avatar_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                paste_avatar(image, avatar_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"  ❌ Could not add server icon: {e}")
 
-        # SERVER NAME
-        server_name = guild.name
-        text_start_x = 85
-        text_start_y = 30
+        def compose():
 
-        servername_rect_center = (150, 30)
-        servername_rect_width = 183
-        servername_rect_height = 35
-
-        def fit_text_to_servername_rect(text, start_x, start_y, rect_center_x, rect_center_y, rect_width, rect_height):
-            font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(
-                        BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = start_x
-                text_y = start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 40:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                rect_left = rect_center_x - (rect_width // 2)
-                rect_right = rect_center_x + (rect_width // 2)
-                rect_top = rect_center_y - (rect_height // 2)
-                rect_bottom = rect_center_y + (rect_height // 2)
-
-                fits_h = (text_x >= rect_left - 1) and (text_x +
-                                                        text_width <= rect_right + 1)
-                fits_v = (text_y >= rect_top - 1) and (text_y +
-                                                       text_height <= rect_bottom + 1)
-
-                if fits_h and fits_v:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(
-                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", smallest_font)
-            except:
-                font = ImageFont.load_default()
-
-            current_text = server_name
-            while len(current_text) > 3:
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
-
-                text_x = text_start_x
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_height = bbox[3] - bbox[1]
-                text_y = text_start_y - (text_height // 2)
-
-                if text_x + text_width <= rect_right:
-                    return current_text, font, (text_x, text_y)
-
-            return server_name[:3] + "...", font, (text_start_x, text_start_y)
-
-        fitted_servername, servername_font, servername_pos = fit_text_to_servername_rect(
-            server_name, text_start_x, text_start_y,
-            servername_rect_center[0], servername_rect_center[1],
-            servername_rect_width, servername_rect_height
-        )
-
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((servername_pos[0] + dx, servername_pos[1] + dy),
-                              fitted_servername, font=servername_font, fill="black")
-
-        draw.text(servername_pos, fitted_servername,
-                  font=servername_font, fill="white")
-
-        # ROLE FILTER
-        role_text = "No Filter"
-        if role_id and role_id != "none":
-            role = guild.get_role(int(role_id))
-            role_text = role.name if role else "Unknown Role"
+            # SERVER NAME
+            server_name = guild.name
+            text_start_x = 85
+            text_start_y = 30
 
-        draw_text_with_stroke(draw, (65, 459), role_text,
-                              font_small, "white", "black", 1)
+            servername_rect_center = (150, 30)
+            servername_rect_width = 183
+            servername_rect_height = 35
 
-        # Created on and time period
-        draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-            "%B %d, %Y"), font_small, "white", "black", 1)
-        draw_text_with_stroke(
-            draw, (630, 457), f"{days} days", font_small, "white", "black", 1)
+            fitted_servername, servername_font, servername_pos = fit_text_to_rectangle(
+                server_name, FONT_PATH, SERVER_NAME_FONT_SIZES,
+                (text_start_x, text_start_y),
+                (*servername_rect_center, servername_rect_width, servername_rect_height),
+                offsets=SERVER_NAME_OFFSETS, ink=False, tolerance=1
+            )
 
-        if activity_data:
-            activities_by_type = {}
-            for activity in activity_data:
-                activity_type = activity.get('activity_type', 'unknown')
-                if activity_type not in activities_by_type:
-                    activities_by_type[activity_type] = []
-                activities_by_type[activity_type].append(activity)
+            stroke_width = 1
+            draw_text_with_stroke(draw, servername_pos, fitted_servername,
+                                  servername_font, "white", "black", stroke_width)
+
+            # ROLE FILTER
+            role_text = "No Filter"
+            if role_id and role_id != "none":
+                role = guild.get_role(int(role_id))
+                role_text = role.name if role else "Unknown Role"
+
+            draw_text_with_stroke(draw, (65, 459), role_text,
+                                  font_small, "white", "black", 1)
+
+            # Created on and time period
+            draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+                "%B %d, %Y"), font_small, "white", "black", 1)
+            draw_text_with_stroke(
+                draw, (630, 457), f"{days} days", font_small, "white", "black", 1)
+
+            if activity_data:
+                activities_by_type = {}
+                for activity in activity_data:
+                    activity_type = activity.get('activity_type', 'unknown')
+                    if activity_type not in activities_by_type:
+                        activities_by_type[activity_type] = []
+                    activities_by_type[activity_type].append(activity)
 
-            for activity_type in activities_by_type:
-                if sort_by == "users":
-                    activities_by_type[activity_type].sort(
-                        key=lambda x: x.get('user_count', 0), reverse=True)
-                elif sort_by == "sessions":
-                    activities_by_type[activity_type].sort(
-                        key=lambda x: x.get('session_count', 0), reverse=True)
-                else:
-                    activities_by_type[activity_type].sort(
-                        key=lambda x: x.get('total_duration_seconds', 0), reverse=True)
-
-            # ACTIVITY POSITIONS
-            activity_positions = {
-                'playing': {
-                    'name': (20, 135),
-                    'value': (20, 180)
-                },
-                'streaming': {
-                    'name': (20, 330),
-                    'value': (20, 360)
-                },
-                'listening': {
-                    'name': (265, 135),
-                    'value': (265, 180)
-                },
-                'watching': {
-                    'name': (265, 330),
-                    'value': (265, 360)
-                },
-                'competing': {
-                    'name': (512, 135),
-                    'value': (512, 180)
-                },
-                'custom': {
-                    'name': (512, 330),
-                    'value': (512, 360)
+                for activity_type in activities_by_type:
+                    if sort_by == "users":
+                        activities_by_type[activity_type].sort(
+                            key=lambda x: x.get('user_count', 0), reverse=True)
+                    elif sort_by == "sessions":
+                        activities_by_type[activity_type].sort(
+                            key=lambda x: x.get('session_count', 0), reverse=True)
+                    else:
+                        activities_by_type[activity_type].sort(
+                            key=lambda x: x.get('total_duration_seconds', 0), reverse=True)
+
+                # ACTIVITY POSITIONS
+                activity_positions = {
+                    'playing': {
+                        'name': (20, 135),
+                        'value': (20, 180)
+                    },
+                    'streaming': {
+                        'name': (20, 330),
+                        'value': (20, 360)
+                    },
+                    'listening': {
+                        'name': (265, 135),
+                        'value': (265, 180)
+                    },
+                    'watching': {
+                        'name': (265, 330),
+                        'value': (265, 360)
+                    },
+                    'competing': {
+                        'name': (512, 135),
+                        'value': (512, 180)
+                    },
+                    'custom': {
+                        'name': (512, 330),
+                        'value': (512, 360)
+                    }
                 }
-            }
-
-            # INVISIBLE RECTANGLES
-            invisible_rectangles = [
-
-                ((130, 135), 220, 32),
-                ((130, 180), 220, 32),
-                ((130, 330), 220, 32),
-                ((130, 360), 220, 32),
-
-
-                ((370, 135), 220, 32),
-                ((370, 180), 220, 32),
-                ((370, 330), 220, 32),
-                ((370, 360), 220, 32),
 
-                ((620, 135), 220, 32),
-                ((620, 180), 220, 32),
-                ((620, 330), 220, 32),
-                ((620, 360), 220, 32)
-            ]
-
-            for activity_type, positions in activity_positions.items():
-                if activity_type in activities_by_type and activities_by_type[activity_type]:
-
-                    top_activity = activities_by_type[activity_type][0]
+                # INVISIBLE RECTANGLES
+                invisible_rectangles = [
 
-                    display_name = top_activity['display_name'][:20]
-                    name_x, name_y = positions['name']
+                    ((130, 135), 220, 32),
+                    ((130, 180), 220, 32),
+                    ((130, 330), 220, 32),
+                    ((130, 360), 220, 32),
 
-                    if sort_by == "users":
-                        value = f"{top_activity.get('user_count', 0)} users"
-                    elif sort_by == "sessions":
-                        value = f"{top_activity.get('session_count', 0)} sessions"
-                    else:
-                        value = format_duration(top_activity.get(
-                            'total_duration_seconds', 0))
 
-                    value_x, value_y = positions['value']
+                    ((370, 135), 220, 32),
+                    ((370, 180), 220, 32),
+                    ((370, 330), 220, 32),
+                    ((370, 360), 220, 32),
 
-                    def fit_text_to_rect(text, target_x, target_y, rect_center_x, rect_center_y, rect_width, rect_height, is_left_aligned=True):
-                        font_sizes = [24, 22, 20, 18, 16]
+                    ((620, 135), 220, 32),
+                    ((620, 180), 220, 32),
+                    ((620, 330), 220, 32),
+                    ((620, 360), 220, 32)
+                ]
 
-                        for font_size in font_sizes:
-                            try:
-                                font = ImageFont.truetype(
-                                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", font_size)
-                            except:
-                                font = ImageFont.load_default()
+                for activity_type, positions in activity_positions.items():
+                    if activity_type in activities_by_type and activities_by_type[activity_type]:
 
-                            bbox = draw.textbbox((0, 0), text, font=font)
-                            text_width = bbox[2] - bbox[0]
-                            text_height = bbox[3] - bbox[1]
+                        top_activity = activities_by_type[activity_type][0]
 
-                            if is_left_aligned:
-                                text_x = target_x
-                            else:
-                                text_x = target_x - (text_width // 2)
-
-                            text_y = target_y - (text_height // 2)
-
-                            rect_left = rect_center_x - (rect_width // 2)
-                            rect_right = rect_center_x + (rect_width // 2)
-                            rect_top = rect_center_y - (rect_height // 2)
-                            rect_bottom = rect_center_y + (rect_height // 2)
-
-                            fits_h = (text_x >= rect_left - 1) and (text_x +
-                                                                    text_width <= rect_right + 1)
-                            fits_v = (text_y >= rect_top - 1) and (text_y +
-                                                                   text_height <= rect_bottom + 1)
-
-                            if fits_h and fits_v:
-                                return text, font, (text_x, text_y)
-
-                        smallest_font = 16
-                        try:
-                            font = ImageFont.truetype(
-                                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", smallest_font)
-                        except:
-                            font = ImageFont.load_default()
-
-                        current_text = text
-                        while len(current_text) > 3:
-                            current_text = current_text[:-4] + "..."
-                            bbox = draw.textbbox(
-                                (0, 0), current_text, font=font)
-                            text_width = bbox[2] - bbox[0]
-
-                            if is_left_aligned:
-                                text_x = target_x
-                            else:
-                                text_x = target_x - (text_width // 2)
-
-                            bbox = draw.textbbox(
-                                (0, 0), current_text, font=font)
-                            text_height = bbox[3] - bbox[1]
-                            text_y = target_y - (text_height // 2)
-
-                            if text_x + text_width <= rect_right:
-                                return current_text, font, (text_x, text_y)
-
-                        return text[:3] + "...", font, (target_x, target_y)
-
-                    rect_index = list(activity_positions.keys()
-                                      ).index(activity_type) * 2
-                    name_rect_center, name_rect_width, name_rect_height = invisible_rectangles[
-                        rect_index]
-                    value_rect_center, value_rect_width, value_rect_height = invisible_rectangles[
-                        rect_index + 1]
-
-                    fitted_name, name_font, name_pos = fit_text_to_rect(
-                        display_name, name_x, name_y,
-                        name_rect_center[0], name_rect_center[1],
-                        name_rect_width, name_rect_height,
-                        is_left_aligned=True
-                    )
+                        display_name = top_activity['display_name'][:20]
+                        name_x, name_y = positions['name']
 
-                    fitted_value, value_font, value_pos = fit_text_to_rect(
-                        value, value_x, value_y,
-                        value_rect_center[0], value_rect_center[1],
-                        value_rect_width, value_rect_height,
-                        is_left_aligned=True
-                    )
+                        if sort_by == "users":
+                            value = f"{top_activity.get('user_count', 0)} users"
+                        elif sort_by == "sessions":
+                            value = f"{top_activity.get('session_count', 0)} sessions"
+                        else:
+                            value = format_duration(top_activity.get(
+                                'total_duration_seconds', 0))
+
+                        value_x, value_y = positions['value']
+
+                        rect_index = list(activity_positions.keys()
+                                          ).index(activity_type) * 2
+                        name_rect_center, name_rect_width, name_rect_height = invisible_rectangles[
+                            rect_index]
+                        value_rect_center, value_rect_width, value_rect_height = invisible_rectangles[
+                            rect_index + 1]
+
+                        fitted_name, name_font, name_pos = fit_text_to_rectangle(
+                            display_name, FONT_PATH, [24, 22, 20, 18, 16], (name_x, name_y),
+                            (*name_rect_center, name_rect_width, name_rect_height),
+                            ink=False, tolerance=1
+                        )
 
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                draw.text((name_pos[0] + dx, name_pos[1] + dy),
-                                          fitted_name, font=name_font, fill="black")
+                        fitted_value, value_font, value_pos = fit_text_to_rectangle(
+                            value, FONT_PATH, [24, 22, 20, 18, 16], (value_x, value_y),
+                            (*value_rect_center, value_rect_width, value_rect_height),
+                            ink=False, tolerance=1
+                        )
 
-                    draw.text(name_pos, fitted_name,
-                              font=name_font, fill="white")
+                        stroke_width = 1
+                        draw_text_with_stroke(draw, name_pos, fitted_name,
+                                              name_font, "white", "black",
+                                              stroke_width)
 
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                draw.text((value_pos[0] + dx, value_pos[1] + dy),
-                                          fitted_value, font=value_font, fill="black")
+                        draw_text_with_stroke(draw, value_pos, fitted_value,
+                                              value_font, "white", "black",
+                                              stroke_width)
 
-                    draw.text(value_pos, fitted_value,
-                              font=value_font, fill="white")
+            return image
 
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        img_bytes = await render_service.render_card(compose, guild.id)
         return discord.File(img_bytes, filename="server_activity.png")
     except Exception as e:
         logger.error(f"Error generating server activity image: {e}")
@@ -2729,19 +2395,16 @@ async def generate_activity_leaderboard_image(guild: discord.Guild, leaderboard_
 
     try:
         template_path = BASE_DIR / "assets" / "images" / "leaderboards final png.png"
-        image = Image.open(template_path)
+        image = template_registry.get(template_path, "RGB")
     except FileNotFoundError:
         try:
             fallback_path = BASE_DIR / "assets" / "images" / "leaderboards final png.png"
-            image = Image.open(fallback_path)
+            image = template_registry.get(fallback_path, "RGB")
         except FileNotFoundError:
             image = Image.new('RGB', (800, 600), color='#2F3136')
 
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
     draw = ImageDraw.Draw(image)
-    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(FONT_PATH)
 
     # SERVER PROFILE PICTURE
     avatar_x, avatar_y = 7, 10
@@ -2749,229 +2412,139 @@ async def generate_activity_leaderboard_image(guild: discord.Guild, leaderboard_
 
     try:
         if guild.icon:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(guild.icon.url) as response:
-                    avatar_data = await response.read()
+            avatar_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
 
-            avatar_image = Image.open(io.BytesIO(avatar_data))
-            avatar_image = avatar_image.resize(
-                avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
+            paste_avatar(image, avatar_image, (avatar_x, avatar_y))
 
-            mask = Image.new('L', avatar_size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse((0, 0, avatar_size[0], avatar_size[1]), fill=255)
-            avatar_image.putalpha(mask)
+    except Exception as e:
+        print(f"  ❌ Could not add server icon: {e}")
 
-            avatar_area = image.crop(
-                (avatar_x, avatar_y, avatar_x +
-                 avatar_size[0], avatar_y + avatar_size[1])
-            ).convert('RGBA')
+    def compose():
 
-            avatar_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-            avatar_with_bg.paste(avatar_image, (0, 0), avatar_image)
-            avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-            image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+        # SERVER NAME
+        server_name = guild.name
+        text_start_x = 85
+        text_start_y = 30
 
-    except Exception as e:
-        print(f"  ❌ Could not add server icon: {e}")
+        servername_rect_center = (150, 30)
+        servername_rect_width = 183
+        servername_rect_height = 35
 
-    # SERVER NAME
-    server_name = guild.name
-    text_start_x = 85
-    text_start_y = 30
+        fitted_servername, servername_font, servername_pos = fit_text_to_rectangle(
+            server_name, FONT_PATH, SERVER_NAME_FONT_SIZES,
+            (text_start_x, text_start_y),
+            (*servername_rect_center, servername_rect_width, servername_rect_height),
+            offsets=SERVER_NAME_OFFSETS, ink=False, tolerance=1
+        )
 
-    servername_rect_center = (150, 30)
-    servername_rect_width = 183
-    servername_rect_height = 35
+        draw_text_with_stroke(draw, servername_pos, fitted_servername,
+                              servername_font, "white", "black", 1)
 
-    def fit_text_to_servername_rect(text, start_x, start_y, rect_center_x, rect_center_y, rect_width, rect_height):
-        font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
+        # Role filter / date / time range
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
+        draw_text_with_stroke(draw, (70, 424), role_text,
+                              font_small, "white", "black", 1)
 
-        for font_size in font_sizes:
-            try:
-                font = ImageFont.truetype(
-                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = start_x
-            text_y = start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if font_size <= 40:
-                vertical_offset += 1
-            if font_size <= 30:
-                vertical_offset += 1
-            if font_size <= 20:
-                vertical_offset += 1
-            if font_size <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            fits_h = (text_x >= rect_left - 1) and (text_x +
-                                                    text_width <= rect_right + 1)
-            fits_v = (text_y >= rect_top - 1) and (text_y +
-                                                   text_height <= rect_bottom + 1)
-
-            if fits_h and fits_v:
-                return text, font, (text_x, text_y)
-
-        smallest_font = 16
-        try:
-            font = ImageFont.truetype(
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", smallest_font)
-        except:
-            font = ImageFont.load_default()
-
-        current_text = server_name
-        while len(current_text) > 3:
-            current_text = current_text[:-4] + "..."
-            bbox = draw.textbbox((0, 0), current_text, font=font)
-            text_width = bbox[2] - bbox[0]
-
-            text_x = text_start_x
-            bbox = draw.textbbox((0, 0), current_text, font=font)
-            text_height = bbox[3] - bbox[1]
-            text_y = text_start_y - (text_height // 2)
-
-            if text_x + text_width <= rect_right:
-                return current_text, font, (text_x, text_y)
-
-        return server_name[:3] + "...", font, (text_start_x, text_start_y)
-
-    fitted_servername, servername_font, servername_pos = fit_text_to_servername_rect(
-        server_name, text_start_x, text_start_y,
-        servername_rect_center[0], servername_rect_center[1],
-        servername_rect_width, servername_rect_height
-    )
+        draw_text_with_stroke(
+            draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
+        draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+            "%B %d, %Y"), font_small, "white", "black", 1)
 
-    stroke_width = 1
-    for dx in [-stroke_width, 0, stroke_width]:
-        for dy in [-stroke_width, 0, stroke_width]:
-            if dx != 0 or dy != 0:
-                draw.text((servername_pos[0] + dx, servername_pos[1] + dy),
-                          fitted_servername, font=servername_font, fill="black")
-
-    draw.text(servername_pos, fitted_servername,
-              font=servername_font, fill="white")
-
-    # Role filter / date / time range
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-    draw_text_with_stroke(draw, (70, 424), role_text,
-                          font_small, "white", "black", 1)
-
-    draw_text_with_stroke(
-        draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
-    draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-        "%B %d, %Y"), font_small, "white", "black", 1)
-
-    total_items = len(leaderboard_data)
-    total_pages = max(1, (total_items + USERS_PER_PAGE - 1) // USERS_PER_PAGE)
-
-    if page >= total_pages:
-        page = total_pages - 1
-    if page < 0:
-        page = 0
-
-    draw_text_with_stroke(
-        draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
-
-    if leaderboard_data:
-        start_idx = page * USERS_PER_PAGE
-        end_idx = min(start_idx + USERS_PER_PAGE, len(leaderboard_data))
-        page_data = leaderboard_data[start_idx:end_idx]
-
-        image_width, _ = image.size
-
-        if len(page_data) <= 4:
-            positions = [(60, 100 + i * 65) for i in range(len(page_data))]
-            box_width, box_height = 600, 40
-        else:
-            box_width, box_height = 280, 40
-            box_spacing = 65
-            start_y = 100
-            total_box_width = (2 * box_width) + 15
-            start_x = (image_width - total_box_width) // 2
-            positions = [
-                (start_x + (i % 2) * (box_width + 15),
-                 start_y + (i // 2) * box_spacing)
-                for i in range(len(page_data))
-            ]
+        total_items = len(leaderboard_data)
+        total_pages = max(1, (total_items + USERS_PER_PAGE - 1) // USERS_PER_PAGE)
+
+        current_page = min(max(page, 0), total_pages - 1)
 
-        for i, (activity_data, (box_x, box_y)) in enumerate(zip(page_data, positions)):
-            global_rank = start_idx + i + 1
+        draw_text_with_stroke(
+            draw, (400, 450), f"Page {current_page + 1}/{total_pages}", font_medium, "white", "black", 1)
 
-            draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                   radius=8, fill=(0, 0, 0, 220), outline=None)
+        if leaderboard_data:
+            start_idx = current_page * USERS_PER_PAGE
+            end_idx = min(start_idx + USERS_PER_PAGE, len(leaderboard_data))
+            page_data = leaderboard_data[start_idx:end_idx]
 
-            placement_width = 35
+            image_width, _ = image.size
 
-            if global_rank == 1:
-                placement_color = (255, 215, 0, 220)  # Gold
-            elif global_rank == 2:
-                placement_color = (192, 192, 192, 220)  # Silver
-            elif global_rank == 3:
-                placement_color = (205, 127, 50, 220)  # Bronze
+            if len(page_data) <= 4:
+                positions = [(60, 100 + i * 65) for i in range(len(page_data))]
+                box_width, box_height = 600, 40
             else:
-                placement_color = (93, 0, 136, 255)  # Purple
+                box_width, box_height = 280, 40
+                box_spacing = 65
+                start_y = 100
+                total_box_width = (2 * box_width) + 15
+                start_x = (image_width - total_box_width) // 2
+                positions = [
+                    (start_x + (i % 2) * (box_width + 15),
+                     start_y + (i // 2) * box_spacing)
+                    for i in range(len(page_data))
+                ]
+
+            for i, (activity_data, (box_x, box_y)) in enumerate(zip(page_data, positions)):
+                global_rank = start_idx + i + 1
+
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                       radius=8, fill=(0, 0, 0, 220), outline=None)
+
+                placement_width = 35
+
+                if global_rank == 1:
+                    placement_color = (255, 215, 0, 220)  # Gold
+                elif global_rank == 2:
+                    placement_color = (192, 192, 192, 220)  # Silver
+                elif global_rank == 3:
+                    placement_color = (205, 127, 50, 220)  # Bronze
+                else:
+                    placement_color = (93, 0, 136, 255)  # Purple
 
-            draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                   radius=8, fill=placement_color, outline=None)
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                       radius=8, fill=placement_color, outline=None)
 
-            display_name = activity_data['display_name'][:20]
+                display_name = activity_data['display_name'][:20]
 
-            if sort_by == "users":
-                value_text = f"{format_user_count(activity_data['user_count'])} users"
-            elif sort_by == "sessions":
-                value_text = f"{format_user_count(activity_data['session_count'])} sessions"
-            else:
-                total_seconds = activity_data['total_duration_seconds'] or 0
-                value_text = format_duration(total_seconds)
-
-            rank_text = f"#{global_rank}"
-            rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-            rank_width = rank_bbox[2] - rank_bbox[0]
-            value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
-            value_width = value_bbox[2] - value_bbox[0]
-
-            if len(display_name) > 20:
-                display_name = display_name[:17] + "..."
-            draw_text_with_stroke(draw, (box_x + placement_width + 8, box_y + 10),
-                                  display_name, font_medium, "white", "black", 1)
-
-            rank_height = rank_bbox[3] - rank_bbox[1]
-            value_height = value_bbox[3] - value_bbox[1]
-            rank_y = box_y + (box_height - rank_height) // 2
-            value_y = box_y + (box_height - value_height) // 2
-
-            rank_x = box_x + (placement_width - rank_width) // 2
-            draw_text_with_stroke(draw, (rank_x, rank_y),
-                                  rank_text, font_medium, "white", "black", 1)
-
-            value_x = box_x + box_width - value_width - 8
-            draw_text_with_stroke(draw, (value_x, value_y),
-                                  value_text, font_medium, "white", "black", 1)
-    else:
+                if sort_by == "users":
+                    value_text = f"{format_user_count(activity_data['user_count'])} users"
+                elif sort_by == "sessions":
+                    value_text = f"{format_user_count(activity_data['session_count'])} sessions"
+                else:
+                    total_seconds = activity_data['total_duration_seconds'] or 0
+                    value_text = format_duration(total_seconds)
+
+                rank_text = f"#{global_rank}"
+                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                rank_width = rank_bbox[2] - rank_bbox[0]
+                value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
+                value_width = value_bbox[2] - value_bbox[0]
+
+                if len(display_name) > 20:
+                    display_name = display_name[:17] + "..."
+                draw_text_with_stroke(draw, (box_x + placement_width + 8, box_y + 10),
+                                      display_name, font_medium, "white", "black", 1)
+
+                rank_height = rank_bbox[3] - rank_bbox[1]
+                value_height = value_bbox[3] - value_bbox[1]
+                rank_y = box_y + (box_height - rank_height) // 2
+                value_y = box_y + (box_height - value_height) // 2
+
+                rank_x = box_x + (placement_width - rank_width) // 2
+                draw_text_with_stroke(draw, (rank_x, rank_y),
+                                      rank_text, font_medium, "white", "black", 1)
+
+                value_x = box_x + box_width - value_width - 8
+                draw_text_with_stroke(draw, (value_x, value_y),
+                                      value_text, font_medium, "white", "black", 1)
+        else:
+
+            cx, cy = image.size[0] // 2, image.size[1] // 2
+            draw_text_with_stroke(draw, (cx - 150, cy - 15),
+                                  "NO DATA AVAILABLE", font_larger, "white", "black", 1)
 
-        cx, cy = image.size[0] // 2, image.size[1] // 2
-        draw_text_with_stroke(draw, (cx - 150, cy - 15),
-                              "NO DATA AVAILABLE", font_larger, "white", "black", 1)
+        return image
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
     return discord.File(img_bytes, filename="activity_leaderboard.png")
 
 
@@ -1,13 +1,16 @@
-import os
 import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime, timedelta
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
 import io
 import textwrap
-import aiohttp
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font, font_or_default, fit_font_to_width
+from utils.render_toolkit import draw_text_with_stroke, step_offsets, fit_text_to_rectangle, paste_avatar
+from utils.templates import template_registry
+from utils.render_service import render_service
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -557,129 +560,21 @@ class AverageStats(commands.Cog):
 
         if max_width and text_width > max_width:
 
+            font_sizes = []
             font_size = int(font.size * 0.9)
-            while font_size > 10 and text_width > max_width:
-                current_font = ImageFont.truetype(self.font_path, font_size)
-                text_width = draw.textlength(text, font=current_font)
+            while font_size > 10:
+                font_sizes.append(font_size)
                 font_size = int(font_size * 0.9)
 
-        x, y = position
+            if font_sizes:
+                current_font = fit_font_to_width(self.font_path, text, max_width, font_sizes) \
+                    or get_font(self.font_path, font_sizes[-1])
 
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text,
-                              font=current_font, fill=stroke_color)
-
-        draw.text((x, y), text, font=current_font, fill=fill_color)
+        draw_text_with_stroke(draw, position, text, current_font,
+                              fill_color, stroke_color, stroke_width)
 
         return current_font
 
-    def _fit_text_to_rectangle(self, draw, text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
-
-        font_paths = [self.font_path]
-
-        font_sizes = [32, 30, 28, 26, 24, 22, 20, 18, 17, 16, 15, 14, 13]
-
-        rect_left = rect_center_x - (rect_width // 2)
-        rect_right = rect_center_x + (rect_width // 2)
-        rect_top = rect_center_y - (rect_height // 2)
-        rect_bottom = rect_center_y + (rect_height // 2)
-
-        for font_size in font_sizes:
-            try:
-                font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if font_size <= 40:
-                vertical_offset += 1
-            if font_size <= 30:
-                vertical_offset += 1
-            if font_size <= 20:
-                vertical_offset += 1
-            if font_size <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-                return text, font, (text_x, text_y)
-
-        smallest_font = 16
-        try:
-            font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                font_paths[0]) else ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-
-        vertical_offset = 0
-        if smallest_font <= 40:
-            vertical_offset += 1
-        if smallest_font <= 30:
-            vertical_offset += 1
-        if smallest_font <= 20:
-            vertical_offset += 1
-        if smallest_font <= 16:
-            vertical_offset += 1
-        text_y += vertical_offset
-
-        text_fits_horizontally = (
-            text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-        text_fits_vertically = (
-            text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-        if text_fits_horizontally and text_fits_vertically:
-            return text, font, (text_x, text_y)
-
-        current_text = text
-        while len(current_text) > 3:
-            current_text = current_text[:-4] + "..."
-            bbox = draw.textbbox((0, 0), current_text, font=font)
-            text_width = bbox[2] - bbox[0]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-            text_y += vertical_offset
-
-            if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-                return current_text, font, (text_x, text_y)
-
-        if len(text) > 3:
-            final_text = text[:3] + "..."
-        else:
-            final_text = text
-
-        bbox = draw.textbbox((0, 0), final_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-        text_y += vertical_offset
-
-        return final_text, font, (text_x, text_y)
-
     async def _add_profile_pic_and_name(self, image, draw, interaction, target_name, is_user_stats, user=None):
 
         positions = self.COMPATIBILITY_UI_POSITIONS
@@ -696,70 +591,40 @@ class AverageStats(commands.Cog):
         try:
             if is_user_stats and user and user.avatar:
                 # User profile picture
-                icon_url = user.avatar.url
+                icon_asset = user.avatar
             elif not is_user_stats and interaction.guild.icon:
                 # Server profile picture
-                icon_url = interaction.guild.icon.url
+                icon_asset = interaction.guild.icon
             else:
-                icon_url = None
-
-            if icon_url:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(icon_url) as response:
-                        icon_data = await response.read()
-
-                icon_image = Image.open(io.BytesIO(icon_data))
-                icon_image = icon_image.resize(
-                    avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
+                icon_asset = None
 
-                mask = Image.new('L', avatar_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse(
-                    (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                icon_image.putalpha(mask)
+            if icon_asset:
+                icon_image = await asset_cache.get_image(icon_asset, avatar_size, circle=True)
 
-                avatar_area = image.crop(
-                    (avatar_x, avatar_y, avatar_x +
-                     avatar_size[0], avatar_y + avatar_size[1])
-                ).convert('RGBA')
-
-                icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+                paste_avatar(image, icon_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"Could not add profile icon: {e}")
 
-        fitted_text, text_font, text_pos = self._fit_text_to_rectangle(
-            draw,
+        font_sizes = [32, 30, 28, 26, 24, 22, 20, 18, 17, 16, 15, 14, 13]
+        fitted_text, text_font, text_pos = fit_text_to_rectangle(
             target_name,
-            text_start_x,
-            text_start_y,
-            username_rectangle["center"][0],
-            username_rectangle["center"][1],
-            username_rectangle["width"],
-            username_rectangle["height"],
-            is_username=True
+            self.font_path,
+            font_sizes,
+            (text_start_x, text_start_y),
+            (*username_rectangle["center"], username_rectangle["width"], username_rectangle["height"]),
+            offsets=step_offsets(font_sizes, (40, 30, 20, 16)),
+            ink=False,
+            tolerance=1
         )
 
         if fitted_text and text_font:
 
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        draw.text((text_pos[0] + dx, text_pos[1] + dy),
-                                  fitted_text, font=text_font, fill="black")
-
-            draw.text(text_pos, fitted_text, font=text_font, fill="white")
+            draw_text_with_stroke(draw, text_pos, fitted_text, text_font,
+                                  "white", "black", 1)
         else:
 
-            try:
-                font_huge = ImageFont.truetype(self.font_path, 40) if os.path.exists(
-                    self.font_path) else ImageFont.load_default()
-            except:
-                font_huge = ImageFont.load_default()
+            font_huge = font_or_default(self.font_path, 40)
             draw.text((text_start_x, text_start_y),
                       target_name, font=font_huge, fill="white")
 
@@ -1001,19 +866,19 @@ class AverageStats(commands.Cog):
         try:
 
             background_path = self.user_background_path if is_user_stats else self.server_background_path
-            image = Image.open(background_path)
+            image = template_registry.get(background_path, "RGB")
             draw = ImageDraw.Draw(image)
 
             try:
-                font_huge = ImageFont.truetype(self.font_path, 40)
-                font_medium = ImageFont.truetype(self.font_path, 30)
-                font_small = ImageFont.truetype(self.font_path, 16)
+                font_huge = get_font(self.font_path, 40)
+                font_medium = get_font(self.font_path, 30)
+                font_small = get_font(self.font_path, 16)
             except Exception as font_error:
                 print(f"Font loading error: {font_error}")
 
-                font_huge = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_small = ImageFont.load_default()
+                font_huge = default_font()
+                font_medium = default_font()
+                font_small = default_font()
 
             if is_user_stats:
                 target_name = username
@@ -1026,66 +891,68 @@ class AverageStats(commands.Cog):
                 image, draw, interaction, target_name, is_user_stats, user_obj
             )
 
-            if is_user_stats:
-                role_text = ""
-            else:
-                role_text = "No Filter"
-                if role_id and role_id != "none":
-                    role = interaction.guild.get_role(int(role_id))
-                    role_text = role.name if role else "Unknown Role"
-
-            self._draw_text_with_stroke(draw, (70, 424), role_text,
-                                        font_small, "white", "black", 1)
-
-            # Time period and created on
-            self._draw_text_with_stroke(
-                draw, (630, 424), f"{days_back} days", font_small, "white", "black", 1)
-            self._draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-                "%B %d, %Y"), font_small, "white", "black", 1)
-
-            # Format numbers based on period
-            messages_formatted = self._format_number_for_period(
-                messages_avg, period)
-            voice_formatted = self._format_number_for_period(voice_avg, period)
-            emoji_formatted = self._format_number_for_period(emoji_avg, period)
-            invite_formatted = self._format_number_for_period(
-                invite_avg, period)
-            activity_formatted = self._format_number_for_period(
-                activity_avg, period)
-
-            # Messages
-            self._draw_text_with_stroke(
-                draw, (25, 130), messages_formatted, font_medium, "white", "black", max_width=200)
-            self._draw_text_with_stroke(
-                draw, (25, 165), f"{total_messages:,}", font_medium, "white", "black", max_width=200)
-
-            # Voice
-            self._draw_text_with_stroke(
-                draw, (270, 130), voice_formatted, font_medium, "white", "black", max_width=200)
-            self._draw_text_with_stroke(
-                draw, (270, 165), f"{total_voice:.0f}", font_medium, "white", "black", max_width=200)
-
-            # Emojis
-            self._draw_text_with_stroke(
-                draw, (515, 130), emoji_formatted, font_medium, "white", "black", max_width=200)
-            self._draw_text_with_stroke(
-                draw, (515, 165), f"{total_emojis:,}", font_medium, "white", "black", max_width=200)
-
-            # Invites
-            self._draw_text_with_stroke(
-                draw, (100, 285), invite_formatted, font_medium, "white", "black", max_width=200)
-            self._draw_text_with_stroke(
-                draw, (100, 335), f"{total_invites:,}", font_medium, "white", "black", max_width=200)
-
-            # Activities
-            self._draw_text_with_stroke(
-                draw, (405, 285), activity_formatted, font_medium, "white", "black", max_width=200)
-            self._draw_text_with_stroke(
-                draw, (405, 335), f"{total_activities:,}", font_medium, "white", "black", max_width=200)
-
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
+            def compose():
+
+                if is_user_stats:
+                    role_text = ""
+                else:
+                    role_text = "No Filter"
+                    if role_id and role_id != "none":
+                        role = interaction.guild.get_role(int(role_id))
+                        role_text = role.name if role else "Unknown Role"
+
+                self._draw_text_with_stroke(draw, (70, 424), role_text,
+                                            font_small, "white", "black", 1)
+
+                # Time period and created on
+                self._draw_text_with_stroke(
+                    draw, (630, 424), f"{days_back} days", font_small, "white", "black", 1)
+                self._draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+                    "%B %d, %Y"), font_small, "white", "black", 1)
+
+                # Format numbers based on period
+                messages_formatted = self._format_number_for_period(
+                    messages_avg, period)
+                voice_formatted = self._format_number_for_period(voice_avg, period)
+                emoji_formatted = self._format_number_for_period(emoji_avg, period)
+                invite_formatted = self._format_number_for_period(
+                    invite_avg, period)
+                activity_formatted = self._format_number_for_period(
+                    activity_avg, period)
+
+                # Messages
+                self._draw_text_with_stroke(
+                    draw, (25, 130), messages_formatted, font_medium, "white", "black", max_width=200)
+                self._draw_text_with_stroke(
+                    draw, (25, 165), f"{total_messages:,}", font_medium, "white", "black", max_width=200)
+
+                # Voice
+                self._draw_text_with_stroke(
+                    draw, (270, 130), voice_formatted, font_medium, "white", "black", max_width=200)
+                self._draw_text_with_stroke(
+                    draw, (270, 165), f"{total_voice:.0f}", font_medium, "white", "black", max_width=200)
+
+                # Emojis
+                self._draw_text_with_stroke(
+                    draw, (515, 130), emoji_formatted, font_medium, "white", "black", max_width=200)
+                self._draw_text_with_stroke(
+                    draw, (515, 165), f"{total_emojis:,}", font_medium, "white", "black", max_width=200)
+
+                # Invites
+                self._draw_text_with_stroke(
+                    draw, (100, 285), invite_formatted, font_medium, "white", "black", max_width=200)
+                self._draw_text_with_stroke(
+                    draw, (100, 335), f"{total_invites:,}", font_medium, "white", "black", max_width=200)
+
+                # Activities
+                self._draw_text_with_stroke(
+                    draw, (405, 285), activity_formatted, font_medium, "white", "black", max_width=200)
+                self._draw_text_with_stroke(
+                    draw, (405, 335), f"{total_activities:,}", font_medium, "white", "black", max_width=200)
+
+                return image
+
+            img_bytes = await render_service.render_card(compose, interaction.guild.id)
 
             filename = f"{'user' if is_user_stats else 'server'}_average_stats_{interaction.guild.id}.png"
             return discord.File(img_bytes, filename=filename)
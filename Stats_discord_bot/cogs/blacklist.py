@@ -893,6 +893,12 @@ class Blacklist(commands.Cog):
                 print(f"Error processing {entity_type} {entity_id_str}: {e}")
                 error_count += 1
 
+        if success_count > 0:
+            # Cached stats were computed under the old blacklist
+            db_cog = self.bot.get_cog('DatabaseStats')
+            if db_cog:
+                await db_cog.bump_blacklist_version(interaction.guild.id)
+
         type_display = {
             'user': ['user', 'users'],
             'channel': ['channel', 'channels'],
@@ -1,7 +1,4 @@
-import aiohttp
-import os
-import io
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import asyncio
 import time
 from datetime import timedelta, datetime
@@ -10,6 +7,11 @@ from discord import app_commands
 from discord.ext import commands
 import discord
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.render_toolkit import get_fonts, draw_text_with_stroke, fit_text_to_rectangle
+from utils.templates import template_registry
+from utils.render_service import render_service
+from utils.render_cache import cached_render
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,663 +42,429 @@ def format_message_count(count):
 
 # FONTS
 
-def get_fonts():
-
-    try:
-
-        custom_font_path = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
-        if os.path.exists(custom_font_path):
-            font_small = ImageFont.truetype(custom_font_path, 16)
-            font_medium = ImageFont.truetype(custom_font_path, 20)
-            font_large = ImageFont.truetype(custom_font_path, 24)
-            font_larger = ImageFont.truetype(custom_font_path, 30)
-            font_huge = ImageFont.truetype(custom_font_path, 40)
-            return font_small, font_medium, font_large, font_larger, font_huge
-    except:
-        pass
-
-    try:
-
-        font_small = ImageFont.truetype("arial.ttf", 16)
-        font_medium = ImageFont.truetype("arial.ttf", 20)
-        font_large = ImageFont.truetype("arial.ttf", 24)
-        font_larger = ImageFont.truetype("arial.ttf", 30)
-        font_huge = ImageFont.truetype("arial.ttf", 40)
-        return font_small, font_medium, font_large, font_larger, font_huge
-    except:
-        try:
-
-            font_small = ImageFont.truetype("Helvetica.ttf", 16)
-            font_medium = ImageFont.truetype("Helvetica.ttf", 20)
-            font_large = ImageFont.truetype("Helvetica.ttf", 24)
-            font_larger = ImageFont.truetype("Helvetica.ttf", 30)
-            font_huge = ImageFont.truetype("Helvetica.ttf", 40)
-            return font_small, font_medium, font_large, font_larger, font_huge
-        except:
-
-            font_small = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_large = ImageFont.load_default()
-            font_larger = ImageFont.load_default()
-            font_huge = ImageFont.load_default()
-            return font_small, font_medium, font_large, font_larger, font_huge
-
-
-def get_horndon_font(size=40):
-
-    custom_font_path = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
-    try:
-        if os.path.exists(custom_font_path):
-
-            return ImageFont.truetype(custom_font_path, size)
-    except Exception as e:
-        print(f"Warning: Could not load HorndonD font at size {size}: {e}")
-
-    try:
-        return ImageFont.truetype("arial.ttf", size)
-    except:
-        return ImageFont.load_default()
+FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
 
 # INVISIBLE RECTANGLE
 
-def check_text_against_rectangle(draw, text, font, text_x, text_y, rect_left, rect_top, rect_right, rect_bottom):
-
-    bbox = draw.textbbox((text_x, text_y), text, font=font)
-    text_left = bbox[0]
-    text_right = bbox[2]
-    text_top = bbox[1]
-    text_bottom = bbox[3]
+SERVER_NAME_FONT_SIZES = [40, 38, 36, 34, 32, 30, 28,
+                          26, 24, 22, 20, 18, 16, 14, 12, 10, 8]
+REGULAR_FONT_SIZES = [24, 22, 20, 18, 16, 14, 12, 10, 8]
 
-    exceeds_width = (text_left < rect_left) or (text_right > rect_right)
-    exceeds_height = (text_top < rect_top) or (text_bottom > rect_bottom)
 
-    return exceeds_width or exceeds_height
+def fit_server_name(text, text_x, text_y, rect):
 
+    # One pixel lower for every size step down
+    return fit_text_to_rectangle(text, FONT_PATH, SERVER_NAME_FONT_SIZES, (text_x, text_y), rect,
+                                 offsets=range(len(SERVER_NAME_FONT_SIZES)), middle=False)
 
-def fit_server_name(draw, text, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
 
-    rect_left = rect_center_x - (rect_width // 2)
-    rect_right = rect_center_x + (rect_width // 2)
-    rect_top = rect_center_y - (rect_height // 2)
-    rect_bottom = rect_center_y + (rect_height // 2)
+def fit_regular_text(text, text_x, text_y, rect):
 
-    font_sizes = [40, 38, 36, 34, 32, 30, 28,
-                  26, 24, 22, 20, 18, 16, 14, 12, 10, 8]
+    # One pixel lower for every two size steps down
+    return fit_text_to_rectangle(text, FONT_PATH, REGULAR_FONT_SIZES, (text_x, text_y), rect,
+                                 offsets=[idx // 2 for idx in range(len(REGULAR_FONT_SIZES))], middle=False)
 
-    for idx, font_size in enumerate(font_sizes):
 
-        font = get_horndon_font(font_size)
+# IMAGE GENERATION
 
-        vertical_offset = idx
-        adjusted_y = text_y + vertical_offset
+@cached_render('category_messages')
+async def generate_category_message_stats_image(guild: discord.Guild, category: discord.CategoryChannel, message_data: dict, days_back: int, role_id: str = None):
 
-        if not check_text_against_rectangle(draw, text, font, text_x, adjusted_y,
-                                            rect_left, rect_top, rect_right, rect_bottom):
-            return text, font, (text_x, adjusted_y), font_size
+    template_path = BASE_DIR / "assets" / "images" / \
+        "category message stats final png.png"
+    try:
+        image = template_registry.get(template_path, "RGB")
+    except FileNotFoundError:
+        image = Image.new('RGB', (800, 600), color='#2F3136')
 
-    smallest_font = font_sizes[-1]
-    font = get_horndon_font(smallest_font)
+    # Fetched up front, since the drawing below runs in a render thread
+    icon_image = None
+    if guild.icon:
+        try:
+            icon_image = await asset_cache.get_image(guild.icon, (20, 20))
+        except Exception as e:
+            print(f"❌ Could not load server icon: {e}")
 
-    truncated_text = text
-    while len(truncated_text) > 3:
-        truncated_text = truncated_text[:-4] + "..."
+    def compose():
 
-        vertical_offset = len(font_sizes) - 1
-        adjusted_y = text_y + vertical_offset
+        draw = ImageDraw.Draw(image)
 
-        if not check_text_against_rectangle(draw, truncated_text, font, text_x, adjusted_y,
-                                            rect_left, rect_top, rect_right, rect_bottom):
-            return truncated_text, font, (text_x, adjusted_y), smallest_font
+        font_small, font_medium, font_large, font_larger, font_huge = get_fonts(FONT_PATH, (16, 20, 24, 30, 40))
 
-    vertical_offset = len(font_sizes) - 1
-    final_text = text[:3] + "..." if len(text) > 3 else text
-    return final_text, font, (text_x, text_y + vertical_offset), smallest_font
+        #
+        server_name_rect = {"center": (135, 30), "width": 245, "height": 45}
 
+        username_rectangles = [
+            {"center": (70, 330), "width": 125, "height": 50},
+            {"center": (70, 385), "width": 125, "height": 50},
+            {"center": (70, 440), "width": 125, "height": 50},
+            {"center": (70, 495), "width": 125, "height": 50},
+            {"center": (70, 540), "width": 125, "height": 50}
+        ]
 
-def fit_regular_text(draw, text, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
+        channel_name_rectangles = [
+            {"center": (330, 385), "width": 125, "height": 50},
+            {"center": (330, 440), "width": 125, "height": 50},
+            {"center": (330, 495), "width": 125, "height": 50},
+            {"center": (330, 540), "width": 125, "height": 50},
+        ]
 
-    rect_left = rect_center_x - (rect_width // 2)
-    rect_right = rect_center_x + (rect_width // 2)
-    rect_top = rect_center_y - (rect_height // 2)
-    rect_bottom = rect_center_y + (rect_height // 2)
+        fitted_server_name, server_name_font, server_name_pos = fit_server_name(
+            guild.name, 30, 7, server_name_rect
+        )
 
-    font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
+        draw_text_with_stroke(draw, server_name_pos, fitted_server_name,
+                              server_name_font, "white", "black", 1)
 
-    for idx, font_size in enumerate(font_sizes):
         try:
-            custom_font_path = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
-            if os.path.exists(custom_font_path):
-
-                font = ImageFont.truetype(custom_font_path, font_size)
-            else:
-                font = ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-
-        vertical_offset = idx // 2
-        adjusted_y = text_y + vertical_offset
+            if icon_image:
 
-        if not check_text_against_rectangle(draw, text, font, text_x, adjusted_y,
-                                            rect_left, rect_top, rect_right, rect_bottom):
-            return text, font, (text_x, adjusted_y), font_size
+                bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
 
-    smallest_font = font_sizes[-1]
-    try:
-        custom_font_path = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
-        if os.path.exists(custom_font_path):
-            font = ImageFont.truetype(custom_font_path, smallest_font)
-        else:
-            font = ImageFont.load_default()
-    except:
-        font = ImageFont.load_default()
+                icon_x = 375 - (text_width // 2) - 29
+                icon_y = 75 - 10
 
-    truncated_text = text
-    while len(truncated_text) > 3:
-        truncated_text = truncated_text[:-4] + "..."
+                image.paste(icon_image, (int(icon_x), int(icon_y)))
 
-        vertical_offset = len(font_sizes) // 2
-        adjusted_y = text_y + vertical_offset
+                text_x = 375 - (text_width // 2)
+                draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name,
+                                      font_medium, "white", "black", 1)
 
-        if not check_text_against_rectangle(draw, truncated_text, font, text_x, adjusted_y,
-                                            rect_left, rect_top, rect_right, rect_bottom):
-            return truncated_text, font, (text_x, adjusted_y), smallest_font
+            else:
+                bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
+                text_x = 375 - (text_width // 2)
+                draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name,
+                                      font_medium, "white", "black", 1)
 
-    vertical_offset = len(font_sizes) // 2
-    final_text = text[:3] + "..." if len(text) > 3 else text
-    return final_text, font, (text_x, text_y + vertical_offset), smallest_font
+        except Exception as e:
+            print(f"❌ Could not add server icon: {e}")
 
+            bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
+            text_width = bbox[2] - bbox[0]
+            text_x = 375 - (text_width // 2)
+            draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name, font_medium,
+                                  "white", "black", 1)
 
-# STROKE
+        text_channels = [ch for ch in category.channels if isinstance(
+            ch, discord.TextChannel)]
+        channels_count = len(text_channels)
 
-def draw_text_with_stroke(draw, text, position, font, fill="white", stroke_fill="black", stroke_width=1):
+        draw_text_with_stroke(draw, (125, 160), str(channels_count), font_huge,
+                              "white", "black", 1)
 
-    x, y = position
+        total_messages = message_data.get('total_messages', 0)
+        draw_text_with_stroke(draw, (380, 160),
+                              format_message_count(total_messages), font_huge,
+                              "white", "black", 1)
 
-    for dx in [-stroke_width, 0, stroke_width]:
-        for dy in [-stroke_width, 0, stroke_width]:
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, fill=stroke_fill, font=font)
+        # CREATED ON
+        current_date = datetime.now().strftime("%B %d, %Y")
+        draw_text_with_stroke(draw, (550, 40), current_date, font_small, "white", "black", 1)
 
-    draw.text((x, y), text, fill=fill, font=font)
+        # ROLE
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
 
+        draw_text_with_stroke(draw, (590, 420), role_text, font_small, "white", "black", 1)
 
-# IMAGE GENERATION
+        # TIME PERIOD
+        time_period_text = f"{days_back} days"
 
-async def generate_category_message_stats_image(guild: discord.Guild, category: discord.CategoryChannel, message_data: dict, days_back: int, role_id: str = None):
+        draw_text_with_stroke(draw, (635, 458), time_period_text, font_small,
+                              "white", "black", 1)
 
-    template_path = BASE_DIR / "assets" / "images" / \
-        "category message stats final png.png"
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (800, 600), color='#2F3136')
+        top_users = message_data.get('users', Counter()).most_common(5)
 
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-    draw = ImageDraw.Draw(image)
-
-    font_small, font_medium, font_large, font_larger, font_huge = get_fonts()
-
-    #
-    server_name_rect = {"center": (135, 30), "width": 245, "height": 45}
-
-    username_rectangles = [
-        {"center": (70, 330), "width": 125, "height": 50},
-        {"center": (70, 385), "width": 125, "height": 50},
-        {"center": (70, 440), "width": 125, "height": 50},
-        {"center": (70, 495), "width": 125, "height": 50},
-        {"center": (70, 540), "width": 125, "height": 50}
-    ]
-
-    channel_name_rectangles = [
-        {"center": (330, 385), "width": 125, "height": 50},
-        {"center": (330, 440), "width": 125, "height": 50},
-        {"center": (330, 495), "width": 125, "height": 50},
-        {"center": (330, 540), "width": 125, "height": 50},
-    ]
-
-    fitted_server_name, server_name_font, server_name_pos, server_font_size = fit_server_name(
-        draw,
-        guild.name,
-        30,
-        7,
-        server_name_rect["center"][0],
-        server_name_rect["center"][1],
-        server_name_rect["width"],
-        server_name_rect["height"]
-    )
+        user_positions = [
+            (20, 320), (20, 375), (20, 430), (20, 485), (20, 535)
+        ]
+        message_positions = [
+            (195, 320), (195, 375), (195, 430), (195, 485), (195, 535)
+        ]
 
-    draw_text_with_stroke(
-        draw, fitted_server_name, server_name_pos, server_name_font
-    )
+        for i, ((user_id, message_count), (user_x, user_y), (msg_x, msg_y)) in enumerate(zip(top_users, user_positions, message_positions)):
+            member = guild.get_member(int(user_id))
+            username = member.name if member else f"User {user_id}"
 
-    try:
-        if guild.icon:
+            if i < len(username_rectangles):
+                rect_info = username_rectangles[i]
 
-            icon_url = guild.icon.url
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as response:
-                    icon_data = await response.read()
+                fitted_username, username_font, username_pos = fit_regular_text(
+                    username, user_x, user_y, rect_info
+                )
 
-            icon_image = Image.open(io.BytesIO(icon_data))
+                draw_text_with_stroke(draw, username_pos, fitted_username,
+                                      username_font, "white", "black", 1)
 
-            icon_size = (20, 20)
-            icon_image = icon_image.resize(icon_size, Image.Resampling.LANCZOS)
+            count_text = format_message_count(message_count)
+            draw_text_with_stroke(draw, (msg_x, msg_y), count_text, font_large,
+                                  "white", "black", 1)
 
-            bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
-            text_width = bbox[2] - bbox[0]
+        top_channels = message_data.get('channels', Counter()).most_common(5)
 
-            icon_x = 375 - (text_width // 2) - 29
-            icon_y = 75 - 10
+        channel_positions = [
+            (280, 320), (280, 375), (280, 430), (280, 485), (280, 535)
+        ]
+        channel_message_positions = [
+            (450, 320), (450, 375), (450, 430), (450, 485), (450, 535)
+        ]
 
-            image.paste(icon_image, (int(icon_x), int(icon_y)))
+        for i, ((channel_id, message_count), (chan_x, chan_y), (msg_x, msg_y)) in enumerate(zip(top_channels, channel_positions, channel_message_positions)):
+            channel = guild.get_channel(int(channel_id))
+            channel_name = channel.name if channel else f"Channel {channel_id}"
 
-            text_x = 375 - (text_width // 2)
-            draw_text_with_stroke(
-                draw, guild.name, (text_x, 75 - 13), font_medium
-            )
+            if i >= 1 and (i-1) < len(channel_name_rectangles):
+                rect_info = channel_name_rectangles[i-1]
 
-        else:
-            bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
-            text_width = bbox[2] - bbox[0]
-            text_x = 375 - (text_width // 2)
-            draw_text_with_stroke(
-                draw, guild.name, (text_x, 75 - 13), font_medium
-            )
+                fitted_channel_name, channel_font, channel_pos = fit_regular_text(
+                    channel_name, chan_x, chan_y, rect_info
+                )
 
-    except Exception as e:
-        print(f"❌ Could not add server icon: {e}")
+                draw_text_with_stroke(draw, channel_pos, fitted_channel_name,
+                                      channel_font, "white", "black", 1)
+            elif i == 0:
+
+                draw_text_with_stroke(draw, (chan_x, chan_y), channel_name,
+                                      font_large, "white", "black", 1)
+
+            count_text = format_message_count(message_count)
+            draw_text_with_stroke(draw, (msg_x, msg_y), count_text, font_large,
+                                  "white", "black", 1)
+
+        messages_over_days = {}
+        daily_data = message_data.get('daily', Counter())
+        for days in [1, 5, 10, 20, 30]:
+            if days <= days_back:
+                count = 0
+                for days_ago, msg_count in daily_data.items():
+                    if days_ago <= days:
+                        count += msg_count
+                messages_over_days[days] = count
+
+        time_positions = {
+            1: (670, 155),
+            5: (670, 210),
+            10: (670, 265),
+            20: (670, 315),
+            30: (670, 365)
+        }
 
-        bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
-        text_width = bbox[2] - bbox[0]
-        text_x = 375 - (text_width // 2)
-        draw_text_with_stroke(
-            draw, guild.name, (text_x, 75 - 13), font_medium
-        )
+        for days, (x, y) in time_positions.items():
+            message_count = messages_over_days.get(days, 0)
+            count_text = format_message_count(message_count)
 
-    text_channels = [ch for ch in category.channels if isinstance(
-        ch, discord.TextChannel)]
-    channels_count = len(text_channels)
+            draw_text_with_stroke(draw, (x, y), count_text, font_large, "white", "black", 1)
 
-    draw_text_with_stroke(
-        draw, str(channels_count), (125, 160), font_huge
-    )
+        return image
 
-    total_messages = message_data.get('total_messages', 0)
-    draw_text_with_stroke(
-        draw, format_message_count(total_messages), (380, 160), font_huge
-    )
+    img_bytes = await render_service.render_card(compose, guild.id)
 
-    # CREATED ON
-    current_date = datetime.now().strftime("%B %d, %Y")
-    draw_text_with_stroke(
-        draw, current_date, (550, 40), font_small
-    )
+    return img_bytes
 
-    # ROLE
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
 
-    draw_text_with_stroke(
-        draw, role_text, (590, 420), font_small
-    )
+@cached_render('category_voice')
+async def generate_category_voice_stats_image(guild: discord.Guild, category: discord.CategoryChannel, voice_data: dict, days_back: int, role_id: str = None):
 
-    # TIME PERIOD
-    time_period_text = f"{days_back} days"
+    template_path = BASE_DIR / "assets" / "images" / \
+        "category voice stats final png.png"
+    try:
+        image = template_registry.get(template_path, "RGB")
+    except FileNotFoundError:
 
-    draw_text_with_stroke(
-        draw, time_period_text, (635, 458), font_small
-    )
+        image = Image.new('RGB', (800, 600), color='#2F3136')
 
-    top_users = message_data.get('users', Counter()).most_common(5)
-
-    user_positions = [
-        (20, 320), (20, 375), (20, 430), (20, 485), (20, 535)
-    ]
-    message_positions = [
-        (195, 320), (195, 375), (195, 430), (195, 485), (195, 535)
-    ]
-
-    for i, ((user_id, message_count), (user_x, user_y), (msg_x, msg_y)) in enumerate(zip(top_users, user_positions, message_positions)):
-        member = guild.get_member(int(user_id))
-        username = member.name if member else f"User {user_id}"
-
-        if i < len(username_rectangles):
-            rect_info = username_rectangles[i]
-
-            fitted_username, username_font, username_pos, username_font_size = fit_regular_text(
-                draw,
-                username,
-                user_x,
-                user_y,
-                rect_info["center"][0],
-                rect_info["center"][1],
-                rect_info["width"],
-                rect_info["height"],
-            )
+    # Fetched up front, since the drawing below runs in a render thread
+    icon_image = None
+    if guild.icon:
+        try:
+            icon_image = await asset_cache.get_image(guild.icon, (20, 20))
+        except Exception as e:
+            print(f"❌ Could not load server icon: {e}")
 
-            draw_text_with_stroke(
-                draw, fitted_username, username_pos, username_font
-            )
+    def compose():
 
-        count_text = format_message_count(message_count)
-        draw_text_with_stroke(
-            draw, count_text, (msg_x, msg_y), font_large
-        )
+        draw = ImageDraw.Draw(image)
 
-    top_channels = message_data.get('channels', Counter()).most_common(5)
-
-    channel_positions = [
-        (280, 320), (280, 375), (280, 430), (280, 485), (280, 535)
-    ]
-    channel_message_positions = [
-        (450, 320), (450, 375), (450, 430), (450, 485), (450, 535)
-    ]
-
-    for i, ((channel_id, message_count), (chan_x, chan_y), (msg_x, msg_y)) in enumerate(zip(top_channels, channel_positions, channel_message_positions)):
-        channel = guild.get_channel(int(channel_id))
-        channel_name = channel.name if channel else f"Channel {channel_id}"
-
-        if i >= 1 and (i-1) < len(channel_name_rectangles):
-            rect_info = channel_name_rectangles[i-1]
-
-            fitted_channel_name, channel_font, channel_pos, channel_font_size = fit_regular_text(
-                draw,
-                channel_name,
-                chan_x,
-                chan_y,
-                rect_info["center"][0],
-                rect_info["center"][1],
-                rect_info["width"],
-                rect_info["height"],
-            )
+        font_small, font_medium, font_large, font_larger, font_huge = get_fonts(FONT_PATH, (16, 20, 24, 30, 40))
 
-            draw_text_with_stroke(
-                draw, fitted_channel_name, channel_pos, channel_font
-            )
-        elif i == 0:
+        server_name_rect = {"center": (135, 30), "width": 245, "height": 45}
 
-            draw_text_with_stroke(
-                draw, channel_name, (chan_x, chan_y), font_large
-            )
+        username_rectangles = [
+            {"center": (70, 330), "width": 125, "height": 50},
+            {"center": (70, 385), "width": 125, "height": 50},
+            {"center": (70, 440), "width": 125, "height": 50},
+            {"center": (70, 495), "width": 125, "height": 50},
+            {"center": (70, 540), "width": 125, "height": 50}
+        ]
 
-        count_text = format_message_count(message_count)
-        draw_text_with_stroke(
-            draw, count_text, (msg_x, msg_y), font_large
-        )
+        channel_name_rectangles = [
+            {"center": (330, 385), "width": 125, "height": 50},
+            {"center": (330, 440), "width": 125, "height": 50},
+            {"center": (330, 495), "width": 125, "height": 50},
+            {"center": (330, 540), "width": 125, "height": 50},
+        ]
 
-    messages_over_days = {}
-    daily_data = message_data.get('daily', Counter())
-    for days in [1, 5, 10, 20, 30]:
-        if days <= days_back:
-            count = 0
-            for days_ago, msg_count in daily_data.items():
-                if days_ago <= days:
-                    count += msg_count
-            messages_over_days[days] = count
-
-    time_positions = {
-        1: (670, 155),
-        5: (670, 210),
-        10: (670, 265),
-        20: (670, 315),
-        30: (670, 365)
-    }
-
-    for days, (x, y) in time_positions.items():
-        message_count = messages_over_days.get(days, 0)
-        count_text = format_message_count(message_count)
-
-        draw_text_with_stroke(
-            draw, count_text, (x, y), font_large
+        fitted_server_name, server_name_font, server_name_pos = fit_server_name(
+            guild.name, 30, 7, server_name_rect
         )
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+        draw_text_with_stroke(draw, server_name_pos, fitted_server_name,
+                              server_name_font, "white", "black", 1)
 
-    return img_bytes
-
-
-async def generate_category_voice_stats_image(guild: discord.Guild, category: discord.CategoryChannel, voice_data: dict, days_back: int, role_id: str = None):
+        try:
+            if icon_image:
 
-    template_path = BASE_DIR / "assets" / "images" / \
-        "category voice stats final png.png"
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
+                bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
 
-        image = Image.new('RGB', (800, 600), color='#2F3136')
+                icon_x = 375 - (text_width // 2) - 29
+                icon_y = 75 - 10
 
-    draw = ImageDraw.Draw(image)
-
-    font_small, font_medium, font_large, font_larger, font_huge = get_fonts()
-
-    server_name_rect = {"center": (135, 30), "width": 245, "height": 45}
-
-    username_rectangles = [
-        {"center": (70, 330), "width": 125, "height": 50},
-        {"center": (70, 385), "width": 125, "height": 50},
-        {"center": (70, 440), "width": 125, "height": 50},
-        {"center": (70, 495), "width": 125, "height": 50},
-        {"center": (70, 540), "width": 125, "height": 50}
-    ]
-
-    channel_name_rectangles = [
-        {"center": (330, 385), "width": 125, "height": 50},
-        {"center": (330, 440), "width": 125, "height": 50},
-        {"center": (330, 495), "width": 125, "height": 50},
-        {"center": (330, 540), "width": 125, "height": 50},
-    ]
-
-    fitted_server_name, server_name_font, server_name_pos, server_font_size = fit_server_name(
-        draw,
-        guild.name,
-        30,
-        7,
-        server_name_rect["center"][0],
-        server_name_rect["center"][1],
-        server_name_rect["width"],
-        server_name_rect["height"]
-    )
+                image.paste(icon_image, (int(icon_x), int(icon_y)))
 
-    draw_text_with_stroke(
-        draw, fitted_server_name, server_name_pos, server_name_font
-    )
+                text_x = 375 - (text_width // 2)
+                draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name,
+                                      font_medium, "white", "black", 1)
 
-    try:
-        if guild.icon:
-
-            icon_url = guild.icon.url
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as response:
-                    icon_data = await response.read()
+            else:
 
-            icon_image = Image.open(io.BytesIO(icon_data))
+                bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
+                text_x = 375 - (text_width // 2)
+                draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name,
+                                      font_medium, "white", "black", 1)
 
-            icon_size = (20, 20)
-            icon_image = icon_image.resize(icon_size, Image.Resampling.LANCZOS)
+        except Exception as e:
+            print(f"❌ Could not add server icon: {e}")
 
             bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
             text_width = bbox[2] - bbox[0]
+            text_x = 375 - (text_width // 2)
+            draw_text_with_stroke(draw, (text_x, 75 - 13), guild.name, font_medium,
+                                  "white", "black", 1)
 
-            icon_x = 375 - (text_width // 2) - 29
-            icon_y = 75 - 10
+        voice_channels = [ch for ch in category.channels if isinstance(
+            ch, discord.VoiceChannel)]
+        channels_count = len(voice_channels)
 
-            image.paste(icon_image, (int(icon_x), int(icon_y)))
+        draw_text_with_stroke(draw, (125, 160), str(channels_count), font_huge,
+                              "white", "black", 1)
 
-            text_x = 375 - (text_width // 2)
-            draw_text_with_stroke(
-                draw, guild.name, (text_x, 75 - 13), font_medium
-            )
+        total_seconds = voice_data.get('total_seconds', 0)
+        total_voice_text = format_voice_time(total_seconds)
 
-        else:
+        draw_text_with_stroke(draw, (380, 160), total_voice_text, font_huge,
+                              "white", "black", 1)
 
-            bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
-            text_width = bbox[2] - bbox[0]
-            text_x = 375 - (text_width // 2)
-            draw_text_with_stroke(
-                draw, guild.name, (text_x, 75 - 13), font_medium
-            )
+        # CREATED ON
+        current_date = datetime.now().strftime("%B %d, %Y")
 
-    except Exception as e:
-        print(f"❌ Could not add server icon: {e}")
+        draw_text_with_stroke(draw, (550, 40), current_date, font_small, "white", "black", 1)
 
-        bbox = draw.textbbox((0, 0), guild.name, font=font_medium)
-        text_width = bbox[2] - bbox[0]
-        text_x = 375 - (text_width // 2)
-        draw_text_with_stroke(
-            draw, guild.name, (text_x, 75 - 13), font_medium
-        )
+        # ROLE
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
 
-    voice_channels = [ch for ch in category.channels if isinstance(
-        ch, discord.VoiceChannel)]
-    channels_count = len(voice_channels)
+        draw_text_with_stroke(draw, (590, 420), role_text, font_small, "white", "black", 1)
 
-    draw_text_with_stroke(
-        draw, str(channels_count), (125, 160), font_huge
-    )
+        # TIME PERIOD
+        time_period_text = f"{days_back} days"
 
-    total_seconds = voice_data.get('total_seconds', 0)
-    total_voice_text = format_voice_time(total_seconds)
+        draw_text_with_stroke(draw, (635, 458), time_period_text, font_small,
+                              "white", "black", 1)
 
-    draw_text_with_stroke(
-        draw, total_voice_text, (380, 160), font_huge
-    )
+        top_users = voice_data.get('users', Counter()).most_common(5)
+        user_positions = [
+            (20, 320), (20, 375), (20, 430), (20, 485), (20, 535)
+        ]
+        voice_time_positions = [
+            (195, 320), (195, 375), (195, 430), (195, 485), (195, 535)
+        ]
 
-    # CREATED ON
-    current_date = datetime.now().strftime("%B %d, %Y")
+        for i, ((user_id, user_seconds), (user_x, user_y), (time_x, time_y)) in enumerate(zip(top_users, user_positions, voice_time_positions)):
+            member = guild.get_member(int(user_id))
+            username = member.name if member else f"User {user_id}"
 
-    draw_text_with_stroke(
-        draw, current_date, (550, 40), font_small
-    )
+            if i < len(username_rectangles):
+                rect_info = username_rectangles[i]
 
-    # ROLE
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
+                fitted_username, username_font, username_pos = fit_regular_text(
+                    username, user_x, user_y, rect_info
+                )
 
-    draw_text_with_stroke(
-        draw, role_text, (590, 420), font_small
-    )
+                draw_text_with_stroke(draw, username_pos, fitted_username,
+                                      username_font, "white", "black", 1)
 
-    # TIME PERIOD
-    time_period_text = f"{days_back} days"
+            voice_time_text = format_voice_time(user_seconds)
+            draw_text_with_stroke(draw, (time_x, time_y), voice_time_text,
+                                  font_large, "white", "black", 1)
 
-    draw_text_with_stroke(
-        draw, time_period_text, (635, 458), font_small
-    )
+        top_channels = voice_data.get('channels', Counter()).most_common(5)
 
-    top_users = voice_data.get('users', Counter()).most_common(5)
-    user_positions = [
-        (20, 320), (20, 375), (20, 430), (20, 485), (20, 535)
-    ]
-    voice_time_positions = [
-        (195, 320), (195, 375), (195, 430), (195, 485), (195, 535)
-    ]
-
-    for i, ((user_id, user_seconds), (user_x, user_y), (time_x, time_y)) in enumerate(zip(top_users, user_positions, voice_time_positions)):
-        member = guild.get_member(int(user_id))
-        username = member.name if member else f"User {user_id}"
-
-        if i < len(username_rectangles):
-            rect_info = username_rectangles[i]
-
-            fitted_username, username_font, username_pos, username_font_size = fit_regular_text(
-                draw,
-                username,
-                user_x,
-                user_y,
-                rect_info["center"][0],
-                rect_info["center"][1],
-                rect_info["width"],
-                rect_info["height"],
-            )
+        channel_positions = [
+            (280, 320), (280, 375), (280, 430), (280, 485), (280, 535)
+        ]
+        channel_voice_positions = [
+            (450, 320), (450, 375), (450, 430), (450, 485), (450, 535)
+        ]
 
-            draw_text_with_stroke(
-                draw, fitted_username, username_pos, username_font
-            )
+        for i, ((channel_id, channel_seconds), (chan_x, chan_y), (time_x, time_y)) in enumerate(zip(top_channels, channel_positions, channel_voice_positions)):
+            channel = guild.get_channel(int(channel_id))
+            channel_name = channel.name if channel else f"Channel {channel_id}"
 
-        voice_time_text = format_voice_time(user_seconds)
-        draw_text_with_stroke(
-            draw, voice_time_text, (time_x, time_y), font_large
-        )
+            if i >= 1 and (i-1) < len(channel_name_rectangles):
+                rect_info = channel_name_rectangles[i-1]
 
-    top_channels = voice_data.get('channels', Counter()).most_common(5)
-
-    channel_positions = [
-        (280, 320), (280, 375), (280, 430), (280, 485), (280, 535)
-    ]
-    channel_voice_positions = [
-        (450, 320), (450, 375), (450, 430), (450, 485), (450, 535)
-    ]
-
-    for i, ((channel_id, channel_seconds), (chan_x, chan_y), (time_x, time_y)) in enumerate(zip(top_channels, channel_positions, channel_voice_positions)):
-        channel = guild.get_channel(int(channel_id))
-        channel_name = channel.name if channel else f"Channel {channel_id}"
-
-        if i >= 1 and (i-1) < len(channel_name_rectangles):
-            rect_info = channel_name_rectangles[i-1]
-
-            fitted_channel_name, channel_font, channel_pos, channel_font_size = fit_regular_text(
-                draw,
-                channel_name,
-                chan_x,
-                chan_y,
-                rect_info["center"][0],
-                rect_info["center"][1],
-                rect_info["width"],
-                rect_info["height"],
-            )
+                fitted_channel_name, channel_font, channel_pos = fit_regular_text(
+                    channel_name, chan_x, chan_y, rect_info
+                )
 
-            draw_text_with_stroke(
-                draw, fitted_channel_name, channel_pos, channel_font
-            )
-        elif i == 0:
+                draw_text_with_stroke(draw, channel_pos, fitted_channel_name,
+                                      channel_font, "white", "black", 1)
+            elif i == 0:
+
+                draw_text_with_stroke(draw, (chan_x, chan_y), channel_name,
+                                      font_large, "white", "black", 1)
+
+            voice_time_text = format_voice_time(channel_seconds)
+            draw_text_with_stroke(draw, (time_x, time_y), voice_time_text,
+                                  font_large, "white", "black", 1)
+
+        voice_time_over_days = {}
+        daily_data = voice_data.get('daily', Counter())
+        for days in [1, 5, 10, 20, 30]:
+            if days <= days_back:
+                total_seconds = 0
+                for days_ago, seconds in daily_data.items():
+                    if days_ago <= days:
+                        total_seconds += seconds
+                voice_time_over_days[days] = total_seconds
+
+        time_positions = {
+            1: (670, 155),
+            5: (670, 210),
+            10: (670, 265),
+            20: (670, 315),
+            30: (670, 365)
+        }
 
-            draw_text_with_stroke(
-                draw, channel_name, (chan_x, chan_y), font_large
-            )
+        for days, (x, y) in time_positions.items():
+            seconds = voice_time_over_days.get(days, 0)
+            voice_time_text = format_voice_time(seconds)
 
-        voice_time_text = format_voice_time(channel_seconds)
-        draw_text_with_stroke(
-            draw, voice_time_text, (time_x, time_y), font_large
-        )
+            draw_text_with_stroke(draw, (x, y), voice_time_text, font_large,
+                                  "white", "black", 1)
 
-    voice_time_over_days = {}
-    daily_data = voice_data.get('daily', Counter())
-    for days in [1, 5, 10, 20, 30]:
-        if days <= days_back:
-            total_seconds = 0
-            for days_ago, seconds in daily_data.items():
-                if days_ago <= days:
-                    total_seconds += seconds
-            voice_time_over_days[days] = total_seconds
-
-    time_positions = {
-        1: (670, 155),
-        5: (670, 210),
-        10: (670, 265),
-        20: (670, 315),
-        30: (670, 365)
-    }
-
-    for days, (x, y) in time_positions.items():
-        seconds = voice_time_over_days.get(days, 0)
-        voice_time_text = format_voice_time(seconds)
-
-        draw_text_with_stroke(
-            draw, voice_time_text, (x, y), font_large
-        )
+        return image
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
 
     return img_bytes
 
@@ -1,6 +1,3 @@
-import numpy as np
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -8,54 +5,36 @@ import asyncpg
 import asyncio
 from datetime import datetime, timedelta
 import io
-import os
 from typing import Optional, Dict, List, Tuple, Set, Any
 from dotenv import load_dotenv
-import aiohttp
 import json
 from datetime import timezone
 from datetime import datetime, timedelta, date
 import traceback
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.render_cache import cached_render
+from utils.render_service import render_service
+from utils.line_chart import render_line_chart, date_to_number
+from utils.render_toolkit import draw_text_with_stroke, step_offsets, fit_text_to_rectangle, paste_avatar
+from utils.emoji_store import emoji_source
+from PIL import Image, ImageDraw
 from pilmoji import Pilmoji
-import matplotlib
-matplotlib.use('Agg')
 
 
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Where the line chart is pasted on the template
+CHART_SIZE = (644, 250)
 
-# DRAWING FUNCTIONS
-
-def draw_text_with_stroke(draw, position, text, font, text_color, stroke_color, stroke_width):
-
-    x, y = position
-
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font, fill=stroke_color)
-
-    draw.text((x, y), text, font=font, fill=text_color)
-
-
-def draw_text_with_stroke_and_emoji(pilmoji_draw, position, text, font, text_color, stroke_color, stroke_width):
-
-    x, y = position
-
-    temp_draw = pilmoji_draw._draw
-
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx != 0 or dy != 0:
-                pilmoji_draw.text((x + dx, y + dy), text, font=font,
-                                  fill=stroke_color, emoji_position_offset=(0, 0))
-
-    pilmoji_draw.text((x, y), text, font=font, fill=text_color,
-                      emoji_position_offset=(0, 0))
+# Card title: tried largest first, nudged down a pixel per 2pt step
+TITLE_FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
+TITLE_FONT_SIZES = (32, 30, 28, 26, 24, 22, 20, 18, 16)
+TITLE_OFFSETS = step_offsets(TITLE_FONT_SIZES, range(32, 15, -2))
 
 
 # ROLE SELECT MENU
@@ -333,12 +312,17 @@ class ChartView(discord.ui.View):
                 await self._safe_edit_response(interaction, content=f"❌ {data['error']}", view=self)
                 return
 
-            chart_img, timestamps, y_labels = self.cog.generate_professional_chart(
-                data, self.current_selection)
-            label = self.create_label(data)
-            final_image_bytes = await self.cog.draw_chart_on_template(
-                chart_img, label, self.current_days, self.selected_role_id,
-                timestamps, y_labels, self.current_selection, self.chart_type, self.target_id, self.guild_id)
+            # The header shows the target's name and avatar
+            guild = self.cog.bot.get_guild(self.guild_id)
+            header_target = None
+            if guild and self.chart_type == "user":
+                header_target = guild.get_member(self.target_id)
+            elif guild and self.chart_type in ("channel", "category"):
+                header_target = guild.get_channel(self.target_id)
+
+            final_image_bytes = await self.render_chart(
+                data, self.current_selection, self.current_days, self.selected_role_id,
+                self.chart_type, self.target_id, self.guild_id, guild, header_target)
 
             file = discord.File(final_image_bytes, filename='chart.png')
             self._update_buttons()
@@ -351,6 +335,19 @@ class ChartView(discord.ui.View):
             except:
                 pass
 
+    @cached_render('chart')
+    async def render_chart(self, data: Dict, selection: str, days: int, role_id: Optional[str],
+                           chart_type: str, target_id: int, guild_id: int,
+                           guild: Optional[discord.Guild], header_target: Any) -> io.BytesIO:
+
+        # guild and header_target only key the cache: the header shows them
+        chart_img, timestamps, y_labels = await self.cog.generate_professional_chart(
+            data, selection, guild_id)
+        label = self.create_label(data)
+        return await self.cog.draw_chart_on_template(
+            chart_img, label, days, role_id, timestamps, y_labels,
+            selection, chart_type, target_id, guild_id)
+
     def create_label(self, data: Dict) -> str:
 
         chart_type = self.current_selection
@@ -400,143 +397,36 @@ class ChartView(discord.ui.View):
                 intervals = self.current_days // 30
                 time_delta = timedelta(days=30)
 
-            points = []
-            total = 0
-
-            for i in range(intervals):
-                interval_start = end_time - time_delta * (i + 1)
-                interval_end = end_time - time_delta * i
+            if chart_type == "messages":
+                metric = 'messages'
+            elif chart_type == "voice_activity":
+                metric = 'voice'
+            elif chart_type == "invites" and self.chart_type in ("user", "server"):
+                metric = 'invites' if self.chart_type == "user" else 'valid_invites'
+            else:
+                return {'points': [], 'total': 0}
+
+            # Anchored on the end of the current hour rather than now, so
+            # the series' cache key holds for the rest of the hour
+            series_end = end_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+            series = await db_stats.q_metric_series(
+                guild_id=self.guild_id,
+                scope=self.chart_type,
+                metric=metric,
+                start_time=series_end - time_delta * intervals,
+                end_time=series_end,
+                bucket=time_delta,
+                target_id=None if self.chart_type == "server" else self.target_id,
+                role_filter_ids=role_filter_ids
+            )
 
-                if self.current_days <= 2:
-                    date_obj = interval_start
-                else:
-                    date_obj = interval_start.date()
-
-                if self.chart_type == "user":
-                    if chart_type == "messages":
-                        result = await db_stats.q_user_total_messages(
-                            guild_id=self.guild_id,
-                            user_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = result.get('total_messages', 0)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                    elif chart_type == "voice_activity":
-                        result = await db_stats.q_user_total_voice(
-                            guild_id=self.guild_id,
-                            user_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        seconds = result.get('total_seconds', 0)
-                        points.append(
-                            {'date': date_obj, 'total_seconds': seconds})
-                        total += seconds
-
-                    elif chart_type == "invites":
-                        result = await db_stats.q_user_invite_stats(
-                            guild_id=self.guild_id,
-                            user_id=self.target_id,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = result.get('total_invites', 0)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                elif self.chart_type == "server":
-                    if chart_type == "messages":
-                        result = await db_stats.q_server_total_messages(
-                            guild_id=self.guild_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = result.get('total_messages', 0)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                    elif chart_type == "voice_activity":
-                        result = await db_stats.q_server_total_voice(
-                            guild_id=self.guild_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        seconds = result.get('total_seconds', 0)
-                        points.append(
-                            {'date': date_obj, 'total_seconds': seconds})
-                        total += seconds
-
-                    elif chart_type == "invites":
-                        leaderboard = await db_stats.q_invite_leaderboard(
-                            guild_id=self.guild_id,
-                            limit=100,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = sum(item.get('valid_invites', 0)
-                                    for item in leaderboard)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                elif self.chart_type == "channel":
-                    if chart_type == "messages":
-                        result = await db_stats.q_channel_total_messages(
-                            guild_id=self.guild_id,
-                            channel_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = result.get('total_messages', 0)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                    elif chart_type == "voice_activity":
-                        result = await db_stats.q_channel_total_voice(
-                            guild_id=self.guild_id,
-                            channel_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        seconds = result.get('total_seconds', 0)
-                        points.append(
-                            {'date': date_obj, 'total_seconds': seconds})
-                        total += seconds
-
-                elif self.chart_type == "category":
-                    if chart_type == "messages":
-                        result = await db_stats.q_category_total_messages(
-                            guild_id=self.guild_id,
-                            category_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        count = result.get('total_messages', 0)
-                        points.append({'date': date_obj, 'count': count})
-                        total += count
-
-                    elif chart_type == "voice_activity":
-                        result = await db_stats.q_category_total_voice(
-                            guild_id=self.guild_id,
-                            category_id=self.target_id,
-                            role_filter_ids=role_filter_ids,
-                            start_time=interval_start,
-                            end_time=interval_end
-                        )
-                        seconds = result.get('total_seconds', 0)
-                        points.append(
-                            {'date': date_obj, 'total_seconds': seconds})
-                        total += seconds
+            value_key = 'total_seconds' if metric == 'voice' else 'count'
+            points = []
+            for interval_start, value in zip(series['bucket_starts'], series['values']):
+                date_obj = interval_start if self.current_days <= 2 else interval_start.date()
+                points.append({'date': date_obj, value_key: value})
+            total = series['total']
 
             points.sort(key=lambda x: x['date'])
             return {'points': points, 'total': total}
@@ -650,12 +540,8 @@ class ChartSystem(commands.Cog):
         interval = (x_end - x_start) / 7
         return [int(x_start + interval * i) for i in range(8)]
 
-    def generate_professional_chart(self, data: Dict, chart_type: str) -> Tuple[Image.Image, List[str], List[Tuple[float, str]]]:
-
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(6, 2.5), dpi=300,
-                               facecolor=(0, 0, 0, 0))
-        ax.set_axis_off()
+    async def generate_professional_chart(self, data: Dict, chart_type: str,
+                                          guild_id: Optional[int] = None) -> Tuple[Image.Image, List[str], List[Tuple[float, str]]]:
 
         colors = {
             'messages': '#4287f5',
@@ -665,6 +551,7 @@ class ChartSystem(commands.Cog):
 
         timestamps = []
         y_labels = []
+        series = []
 
         if chart_type in ['messages', 'voice_activity', 'invites']:
             points = data.get('points', [])
@@ -677,7 +564,7 @@ class ChartSystem(commands.Cog):
                 else:
                     values = [float(row['total_seconds']) for row in points]
 
-                dates_numeric = [mdates.date2num(date) for date in dates]
+                dates_numeric = [date_to_number(date) for date in dates]
 
                 max_value = max(values) if values else 1
 
@@ -703,21 +590,12 @@ class ChartSystem(commands.Cog):
 
                 timestamps = self.generate_dynamic_timestamps(points)
 
-                if len(dates_numeric) > 1:
-                    x_smooth = np.linspace(
-                        min(dates_numeric), max(dates_numeric), 500)
-                    y_smooth = np.interp(x_smooth, dates_numeric, values)
-
-                    from scipy.ndimage import gaussian_filter1d
-                    y_smooth = gaussian_filter1d(y_smooth, sigma=2)
-
-                    color = colors.get(chart_type, '#4287f5')
-                    ax.plot(x_smooth, y_smooth, linewidth=4, color=color,
-                            solid_capstyle='round', antialiased=True)
-                else:
-                    color = colors.get(chart_type, '#4287f5')
-                    ax.plot(dates_numeric, values, 'o',
-                            markersize=3, color=color, alpha=0.7)
+                series.append({
+                    'x': dates_numeric,
+                    'y': values,
+                    'color': colors.get(chart_type, '#4287f5'),
+                    'smooth': True
+                })
             else:
                 timestamps = [f"Day {i+1}" for i in range(8)]
                 y_labels = [
@@ -728,12 +606,10 @@ class ChartSystem(commands.Cog):
                     (0, "0")
                 ]
 
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', transparent=True,
-                    bbox_inches='tight', pad_inches=0, dpi=300)
-        buf.seek(0)
-        chart_img = Image.open(buf)
-        plt.close(fig)
+        # Plotting and rasterizing run in a render worker
+        chart_png = await render_service.render(
+            render_line_chart, {'series': series, 'size': CHART_SIZE}, guild_id)
+        chart_img = Image.open(io.BytesIO(chart_png))
 
         return chart_img, timestamps, y_labels
 
@@ -788,10 +664,10 @@ class ChartSystem(commands.Cog):
 
         current_date = datetime.now().strftime("%B %d, %Y")
         try:
-            horndon_font = ImageFont.truetype(
+            horndon_font = get_font(
                 BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
         except:
-            horndon_font = ImageFont.load_default()
+            horndon_font = default_font()
 
         draw_text_with_stroke(draw, (570, 38), current_date,
                               horndon_font, "white", "black", 2)
@@ -800,127 +676,6 @@ class ChartSystem(commands.Cog):
         if not guild:
             return template
 
-        # RECTANGLE FUNCTIONS
-
-        def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            font_paths = [
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf",]
-
-            font_sizes = [32, 30, 28, 26, 24, 22, 20,
-                          18, 16]
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 32:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 28:
-                    vertical_offset += 1
-                if font_size <= 26:
-                    vertical_offset += 1
-                if font_size <= 24:
-                    vertical_offset += 1
-                if font_size <= 22:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 18:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                text_fits_horizontally = (
-                    text_x + text_width + 5 <= rect_right + 1)
-                text_fits_vertically = (
-                    text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                if text_fits_horizontally and text_fits_vertically:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if smallest_font <= 32:
-                vertical_offset += 1
-            if smallest_font <= 30:
-                vertical_offset += 1
-            if smallest_font <= 28:
-                vertical_offset += 1
-            if smallest_font <= 26:
-                vertical_offset += 1
-            if smallest_font <= 24:
-                vertical_offset += 1
-            if smallest_font <= 22:
-                vertical_offset += 1
-            if smallest_font <= 20:
-                vertical_offset += 1
-            if smallest_font <= 18:
-                vertical_offset += 1
-            if smallest_font <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x + text_width + 5 <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-                return text, font, (text_x, text_y)
-
-            current_text = text
-            while len(current_text) > 3:
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-                text_y += vertical_offset
-
-                if (text_x + text_width + 5 <= rect_right + 1):
-                    return current_text, font, (text_x, text_y)
-
-            if len(text) > 3:
-                final_text = text[:3] + "..."
-            else:
-                final_text = text
-
-            return final_text, font, (text_x, text_y)
-
         target_name = guild.name
         use_server_icon = True
         target_member = None
@@ -957,121 +712,42 @@ class ChartSystem(commands.Cog):
             if use_server_icon:
 
                 if guild.icon:
-                    icon_url = guild.icon.url
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(icon_url) as response:
-                            icon_data = await response.read()
-
-                    icon_image = Image.open(io.BytesIO(icon_data))
-                    icon_image = icon_image.resize(
-                        avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                    mask = Image.new('L', avatar_size, 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse(
-                        (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                    icon_image.putalpha(mask)
-
-                    avatar_area = template.crop(
-                        (avatar_x, avatar_y, avatar_x +
-                         avatar_size[0], avatar_y + avatar_size[1])
-                    ).convert('RGBA')
-
-                    icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                    icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                    avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                    template.paste(avatar_area.convert(
-                        'RGB'), (avatar_x, avatar_y))
+                    icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                    paste_avatar(template, icon_image, (avatar_x, avatar_y))
             else:
 
                 if target_member and target_member.avatar:
-                    icon_url = target_member.avatar.url
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(icon_url) as response:
-                            icon_data = await response.read()
-
-                    icon_image = Image.open(io.BytesIO(icon_data))
-                    icon_image = icon_image.resize(
-                        avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                    mask = Image.new('L', avatar_size, 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse(
-                        (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                    icon_image.putalpha(mask)
-
-                    avatar_area = template.crop(
-                        (avatar_x, avatar_y, avatar_x +
-                         avatar_size[0], avatar_y + avatar_size[1])
-                    ).convert('RGBA')
-
-                    icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                    icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                    avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                    template.paste(avatar_area.convert(
-                        'RGB'), (avatar_x, avatar_y))
+                    icon_image = await asset_cache.get_image(target_member.avatar, avatar_size, circle=True)
+
+                    paste_avatar(template, icon_image, (avatar_x, avatar_y))
                 else:
                     if guild.icon:
-                        icon_url = guild.icon.url
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(icon_url) as response:
-                                icon_data = await response.read()
-
-                        icon_image = Image.open(io.BytesIO(icon_data))
-                        icon_image = icon_image.resize(
-                            avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                        mask = Image.new('L', avatar_size, 0)
-                        mask_draw = ImageDraw.Draw(mask)
-                        mask_draw.ellipse(
-                            (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                        icon_image.putalpha(mask)
-
-                        avatar_area = template.crop(
-                            (avatar_x, avatar_y, avatar_x +
-                             avatar_size[0], avatar_y + avatar_size[1])
-                        ).convert('RGBA')
-
-                        icon_with_bg = Image.new(
-                            'RGBA', avatar_size, (0, 0, 0, 0))
-                        icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                        avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                        template.paste(avatar_area.convert(
-                            'RGB'), (avatar_x, avatar_y))
+                        icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                        paste_avatar(template, icon_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"❌ Could not add profile picture: {e}")
 
         fitted_text, text_font, text_pos = fit_text_to_rectangle(
-            target_name,
-            text_start_x,
-            text_start_y,
-            username_rectangle["center"][0],
-            username_rectangle["center"][1],
-            username_rectangle["width"],
-            username_rectangle["height"]
-        )
+            target_name, TITLE_FONT_PATH, TITLE_FONT_SIZES,
+            (text_start_x, text_start_y), username_rectangle,
+            offsets=TITLE_OFFSETS, ink=False, tolerance=1, padding=5)
 
         if fitted_text and text_font:
-            with Pilmoji(template) as pilmoji:
+            with Pilmoji(template, source=emoji_source) as pilmoji:
 
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((text_pos[0] + dx, text_pos[1] + dy),
-                                         fitted_text, font=text_font, fill="black")
-
-                pilmoji.text(text_pos, fitted_text,
-                             font=text_font, fill="white")
+                draw_text_with_stroke(pilmoji, text_pos, fitted_text,
+                                      text_font, "white", "black", 1)
         else:
             try:
-                fallback_font = ImageFont.truetype(
+                fallback_font = get_font(
                     BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 32)
             except:
-                fallback_font = ImageFont.load_default()
+                fallback_font = default_font()
 
-            with Pilmoji(template) as pilmoji:
+            with Pilmoji(template, source=emoji_source) as pilmoji:
                 pilmoji.text((text_start_x, text_start_y),
                              target_name, font=fallback_font, fill="white")
 
@@ -1098,16 +774,14 @@ class ChartSystem(commands.Cog):
         template_path = template_paths.get(chart_type)
 
         try:
-            template = Image.open(template_path).convert("RGBA")
+            template = template_registry.get(template_path)
         except FileNotFoundError:
             template = Image.new('RGBA', (1200, 700), (47, 49, 54, 255))
             print(
                 f"⚠️ Template not found at {template_path}, using fallback background")
 
-        chart_width = 644
-        chart_height = 250
-        chart_img = chart_img.resize(
-            (chart_width, chart_height), Image.Resampling.LANCZOS)
+        if chart_img.size != CHART_SIZE:
+            chart_img = chart_img.resize(CHART_SIZE, Image.Resampling.LANCZOS)
         template.paste(chart_img, (38, 170), chart_img)
 
         try:
@@ -1116,95 +790,90 @@ class ChartSystem(commands.Cog):
             print(f"⚠️ Error drawing header: {e}")
             pass
 
-        draw = ImageDraw.Draw(template)
+        def compose():
 
-        try:
-            horndon_font = ImageFont.truetype(
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
-            horndon_small_font = ImageFont.truetype(
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 12)
-        except:
-            horndon_font = ImageFont.load_default()
-            horndon_small_font = ImageFont.load_default()
-
-        text_color = "white"
-        shadow_color = "black"
-
-        # TIME PERIOD
-        time_text = f"{days} days"
-        draw_text_with_stroke(draw, (133, 93), time_text,
-                              horndon_font, text_color, shadow_color, 1)
-
-        # ROLE FILTER
-        if target_type != "user":
-            role_text = "No Filter"
-            if role_id and role_id != "none":
-                guild = self.bot.get_guild(guild_id)
-                if guild:
-                    role = guild.get_role(int(role_id))
-                    role_text = role.name if role else "Unknown Role"
-
-            with Pilmoji(template) as pilmoji:
-
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((333 + dx, 95 + dy), role_text,
-                                         font=horndon_font, fill=shadow_color)
-
-                pilmoji.text((333, 95), role_text,
-                             font=horndon_font, fill=text_color)
-
-        total_value = "0"
-        if "Messages" in label_text:
-            total_value = label_text.split(
-                "Messages ")[1] if "Messages " in label_text else "0"
-
-            draw_text_with_stroke(draw, (623, 95), total_value, horndon_font,
-                                  text_color, shadow_color, 1)
-        elif "Voice Activity" in label_text:
-            total_value = label_text.split("Voice Activity ")[
-                1] if "Voice Activity " in label_text else "0"
-
-            draw_text_with_stroke(draw, (655, 95), total_value, horndon_font,
-                                  text_color, shadow_color, 1)
-        elif "Invites" in label_text:
-            total_value = label_text.split(
-                "Invites ")[1] if "Invites " in label_text else "0"
-
-            draw_text_with_stroke(draw, (600, 95), total_value, horndon_font,
-                                  text_color, shadow_color, 1)
-
-        if timestamps and len(timestamps) == 8:
-            x_positions = self.get_timestamp_x_positions()
-            timestamp_y_position = 430
-
-            for i, (timestamp, x_pos) in enumerate(zip(timestamps, x_positions)):
-                bbox = draw.textbbox(
-                    (0, 0), timestamp, font=horndon_small_font)
-                text_width = bbox[2] - bbox[0]
-                centered_x = x_pos - (text_width // 2)
-
-                draw_text_with_stroke(draw, (centered_x, timestamp_y_position),
-                                      timestamp, horndon_small_font, text_color, shadow_color, 1)
-
-        y_label_positions = [
-            (27, 145),
-            (27, 215),
-            (27, 280),
-            (27, 351),
-            (30, 410)
-        ]
+            draw = ImageDraw.Draw(template)
 
-        for (x, y), (value, label) in zip(y_label_positions, y_labels):
-            draw_text_with_stroke(draw, (x, y), label,
-                                  horndon_small_font, text_color, shadow_color, 1)
+            try:
+                horndon_font = get_font(
+                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
+                horndon_small_font = get_font(
+                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 12)
+            except:
+                horndon_font = default_font()
+                horndon_small_font = default_font()
+
+            text_color = "white"
+            shadow_color = "black"
+
+            # TIME PERIOD
+            time_text = f"{days} days"
+            draw_text_with_stroke(draw, (133, 93), time_text,
+                                  horndon_font, text_color, shadow_color, 1)
+
+            # ROLE FILTER
+            if target_type != "user":
+                role_text = "No Filter"
+                if role_id and role_id != "none":
+                    guild = self.bot.get_guild(guild_id)
+                    if guild:
+                        role = guild.get_role(int(role_id))
+                        role_text = role.name if role else "Unknown Role"
+
+                with Pilmoji(template, source=emoji_source) as pilmoji:
+
+                    draw_text_with_stroke(pilmoji, (333, 95), role_text,
+                                          horndon_font, text_color, shadow_color,
+                                          1)
+
+            total_value = "0"
+            if "Messages" in label_text:
+                total_value = label_text.split(
+                    "Messages ")[1] if "Messages " in label_text else "0"
+
+                draw_text_with_stroke(draw, (623, 95), total_value, horndon_font,
+                                      text_color, shadow_color, 1)
+            elif "Voice Activity" in label_text:
+                total_value = label_text.split("Voice Activity ")[
+                    1] if "Voice Activity " in label_text else "0"
+
+                draw_text_with_stroke(draw, (655, 95), total_value, horndon_font,
+                                      text_color, shadow_color, 1)
+            elif "Invites" in label_text:
+                total_value = label_text.split(
+                    "Invites ")[1] if "Invites " in label_text else "0"
+
+                draw_text_with_stroke(draw, (600, 95), total_value, horndon_font,
+                                      text_color, shadow_color, 1)
+
+            if timestamps and len(timestamps) == 8:
+                x_positions = self.get_timestamp_x_positions()
+                timestamp_y_position = 430
+
+                for i, (timestamp, x_pos) in enumerate(zip(timestamps, x_positions)):
+                    bbox = draw.textbbox(
+                        (0, 0), timestamp, font=horndon_small_font)
+                    text_width = bbox[2] - bbox[0]
+                    centered_x = x_pos - (text_width // 2)
+
+                    draw_text_with_stroke(draw, (centered_x, timestamp_y_position),
+                                          timestamp, horndon_small_font, text_color, shadow_color, 1)
+
+            y_label_positions = [
+                (27, 145),
+                (27, 215),
+                (27, 280),
+                (27, 351),
+                (30, 410)
+            ]
+
+            for (x, y), (value, label) in zip(y_label_positions, y_labels):
+                draw_text_with_stroke(draw, (x, y), label,
+                                      horndon_small_font, text_color, shadow_color, 1)
+
+            return template
 
-        output = io.BytesIO()
-        template.save(output, format='PNG')
-        output.seek(0)
-        return output
+        return await render_service.render_card(compose, guild_id)
 
     # COMMANDS
 
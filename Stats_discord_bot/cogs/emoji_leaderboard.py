@@ -5,15 +5,21 @@ from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 import re
 import asyncio
-import os
 from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
-import io
-import aiohttp
+from PIL import Image, ImageDraw
 from pilmoji import Pilmoji
 import traceback
 import json
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (get_fonts, draw_text_with_stroke, draw_text_centered_with_stroke,
+                                  draw_rounded_rectangle, step_offsets, fit_text_to_rectangle, paste_avatar)
+from utils.emoji_store import emoji_source
 
 
 load_dotenv()
@@ -36,6 +42,10 @@ class EmojiConfig:
     TEMPLATE_PATH = BASE_DIR / "assets" / "images" / "leaderboards final png.png"
     FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
+    # Server/channel name: tried largest first, nudged down as it shrinks
+    NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+    NAME_OFFSETS = step_offsets(NAME_FONT_SIZES, (40, 30, 20, 16))
+
     # Colors
     COLORS = {
         'gold': (255, 215, 0, 220),
@@ -46,233 +56,8 @@ class EmojiConfig:
     }
 
 
-# FONTS
-
-def get_fonts():
-
-    try:
-        # Try to load the custom font first
-        custom_font_path = EmojiConfig.FONT_PATH
-        if os.path.exists(custom_font_path):
-            font_small = ImageFont.truetype(custom_font_path, 16)
-            font_medium = ImageFont.truetype(custom_font_path, 20)
-            font_large = ImageFont.truetype(custom_font_path, 24)
-            font_larger = ImageFont.truetype(custom_font_path, 30)
-            font_huge = ImageFont.truetype(custom_font_path, 40)
-            font_giant = ImageFont.truetype(custom_font_path, 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        pass
-
-    try:
-        font_small = ImageFont.truetype("arial.ttf", 16)
-        font_medium = ImageFont.truetype("arial.ttf", 20)
-        font_large = ImageFont.truetype("arial.ttf", 24)
-        font_larger = ImageFont.truetype("arial.ttf", 30)
-        font_huge = ImageFont.truetype("arial.ttf", 40)
-        font_giant = ImageFont.truetype("arial.ttf", 60)
-        return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        try:
-            font_small = ImageFont.truetype("Helvetica.ttf", 16)
-            font_medium = ImageFont.truetype("Helvetica.ttf", 20)
-            font_large = ImageFont.truetype("Helvetica.ttf", 24)
-            font_larger = ImageFont.truetype("Helvetica.ttf", 30)
-            font_huge = ImageFont.truetype("Helvetica.ttf", 40)
-            font_giant = ImageFont.truetype("Helvetica.ttf", 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except:
-            font_small = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_large = ImageFont.load_default()
-            font_larger = ImageFont.load_default()
-            font_huge = ImageFont.load_default()
-            font_giant = ImageFont.load_default()
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-
-
-# DRAWING FUNCTIONS
-
-def draw_text_with_stroke_and_emoji(pilmoji, position, text, font, fill, stroke_fill="black", stroke_width=1):
-
-    x, y = position
-
-    for dx in [-stroke_width, 0, stroke_width]:
-        for dy in [-stroke_width, 0, stroke_width]:
-            if dx != 0 or dy != 0:
-                pilmoji.text((x + dx, y + dy), text,
-                             font=font, fill=stroke_fill)
-
-    pilmoji.text((x, y), text, font=font, fill=fill)
-
-
-def draw_text_centered_with_stroke_and_emoji(pilmoji, text, center_position, font, fill="white", stroke_fill="black", stroke_width=2, max_width=None):
-
-    center_x, center_y = center_position
-
-    temp_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
-    bbox = temp_draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    x = center_x - (text_width // 2)
-    y = center_y - (text_height // 2)
-
-    if max_width and text_width > max_width:
-        current_font = font
-        original_size = font.size
-
-        for size in range(original_size - 2, 8, -2):
-            try:
-                smaller_font = ImageFont.truetype(current_font.path, size)
-                bbox = temp_draw.textbbox((0, 0), text, font=smaller_font)
-                text_width = bbox[2] - bbox[0]
-
-                if text_width <= max_width:
-                    text_height = bbox[3] - bbox[1]
-                    x = center_x - (text_width // 2)
-                    y = center_y - (text_height // 2)
-                    draw_text_with_stroke_and_emoji(
-                        pilmoji, (x, y), text, smaller_font, fill, stroke_fill, stroke_width)
-                    return
-            except:
-                continue
-    draw_text_with_stroke_and_emoji(pilmoji, (x, y), text, font, fill,
-                                    stroke_fill, stroke_width)
-
-
-# RECTANGLE FUNCTIONS
-
-def draw_rounded_rectangle(draw, xy, radius, fill=None, outline=None):
-
-    x1, y1, x2, y2 = xy
-    draw.rectangle([x1 + radius, y1, x2 - radius, y2],
-                   fill=fill, outline=outline)
-    draw.rectangle([x1, y1 + radius, x2, y2 - radius],
-                   fill=fill, outline=outline)
-    draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2],
-                  180, 270, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2],
-                  270, 360, fill=fill, outline=outline)
-    draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2],
-                  90, 180, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2],
-                  0, 90, fill=fill, outline=outline)
-
-
-def fit_text_to_rectangle(draw, text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
-
-    font_paths = [BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-
-    initial_font_size = 40
-
-    rect_left = rect_center_x - (rect_width // 2)
-    rect_right = rect_center_x + (rect_width // 2)
-    rect_top = rect_center_y - (rect_height // 2)
-    rect_bottom = rect_center_y + (rect_height // 2)
-
-    font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-    for font_size in font_sizes:
-        try:
-            font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                font_paths[0]) else ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-
-        vertical_offset = 0
-        if font_size <= 40:
-            vertical_offset += 1
-        if font_size <= 30:
-            vertical_offset += 1
-        if font_size <= 20:
-            vertical_offset += 1
-        if font_size <= 16:
-            vertical_offset += 1
-        text_y += vertical_offset
-
-        text_fits_horizontally = (
-            text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-        text_fits_vertically = (
-            text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-        if text_fits_horizontally and text_fits_vertically:
-            return text, font, (text_x, text_y)
-
-    smallest_font = 16
-    try:
-        font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-            font_paths[0]) else ImageFont.load_default()
-    except:
-        font = ImageFont.load_default()
-
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    text_x = text_start_x
-    text_y = text_start_y - (text_height // 2)
-
-    vertical_offset = 0
-    if smallest_font <= 40:
-        vertical_offset += 1
-    if smallest_font <= 30:
-        vertical_offset += 1
-    if smallest_font <= 20:
-        vertical_offset += 1
-    if smallest_font <= 16:
-        vertical_offset += 1
-    text_y += vertical_offset
-
-    text_fits_horizontally = (
-        text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-    text_fits_vertically = (
-        text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-    if text_fits_horizontally and text_fits_vertically:
-        return text, font, (text_x, text_y)
-
-    current_text = text
-    while len(current_text) > 3:
-        current_text = current_text[:-4] + "..."
-        bbox = draw.textbbox((0, 0), current_text, font=font)
-        text_width = bbox[2] - bbox[0]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-
-        text_y += vertical_offset
-
-        if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-            return current_text, font, (text_x, text_y)
-
-    if len(text) > 3:
-        final_text = text[:3] + "..."
-    else:
-        final_text = text
-
-    bbox = draw.textbbox((0, 0), final_text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    text_x = text_start_x
-    text_y = text_start_y - (text_height // 2)
-    text_y += vertical_offset
-
-    return final_text, font, (text_x, text_y)
-
-
 async def add_server_profile_pic_and_name(image, guild, font_huge, channel=None):
 
-    temp_draw = ImageDraw.Draw(image)
-
     # POSITIONS
 
     # Profile picture at (7, 10)
@@ -291,57 +76,51 @@ async def add_server_profile_pic_and_name(image, guild, font_huge, channel=None)
     # SERVER PROFILE PICTURE
     try:
         if guild.icon:
-            icon_url = guild.icon.url
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as response:
-                    icon_data = await response.read()
-
-            icon_image = Image.open(io.BytesIO(icon_data))
-            icon_image = icon_image.resize(
-                avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-            mask = Image.new('L', avatar_size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse(
-                (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-            icon_image.putalpha(mask)
-
-            avatar_area = image.crop(
-                (avatar_x, avatar_y, avatar_x +
-                 avatar_size[0], avatar_y + avatar_size[1])
-            ).convert('RGBA')
-
-            icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-            icon_with_bg.paste(icon_image, (0, 0), icon_image)
-            avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-            image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+            icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+            paste_avatar(image, icon_image, (avatar_x, avatar_y))
 
     except Exception as e:
         print(f"❌ Could not add server icon: {e}")
 
-    with Pilmoji(image) as pilmoji:
+    with Pilmoji(image, source=emoji_source) as pilmoji:
         display_text = f"#{channel.name}" if channel else guild.name
 
         fitted_text, text_font, text_pos = fit_text_to_rectangle(
-            temp_draw,
-            display_text,
-            text_start_x,
-            text_start_y,
-            rect_center_x,
-            rect_center_y,
-            rect_width,
-            rect_height,
-            is_username=True
-        )
+            display_text, EmojiConfig.FONT_PATH, EmojiConfig.NAME_FONT_SIZES,
+            (text_start_x, text_start_y),
+            (rect_center_x, rect_center_y, rect_width, rect_height),
+            offsets=EmojiConfig.NAME_OFFSETS, ink=False, tolerance=1)
 
         if fitted_text and text_font:
-            draw_text_with_stroke_and_emoji(pilmoji, text_pos, fitted_text,
-                                            font=text_font, fill="white", stroke_fill="black", stroke_width=1)
+            draw_text_with_stroke(pilmoji, text_pos, fitted_text,
+                                  font=text_font, fill="white", stroke_fill="black", stroke_width=1)
         else:
-            draw_text_with_stroke_and_emoji(pilmoji, (text_start_x, text_start_y), display_text,
-                                            font=font_huge, fill="white", stroke_fill="black", stroke_width=1)
+            draw_text_with_stroke(pilmoji, (text_start_x, text_start_y), display_text,
+                                  font=font_huge, fill="white", stroke_fill="black", stroke_width=1)
+
+
+
+async def get_base_image(guild, font_huge, channel=None):
+
+    # Template with the server icon and server/channel name, drawn once per
+    # guild and channel and shared by both emoji cards
+    async def build_base():
+        template_path = EmojiConfig.TEMPLATE_PATH
+        try:
+            base = template_registry.get(template_path, "RGB")
+        except FileNotFoundError:
+            base = Image.new('RGB', (800, 600), color='#2F3136')
+            print(f"❌ Template not found at: {template_path}")
+
+        await add_server_profile_pic_and_name(base, guild, font_huge, channel)
+        return base
+
+    variant = f"#{channel.name}" if channel else None
+    return await layer_cache.get(guild, 'emoji_leaderboard', build_base, variant=variant)
 
 
+@cached_render('emoji_leaderboard')
 async def generate_emoji_leaderboard_image(
     guild: discord.Guild,
     leaderboard_data: list,
@@ -355,205 +134,199 @@ async def generate_emoji_leaderboard_image(
     channel: discord.TextChannel = None
 ):
 
-    template_path = EmojiConfig.TEMPLATE_PATH
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (800, 600), color='#2F3136')
-        print(f"❌ Template not found at: {template_path}")
-
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-    draw = ImageDraw.Draw(image)
-    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(EmojiConfig.FONT_PATH)
 
     if leaderboard_type == 'channel' and channel:
-        await add_server_profile_pic_and_name(image, guild, font_huge, channel)
+        image = await get_base_image(guild, font_huge, channel)
     else:
-        await add_server_profile_pic_and_name(image, guild, font_huge)
-
-    # ROLE FILTER / DATE / TIME RANGE
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-
-    with Pilmoji(image) as pilmoji:
-        # role filter
-        draw_text_with_stroke_and_emoji(pilmoji, (70, 424), role_text,
-                                        font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-        # time period
-        draw_text_with_stroke_and_emoji(pilmoji, (630, 422), f"{days_back} days",
-                                        font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-        # created on
-        draw_text_with_stroke_and_emoji(pilmoji, (550, 38), datetime.now(timezone.utc).strftime(
-            "%B %d, %Y"), font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-
-        # Pagination
-        draw_text_with_stroke_and_emoji(
-            pilmoji, (400, 450), f"Page {page + 1}/{total_pages}", font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
-
-        # LEADERBOARD CONTENT
-        if leaderboard_data:
-            start_idx = page * EmojiConfig.EMOJIS_PER_PAGE
-            end_idx = min(start_idx + EmojiConfig.EMOJIS_PER_PAGE,
-                          len(leaderboard_data))
-            page_data = leaderboard_data[start_idx:end_idx]
-
-            image_width, _ = image.size
-
-            if len(page_data) <= 5:
-                positions = [(60, 100 + i * 65) for i in range(len(page_data))]
-                box_width, box_height = 600, 40
-            else:
-                box_width, box_height = 280, 40
-                box_spacing = 65
-                start_y = 100
-                total_box_width = (2 * box_width) + 15
-                start_x = (image_width - total_box_width) // 2
-                positions = [
-                    (start_x + (i % 2) * (box_width + 15),
-                     start_y + (i // 2) * box_spacing)
-                    for i in range(len(page_data))
-                ]
-
-            for i, ((emoji_str, total_count, message_count, reaction_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
-                global_rank = start_idx + i + 1
-
-                draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                       radius=8, fill=EmojiConfig.COLORS['background'], outline=None)
-
-                placement_width = 35
-                if global_rank == 1:
-                    placement_color = EmojiConfig.COLORS['gold']  # Gold
-                elif global_rank == 2:
-                    placement_color = EmojiConfig.COLORS['silver']  # Silver
-                elif global_rank == 3:
-                    placement_color = EmojiConfig.COLORS['bronze']  # Bronze
-                else:
-                    placement_color = EmojiConfig.COLORS['default']  # Purple
+        image = await get_base_image(guild, font_huge)
 
-                draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                       radius=8, fill=placement_color, outline=None)
+    def compose():
 
-                total_uses = sum(count for _, count, _, _ in leaderboard_data)
-                percentage = (total_count / total_uses) * \
-                    100 if total_uses > 0 else 0
-                value_text = f"{total_count:,} uses ({percentage:.1f}%)"
+        draw = ImageDraw.Draw(image)
 
-                rank_text = f"#{global_rank}"
-                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-                rank_width = rank_bbox[2] - rank_bbox[0]
+        # ROLE FILTER / DATE / TIME RANGE
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
+
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            # role filter
+            draw_text_with_stroke(pilmoji, (70, 424), role_text,
+                                  font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+            # time period
+            draw_text_with_stroke(pilmoji, (630, 422), f"{days_back} days",
+                                  font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+            # created on
+            draw_text_with_stroke(pilmoji, (550, 38), datetime.now(timezone.utc).strftime(
+                "%B %d, %Y"), font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+
+            # Pagination
+            draw_text_with_stroke(
+                pilmoji, (400, 450), f"Page {page + 1}/{total_pages}", font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+
+            # LEADERBOARD CONTENT
+            if leaderboard_data:
+                start_idx = page * EmojiConfig.EMOJIS_PER_PAGE
+                end_idx = min(start_idx + EmojiConfig.EMOJIS_PER_PAGE,
+                              len(leaderboard_data))
+                page_data = leaderboard_data[start_idx:end_idx]
+
+                image_width, _ = image.size
+
+                if len(page_data) <= 5:
+                    positions = [(60, 100 + i * 65) for i in range(len(page_data))]
+                    box_width, box_height = 600, 40
+                else:
+                    box_width, box_height = 280, 40
+                    box_spacing = 65
+                    start_y = 100
+                    total_box_width = (2 * box_width) + 15
+                    start_x = (image_width - total_box_width) // 2
+                    positions = [
+                        (start_x + (i % 2) * (box_width + 15),
+                         start_y + (i // 2) * box_spacing)
+                        for i in range(len(page_data))
+                    ]
+
+                for i, ((emoji_str, total_count, message_count, reaction_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
+                    global_rank = start_idx + i + 1
+
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                           radius=8, fill=EmojiConfig.COLORS['background'], outline=None)
+
+                    placement_width = 35
+                    if global_rank == 1:
+                        placement_color = EmojiConfig.COLORS['gold']  # Gold
+                    elif global_rank == 2:
+                        placement_color = EmojiConfig.COLORS['silver']  # Silver
+                    elif global_rank == 3:
+                        placement_color = EmojiConfig.COLORS['bronze']  # Bronze
+                    else:
+                        placement_color = EmojiConfig.COLORS['default']  # Purple
 
-                value_bbox = draw.textbbox(
-                    (0, 0), value_text, font=font_medium)
-                value_width = value_bbox[2] - value_bbox[0]
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                           radius=8, fill=placement_color, outline=None)
 
-                emoji_name = ""
-                display_emoji = emoji_str
+                    total_uses = sum(count for _, count, _, _ in leaderboard_data)
+                    percentage = (total_count / total_uses) * \
+                        100 if total_uses > 0 else 0
+                    value_text = f"{total_count:,} uses ({percentage:.1f}%)"
 
-                if emoji_str.startswith('<') and emoji_str.endswith('>'):
+                    rank_text = f"#{global_rank}"
+                    rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                    rank_width = rank_bbox[2] - rank_bbox[0]
 
-                    emoji_parts = emoji_str.split(':')
-                    if len(emoji_parts) >= 3:
-                        emoji_name = emoji_parts[1]
+                    value_bbox = draw.textbbox(
+                        (0, 0), value_text, font=font_medium)
+                    value_width = value_bbox[2] - value_bbox[0]
 
-                        emoji_id = emoji_parts[2][:-1]
-                        guild_emoji = guild.get_emoji(int(emoji_id))
-                        if guild_emoji:
-                            display_emoji = str(guild_emoji)
-                    else:
-                        emoji_name = "custom"
-                else:
                     emoji_name = ""
+                    display_emoji = emoji_str
 
-                emoji_space = 40
-                if emoji_name:
-                    name_bbox = draw.textbbox(
-                        (0, 0), emoji_name, font=font_medium)
-                    name_width = name_bbox[2] - name_bbox[0]
-                    total_content_width = emoji_space + name_width + 10
-                else:
-                    total_content_width = emoji_space
+                    if emoji_str.startswith('<') and emoji_str.endswith('>'):
 
-                available_width = box_width - placement_width - value_width - 30
+                        emoji_parts = emoji_str.split(':')
+                        if len(emoji_parts) >= 3:
+                            emoji_name = emoji_parts[1]
 
-                name_font = font_medium
-                if emoji_name and total_content_width > available_width:
-                    try:
-                        smaller_font = ImageFont.truetype(font_medium.path, 16) if hasattr(
-                            font_medium, 'path') else font_small
-                        smaller_bbox = draw.textbbox(
-                            (0, 0), emoji_name, font=smaller_font)
-                        smaller_width = smaller_bbox[2] - smaller_bbox[0]
-
-                        if (emoji_space + smaller_width + 10) <= available_width:
-                            name_font = smaller_font
+                            emoji_id = emoji_parts[2][:-1]
+                            guild_emoji = guild.get_emoji(int(emoji_id))
+                            if guild_emoji:
+                                display_emoji = str(guild_emoji)
                         else:
-
-                            while len(emoji_name) > 3:
+                            emoji_name = "custom"
+                    else:
+                        emoji_name = ""
+
+                    emoji_space = 40
+                    if emoji_name:
+                        name_bbox = draw.textbbox(
+                            (0, 0), emoji_name, font=font_medium)
+                        name_width = name_bbox[2] - name_bbox[0]
+                        total_content_width = emoji_space + name_width + 10
+                    else:
+                        total_content_width = emoji_space
+
+                    available_width = box_width - placement_width - value_width - 30
+
+                    name_font = font_medium
+                    if emoji_name and total_content_width > available_width:
+                        try:
+                            smaller_font = get_font(font_medium.path, 16) if hasattr(
+                                font_medium, 'path') else font_small
+                            smaller_bbox = draw.textbbox(
+                                (0, 0), emoji_name, font=smaller_font)
+                            smaller_width = smaller_bbox[2] - smaller_bbox[0]
+
+                            if (emoji_space + smaller_width + 10) <= available_width:
+                                name_font = smaller_font
+                            else:
+
+                                while len(emoji_name) > 3:
+                                    emoji_name = emoji_name[:-4] + "..."
+                                    truncated_bbox = draw.textbbox(
+                                        (0, 0), emoji_name, font=name_font)
+                                    truncated_width = truncated_bbox[2] - \
+                                        truncated_bbox[0]
+                                    if (emoji_space + truncated_width + 10) <= available_width:
+                                        break
+                        except:
+
+                            while len(emoji_name) > 3 and (emoji_space + name_width + 10) > available_width:
                                 emoji_name = emoji_name[:-4] + "..."
-                                truncated_bbox = draw.textbbox(
+                                name_bbox = draw.textbbox(
                                     (0, 0), emoji_name, font=name_font)
-                                truncated_width = truncated_bbox[2] - \
-                                    truncated_bbox[0]
-                                if (emoji_space + truncated_width + 10) <= available_width:
-                                    break
-                    except:
-
-                        while len(emoji_name) > 3 and (emoji_space + name_width + 10) > available_width:
-                            emoji_name = emoji_name[:-4] + "..."
-                            name_bbox = draw.textbbox(
-                                (0, 0), emoji_name, font=name_font)
-                            name_width = name_bbox[2] - name_bbox[0]
-
-                rank_height = rank_bbox[3] - rank_bbox[1]
-                value_height = value_bbox[3] - value_bbox[1]
-
-                rank_y = box_y + (box_height - rank_height) // 2
-                value_y = box_y + (box_height - value_height) // 2
+                                name_width = name_bbox[2] - name_bbox[0]
 
-                rank_x = box_x + (placement_width - rank_width) // 2
-                draw_text_with_stroke_and_emoji(pilmoji, (rank_x, rank_y), rank_text,
-                                                font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+                    rank_height = rank_bbox[3] - rank_bbox[1]
+                    value_height = value_bbox[3] - value_bbox[1]
 
-                emoji_x = box_x + placement_width + 5
-                emoji_y = box_y + (box_height - 30) // 2 + 5
+                    rank_y = box_y + (box_height - rank_height) // 2
+                    value_y = box_y + (box_height - value_height) // 2
 
-                try:
+                    rank_x = box_x + (placement_width - rank_width) // 2
+                    draw_text_with_stroke(pilmoji, (rank_x, rank_y), rank_text,
+                                          font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
 
-                    pilmoji.text((emoji_x, emoji_y), display_emoji,
-                                 font=font_large, fill=(255, 255, 255))
-                except Exception as e:
-                    print(f"❌ Error drawing emoji {display_emoji}: {e}")
+                    emoji_x = box_x + placement_width + 5
+                    emoji_y = box_y + (box_height - 30) // 2 + 5
 
-                    pilmoji.text((emoji_x, emoji_y), display_emoji,
-                                 font=font_large, fill=(255, 255, 255))
+                    try:
 
-                if emoji_name:
-                    name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
-                        (0, 0), emoji_name, font=name_font)[3] - draw.textbbox((0, 0), emoji_name, font=name_font)[1]
-                    name_y = box_y + (box_height - name_height) // 2
-                    name_x = emoji_x + 35
-                    draw_text_with_stroke_and_emoji(pilmoji, (name_x, name_y), emoji_name,
-                                                    font=name_font, fill="white", stroke_fill="black", stroke_width=1)
+                        pilmoji.text((emoji_x, emoji_y), display_emoji,
+                                     font=font_large, fill=(255, 255, 255))
+                    except Exception as e:
+                        print(f"❌ Error drawing emoji {display_emoji}: {e}")
+
+                        pilmoji.text((emoji_x, emoji_y), display_emoji,
+                                     font=font_large, fill=(255, 255, 255))
+
+                    if emoji_name:
+                        name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
+                            (0, 0), emoji_name, font=name_font)[3] - draw.textbbox((0, 0), emoji_name, font=name_font)[1]
+                        name_y = box_y + (box_height - name_height) // 2
+                        name_x = emoji_x + 35
+                        draw_text_with_stroke(pilmoji, (name_x, name_y), emoji_name,
+                                              font=name_font, fill="white", stroke_fill="black", stroke_width=1)
+
+                    value_x = box_x + box_width - value_width - 8
+                    draw_text_with_stroke(pilmoji, (value_x, value_y), value_text,
+                                          font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+            else:
 
-                value_x = box_x + box_width - value_width - 8
-                draw_text_with_stroke_and_emoji(pilmoji, (value_x, value_y), value_text,
-                                                font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
-        else:
+                cx, cy = image.size[0] // 2, image.size[1] // 2
+                draw_text_centered_with_stroke(
+                    pilmoji, "NO DATA AVAILABLE", (cx, cy), font=font_giant, fill="white", stroke_fill="black", stroke_width=3)
 
-            cx, cy = image.size[0] // 2, image.size[1] // 2
-            draw_text_centered_with_stroke_and_emoji(
-                pilmoji, "NO DATA AVAILABLE", (cx, cy), font=font_giant, fill="white", stroke_fill="black", stroke_width=3)
+        return image
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
     return img_bytes
 
 
+@cached_render('user_emoji_leaderboard')
 async def generate_user_emoji_leaderboard_image(
     guild: discord.Guild,
     user_data: list,
@@ -564,173 +337,172 @@ async def generate_user_emoji_leaderboard_image(
     total_pages: int = 1
 ):
 
-    template_path = EmojiConfig.TEMPLATE_PATH
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (800, 600), color='#2F3136')
-        print(f"❌ Template not found at: {template_path}")
-
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-    draw = ImageDraw.Draw(image)
-    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
-
-    await add_server_profile_pic_and_name(image, guild, font_huge)
-
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-
-    with Pilmoji(image) as pilmoji:
-        # role filter
-        draw_text_with_stroke_and_emoji(pilmoji, (70, 424), role_text,
-                                        font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-        # time period
-        draw_text_with_stroke_and_emoji(pilmoji, (630, 422), f"{days_back} days",
-                                        font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-        # created on
-        draw_text_with_stroke_and_emoji(pilmoji, (550, 38), datetime.now(timezone.utc).strftime(
-            "%B %d, %Y"), font=font_small, fill="white", stroke_fill="black", stroke_width=1)
-
-        # pagination
-        draw_text_with_stroke_and_emoji(
-            pilmoji, (400, 450), f"Page {page + 1}/{total_pages}", font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
-
-        # LEADERBOARD CONTENT
-        if user_data:
-            start_idx = page * EmojiConfig.USERS_PER_PAGE
-            end_idx = min(start_idx + EmojiConfig.USERS_PER_PAGE,
-                          len(user_data))
-            page_data = user_data[start_idx:end_idx]
-
-            image_width, _ = image.size
-
-            if len(page_data) <= 5:
-                positions = [(60, 100 + i * 65) for i in range(len(page_data))]
-                box_width, box_height = 600, 40
-            else:
-                box_width, box_height = 280, 40
-                box_spacing = 65
-                start_y = 100
-                total_box_width = (2 * box_width) + 15
-                start_x = (image_width - total_box_width) // 2
-                positions = [
-                    (start_x + (i % 2) * (box_width + 15),
-                     start_y + (i // 2) * box_spacing)
-                    for i in range(len(page_data))
-                ]
-
-            for i, ((user_id, total_count, message_count, reaction_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
-                global_rank = start_idx + i + 1
-
-                draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                       radius=8, fill=EmojiConfig.COLORS['background'], outline=None)
-
-                placement_width = 35
-                if global_rank == 1:
-                    placement_color = EmojiConfig.COLORS['gold']  # Gold
-                elif global_rank == 2:
-                    placement_color = EmojiConfig.COLORS['silver']  # Silver
-                elif global_rank == 3:
-                    placement_color = EmojiConfig.COLORS['bronze']  # Bronze
-                else:
-                    placement_color = EmojiConfig.COLORS['default']  # Purple
+    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(EmojiConfig.FONT_PATH)
 
-                draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                       radius=8, fill=placement_color, outline=None)
+    image = await get_base_image(guild, font_huge)
 
-                total_uses = sum(count for _, count, _, _ in user_data)
-                percentage = (total_count / total_uses) * \
-                    100 if total_uses > 0 else 0
-                value_text = f"{total_count:,} uses ({percentage:.1f}%)"
+    # Names resolved up front, since the drawing below runs in a render thread
+    usernames = {}
+    page_start = page * EmojiConfig.USERS_PER_PAGE
+    for user_id, *_ in (user_data or [])[page_start:page_start + EmojiConfig.USERS_PER_PAGE]:
+        member = guild.get_member(user_id)
+        if member:
+            usernames[user_id] = member.display_name
+            continue
+        try:
+            user = await guild._state.fetch_user(user_id)
+            usernames[user_id] = user.name
+        except:
+            usernames[user_id] = f"Unknown User ({user_id})"
 
-                rank_text = f"#{global_rank}"
-                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-                rank_width = rank_bbox[2] - rank_bbox[0]
+    def compose():
 
-                value_bbox = draw.textbbox(
-                    (0, 0), value_text, font=font_medium)
-                value_width = value_bbox[2] - value_bbox[0]
+        draw = ImageDraw.Draw(image)
 
-                member = guild.get_member(user_id)
-                if member:
-                    username = member.display_name
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
+
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            # role filter
+            draw_text_with_stroke(pilmoji, (70, 424), role_text,
+                                  font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+            # time period
+            draw_text_with_stroke(pilmoji, (630, 422), f"{days_back} days",
+                                  font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+            # created on
+            draw_text_with_stroke(pilmoji, (550, 38), datetime.now(timezone.utc).strftime(
+                "%B %d, %Y"), font=font_small, fill="white", stroke_fill="black", stroke_width=1)
+
+            # pagination
+            draw_text_with_stroke(
+                pilmoji, (400, 450), f"Page {page + 1}/{total_pages}", font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+
+            # LEADERBOARD CONTENT
+            if user_data:
+                start_idx = page * EmojiConfig.USERS_PER_PAGE
+                end_idx = min(start_idx + EmojiConfig.USERS_PER_PAGE,
+                              len(user_data))
+                page_data = user_data[start_idx:end_idx]
+
+                image_width, _ = image.size
+
+                if len(page_data) <= 5:
+                    positions = [(60, 100 + i * 65) for i in range(len(page_data))]
+                    box_width, box_height = 600, 40
                 else:
-                    try:
-                        user = await guild._state.fetch_user(user_id)
-                        username = user.name
-                    except:
-                        username = f"Unknown User ({user_id})"
+                    box_width, box_height = 280, 40
+                    box_spacing = 65
+                    start_y = 100
+                    total_box_width = (2 * box_width) + 15
+                    start_x = (image_width - total_box_width) // 2
+                    positions = [
+                        (start_x + (i % 2) * (box_width + 15),
+                         start_y + (i // 2) * box_spacing)
+                        for i in range(len(page_data))
+                    ]
+
+                for i, ((user_id, total_count, message_count, reaction_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
+                    global_rank = start_idx + i + 1
+
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                           radius=8, fill=EmojiConfig.COLORS['background'], outline=None)
+
+                    placement_width = 35
+                    if global_rank == 1:
+                        placement_color = EmojiConfig.COLORS['gold']  # Gold
+                    elif global_rank == 2:
+                        placement_color = EmojiConfig.COLORS['silver']  # Silver
+                    elif global_rank == 3:
+                        placement_color = EmojiConfig.COLORS['bronze']  # Bronze
+                    else:
+                        placement_color = EmojiConfig.COLORS['default']  # Purple
 
-                available_width = box_width - placement_width - value_width - 30
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                           radius=8, fill=placement_color, outline=None)
 
-                name_bbox = draw.textbbox((0, 0), username, font=font_medium)
-                name_width = name_bbox[2] - name_bbox[0]
+                    total_uses = sum(count for _, count, _, _ in user_data)
+                    percentage = (total_count / total_uses) * \
+                        100 if total_uses > 0 else 0
+                    value_text = f"{total_count:,} uses ({percentage:.1f}%)"
 
-                name_font = font_medium
-                if name_width > available_width:
-                    try:
-                        smaller_font = ImageFont.truetype(font_medium.path, 16) if hasattr(
-                            font_medium, 'path') else font_small
-                        smaller_bbox = draw.textbbox(
-                            (0, 0), username, font=smaller_font)
-                        smaller_width = smaller_bbox[2] - smaller_bbox[0]
-
-                        if smaller_width <= available_width:
-                            name_font = smaller_font
-                        else:
+                    rank_text = f"#{global_rank}"
+                    rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                    rank_width = rank_bbox[2] - rank_bbox[0]
+
+                    value_bbox = draw.textbbox(
+                        (0, 0), value_text, font=font_medium)
+                    value_width = value_bbox[2] - value_bbox[0]
+
+                    username = usernames[user_id]
+
+                    available_width = box_width - placement_width - value_width - 30
+
+                    name_bbox = draw.textbbox((0, 0), username, font=font_medium)
+                    name_width = name_bbox[2] - name_bbox[0]
+
+                    name_font = font_medium
+                    if name_width > available_width:
+                        try:
+                            smaller_font = get_font(font_medium.path, 16) if hasattr(
+                                font_medium, 'path') else font_small
+                            smaller_bbox = draw.textbbox(
+                                (0, 0), username, font=smaller_font)
+                            smaller_width = smaller_bbox[2] - smaller_bbox[0]
+
+                            if smaller_width <= available_width:
+                                name_font = smaller_font
+                            else:
+
+                                display_name = username
+                                while len(display_name) > 3:
+                                    display_name = display_name[:-4] + "..."
+                                    truncated_bbox = draw.textbbox(
+                                        (0, 0), display_name, font=name_font)
+                                    truncated_width = truncated_bbox[2] - \
+                                        truncated_bbox[0]
+                                    if truncated_width <= available_width:
+                                        username = display_name
+                                        break
+                        except:
 
                             display_name = username
-                            while len(display_name) > 3:
+                            while len(display_name) > 3 and name_width > available_width:
                                 display_name = display_name[:-4] + "..."
-                                truncated_bbox = draw.textbbox(
+                                name_bbox = draw.textbbox(
                                     (0, 0), display_name, font=name_font)
-                                truncated_width = truncated_bbox[2] - \
-                                    truncated_bbox[0]
-                                if truncated_width <= available_width:
-                                    username = display_name
-                                    break
-                    except:
-
-                        display_name = username
-                        while len(display_name) > 3 and name_width > available_width:
-                            display_name = display_name[:-4] + "..."
-                            name_bbox = draw.textbbox(
-                                (0, 0), display_name, font=name_font)
-                            name_width = name_bbox[2] - name_bbox[0]
-                        username = display_name
-
-                rank_height = rank_bbox[3] - rank_bbox[1]
-                name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
-                    (0, 0), username, font=name_font)[3] - draw.textbbox((0, 0), username, font=name_font)[1]
-                value_height = value_bbox[3] - value_bbox[0]
-
-                rank_y = box_y + (box_height - rank_height) // 2
-                name_y = box_y + (box_height - name_height) // 2
-                value_y = box_y + (box_height - value_height) // 2
-
-                rank_x = box_x + (placement_width - rank_width) // 2
-                draw_text_with_stroke_and_emoji(pilmoji, (rank_x, rank_y), rank_text,
-                                                font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
-
-                name_x = box_x + placement_width + 8
-                draw_text_with_stroke_and_emoji(pilmoji, (name_x, name_y), username,
-                                                font=name_font, fill="white", stroke_fill="black", stroke_width=1)
-
-                value_x = box_x + box_width - value_width - 8
-                draw_text_with_stroke_and_emoji(pilmoji, (value_x, value_y), value_text,
-                                                font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
-        else:
-            cx, cy = image.size[0] // 2, image.size[1] // 2
-            draw_text_centered_with_stroke_and_emoji(
-                pilmoji, "NO DATA AVAILABLE", (cx, cy), font=font_giant, fill="white", stroke_fill="black", stroke_width=3)
+                                name_width = name_bbox[2] - name_bbox[0]
+                            username = display_name
+
+                    rank_height = rank_bbox[3] - rank_bbox[1]
+                    name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
+                        (0, 0), username, font=name_font)[3] - draw.textbbox((0, 0), username, font=name_font)[1]
+                    value_height = value_bbox[3] - value_bbox[0]
+
+                    rank_y = box_y + (box_height - rank_height) // 2
+                    name_y = box_y + (box_height - name_height) // 2
+                    value_y = box_y + (box_height - value_height) // 2
+
+                    rank_x = box_x + (placement_width - rank_width) // 2
+                    draw_text_with_stroke(pilmoji, (rank_x, rank_y), rank_text,
+                                          font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+
+                    name_x = box_x + placement_width + 8
+                    draw_text_with_stroke(pilmoji, (name_x, name_y), username,
+                                          font=name_font, fill="white", stroke_fill="black", stroke_width=1)
+
+                    value_x = box_x + box_width - value_width - 8
+                    draw_text_with_stroke(pilmoji, (value_x, value_y), value_text,
+                                          font=font_medium, fill="white", stroke_fill="black", stroke_width=1)
+            else:
+                cx, cy = image.size[0] // 2, image.size[1] // 2
+                draw_text_centered_with_stroke(
+                    pilmoji, "NO DATA AVAILABLE", (cx, cy), font=font_giant, fill="white", stroke_fill="black", stroke_width=3)
+
+        return image
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
     return img_bytes
 
 
@@ -1,6 +1,4 @@
 import numpy as np
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -11,47 +9,30 @@ import io
 import os
 from typing import Optional, Dict, List, Tuple
 from dotenv import load_dotenv
-import aiohttp
 import traceback
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.render_service import render_service
+from utils.line_chart import render_line_chart, date_to_number
+from utils.render_toolkit import draw_text_with_stroke, step_offsets, fit_text_to_rectangle, paste_avatar
+from utils.emoji_store import emoji_source
+from PIL import Image, ImageDraw
 from pilmoji import Pilmoji
-import matplotlib
-matplotlib.use('Agg')
 
 
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Where the line chart is pasted on the template
+CHART_SIZE = (644, 250)
 
-# DRAWING FUNCTIONS
-
-def draw_text_with_stroke(draw, position, text, font, text_color, stroke_color, stroke_width):
-
-    x, y = position
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font, fill=stroke_color)
-
-    draw.text((x, y), text, font=font, fill=text_color)
-
-
-def draw_text_with_stroke_and_emoji(pilmoji_draw, position, text, font, text_color, stroke_color, stroke_width):
-
-    x, y = position
-
-    temp_draw = pilmoji_draw._draw
-
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx != 0 or dy != 0:
-                pilmoji_draw.text((x + dx, y + dy), text, font=font,
-                                  fill=stroke_color, emoji_position_offset=(0, 0))
-
-    pilmoji_draw.text((x, y), text, font=font, fill=text_color,
-                      emoji_position_offset=(0, 0))
+# Card title: tried largest first, nudged down a pixel per 2pt step
+TITLE_FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
+TITLE_FONT_SIZES = (32, 30, 28, 26, 24, 22, 20, 18, 16)
+TITLE_OFFSETS = step_offsets(TITLE_FONT_SIZES, range(32, 15, -2))
 
 
 # TIME SETTINGS MODAL
@@ -288,8 +269,8 @@ class GrowthView(discord.ui.View):
                 await self._safe_edit_response(interaction, content="❌ No growth data available", view=self)
                 return
 
-            chart_img, timestamps, y_labels = self.cog.generate_growth_chart(
-                data, self.current_days, self.growth_type)
+            chart_img, timestamps, y_labels = await self.cog.generate_growth_chart(
+                data, self.current_days, self.growth_type, self.guild_id)
 
             label = self.create_label(data, self.current_days)
 
@@ -565,6 +546,39 @@ class GrowthSystem(commands.Cog):
 
     # QUERY METHODS
 
+    async def q_growth_series(self, conn, guild_id: int, start_date: date, days: int) -> Dict:
+
+        rows = await conn.fetch("""
+            SELECT
+                d.day::date AS day,
+                COALESCE(j.joins, 0) AS joins,
+                COALESCE(l.leaves, 0) AS leaves
+            FROM generate_series($2::date, $2::date + ($3 - 1), INTERVAL '1 day') AS d(day)
+            LEFT JOIN (
+                SELECT DATE(join_time) AS day, COUNT(*) AS joins
+                FROM member_joins
+                WHERE guild_id = $1
+                AND join_time >= $2::date
+                AND join_time < $2::date + $3
+                GROUP BY DATE(join_time)
+            ) j ON j.day = d.day::date
+            LEFT JOIN (
+                SELECT DATE(leave_time) AS day, COUNT(*) AS leaves
+                FROM member_leaves
+                WHERE guild_id = $1
+                AND leave_time >= $2::date
+                AND leave_time < $2::date + $3
+                GROUP BY DATE(leave_time)
+            ) l ON l.day = d.day::date
+            ORDER BY d.day;
+        """, guild_id, start_date, days)
+
+        return {
+            'dates': [row['day'] for row in rows],
+            'joins': [row['joins'] for row in rows],
+            'leaves': [row['leaves'] for row in rows]
+        }
+
     async def fetch_historical_growth(self, guild_id: int, days: int = 14) -> Dict:
 
         print(
@@ -583,30 +597,12 @@ class GrowthSystem(commands.Cog):
                 print(
                     f"📊 GrowthSystem: Querying from {start_date} to {current_utc.date()} (inclusive, {days} days)")
 
-                joins_points = []
-                leaves_points = []
-
-                for day_offset in range(days):
-                    current_date = start_date + timedelta(days=day_offset)
+                series = await self.q_growth_series(conn, guild_id, start_date, days)
 
-                    daily_joins = await conn.fetchval("""
-                        SELECT COUNT(*) 
-                        FROM member_joins 
-                        WHERE guild_id = $1 
-                        AND DATE(join_time) = $2;
-                    """, guild_id, current_date) or 0
-
-                    daily_leaves = await conn.fetchval("""
-                        SELECT COUNT(*) 
-                        FROM member_leaves 
-                        WHERE guild_id = $1 
-                        AND DATE(leave_time) = $2;
-                    """, guild_id, current_date) or 0
-
-                    joins_points.append(
-                        {'date': current_date, 'count': daily_joins})
-                    leaves_points.append(
-                        {'date': current_date, 'count': daily_leaves})
+                joins_points = [{'date': current_date, 'count': joins}
+                                for current_date, joins in zip(series['dates'], series['joins'])]
+                leaves_points = [{'date': current_date, 'count': leaves}
+                                 for current_date, leaves in zip(series['dates'], series['leaves'])]
 
                 total_joins = sum(p['count'] for p in joins_points)
                 total_leaves = sum(p['count'] for p in leaves_points)
@@ -901,16 +897,12 @@ class GrowthSystem(commands.Cog):
 
     # CHART GENERATION METHODS
 
-    def generate_growth_chart(self, data: Dict, days: int, growth_type: str) -> Tuple[Image.Image, List[str], List[Tuple[float, str]]]:
-
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(6, 2.5), dpi=300,
-                               facecolor=(0, 0, 0, 0))
-
-        ax.set_axis_off()
+    async def generate_growth_chart(self, data: Dict, days: int, growth_type: str,
+                                    guild_id: Optional[int] = None) -> Tuple[Image.Image, List[str], List[Tuple[float, str]]]:
 
         timestamps = []
         y_labels = []
+        series = []
 
         joins_data = data.get('joins', [])
         leaves_data = data.get('leaves', [])
@@ -947,65 +939,51 @@ class GrowthSystem(commands.Cog):
                 join_dates = [row['date'] for row in joins_data]
                 join_values = [float(row['count']) for row in joins_data]
 
-                join_dates_numeric = [mdates.date2num(
+                join_dates_numeric = [date_to_number(
                     date) for date in join_dates]
 
-                if len(join_dates_numeric) > 1:
-                    x_smooth = np.linspace(
-                        min(join_dates_numeric), max(join_dates_numeric), 500)
-                    y_smooth = np.interp(
-                        x_smooth, join_dates_numeric, join_values)
-
-                    from scipy.ndimage import gaussian_filter1d
-                    y_smooth = gaussian_filter1d(y_smooth, sigma=2)
-
-                    ax.plot(x_smooth, y_smooth, linewidth=4, color='#21ef00',
-                            solid_capstyle='round', antialiased=True, label='Joins')
-                else:
-                    ax.plot(join_dates_numeric, join_values, 'o',
-                            markersize=3, color='#21ef00', alpha=0.7)
+                series.append({
+                    'x': join_dates_numeric,
+                    'y': join_values,
+                    'color': '#21ef00',
+                    'smooth': True
+                })
 
             if leaves_data:
                 leaves_data.sort(key=lambda x: x['date'])
                 leave_dates = [row['date'] for row in leaves_data]
                 leave_values = [float(row['count']) for row in leaves_data]
 
-                leave_dates_numeric = [mdates.date2num(
+                leave_dates_numeric = [date_to_number(
                     date) for date in leave_dates]
 
-                if len(leave_dates_numeric) > 1:
-                    x_smooth = np.linspace(
-                        min(leave_dates_numeric), max(leave_dates_numeric), 500)
-                    y_smooth = np.interp(
-                        x_smooth, leave_dates_numeric, leave_values)
-
-                    from scipy.ndimage import gaussian_filter1d
-                    y_smooth = gaussian_filter1d(y_smooth, sigma=2)
-
-                    ax.plot(x_smooth, y_smooth, linewidth=4, color='#ef0000',
-                            solid_capstyle='round', antialiased=True, label='Leaves')
-                else:
-                    ax.plot(leave_dates_numeric, leave_values, 'o',
-                            markersize=3, color='#ef0000', alpha=0.7)
+                series.append({
+                    'x': leave_dates_numeric,
+                    'y': leave_values,
+                    'color': '#ef0000',
+                    'smooth': True
+                })
 
         else:
             print("⚠️ GrowthSystem: No data points, creating placeholder chart")
             timestamps = [f"Day {i+1}" for i in range(8)]
-            x_smooth = np.linspace(1, 8, 100)
-            y_joins = np.ones_like(x_smooth) * (y_max * 0.5)
-            y_leaves = np.ones_like(x_smooth) * (y_max * 0.25)
-
-            ax.plot(x_smooth, y_joins, linewidth=4, color='#21ef00',
-                    solid_capstyle='round', antialiased=True, label='Joins', alpha=0.5)
-            ax.plot(x_smooth, y_leaves, linewidth=4, color='#ef0000',
-                    solid_capstyle='round', antialiased=True, label='Leaves', alpha=0.5)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', transparent=True,
-                    bbox_inches='tight', pad_inches=0, dpi=300)
-        buf.seek(0)
-        chart_img = Image.open(buf)
-        plt.close(fig)
+            series.append({
+                'x': [1, 8],
+                'y': [y_max * 0.5, y_max * 0.5],
+                'color': '#21ef00',
+                'alpha': 0.5
+            })
+            series.append({
+                'x': [1, 8],
+                'y': [y_max * 0.25, y_max * 0.25],
+                'color': '#ef0000',
+                'alpha': 0.5
+            })
+
+        # Plotting and rasterizing run in a render worker
+        chart_png = await render_service.render(
+            render_line_chart, {'series': series, 'size': CHART_SIZE}, guild_id)
+        chart_img = Image.open(io.BytesIO(chart_png))
 
         return chart_img, timestamps, y_labels
 
@@ -1029,10 +1007,10 @@ class GrowthSystem(commands.Cog):
 
         current_date = datetime.now().strftime("%B %d, %Y")
         try:
-            horndon_font = ImageFont.truetype(
+            horndon_font = get_font(
                 BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
         except:
-            horndon_font = ImageFont.load_default()
+            horndon_font = default_font()
 
         draw_text_with_stroke(draw, (570, 38), current_date,
                               horndon_font, "white", "black", 2)
@@ -1041,127 +1019,6 @@ class GrowthSystem(commands.Cog):
         if not guild:
             return template
 
-        # FITTING LOGIC FUNCTIONS
-
-        def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            font_paths = [
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-
-            font_sizes = [32, 30, 28, 26, 24, 22, 20,
-                          18, 16]
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 32:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 28:
-                    vertical_offset += 1
-                if font_size <= 26:
-                    vertical_offset += 1
-                if font_size <= 24:
-                    vertical_offset += 1
-                if font_size <= 22:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 18:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                text_fits_horizontally = (
-                    text_x + text_width + 5 <= rect_right + 1)
-                text_fits_vertically = (
-                    text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                if text_fits_horizontally and text_fits_vertically:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if smallest_font <= 32:
-                vertical_offset += 1
-            if smallest_font <= 30:
-                vertical_offset += 1
-            if smallest_font <= 28:
-                vertical_offset += 1
-            if smallest_font <= 26:
-                vertical_offset += 1
-            if smallest_font <= 24:
-                vertical_offset += 1
-            if smallest_font <= 22:
-                vertical_offset += 1
-            if smallest_font <= 20:
-                vertical_offset += 1
-            if smallest_font <= 18:
-                vertical_offset += 1
-            if smallest_font <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x + text_width + 5 <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-                return text, font, (text_x, text_y)
-
-            current_text = text
-            while len(current_text) > 3:
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-                text_y += vertical_offset
-
-                if (text_x + text_width + 5 <= rect_right + 1):
-                    return current_text, font, (text_x, text_y)
-
-            if len(text) > 3:
-                final_text = text[:3] + "..."
-            else:
-                final_text = text
-
-            return final_text, font, (text_x, text_y)
-
         # DISPLAY
 
         target_name = guild.name
@@ -1171,94 +1028,37 @@ class GrowthSystem(commands.Cog):
         try:
             if use_server_icon:
                 if guild.icon:
-                    icon_url = guild.icon.url
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(icon_url) as response:
-                            icon_data = await response.read()
-
-                    icon_image = Image.open(io.BytesIO(icon_data))
-                    icon_image = icon_image.resize(
-                        avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                    mask = Image.new('L', avatar_size, 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse(
-                        (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                    icon_image.putalpha(mask)
-
-                    avatar_area = template.crop(
-                        (avatar_x, avatar_y, avatar_x +
-                         avatar_size[0], avatar_y + avatar_size[1])
-                    ).convert('RGBA')
-
-                    icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                    icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                    avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                    template.paste(avatar_area.convert(
-                        'RGB'), (avatar_x, avatar_y))
+                    icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                    paste_avatar(template, icon_image, (avatar_x, avatar_y))
             else:
                 if guild.icon:
-                    icon_url = guild.icon.url
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(icon_url) as response:
-                            icon_data = await response.read()
-
-                    icon_image = Image.open(io.BytesIO(icon_data))
-                    icon_image = icon_image.resize(
-                        avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                    mask = Image.new('L', avatar_size, 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse(
-                        (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                    icon_image.putalpha(mask)
-
-                    avatar_area = template.crop(
-                        (avatar_x, avatar_y, avatar_x +
-                         avatar_size[0], avatar_y + avatar_size[1])
-                    ).convert('RGBA')
-
-                    icon_with_bg = Image.new(
-                        'RGBA', avatar_size, (0, 0, 0, 0))
-                    icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                    avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                    template.paste(avatar_area.convert(
-                        'RGB'), (avatar_x, avatar_y))
+                    icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                    paste_avatar(template, icon_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"❌ Could not add profile picture: {e}")
 
         fitted_text, text_font, text_pos = fit_text_to_rectangle(
-            target_name,
-            text_start_x,
-            text_start_y,
-            username_rectangle["center"][0],
-            username_rectangle["center"][1],
-            username_rectangle["width"],
-            username_rectangle["height"]
-        )
+            target_name, TITLE_FONT_PATH, TITLE_FONT_SIZES,
+            (text_start_x, text_start_y), username_rectangle,
+            offsets=TITLE_OFFSETS, ink=False, tolerance=1, padding=5)
 
         if fitted_text and text_font:
-            with Pilmoji(template) as pilmoji:
+            with Pilmoji(template, source=emoji_source) as pilmoji:
 
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((text_pos[0] + dx, text_pos[1] + dy),
-                                         fitted_text, font=text_font, fill="black")
-
-                pilmoji.text(text_pos, fitted_text,
-                             font=text_font, fill="white")
+                draw_text_with_stroke(pilmoji, text_pos, fitted_text,
+                                      text_font, "white", "black", 1)
         else:
             try:
-                fallback_font = ImageFont.truetype(
+                fallback_font = get_font(
                     BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 32)
             except:
-                fallback_font = ImageFont.load_default()
+                fallback_font = default_font()
 
             # Use Pilmoji for fallback too
-            with Pilmoji(template) as pilmoji:
+            with Pilmoji(template, source=emoji_source) as pilmoji:
                 pilmoji.text((text_start_x, text_start_y),
                              target_name, font=fallback_font, fill="white")
 
@@ -1278,99 +1078,98 @@ class GrowthSystem(commands.Cog):
         template_path = BASE_DIR / "assets" / "images" / "growth final png.png"
 
         try:
-            template = Image.open(template_path).convert("RGBA")
+            template = template_registry.get(template_path)
         except FileNotFoundError:
             template = Image.new('RGBA', (1200, 700), (47, 49, 54, 255))
             print(
                 f"⚠️ Growth template not found at {template_path}, using fallback background")
 
-        chart_width = 644
-        chart_height = 250
-        chart_img = chart_img.resize(
-            (chart_width, chart_height), Image.Resampling.LANCZOS)
+        if chart_img.size != CHART_SIZE:
+            chart_img = chart_img.resize(CHART_SIZE, Image.Resampling.LANCZOS)
 
         template.paste(chart_img, (38, 170), chart_img)
 
         template = await self.draw_growth_header(template, growth_type, guild_id)
 
-        draw = ImageDraw.Draw(template)
-        try:
+        def compose():
+
+            draw = ImageDraw.Draw(template)
             try:
-                horndon_font = ImageFont.truetype(
-                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
-                horndon_small_font = ImageFont.truetype(
-                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 12)
+                try:
+                    horndon_font = get_font(
+                        BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 16)
+                    horndon_small_font = get_font(
+                        BASE_DIR / "assets" / "fonts" / "HorndonD.ttf", 12)
+                except:
+                    horndon_font = default_font()
+                    horndon_small_font = default_font()
             except:
-                horndon_font = ImageFont.load_default()
-                horndon_small_font = ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-            horndon_font = ImageFont.load_default()
-            horndon_small_font = ImageFont.load_default()
+                font = default_font()
+                small_font = default_font()
+                horndon_font = default_font()
+                horndon_small_font = default_font()
 
-        text_color = "white"
-        shadow_color = "black"
+            text_color = "white"
+            shadow_color = "black"
 
-        # TIME PERIOD TEXT
-        if growth_type == "joins_leaves":
-            time_text = f"Last {days} days"
-        else:
-            time_text = f"Next {days} days"
-        draw_text_with_stroke(draw, (108, 88), time_text,
-                              horndon_font, text_color, shadow_color, 1)
+            # TIME PERIOD TEXT
+            if growth_type == "joins_leaves":
+                time_text = f"Last {days} days"
+            else:
+                time_text = f"Next {days} days"
+            draw_text_with_stroke(draw, (108, 88), time_text,
+                                  horndon_font, text_color, shadow_color, 1)
 
-        if "Joins:" in label_text or "Projected Joins:" in label_text:
-            try:
-                if "Projected Joins:" in label_text:
-                    joins_text = label_text.split("Projected Joins: ")[
-                        1].split(" |")[0]
-                else:
-                    joins_text = label_text.split("Joins: ")[1].split(" |")[0]
-                draw_text_with_stroke(draw, (358, 95), joins_text, horndon_font,
-                                      "#21ef00", shadow_color, 1)
-            except:
-                draw_text_with_stroke(draw, (358, 95), "0", horndon_font,
-                                      "#21ef00", shadow_color, 1)
+            if "Joins:" in label_text or "Projected Joins:" in label_text:
+                try:
+                    if "Projected Joins:" in label_text:
+                        joins_text = label_text.split("Projected Joins: ")[
+                            1].split(" |")[0]
+                    else:
+                        joins_text = label_text.split("Joins: ")[1].split(" |")[0]
+                    draw_text_with_stroke(draw, (358, 95), joins_text, horndon_font,
+                                          "#21ef00", shadow_color, 1)
+                except:
+                    draw_text_with_stroke(draw, (358, 95), "0", horndon_font,
+                                          "#21ef00", shadow_color, 1)
 
-        if "Leaves:" in label_text or "Leaves:" in label_text:
-            try:
-                leaves_text = label_text.split("Leaves: ")[1].split(" |")[0]
-                draw_text_with_stroke(draw, (573, 95), leaves_text, horndon_font,
-                                      "#ef0000", shadow_color, 1)
-            except:
-                draw_text_with_stroke(draw, (573, 95), "0", horndon_font,
-                                      "#ef0000", shadow_color, 1)
-
-        if timestamps and len(timestamps) == 8:
-            x_positions = self.get_timestamp_x_positions()
-            timestamp_y_position = 430
-
-            for i, (timestamp, x_pos) in enumerate(zip(timestamps, x_positions)):
-                bbox = draw.textbbox(
-                    (0, 0), timestamp, font=horndon_small_font)
-                text_width = bbox[2] - bbox[0]
-                centered_x = x_pos - (text_width // 2)
-
-                draw_text_with_stroke(draw, (centered_x, timestamp_y_position),
-                                      timestamp, horndon_small_font, text_color, shadow_color, 1)
-
-        y_label_positions = [
-            (27, 148),  # Highest number
-            (27, 215),  # Second highest
-            (27, 280),  # Third highest
-            (27, 345),  # Fourth highest
-            (27, 400)   # Zero
-        ]
+            if "Leaves:" in label_text or "Leaves:" in label_text:
+                try:
+                    leaves_text = label_text.split("Leaves: ")[1].split(" |")[0]
+                    draw_text_with_stroke(draw, (573, 95), leaves_text, horndon_font,
+                                          "#ef0000", shadow_color, 1)
+                except:
+                    draw_text_with_stroke(draw, (573, 95), "0", horndon_font,
+                                          "#ef0000", shadow_color, 1)
+
+            if timestamps and len(timestamps) == 8:
+                x_positions = self.get_timestamp_x_positions()
+                timestamp_y_position = 430
+
+                for i, (timestamp, x_pos) in enumerate(zip(timestamps, x_positions)):
+                    bbox = draw.textbbox(
+                        (0, 0), timestamp, font=horndon_small_font)
+                    text_width = bbox[2] - bbox[0]
+                    centered_x = x_pos - (text_width // 2)
+
+                    draw_text_with_stroke(draw, (centered_x, timestamp_y_position),
+                                          timestamp, horndon_small_font, text_color, shadow_color, 1)
+
+            y_label_positions = [
+                (27, 148),  # Highest number
+                (27, 215),  # Second highest
+                (27, 280),  # Third highest
+                (27, 345),  # Fourth highest
+                (27, 400)   # Zero
+            ]
+
+            for (x, y), (value, label) in zip(y_label_positions, y_labels):
+                draw_text_with_stroke(draw, (x, y), label,
+                                      horndon_small_font, text_color, shadow_color, 1)
 
-        for (x, y), (value, label) in zip(y_label_positions, y_labels):
-            draw_text_with_stroke(draw, (x, y), label,
-                                  horndon_small_font, text_color, shadow_color, 1)
+            return template
 
-        output = io.BytesIO()
-        template.save(output, format='PNG')
-        output.seek(0)
-        return output
+        return await render_service.render_card(compose, guild_id)
 
     # COMMANDS
 
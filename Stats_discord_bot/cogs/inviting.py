@@ -1,15 +1,20 @@
 import json
-import aiohttp
-import io
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from typing import Optional, List, Tuple, Dict, Any
-import os
 import asyncpg
 from datetime import datetime, timedelta, timezone
 from discord import app_commands
 from discord.ext import commands
 import discord
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (get_fonts, draw_text_with_stroke, draw_text_centered_with_stroke,
+                                  draw_rounded_rectangle, step_offsets, fit_text_to_rectangle, paste_avatar)
 
 
 # CONFIGURATION
@@ -27,114 +32,14 @@ class InviteConfig:
     TEMPLATE_PATH = BASE_DIR / "assets" / "images" / "leaderboards final png.png"
     FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
-
-# FONTS
-
-def get_fonts():
-
-    try:
-        custom_font_path = InviteConfig.FONT_PATH
-        if os.path.exists(custom_font_path):
-            font_small = ImageFont.truetype(custom_font_path, 16)
-            font_medium = ImageFont.truetype(custom_font_path, 20)
-            font_large = ImageFont.truetype(custom_font_path, 24)
-            font_larger = ImageFont.truetype(custom_font_path, 30)
-            font_huge = ImageFont.truetype(custom_font_path, 40)
-            font_giant = ImageFont.truetype(custom_font_path, 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        pass
-
-    try:
-        font_small = ImageFont.truetype("arial.ttf", 16)
-        font_medium = ImageFont.truetype("arial.ttf", 20)
-        font_large = ImageFont.truetype("arial.ttf", 24)
-        font_larger = ImageFont.truetype("arial.ttf", 30)
-        font_huge = ImageFont.truetype("arial.ttf", 40)
-        font_giant = ImageFont.truetype("arial.ttf", 60)
-        return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-    except:
-        try:
-            font_small = ImageFont.truetype("Helvetica.ttf", 16)
-            font_medium = ImageFont.truetype("Helvetica.ttf", 20)
-            font_large = ImageFont.truetype("Helvetica.ttf", 24)
-            font_larger = ImageFont.truetype("Helvetica.ttf", 30)
-            font_huge = ImageFont.truetype("Helvetica.ttf", 40)
-            font_giant = ImageFont.truetype("Helvetica.ttf", 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except:
-            font_small = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_large = ImageFont.load_default()
-            font_larger = ImageFont.load_default()
-            font_huge = ImageFont.load_default()
-            font_giant = ImageFont.load_default()
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-
-
-# DRAWING FUNCTIONS
-
-def draw_text_with_stroke(draw, position, text, font, fill, stroke_fill, stroke_width):
-
-    x, y = position
-    for dx in [-stroke_width, 0, stroke_width]:
-        for dy in [-stroke_width, 0, stroke_width]:
-            if dx != 0 or dy != 0:
-                draw.text((x + dx, y + dy), text, font=font, fill=stroke_fill)
-    draw.text((x, y), text, font=font, fill=fill)
-
-
-def draw_text_centered_with_stroke(draw, text, center_position, font, fill="white", stroke_fill="black", stroke_width=2, max_width=None):
-
-    center_x, center_y = center_position
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    x = center_x - (text_width // 2)
-    y = center_y - (text_height // 2)
-
-    if max_width and text_width > max_width:
-        current_font = font
-        original_size = font.size
-        for size in range(original_size - 2, 8, -2):
-            try:
-                smaller_font = ImageFont.truetype(current_font.path, size)
-                bbox = draw.textbbox((0, 0), text, font=smaller_font)
-                text_width = bbox[2] - bbox[0]
-                if text_width <= max_width:
-                    text_height = bbox[3] - bbox[1]
-                    x = center_x - (text_width // 2)
-                    y = center_y - (text_height // 2)
-                    draw_text_with_stroke(
-                        draw, (x, y), text, smaller_font, fill, stroke_fill, stroke_width)
-                    return
-            except:
-                continue
-
-    draw_text_with_stroke(draw, (x, y), text, font, fill,
-                          stroke_fill, stroke_width)
-
-
-def draw_rounded_rectangle(draw, xy, radius, fill=None, outline=None):
-
-    x1, y1, x2, y2 = xy
-    draw.rectangle([x1 + radius, y1, x2 - radius, y2],
-                   fill=fill, outline=outline)
-    draw.rectangle([x1, y1 + radius, x2, y2 - radius],
-                   fill=fill, outline=outline)
-    draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2],
-                  180, 270, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2],
-                  270, 360, fill=fill, outline=outline)
-    draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2],
-                  90, 180, fill=fill, outline=outline)
-    draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2],
-                  0, 90, fill=fill, outline=outline)
+    # Server name: tried largest first, nudged down as it shrinks
+    NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+    NAME_OFFSETS = step_offsets(NAME_FONT_SIZES, (40, 30, 20, 16))
 
 
 # IMAGE GENERATION
 
+@cached_render('invite_leaderboard')
 async def generate_invite_leaderboard_image(
     guild: discord.Guild,
     leaderboard_data: list,
@@ -143,359 +48,226 @@ async def generate_invite_leaderboard_image(
     page: int = 0
 ):
 
-    template_path = InviteConfig.TEMPLATE_PATH
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (800, 600), color='#2F3136')
+    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(InviteConfig.FONT_PATH)
 
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-    draw = ImageDraw.Draw(image)
-    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts()
+    async def build_base():
+        template_path = InviteConfig.TEMPLATE_PATH
+        try:
+            base = template_registry.get(template_path, "RGB")
+        except FileNotFoundError:
+            base = Image.new('RGB', (800, 600), color='#2F3136')
 
-    def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
+        draw = ImageDraw.Draw(base)
 
-        font_paths = [
-            BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
+        # Profile picture at (7, 10)
+        avatar_x, avatar_y = 7, 10
+        avatar_size = (60, 60)
 
-        initial_font_size = 40
+        # Server name starting position
+        text_start_x = 85
+        text_start_y = 30
 
-        rect_left = rect_center_x - (rect_width // 2)
-        rect_right = rect_center_x + (rect_width // 2)
-        rect_top = rect_center_y - (rect_height // 2)
-        rect_bottom = rect_center_y + (rect_height // 2)
+        # Rectangle for text constraints
+        username_rectangle = {"center": (150, 30), "width": 183, "height": 35}
 
-        font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
+        # SERVER PROFILE PICTURE
 
-        for font_size in font_sizes:
-            try:
-                font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if font_size <= 40:
-                vertical_offset += 1
-            if font_size <= 30:
-                vertical_offset += 1
-            if font_size <= 20:
-                vertical_offset += 1
-            if font_size <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-                return text, font, (text_x, text_y)
-        smallest_font = 16
         try:
-            font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                font_paths[0]) else ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-
-        vertical_offset = 0
-        if smallest_font <= 40:
-            vertical_offset += 1
-        if smallest_font <= 30:
-            vertical_offset += 1
-        if smallest_font <= 20:
-            vertical_offset += 1
-        if smallest_font <= 16:
-            vertical_offset += 1
-        text_y += vertical_offset
-        text_fits_horizontally = (
-            text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-        text_fits_vertically = (
-            text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-        if text_fits_horizontally and text_fits_vertically:
-            return text, font, (text_x, text_y)
-
-        current_text = text
-        while len(current_text) > 3:
-            current_text = current_text[:-4] + "..."
-            bbox = draw.textbbox((0, 0), current_text, font=font)
-            text_width = bbox[2] - bbox[0]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            text_y += vertical_offset
-
-            if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-                return current_text, font, (text_x, text_y)
-
-        if len(text) > 3:
-            final_text = text[:3] + "..."
-        else:
-            final_text = text
-
-        bbox = draw.textbbox((0, 0), final_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        text_x = text_start_x
-        text_y = text_start_y - (text_height // 2)
-        text_y += vertical_offset
-
-        return final_text, font, (text_x, text_y)
-
-    # Profile picture at (7, 10)
-    avatar_x, avatar_y = 7, 10
-    avatar_size = (60, 60)
-
-    # Server name starting position
-    text_start_x = 85
-    text_start_y = 30
-
-    # Rectangle for text constraints
-    username_rectangle = {"center": (150, 30), "width": 183, "height": 35}
-
-    # SERVER PROFILE PICTURE
-
-    try:
-        if guild.icon:
-            icon_url = guild.icon.url
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as response:
-                    icon_data = await response.read()
-
-            icon_image = Image.open(io.BytesIO(icon_data))
-            icon_image = icon_image.resize(
-                avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-            mask = Image.new('L', avatar_size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse(
-                (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-            icon_image.putalpha(mask)
-
-            avatar_area = image.crop(
-                (avatar_x, avatar_y, avatar_x +
-                 avatar_size[0], avatar_y + avatar_size[1])
-            ).convert('RGBA')
-
-            icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-            icon_with_bg.paste(icon_image, (0, 0), icon_image)
-            avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-            image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
-
-    except Exception as e:
-        print(f"❌ Could not add server icon: {e}")
-
-    server_name = guild.name
-
-    fitted_text, text_font, text_pos = fit_text_to_rectangle(
-        server_name,
-        text_start_x,
-        text_start_y,
-        username_rectangle["center"][0],
-        username_rectangle["center"][1],
-        username_rectangle["width"],
-        username_rectangle["height"],
-        is_username=True
-    )
+            if guild.icon:
+                icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
 
-    if fitted_text and text_font:
+                paste_avatar(base, icon_image, (avatar_x, avatar_y))
 
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((text_pos[0] + dx, text_pos[1] + dy),
-                              fitted_text, font=text_font, fill="black")
+        except Exception as e:
+            print(f"❌ Could not add server icon: {e}")
 
-        draw.text(text_pos, fitted_text, font=text_font, fill="white")
-    else:
+        server_name = guild.name
 
-        draw_text_with_stroke(draw, (text_start_x, text_start_y), server_name,
-                              font_huge, "white", "black", 2)
+        fitted_text, text_font, text_pos = fit_text_to_rectangle(
+            server_name, InviteConfig.FONT_PATH, InviteConfig.NAME_FONT_SIZES,
+            (text_start_x, text_start_y), username_rectangle,
+            offsets=InviteConfig.NAME_OFFSETS, ink=False, tolerance=1)
 
-    # ROLE FILTER
+        if fitted_text and text_font:
 
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-    draw_text_with_stroke(draw, (70, 424), role_text,
-                          font_small, "white", "black", 1)
+            draw_text_with_stroke(draw, text_pos, fitted_text, text_font, "white", "black", 1)
+        else:
 
-    # CREATED ON
+            draw_text_with_stroke(draw, (text_start_x, text_start_y), server_name,
+                                  font_huge, "white", "black", 2)
 
-    draw_text_with_stroke(
-        draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
-    draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-        "%B %d, %Y"), font_small, "white", "black", 1)
+        return base
 
-    # PAGINATION
-    if leaderboard_data:
-        total_users = len(leaderboard_data)
-        users_per_page = InviteConfig.USERS_PER_PAGE
-        total_pages = (total_users + users_per_page - 1) // users_per_page
-        draw_text_with_stroke(
-            draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
-    else:
-        total_pages = 1
+    # Template, icon and server name are drawn once per guild
+    image = await layer_cache.get(guild, 'invite_leaderboard', build_base)
 
-    # LEADERBOARD CONTENT
-    if leaderboard_data:
-        display_data = []
+    def compose():
 
-        for user_data in leaderboard_data:
-            user_id = user_data['user_id']
-            name = None
-            try:
-                member = guild.get_member(int(user_id))
-                if member:
-                    name = member.name
-                else:
-                    name = f"User {user_id} (Left)"
-            except Exception as e:
-                print(f"⚠️ Error resolving user ID {user_id}: {e}")
-                name = f"Unknown ({user_id})"
+        draw = ImageDraw.Draw(image)
 
-            invite_count = user_data.get('valid_invites', 0)
+        # ROLE FILTER
 
-            display_data.append((name, invite_count))
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
+        draw_text_with_stroke(draw, (70, 424), role_text,
+                              font_small, "white", "black", 1)
 
-        start_idx = page * InviteConfig.USERS_PER_PAGE
-        end_idx = min(start_idx + InviteConfig.USERS_PER_PAGE,
-                      len(display_data))
-        page_data = display_data[start_idx:end_idx]
+        # CREATED ON
 
-        image_width, _ = image.size
+        draw_text_with_stroke(
+            draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
+        draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+            "%B %d, %Y"), font_small, "white", "black", 1)
 
-        if len(page_data) <= 4:
-            positions = [(60, 100 + i * 65) for i in range(len(page_data))]
-            box_width, box_height = 600, 40
+        # PAGINATION
+        if leaderboard_data:
+            total_users = len(leaderboard_data)
+            users_per_page = InviteConfig.USERS_PER_PAGE
+            total_pages = (total_users + users_per_page - 1) // users_per_page
+            draw_text_with_stroke(
+                draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
         else:
-            box_width, box_height = 280, 40
-            box_spacing = 65
-            start_y = 100
-            total_box_width = (2 * box_width) + 15
-            start_x = (image_width - total_box_width) // 2
-            positions = [
-                (start_x + (i % 2) * (box_width + 15),
-                 start_y + (i // 2) * box_spacing)
-                for i in range(len(page_data))
-            ]
-
-        for i, ((name, invite_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
-            global_rank = start_idx + i + 1
-
-            draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                   radius=8, fill=(0, 0, 0, 220), outline=None)
-
-            placement_width = 35
-            if global_rank == 1:
-                placement_color = (255, 215, 0, 220)  # Gold
-            elif global_rank == 2:
-                placement_color = (192, 192, 192, 220)  # Silver
-            elif global_rank == 3:
-                placement_color = (205, 127, 50, 220)  # Bronze
-            else:
-                placement_color = (93, 0, 136, 255)  # Purple
+            total_pages = 1
 
-            draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                   radius=8, fill=placement_color, outline=None)
+        # LEADERBOARD CONTENT
+        if leaderboard_data:
+            display_data = []
 
-            value_text = f"{invite_count:,} invites"
+            for user_data in leaderboard_data:
+                user_id = user_data['user_id']
+                name = None
+                try:
+                    member = guild.get_member(int(user_id))
+                    if member:
+                        name = member.name
+                    else:
+                        name = f"User {user_id} (Left)"
+                except Exception as e:
+                    print(f"⚠️ Error resolving user ID {user_id}: {e}")
+                    name = f"Unknown ({user_id})"
 
-            rank_text = f"#{global_rank}"
-            rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-            rank_width = rank_bbox[2] - rank_bbox[0]
+                invite_count = user_data.get('valid_invites', 0)
 
-            value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
-            value_width = value_bbox[2] - value_bbox[0]
+                display_data.append((name, invite_count))
 
-            available_name_width = box_width - placement_width - value_width - 20
+            start_idx = page * InviteConfig.USERS_PER_PAGE
+            end_idx = min(start_idx + InviteConfig.USERS_PER_PAGE,
+                          len(display_data))
+            page_data = display_data[start_idx:end_idx]
 
-            display_name = name
-            name_bbox = draw.textbbox((0, 0), display_name, font=font_medium)
-            name_width = name_bbox[2] - name_bbox[0]
+            image_width, _ = image.size
 
-            if name_width > available_name_width:
-                try:
-                    smaller_font = ImageFont.truetype(font_medium.path, size=16) if hasattr(
-                        font_medium, 'path') else font_small
-                    smaller_bbox = draw.textbbox(
-                        (0, 0), display_name, font=smaller_font)
-                    smaller_width = smaller_bbox[2] - smaller_bbox[0]
-
-                    if smaller_width <= available_name_width:
-                        name_font = smaller_font
-                    else:
+            if len(page_data) <= 4:
+                positions = [(60, 100 + i * 65) for i in range(len(page_data))]
+                box_width, box_height = 600, 40
+            else:
+                box_width, box_height = 280, 40
+                box_spacing = 65
+                start_y = 100
+                total_box_width = (2 * box_width) + 15
+                start_x = (image_width - total_box_width) // 2
+                positions = [
+                    (start_x + (i % 2) * (box_width + 15),
+                     start_y + (i // 2) * box_spacing)
+                    for i in range(len(page_data))
+                ]
+
+            for i, ((name, invite_count), (box_x, box_y)) in enumerate(zip(page_data, positions)):
+                global_rank = start_idx + i + 1
+
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                       radius=8, fill=(0, 0, 0, 220), outline=None)
+
+                placement_width = 35
+                if global_rank == 1:
+                    placement_color = (255, 215, 0, 220)  # Gold
+                elif global_rank == 2:
+                    placement_color = (192, 192, 192, 220)  # Silver
+                elif global_rank == 3:
+                    placement_color = (205, 127, 50, 220)  # Bronze
+                else:
+                    placement_color = (93, 0, 136, 255)  # Purple
+
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                       radius=8, fill=placement_color, outline=None)
+
+                value_text = f"{invite_count:,} invites"
+
+                rank_text = f"#{global_rank}"
+                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                rank_width = rank_bbox[2] - rank_bbox[0]
+
+                value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
+                value_width = value_bbox[2] - value_bbox[0]
+
+                available_name_width = box_width - placement_width - value_width - 20
+
+                display_name = name
+                name_bbox = draw.textbbox((0, 0), display_name, font=font_medium)
+                name_width = name_bbox[2] - name_bbox[0]
+
+                if name_width > available_name_width:
+                    try:
+                        smaller_font = get_font(font_medium.path, size=16) if hasattr(
+                            font_medium, 'path') else font_small
+                        smaller_bbox = draw.textbbox(
+                            (0, 0), display_name, font=smaller_font)
+                        smaller_width = smaller_bbox[2] - smaller_bbox[0]
+
+                        if smaller_width <= available_name_width:
+                            name_font = smaller_font
+                        else:
+                            name_font = font_medium
+                            while len(display_name) > 3:
+                                display_name = display_name[:-4] + "..."
+                                truncated_bbox = draw.textbbox(
+                                    (0, 0), display_name, font=name_font)
+                                truncated_width = truncated_bbox[2] - \
+                                    truncated_bbox[0]
+                                if truncated_width <= available_name_width:
+                                    break
+                    except:
                         name_font = font_medium
                         while len(display_name) > 3:
                             display_name = display_name[:-4] + "..."
                             truncated_bbox = draw.textbbox(
                                 (0, 0), display_name, font=name_font)
-                            truncated_width = truncated_bbox[2] - \
-                                truncated_bbox[0]
+                            truncated_width = truncated_bbox[2] - truncated_bbox[0]
                             if truncated_width <= available_name_width:
                                 break
-                except:
+                else:
                     name_font = font_medium
-                    while len(display_name) > 3:
-                        display_name = display_name[:-4] + "..."
-                        truncated_bbox = draw.textbbox(
-                            (0, 0), display_name, font=name_font)
-                        truncated_width = truncated_bbox[2] - truncated_bbox[0]
-                        if truncated_width <= available_name_width:
-                            break
-            else:
-                name_font = font_medium
-
-            rank_height = rank_bbox[3] - rank_bbox[1]
-            name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
-                (0, 0), display_name, font=name_font)[3] - draw.textbbox((0, 0), display_name, font=name_font)[1]
-            value_height = value_bbox[3] - value_bbox[1]
-
-            rank_y = box_y + (box_height - rank_height) // 2
-            name_y = box_y + (box_height - name_height) // 2
-            value_y = box_y + (box_height - value_height) // 2
-
-            rank_x = box_x + (placement_width - rank_width) // 2
-            draw_text_with_stroke(draw, (rank_x, rank_y),
-                                  rank_text, font_medium, "white", "black", 1)
-
-            name_x = box_x + placement_width + 8
-            draw_text_with_stroke(draw, (name_x, name_y),
-                                  display_name, name_font, "white", "black", 1)
-
-            value_x = box_x + box_width - value_width - 8
-            draw_text_with_stroke(draw, (value_x, value_y),
-                                  value_text, font_medium, "white", "black", 1)
-    else:
-        cx, cy = image.size[0] // 2, image.size[1] // 2
-        draw_text_centered_with_stroke(
-            draw, "NO DATA AVAILABLE", (cx, cy), font_giant, "white", "black", 3)
-
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+
+                rank_height = rank_bbox[3] - rank_bbox[1]
+                name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
+                    (0, 0), display_name, font=name_font)[3] - draw.textbbox((0, 0), display_name, font=name_font)[1]
+                value_height = value_bbox[3] - value_bbox[1]
+
+                rank_y = box_y + (box_height - rank_height) // 2
+                name_y = box_y + (box_height - name_height) // 2
+                value_y = box_y + (box_height - value_height) // 2
+
+                rank_x = box_x + (placement_width - rank_width) // 2
+                draw_text_with_stroke(draw, (rank_x, rank_y),
+                                      rank_text, font_medium, "white", "black", 1)
+
+                name_x = box_x + placement_width + 8
+                draw_text_with_stroke(draw, (name_x, name_y),
+                                      display_name, name_font, "white", "black", 1)
+
+                value_x = box_x + box_width - value_width - 8
+                draw_text_with_stroke(draw, (value_x, value_y),
+                                      value_text, font_medium, "white", "black", 1)
+        else:
+            cx, cy = image.size[0] // 2, image.size[1] // 2
+            draw_text_centered_with_stroke(
+                draw, "NO DATA AVAILABLE", (cx, cy), font_giant, "white", "black", 3)
+
+        return image
+
+    img_bytes = await render_service.render_card(compose, guild.id)
     return img_bytes
 
 
@@ -5,16 +5,21 @@ from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 import time
 import asyncio
-import os
-from PIL import Image, ImageDraw, ImageFont
-import io
-import aiohttp
+from PIL import Image, ImageDraw
 import random
 import traceback
 from typing import List, Dict, Any, Optional, Set, Tuple
 import logging
 import re
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import text_size, first_fitting, fit_font_to_width
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (get_fonts, draw_text_with_stroke, draw_text_centered_with_stroke,
+                                  draw_rounded_rectangle, step_offsets, fit_text_to_rectangle, paste_avatar)
 
 
 # CONFIGURATION
@@ -32,6 +37,10 @@ class Config:
     TEMPLATE_PATH = BASE_DIR / "assets" / "images" / "leaderboards final png.png"
     FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
+    # Server name: tried largest first, nudged down as it shrinks
+    NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+    NAME_OFFSETS = step_offsets(NAME_FONT_SIZES, (40, 30, 20, 16))
+
     DEFAULT_DAYS_BACK = 14
     TIME_PERIODS = [7, 14, 30]
     MAX_CUSTOM_DAYS = 2000
@@ -52,126 +61,11 @@ class Config:
 
 class ImageGenerator:
 
-    # FONTS
-
-    @staticmethod
-    def get_fonts():
-
-        try:
-            custom_font_path = Config.FONT_PATH
-            if os.path.exists(custom_font_path):
-                font_small = ImageFont.truetype(custom_font_path, 16)
-                font_medium = ImageFont.truetype(custom_font_path, 20)
-                font_large = ImageFont.truetype(custom_font_path, 24)
-                font_larger = ImageFont.truetype(custom_font_path, 30)
-                font_huge = ImageFont.truetype(custom_font_path, 40)
-                font_giant = ImageFont.truetype(custom_font_path, 60)
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except Exception as e:
-            logger.warning(f"Failed to load custom font: {e}")
-
-        try:
-            font_small = ImageFont.truetype("arial.ttf", 16)
-            font_medium = ImageFont.truetype("arial.ttf", 20)
-            font_large = ImageFont.truetype("arial.ttf", 24)
-            font_larger = ImageFont.truetype("arial.ttf", 30)
-            font_huge = ImageFont.truetype("arial.ttf", 40)
-            font_giant = ImageFont.truetype("arial.ttf", 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except:
-            try:
-                font_small = ImageFont.truetype("Helvetica.ttf", 16)
-                font_medium = ImageFont.truetype("Helvetica.ttf", 20)
-                font_large = ImageFont.truetype("Helvetica.ttf", 24)
-                font_larger = ImageFont.truetype("Helvetica.ttf", 30)
-                font_huge = ImageFont.truetype("Helvetica.ttf", 40)
-                font_giant = ImageFont.truetype("Helvetica.ttf", 60)
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-            except:
-                font_small = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_large = ImageFont.load_default()
-                font_larger = ImageFont.load_default()
-                font_huge = ImageFont.load_default()
-                font_giant = ImageFont.load_default()
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-
-    # DRAWING FUNCTIONS
-
-    @staticmethod
-    def draw_text_with_stroke(draw, position, text, font, fill, stroke_fill, stroke_width):
-
-        x, y = position
-
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text,
-                              font=font, fill=stroke_fill)
-
-        draw.text((x, y), text, font=font, fill=fill)
-
-    @staticmethod
-    def draw_text_centered_with_stroke(draw, text, center_position, font, fill="white", stroke_fill="black", stroke_width=2, max_width=None):
-
-        center_x, center_y = center_position
-
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        x = center_x - (text_width // 2)
-        y = center_y - (text_height // 2)
-
-        if max_width and text_width > max_width:
-            current_font = font
-            original_size = font.size
-
-            for size in range(original_size - 2, 8, -2):
-                try:
-                    smaller_font = ImageFont.truetype(current_font.path, size)
-                    bbox = draw.textbbox((0, 0), text, font=smaller_font)
-                    text_width = bbox[2] - bbox[0]
-
-                    if text_width <= max_width:
-                        text_height = bbox[3] - bbox[1]
-                        x = center_x - (text_width // 2)
-                        y = center_y - (text_height // 2)
-                        ImageGenerator.draw_text_with_stroke(
-                            draw, (x, y), text, smaller_font, fill, stroke_fill, stroke_width)
-                        return
-                except:
-                    continue
-
-        ImageGenerator.draw_text_with_stroke(
-            draw, (x, y), text, font, fill, stroke_fill, stroke_width)
-
-    @staticmethod
-    def draw_rounded_rectangle(draw, xy, radius, fill=None, outline=None):
-
-        x1, y1, x2, y2 = xy
-        draw.rectangle([x1 + radius, y1, x2 - radius, y2],
-                       fill=fill, outline=outline)
-        draw.rectangle([x1, y1 + radius, x2, y2 - radius],
-                       fill=fill, outline=outline)
-        draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2],
-                      180, 270, fill=fill, outline=outline)
-        draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2],
-                      270, 360, fill=fill, outline=outline)
-        draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2],
-                      90, 180, fill=fill, outline=outline)
-        draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2],
-                      0, 90, fill=fill, outline=outline)
-
     @staticmethod
     async def load_icon_from_url(url):
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        icon_data = await response.read()
-                        return Image.open(io.BytesIO(icon_data))
+            return await asset_cache.get_image(url)
         except Exception as e:
             logger.warning(f"Failed to load icon from URL: {e}")
         return None
@@ -212,33 +106,26 @@ class ImageGenerator:
     @staticmethod
     def truncate_text_for_width(draw, text, font, max_width, ellipsis="..."):
 
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-
-        if text_width <= max_width:
+        if text_size(text, font)[0] <= max_width:
             return text, font
 
         try:
             if hasattr(font, 'path'):
-                for size in range(font.size - 2, 12, -2):
-                    smaller_font = ImageFont.truetype(font.path, size)
-                    smaller_bbox = draw.textbbox(
-                        (0, 0), text, font=smaller_font)
-                    smaller_width = smaller_bbox[2] - smaller_bbox[0]
-
-                    if smaller_width <= max_width:
-                        return text, smaller_font
+                smaller_font = fit_font_to_width(
+                    font.path, text, max_width, range(font.size - 2, 12, -2))
+                if smaller_font:
+                    return text, smaller_font
         except:
             pass
 
-        truncated_text = text
-        while len(truncated_text) > 3:
-            truncated_text = truncated_text[:-4] + ellipsis
-            truncated_bbox = draw.textbbox((0, 0), truncated_text, font=font)
-            truncated_width = truncated_bbox[2] - truncated_bbox[0]
-
-            if truncated_width <= max_width:
-                return truncated_text, font
+        # Longest prefix that fits with the ellipsis appended
+        truncated_text = first_fitting(
+            range(len(text) - 4, -1, -1),
+            lambda length: text[:length] + ellipsis
+            if text_size(text[:length] + ellipsis, font)[0] <= max_width else None
+        )
+        if truncated_text:
+            return truncated_text, font
 
         return text[:3] + ellipsis, font
 
@@ -247,137 +134,6 @@ class ImageGenerator:
 
         draw = ImageDraw.Draw(image)
 
-        def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            bbox = draw.textbbox((text_x, text_y), text, font=font)
-            text_left = bbox[0]
-            text_right = bbox[2]
-            text_top = bbox[1]
-            text_bottom = bbox[3]
-
-            exceeds_left = text_left < rect_left
-            exceeds_right = text_right > rect_right
-            exceeds_top = text_top < rect_top
-            exceeds_bottom = text_bottom > rect_bottom
-
-            return exceeds_left or exceeds_right or exceeds_top or exceeds_bottom
-
-        # INVISIBLE RECTANGLE
-
-        def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
-
-            font_paths = [
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-
-            initial_font_size = 40
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 40:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                text_fits_horizontally = (
-                    text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-                text_fits_vertically = (
-                    text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                if text_fits_horizontally and text_fits_vertically:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if smallest_font <= 40:
-                vertical_offset += 1
-            if smallest_font <= 30:
-                vertical_offset += 1
-            if smallest_font <= 20:
-                vertical_offset += 1
-            if smallest_font <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-                return text, font, (text_x, text_y)
-
-            current_text = text
-            while len(current_text) > 3:
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                text_y += vertical_offset
-
-                if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-                    return current_text, font, (text_x, text_y)
-
-            if len(text) > 3:
-                final_text = text[:3] + "..."
-            else:
-                final_text = text
-
-            bbox = draw.textbbox((0, 0), final_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-            text_y += vertical_offset
-
-            return final_text, font, (text_x, text_y)
-
         # User Profile picture
         avatar_x, avatar_y = 7, 10
         avatar_size = (60, 60)
@@ -392,55 +148,22 @@ class ImageGenerator:
         # SERVER PROFILE PICTURE
         try:
             if guild.icon:
-                icon_url = guild.icon.url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(icon_url) as response:
-                        icon_data = await response.read()
-
-                icon_image = Image.open(io.BytesIO(icon_data))
-                icon_image = icon_image.resize(
-                    avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', avatar_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse(
-                    (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                icon_image.putalpha(mask)
-
-                avatar_area = image.crop(
-                    (avatar_x, avatar_y, avatar_x +
-                     avatar_size[0], avatar_y + avatar_size[1])
-                ).convert('RGBA')
-
-                icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+                icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                paste_avatar(image, icon_image, (avatar_x, avatar_y))
 
         except Exception as e:
             logger.error(f"Could not add server icon: {e}")
 
         fitted_text, text_font, text_pos = fit_text_to_rectangle(
-            target_name,
-            text_start_x,
-            text_start_y,
-            username_rectangle["center"][0],
-            username_rectangle["center"][1],
-            username_rectangle["width"],
-            username_rectangle["height"],
-            is_username=True
-        )
+            target_name, Config.FONT_PATH, Config.NAME_FONT_SIZES,
+            (text_start_x, text_start_y), username_rectangle,
+            offsets=Config.NAME_OFFSETS, ink=False, tolerance=1)
 
         if fitted_text and text_font:
 
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        draw.text((text_pos[0] + dx, text_pos[1] + dy),
-                                  fitted_text, font=text_font, fill="black")
-
-            draw.text(text_pos, fitted_text, font=text_font, fill="white")
+            draw_text_with_stroke(draw, text_pos, fitted_text, text_font,
+                                  "white", "black", 1)
         else:
             draw.text((text_start_x, text_start_y),
                       target_name, font=font_huge, fill="white")
@@ -505,6 +228,7 @@ class DataFormatter:
 
 # IMAGE GENERATION
 
+@cached_render('leaderboard')
 async def generate_leaderboard_image(
     guild: discord.Guild,
     leaderboard_data: list,
@@ -516,151 +240,163 @@ async def generate_leaderboard_image(
     total_value: int = None,
     user_count: int = 10,
     page: int = 0,
-    is_real_time: bool = False
+    is_real_time: bool = False,
+    total_items: int = None
 ):
 
+    # With total_items, leaderboard_data holds only the requested page
     template_path = Config.TEMPLATE_PATH
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (Config.IMAGE_WIDTH,
-                          Config.IMAGE_HEIGHT), color='#2F3136')
-
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-
-    draw = ImageDraw.Draw(image)
-    font_small, font_medium, font_large, font_larger, font_huge, font_giant = ImageGenerator.get_fonts()
-
-    await ImageGenerator.add_server_profile_pic_and_name(image, guild, target_name, leaderboard_type, font_huge)
-
-    # ROLE FILTER / DATE / TIME RANGE
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-    ImageGenerator.draw_text_with_stroke(
-        draw, (70, 424), role_text, font_small, "white", "black", 1)
-
-    # Time display
-    time_text = f"{days_back} days"
-    ImageGenerator.draw_text_with_stroke(
-        draw, (630, 422), time_text, font_small, "white", "black", 1)
-    ImageGenerator.draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-        "%B %d, %Y"), font_small, "white", "black", 1)
-
-    # PAGINATION
-    if leaderboard_data:
-        total_users = len(leaderboard_data)
-        users_per_page = Config.USERS_PER_PAGE
-        total_pages = (total_users + users_per_page - 1) // users_per_page
-        ImageGenerator.draw_text_with_stroke(
-            draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
-    else:
-        total_pages = 1
-
-    # LEADERBOARD CONTENT
-    if leaderboard_data:
-        display_data = ImageGenerator.format_leaderboard_data(
-            guild, leaderboard_data, leaderboard_type)
-
-        start_idx = page * Config.USERS_PER_PAGE
-        end_idx = min(start_idx + Config.USERS_PER_PAGE, len(display_data))
-        page_data = display_data[start_idx:end_idx]
-
-        if len(page_data) <= 4:
-            positions = [(60, 100 + i * 65) for i in range(len(page_data))]
-            box_width, box_height = 600, 40
+    font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(Config.FONT_PATH)
+
+    async def build_base():
+        try:
+            base = template_registry.get(template_path, "RGB")
+        except FileNotFoundError:
+            base = Image.new('RGB', (Config.IMAGE_WIDTH,
+                             Config.IMAGE_HEIGHT), color='#2F3136')
+
+        await ImageGenerator.add_server_profile_pic_and_name(base, guild, target_name, leaderboard_type, font_huge)
+        return base
+
+    # Template, icon and name are drawn once per guild and target
+    image = await layer_cache.get(guild, 'leaderboard', build_base, variant=target_name)
+
+    def compose():
+
+        draw = ImageDraw.Draw(image)
+
+        # ROLE FILTER / DATE / TIME RANGE
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
+        draw_text_with_stroke(
+            draw, (70, 424), role_text, font_small, "white", "black", 1)
+
+        # Time display
+        time_text = f"{days_back} days"
+        draw_text_with_stroke(
+            draw, (630, 422), time_text, font_small, "white", "black", 1)
+        draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+            "%B %d, %Y"), font_small, "white", "black", 1)
+
+        # PAGINATION
+        if leaderboard_data:
+            total_users = total_items if total_items is not None else len(
+                leaderboard_data)
+            users_per_page = Config.USERS_PER_PAGE
+            total_pages = (total_users + users_per_page - 1) // users_per_page
+            draw_text_with_stroke(
+                draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
         else:
-            box_width, box_height = 280, 40
-            box_spacing = 65
-            start_y = 100
-            total_box_width = (2 * box_width) + 15
-            start_x = (Config.IMAGE_WIDTH - total_box_width) // 2
-            positions = [
-                (start_x + (i % 2) * (box_width + 15),
-                 start_y + (i // 2) * box_spacing)
-                for i in range(len(page_data))
-            ]
-
-        for i, ((name, value), (box_x, box_y)) in enumerate(zip(page_data, positions)):
-            global_rank = start_idx + i + 1
-
-            ImageGenerator.draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                                  radius=8, fill=Config.COLORS['background'], outline=None)
-
-            placement_width = 35
-            if global_rank == 1:
-                placement_color = Config.COLORS['gold']
-            elif global_rank == 2:
-                placement_color = Config.COLORS['silver']
-            elif global_rank == 3:
-                placement_color = Config.COLORS['bronze']
-            else:
-                placement_color = Config.COLORS['default']
+            total_pages = 1
 
-            ImageGenerator.draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                                  radius=8, fill=placement_color, outline=None)
+        # LEADERBOARD CONTENT
+        if leaderboard_data:
+            display_data = ImageGenerator.format_leaderboard_data(
+                guild, leaderboard_data, leaderboard_type)
 
-            is_voice_type = leaderboard_type in [
-                'voice', 'server_voice', 'category_voice', 'top_users_voice',
-                'top_voice_channels', 'top_voice_categories'
-            ] or 'voice' in leaderboard_type
+            start_idx = page * Config.USERS_PER_PAGE
+            if total_items is not None:
+                page_data = display_data[:Config.USERS_PER_PAGE]
+            else:
+                end_idx = min(start_idx + Config.USERS_PER_PAGE,
+                              len(display_data))
+                page_data = display_data[start_idx:end_idx]
 
-            if is_voice_type:
-                value_text = DataFormatter.format_voice_time(value)
+            if len(page_data) <= 4:
+                positions = [(60, 100 + i * 65) for i in range(len(page_data))]
+                box_width, box_height = 600, 40
             else:
-                value_text = DataFormatter.format_message_count(value)
+                box_width, box_height = 280, 40
+                box_spacing = 65
+                start_y = 100
+                total_box_width = (2 * box_width) + 15
+                start_x = (Config.IMAGE_WIDTH - total_box_width) // 2
+                positions = [
+                    (start_x + (i % 2) * (box_width + 15),
+                     start_y + (i // 2) * box_spacing)
+                    for i in range(len(page_data))
+                ]
+
+            for i, ((name, value), (box_x, box_y)) in enumerate(zip(page_data, positions)):
+                global_rank = start_idx + i + 1
+
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                       radius=8, fill=Config.COLORS['background'], outline=None)
+
+                placement_width = 35
+                if global_rank == 1:
+                    placement_color = Config.COLORS['gold']
+                elif global_rank == 2:
+                    placement_color = Config.COLORS['silver']
+                elif global_rank == 3:
+                    placement_color = Config.COLORS['bronze']
+                else:
+                    placement_color = Config.COLORS['default']
 
-                if total_value and total_value > 0 and isinstance(total_value, (int, float)):
-                    perc = (value / total_value) * 100
-                    value_text += f" ({perc:.1f}%)"
+                draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                       radius=8, fill=placement_color, outline=None)
 
-            rank_text = f"#{global_rank}"
-            rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-            rank_width = rank_bbox[2] - rank_bbox[0]
+                is_voice_type = leaderboard_type in [
+                    'voice', 'server_voice', 'category_voice', 'top_users_voice',
+                    'top_voice_channels', 'top_voice_categories'
+                ] or 'voice' in leaderboard_type
 
-            value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
-            value_width = value_bbox[2] - value_bbox[0]
+                if is_voice_type:
+                    value_text = DataFormatter.format_voice_time(value)
+                else:
+                    value_text = DataFormatter.format_message_count(value)
 
-            available_name_width = box_width - \
-                placement_width - value_width - 20
+                    if total_value and total_value > 0 and isinstance(total_value, (int, float)):
+                        perc = (value / total_value) * 100
+                        value_text += f" ({perc:.1f}%)"
 
-            display_name = name
-            name_font = font_medium
+                rank_text = f"#{global_rank}"
+                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                rank_width = rank_bbox[2] - rank_bbox[0]
 
-            display_name, name_font = ImageGenerator.truncate_text_for_width(
-                draw, display_name, name_font, available_name_width
-            )
+                value_bbox = draw.textbbox((0, 0), value_text, font=font_medium)
+                value_width = value_bbox[2] - value_bbox[0]
+
+                available_name_width = box_width - \
+                    placement_width - value_width - 20
+
+                display_name = name
+                name_font = font_medium
+
+                display_name, name_font = ImageGenerator.truncate_text_for_width(
+                    draw, display_name, name_font, available_name_width
+                )
+
+                rank_height = rank_bbox[3] - rank_bbox[1]
+                name_bbox = draw.textbbox((0, 0), display_name, font=name_font)
+                name_height = name_bbox[3] - name_bbox[1]
+                value_height = value_bbox[3] - value_bbox[0]
+
+                rank_y = box_y + (box_height - rank_height) // 2
+                name_y = box_y + (box_height - name_height) // 2
+                value_y = box_y + (box_height - value_height) // 2
+
+                rank_x = box_x + (placement_width - rank_width) // 2
+                draw_text_with_stroke(
+                    draw, (rank_x, rank_y), rank_text, font_medium, "white", "black", 1)
+
+                name_x = box_x + placement_width + 8
+                draw_text_with_stroke(
+                    draw, (name_x, name_y), display_name, name_font, "white", "black", 1)
+
+                value_x = box_x + box_width - value_width - 8
+                draw_text_with_stroke(
+                    draw, (value_x, value_y), value_text, font_medium, "white", "black", 1)
+        else:
+            cx, cy = image.size[0] // 2, image.size[1] // 2
+            draw_text_centered_with_stroke(
+                draw, "NO DATA AVAILABLE", (cx, cy), font_giant, "white", "black", 3)
+
+        return image
 
-            rank_height = rank_bbox[3] - rank_bbox[1]
-            name_bbox = draw.textbbox((0, 0), display_name, font=name_font)
-            name_height = name_bbox[3] - name_bbox[1]
-            value_height = value_bbox[3] - value_bbox[0]
-
-            rank_y = box_y + (box_height - rank_height) // 2
-            name_y = box_y + (box_height - name_height) // 2
-            value_y = box_y + (box_height - value_height) // 2
-
-            rank_x = box_x + (placement_width - rank_width) // 2
-            ImageGenerator.draw_text_with_stroke(
-                draw, (rank_x, rank_y), rank_text, font_medium, "white", "black", 1)
-
-            name_x = box_x + placement_width + 8
-            ImageGenerator.draw_text_with_stroke(
-                draw, (name_x, name_y), display_name, name_font, "white", "black", 1)
-
-            value_x = box_x + box_width - value_width - 8
-            ImageGenerator.draw_text_with_stroke(
-                draw, (value_x, value_y), value_text, font_medium, "white", "black", 1)
-    else:
-        cx, cy = image.size[0] // 2, image.size[1] // 2
-        ImageGenerator.draw_text_centered_with_stroke(
-            draw, "NO DATA AVAILABLE", (cx, cy), font_giant, "white", "black", 3)
-
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
     return img_bytes
 
 
@@ -668,7 +404,8 @@ async def generate_leaderboard_image(
 
 async def generate_voice_leaderboard_image(guild: discord.Guild, channel: discord.VoiceChannel,
                                            leaderboard_data: list, days_back: int, role_id: str = None,
-                                           user_count: int = 10, page: int = 0, is_real_time: bool = False):
+                                           user_count: int = 10, page: int = 0, is_real_time: bool = False,
+                                           total_items: int = None):
 
     return await generate_leaderboard_image(
         guild=guild,
@@ -679,13 +416,15 @@ async def generate_voice_leaderboard_image(guild: discord.Guild, channel: discor
         role_id=role_id,
         user_count=user_count,
         page=page,
-        is_real_time=is_real_time
+        is_real_time=is_real_time,
+        total_items=total_items
     )
 
 
 async def generate_text_leaderboard_image(guild: discord.Guild, channel: discord.TextChannel,
                                           leaderboard_data: list, days_back: int, role_id: str = None,
-                                          total_messages: int = None, user_count: int = 10, page: int = 0, is_real_time: bool = False):
+                                          total_messages: int = None, user_count: int = 10, page: int = 0, is_real_time: bool = False,
+                                          total_items: int = None):
 
     return await generate_leaderboard_image(
         guild=guild,
@@ -697,7 +436,8 @@ async def generate_text_leaderboard_image(guild: discord.Guild, channel: discord
         total_value=total_messages,
         user_count=user_count,
         page=page,
-        is_real_time=is_real_time
+        is_real_time=is_real_time,
+        total_items=total_items
     )
 
 # SERVER LEADERBOARD IMAGE GENERATION
@@ -726,7 +466,8 @@ async def generate_server_leaderboard_image(guild: discord.Guild, leaderboard_da
 async def generate_category_leaderboard_image(guild: discord.Guild, category: discord.CategoryChannel,
                                               leaderboard_data: list, leaderboard_type: str,
                                               days_back: int, role_id: str = None, total_value: int = None,
-                                              user_count: int = 10, page: int = 0, is_real_time: bool = False):
+                                              user_count: int = 10, page: int = 0, is_real_time: bool = False,
+                                              total_items: int = None):
 
     return await generate_leaderboard_image(
         guild=guild,
@@ -738,7 +479,8 @@ async def generate_category_leaderboard_image(guild: discord.Guild, category: di
         total_value=total_value,
         user_count=user_count,
         page=page,
-        is_real_time=is_real_time
+        is_real_time=is_real_time,
+        total_items=total_items
     )
 
 
@@ -1191,11 +933,11 @@ class VoiceLeaderboardView(discord.ui.View):
 
         if interaction.response.is_done():
 
-            await self.update_message(interaction)
+            await self.update_message(interaction, refresh=True)
         else:
             await interaction.response.defer(ephemeral=False, thinking=False)
 
-            await self.update_message(interaction)
+            await self.update_message(interaction, refresh=True)
 
     async def handle_custom_days(self, interaction: discord.Interaction):
 
@@ -1203,35 +945,30 @@ class VoiceLeaderboardView(discord.ui.View):
             self.cog, interaction.message.id, self.guild, self.channel)
         await interaction.response.send_modal(modal)
 
-    async def generate_image(self):
-
-        leaderboard_data = await self.cog.get_channel_voice_leaderboard(
-            self.guild, self.channel, self.current_days, self.selected_role_id
-        )
+    async def generate_image(self, leaderboard_page: dict):
 
         return await generate_voice_leaderboard_image(
             guild=self.guild,
             channel=self.channel,
-            leaderboard_data=leaderboard_data,
+            leaderboard_data=leaderboard_page['entries'],
             days_back=self.current_days,
             role_id=self.selected_role_id,
-            page=self.page
+            page=leaderboard_page['page'],
+            total_items=leaderboard_page['total_items']
         )
 
-    async def update_message(self, interaction: discord.Interaction):
+    async def update_message(self, interaction: discord.Interaction, refresh: bool = False):
 
         try:
-            leaderboard_data = await self.cog.get_channel_voice_leaderboard(
-                self.guild, self.channel, self.current_days, self.selected_role_id
+            leaderboard_page = await self.cog.get_channel_voice_leaderboard(
+                self.guild, self.channel, self.current_days, self.selected_role_id,
+                page=self.page, refresh=refresh
             )
-            total_users = len(leaderboard_data)
+            self.page = leaderboard_page['page']
             total_pages = max(
-                1, (total_users + Config.USERS_PER_PAGE - 1) // Config.USERS_PER_PAGE)
-
-            if self.page >= total_pages:
-                self.page = max(0, total_pages - 1)
+                1, (leaderboard_page['total_items'] + Config.USERS_PER_PAGE - 1) // Config.USERS_PER_PAGE)
 
-            img_bytes = await self.generate_image()
+            img_bytes = await self.generate_image(leaderboard_page)
 
             for child in self.children:
                 if isinstance(child, PageIndicator):
@@ -1345,7 +1082,7 @@ class TextLeaderboardView(discord.ui.View):
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=False, thinking=False)
 
-        await self.update_message(interaction)
+        await self.update_message(interaction, refresh=True)
 
     async def handle_time_settings(self, interaction: discord.Interaction):
 
@@ -1379,39 +1116,31 @@ class TextLeaderboardView(discord.ui.View):
             self.cog, interaction.message.id, self.guild, self.channel)
         await interaction.response.send_modal(modal)
 
-    async def generate_image(self):
-
-        leaderboard_data = await self.cog.get_channel_text_leaderboard(
-            self.guild, self.channel, self.current_days, self.selected_role_id
-        )
-
-        total_messages = sum(count for _, count in leaderboard_data)
+    async def generate_image(self, leaderboard_page: dict):
 
         return await generate_text_leaderboard_image(
             guild=self.guild,
             channel=self.channel,
-            leaderboard_data=leaderboard_data,
+            leaderboard_data=leaderboard_page['entries'],
             days_back=self.current_days,
             role_id=self.selected_role_id,
-            total_messages=total_messages,
-            page=self.page
+            total_messages=leaderboard_page['total_value'],
+            page=leaderboard_page['page'],
+            total_items=leaderboard_page['total_items']
         )
 
-    async def update_message(self, interaction: discord.Interaction):
+    async def update_message(self, interaction: discord.Interaction, refresh: bool = False):
 
         try:
-
-            leaderboard_data = await self.cog.get_channel_text_leaderboard(
-                self.guild, self.channel, self.current_days, self.selected_role_id
+            leaderboard_page = await self.cog.get_channel_text_leaderboard(
+                self.guild, self.channel, self.current_days, self.selected_role_id,
+                page=self.page, refresh=refresh
             )
-            total_users = len(leaderboard_data)
+            self.page = leaderboard_page['page']
             total_pages = max(
-                1, (total_users + Config.USERS_PER_PAGE - 1) // Config.USERS_PER_PAGE)
+                1, (leaderboard_page['total_items'] + Config.USERS_PER_PAGE - 1) // Config.USERS_PER_PAGE)
 
-            if self.page >= total_pages:
-                self.page = max(0, total_pages - 1)
-
-            img_bytes = await self.generate_image()
+            img_bytes = await self.generate_image(leaderboard_page)
 
             for child in self.children:
                 if isinstance(child, PageIndicator):
@@ -1814,7 +1543,7 @@ class CategoryLeaderboardView(discord.ui.View):
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=False, thinking=False)
 
-        await self.update_message(interaction)
+        await self.update_message(interaction, refresh=True)
 
     async def handle_time_settings(self, interaction: discord.Interaction):
 
@@ -1848,30 +1577,19 @@ class CategoryLeaderboardView(discord.ui.View):
             self.cog, interaction.message.id, self.guild, self.category)
         await interaction.response.send_modal(modal)
 
-    async def generate_image(self):
-
-        data = await self.cog.get_category_data(self.guild, self.category, self.current_days,
-                                                self.leaderboard_type, self.selected_role_id)
+    async def generate_image(self, data: dict):
 
-        if self.leaderboard_type == "top_users_messages":
-            leaderboard_data = data["users"]
-            total_value = sum(
-                count for _, count in leaderboard_data) if leaderboard_data else 0
-        elif self.leaderboard_type == "top_users_voice":
-            leaderboard_data = data["users"]
-            total_value = sum(
-                seconds for _, seconds in leaderboard_data) if leaderboard_data else 0
-        elif self.leaderboard_type == "top_text_channels":
-            leaderboard_data = data["channels"]
-            total_value = sum(
-                count for _, count in leaderboard_data) if leaderboard_data else 0
-        elif self.leaderboard_type == "top_voice_channels":
-            leaderboard_data = data["channels"]
-            total_value = sum(
-                seconds for _, seconds in leaderboard_data) if leaderboard_data else 0
+        if self.leaderboard_type in ["top_users_messages", "top_users_voice"]:
+            leaderboard_data = data.get("users", [])
+        elif self.leaderboard_type in ["top_text_channels", "top_voice_channels"]:
+            leaderboard_data = data.get("channels", [])
         else:
             leaderboard_data = []
-            total_value = 0
+
+        total_value = data.get("total_value")
+        if total_value is None:
+            total_value = sum(
+                value for _, value in leaderboard_data) if leaderboard_data else 0
 
         return await generate_category_leaderboard_image(
             guild=self.guild,
@@ -1881,28 +1599,31 @@ class CategoryLeaderboardView(discord.ui.View):
             days_back=self.current_days,
             role_id=self.selected_role_id,
             total_value=total_value,
-            page=self.page
+            page=self.page,
+            total_items=data.get("total_items")
         )
 
-    async def update_message(self, interaction: discord.Interaction):
+    async def update_message(self, interaction: discord.Interaction, refresh: bool = False):
 
         try:
             data = await self.cog.get_category_data(self.guild, self.category, self.current_days,
-                                                    self.leaderboard_type, self.selected_role_id)
+                                                    self.leaderboard_type, self.selected_role_id,
+                                                    page=self.page, refresh=refresh)
 
             if self.leaderboard_type in ["top_users_messages", "top_users_voice"]:
                 leaderboard_data = data.get("users", [])
             else:
                 leaderboard_data = data.get("channels", [])
 
-            total_items = len(leaderboard_data)
+            total_items = data.get("total_items", len(leaderboard_data))
             total_pages = max(
                 1, (total_items + Config.USERS_PER_PAGE - 1) // Config.USERS_PER_PAGE)
 
+            self.page = data.get("page", self.page)
             if self.page >= total_pages:
                 self.page = max(0, total_pages - 1)
 
-            img_bytes = await self.generate_image()
+            img_bytes = await self.generate_image(data)
 
             for child in self.children:
                 if isinstance(child, PageIndicator):
@@ -2159,17 +1880,22 @@ class Leaderboards(commands.Cog):
     # QUERY FUNCTIONS
 
     async def get_channel_voice_leaderboard(self, guild: discord.Guild, channel: discord.VoiceChannel,
-                                            days_back: int, role_id: str = None):
+                                            days_back: int, role_id: str = None,
+                                            page: int = 0, refresh: bool = False):
+
+        # One page of the channel's ranking snapshot; paging reuses the
+        # snapshot and refresh starts a new one
+        empty = {'entries': [], 'page': 0, 'total_items': 0, 'total_value': 0}
 
         if not self.db_cog:
             logger.warning("DatabaseStats cog not available")
-            return []
+            return empty
 
         try:
             guild_id_int = DataFormatter.ensure_int(guild.id)
             if guild_id_int is None:
                 logger.error(f"Invalid guild ID: {guild.id}")
-                return []
+                return empty
 
             role_filter_ids = None
             if role_id and role_id != "none":
@@ -2177,45 +1903,40 @@ class Leaderboards(commands.Cog):
                 if role_id_int:
                     role_filter_ids = [role_id_int]
 
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(days=days_back)
-
-            top_users = await self.db_cog.q_leaderboard_voice_users_in_channel(
+            return await self.db_cog.q_ranking_page(
                 guild_id=guild_id_int,
-                channel_id=channel.id,
-                limit=100,
+                metric='voice',
+                page=page,
+                page_size=Config.USERS_PER_PAGE,
+                scope='channel',
+                target_id=channel.id,
                 role_filter_ids=role_filter_ids,
-                start_time=start_time,
-                end_time=end_time
+                days_back=days_back,
+                refresh=refresh
             )
 
-            user_stats = []
-            for user_data in top_users:
-                user_id = user_data.get('user_id')
-                total_seconds = user_data.get('total_seconds', 0)
-
-                if user_id and total_seconds > 0:
-                    user_stats.append((str(user_id), total_seconds))
-
-            return user_stats
-
         except Exception as e:
             logger.error(f"Error getting voice leaderboard: {e}")
             traceback.print_exc()
-            return []
+            return empty
 
     async def get_channel_text_leaderboard(self, guild: discord.Guild, channel: discord.TextChannel,
-                                           days_back: int, role_id: str = None):
+                                           days_back: int, role_id: str = None,
+                                           page: int = 0, refresh: bool = False):
+
+        # One page of the channel's ranking snapshot; paging reuses the
+        # snapshot and refresh starts a new one
+        empty = {'entries': [], 'page': 0, 'total_items': 0, 'total_value': 0}
 
         if not self.db_cog:
             logger.warning("DatabaseStats cog not available")
-            return []
+            return empty
 
         try:
             guild_id_int = DataFormatter.ensure_int(guild.id)
             if guild_id_int is None:
                 logger.error(f"Invalid guild ID: {guild.id}")
-                return []
+                return empty
 
             role_filter_ids = None
             if role_id and role_id != "none":
@@ -2223,32 +1944,22 @@ class Leaderboards(commands.Cog):
                 if role_id_int:
                     role_filter_ids = [role_id_int]
 
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(days=days_back)
-
-            top_users = await self.db_cog.q_leaderboard_text_users_in_channel(
+            return await self.db_cog.q_ranking_page(
                 guild_id=guild_id_int,
-                channel_id=channel.id,
-                limit=100,
+                metric='messages',
+                page=page,
+                page_size=Config.USERS_PER_PAGE,
+                scope='channel',
+                target_id=channel.id,
                 role_filter_ids=role_filter_ids,
-                start_time=start_time,
-                end_time=end_time
+                days_back=days_back,
+                refresh=refresh
             )
 
-            user_stats = []
-            for user_data in top_users:
-                user_id = user_data.get('user_id')
-                message_count = user_data.get('message_count', 0)
-
-                if user_id and message_count > 0:
-                    user_stats.append((str(user_id), message_count))
-
-            return user_stats
-
         except Exception as e:
             logger.error(f"Error getting text leaderboard: {e}")
             traceback.print_exc()
-            return []
+            return empty
 
     async def get_server_message_data(self, guild: discord.Guild, days_back: int,
                                       role_id: str = None):
@@ -2279,19 +1990,33 @@ class Leaderboards(commands.Cog):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days_back)
 
-            top_users = await self.db_cog.q_server_top3_users_messages(
-                guild_id=guild_id_int,
-                role_filter_ids=role_filter_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
+            live_users = None
+            if not role_filter_ids:
+                live_users = await self.db_cog.q_live_leaderboard(
+                    guild_id=guild_id_int,
+                    metric='messages',
+                    days=days_back,
+                    limit=100
+                )
 
-            for user_data in top_users:
-                user_id = user_data.get('user_id')
-                message_count = user_data.get('message_count', 0)
+            if live_users is not None:
+                for user_id, message_count in live_users['entries']:
+                    result["users"].append((str(user_id), int(message_count)))
+            else:
+                top_users = await self.db_cog.q_server_top3_users_messages(
+                    guild_id=guild_id_int,
+                    limit=100,
+                    role_filter_ids=role_filter_ids,
+                    start_time=start_time,
+                    end_time=end_time
+                )
+
+                for user_data in top_users:
+                    user_id = user_data.get('user_id')
+                    message_count = user_data.get('message_count', 0)
 
-                if user_id and message_count > 0:
-                    result["users"].append((str(user_id), message_count))
+                    if user_id and message_count > 0:
+                        result["users"].append((str(user_id), message_count))
 
             top_channels = await self.db_cog.q_leaderboard_server_top_text_channels(
                 guild_id=guild_id_int,
@@ -2360,19 +2085,33 @@ class Leaderboards(commands.Cog):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days_back)
 
-            top_users = await self.db_cog.q_server_top3_users_voice(
-                guild_id=guild_id_int,
-                role_filter_ids=role_filter_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
+            live_users = None
+            if not role_filter_ids:
+                live_users = await self.db_cog.q_live_leaderboard(
+                    guild_id=guild_id_int,
+                    metric='voice',
+                    days=days_back,
+                    limit=100
+                )
+
+            if live_users is not None:
+                for user_id, total_seconds in live_users['entries']:
+                    result["users"].append((str(user_id), int(total_seconds)))
+            else:
+                top_users = await self.db_cog.q_server_top3_users_voice(
+                    guild_id=guild_id_int,
+                    limit=100,
+                    role_filter_ids=role_filter_ids,
+                    start_time=start_time,
+                    end_time=end_time
+                )
 
-            for user_data in top_users:
-                user_id = user_data.get('user_id')
-                total_seconds = user_data.get('total_seconds', 0)
+                for user_data in top_users:
+                    user_id = user_data.get('user_id')
+                    total_seconds = user_data.get('total_seconds', 0)
 
-                if user_id and total_seconds > 0:
-                    result["users"].append((str(user_id), total_seconds))
+                    if user_id and total_seconds > 0:
+                        result["users"].append((str(user_id), total_seconds))
 
             top_channels = await self.db_cog.q_leaderboard_server_top_voice_channels(
                 guild_id=guild_id_int,
@@ -2413,7 +2152,8 @@ class Leaderboards(commands.Cog):
         return result
 
     async def get_category_data(self, guild: discord.Guild, category: discord.CategoryChannel,
-                                days_back: int, leaderboard_type: str, role_id: str = None):
+                                days_back: int, leaderboard_type: str, role_id: str = None,
+                                page: int = 0, refresh: bool = False):
 
         if not self.db_cog:
             logger.warning("DatabaseStats cog not available")
@@ -2439,41 +2179,25 @@ class Leaderboards(commands.Cog):
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days_back)
 
-            if leaderboard_type == "top_users_messages":
+            if leaderboard_type in ("top_users_messages", "top_users_voice"):
 
-                top_users = await self.db_cog.q_leaderboard_category_users_messages(
+                # User rankings page through a ranking snapshot
+                leaderboard_page = await self.db_cog.q_ranking_page(
                     guild_id=guild_id_int,
-                    category_id=category.id,
-                    limit=100,
+                    metric='messages' if leaderboard_type == "top_users_messages" else 'voice',
+                    page=page,
+                    page_size=Config.USERS_PER_PAGE,
+                    scope='category',
+                    target_id=category.id,
                     role_filter_ids=role_filter_ids,
-                    start_time=start_time,
-                    end_time=end_time
+                    days_back=days_back,
+                    refresh=refresh
                 )
 
-                for user_data in top_users:
-                    user_id = user_data.get('user_id')
-                    message_count = user_data.get('message_count', 0)
-
-                    if user_id and message_count > 0:
-                        result["users"].append((str(user_id), message_count))
-
-            elif leaderboard_type == "top_users_voice":
-
-                top_users = await self.db_cog.q_leaderboard_category_users_voice(
-                    guild_id=guild_id_int,
-                    category_id=category.id,
-                    limit=100,
-                    role_filter_ids=role_filter_ids,
-                    start_time=start_time,
-                    end_time=end_time
-                )
-
-                for user_data in top_users:
-                    user_id = user_data.get('user_id')
-                    total_seconds = user_data.get('total_seconds', 0)
-
-                    if user_id and total_seconds > 0:
-                        result["users"].append((str(user_id), total_seconds))
+                result["users"] = leaderboard_page['entries']
+                result["page"] = leaderboard_page['page']
+                result["total_items"] = leaderboard_page['total_items']
+                result["total_value"] = leaderboard_page['total_value']
 
             elif leaderboard_type == "top_text_channels":
 
@@ -2583,26 +2307,20 @@ class Leaderboards(commands.Cog):
             await interaction.followup.send("❌ Database connection not available. Please make sure the DatabaseStats cog is loaded.", ephemeral=True)
             return
 
-        leaderboard_data = await self.get_channel_voice_leaderboard(interaction.guild, channel, Config.DEFAULT_DAYS_BACK)
+        view = VoiceLeaderboardView(
+            self, interaction.guild, channel, days_back=Config.DEFAULT_DAYS_BACK
+        )
 
-        if not leaderboard_data:
+        leaderboard_page = await self.get_channel_voice_leaderboard(interaction.guild, channel, Config.DEFAULT_DAYS_BACK)
+
+        if not leaderboard_page['entries']:
             await interaction.followup.send("⚠️ No data available for this channel.", ephemeral=True)
             return
 
-        img_bytes = await generate_voice_leaderboard_image(
-            guild=interaction.guild,
-            channel=channel,
-            leaderboard_data=leaderboard_data,
-            days_back=Config.DEFAULT_DAYS_BACK,
-            page=0
-        )
+        img_bytes = await view.generate_image(leaderboard_page)
 
         file = discord.File(img_bytes, filename="voice_leaderboard.png")
 
-        view = VoiceLeaderboardView(
-            self, interaction.guild, channel, days_back=Config.DEFAULT_DAYS_BACK
-        )
-
         await interaction.followup.send(file=file, view=view)
 
         message = await interaction.original_response()
@@ -2620,29 +2338,20 @@ class Leaderboards(commands.Cog):
             await interaction.followup.send("❌ Database connection not available. Please make sure the DatabaseStats cog is loaded.", ephemeral=True)
             return
 
-        leaderboard_data = await self.get_channel_text_leaderboard(interaction.guild, channel, Config.DEFAULT_DAYS_BACK)
+        view = TextLeaderboardView(
+            self, interaction.guild, channel, days_back=Config.DEFAULT_DAYS_BACK
+        )
+
+        leaderboard_page = await self.get_channel_text_leaderboard(interaction.guild, channel, Config.DEFAULT_DAYS_BACK)
 
-        if not leaderboard_data:
+        if not leaderboard_page['entries']:
             await interaction.followup.send("⚠️ No data available for this channel.", ephemeral=True)
             return
 
-        total_messages = sum(count for _, count in leaderboard_data)
-
-        img_bytes = await generate_text_leaderboard_image(
-            guild=interaction.guild,
-            channel=channel,
-            leaderboard_data=leaderboard_data,
-            days_back=Config.DEFAULT_DAYS_BACK,
-            total_messages=total_messages,
-            page=0
-        )
+        img_bytes = await view.generate_image(leaderboard_page)
 
         file = discord.File(img_bytes, filename="text_leaderboard.png")
 
-        view = TextLeaderboardView(
-            self, interaction.guild, channel, days_back=Config.DEFAULT_DAYS_BACK
-        )
-
         await interaction.followup.send(file=file, view=view)
 
         message = await interaction.original_response()
@@ -2,7 +2,8 @@ import discord
 from discord import app_commands
 from discord.ui import View, Select, Button, Modal, TextInput
 from discord.ext import commands
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal, Tuple
+from datetime import datetime
 import asyncpg
 import os
 from dotenv import load_dotenv
@@ -20,10 +21,19 @@ logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Raw tables the rollups are built from -> columns bounding the time a row covers
+ROLLUP_TIME_COLUMNS = {
+    'message_tracking': ('created_at', 'created_at'),
+    'voice_session_history': ('join_time', 'leave_time'),
+    'emoji_usage': ('last_used', 'last_used'),
+    'activity_sessions': ('start_time', 'start_time')
+}
+
 
 class DatabaseManager:
-    def __init__(self, pool: asyncpg.Pool):
+    def __init__(self, pool: asyncpg.Pool, bot: Optional[commands.Bot] = None):
         self.pool = pool
+        self.bot = bot
         logger.info("DatabaseManager initialized")
 
     async def ensure_tables_exist(self, guild_id: int):
@@ -50,6 +60,74 @@ class DatabaseManager:
                 return False
             return True
 
+    # ROLLUP MAINTENANCE
+
+    def _db_cog(self):
+
+        return self.bot.get_cog('DatabaseStats') if self.bot else None
+
+    async def _delete_rows(self, conn, table: str, where_clause: str, params: list,
+                           deleted_ranges: Dict[str, Tuple[datetime, datetime]]) -> int:
+
+        # Deletes the matching rows; for a table the rollups are built from,
+        # also notes the time range they covered in deleted_ranges
+        time_columns = ROLLUP_TIME_COLUMNS.get(table)
+        if time_columns is None:
+            result = await conn.execute(f"DELETE FROM {table} WHERE {where_clause}", *params)
+            deleted_count = result.split()[-1]
+            return int(deleted_count) if deleted_count.isdigit() else 0
+
+        row = await conn.fetchrow(f"""
+            WITH deleted AS (
+                DELETE FROM {table} WHERE {where_clause}
+                RETURNING {time_columns[0]} AS first_at, {time_columns[1]} AS last_at
+            )
+            SELECT COUNT(*) AS deleted_count, MIN(first_at) AS first_at, MAX(last_at) AS last_at
+            FROM deleted
+        """, *params)
+
+        if row['deleted_count']:
+            first_at = row['first_at']
+            last_at = row['last_at'] or first_at
+            if table in deleted_ranges:
+                first_at = min(first_at, deleted_ranges[table][0])
+                last_at = max(last_at, deleted_ranges[table][1])
+            deleted_ranges[table] = (first_at, last_at)
+
+        return row['deleted_count']
+
+    async def _rebuild_derived_rows(self, conn, guild_id: int, where_clause: str, params: list,
+                                    deleted_ranges: Dict[str, Tuple[datetime, datetime]]):
+
+        # Runs in the delete's transaction: voice_hourly holds the deleted
+        # sessions' hourly slices, and the guild's sketches and summaries
+        # over the deleted range are rebuilt from the rows left
+        if 'voice_session_history' in deleted_ranges:
+            await conn.execute(f"DELETE FROM voice_hourly WHERE {where_clause}", *params)
+
+        db_cog = self._db_cog()
+        if db_cog and deleted_ranges:
+            await db_cog.rebuild_guild_summaries(conn, guild_id, deleted_ranges)
+
+    async def _finish_reset(self, guild_id: int,
+                            deleted_ranges: Dict[str, Tuple[datetime, datetime]]):
+
+        # Runs once the delete is committed; the continuous aggregates can't
+        # be refreshed inside a transaction
+        db_cog = self._db_cog()
+        if not db_cog:
+            logger.warning(f"DatabaseStats not loaded; rollups for guild {guild_id} not refreshed")
+            return
+
+        if deleted_ranges:
+            await db_cog.refresh_rollups(deleted_ranges)
+
+        # The live leaderboards backfill from the corrected rollups
+        await db_cog.clear_live_leaderboards(guild_id)
+
+        # Cached q_* results were computed from the deleted rows
+        await db_cog.bump_data_version(guild_id)
+
     # SERVER DELETION LOGIC
 
     async def delete_server_all(self, guild_id: int,
@@ -60,6 +138,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_server_all: guild={guild_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1"]
@@ -90,9 +170,8 @@ class DatabaseManager:
 
                     for table in tables:
                         try:
-                            result = await conn.execute(f"DELETE FROM {table} WHERE {where_clause}", *params)
-
-                            deleted_counts[table] = result.split()[-1]
+                            deleted_counts[table] = await self._delete_rows(
+                                conn, table, where_clause, params, deleted_ranges)
                             logger.info(
                                 f"Deleted from {table}: {deleted_counts[table]} rows")
                         except Exception as e:
@@ -109,8 +188,8 @@ class DatabaseManager:
 
                         for table in server_tables:
                             try:
-                                result = await conn.execute(f"DELETE FROM {table} WHERE guild_id = $1", guild_id)
-                                deleted_counts[table] = result.split()[-1]
+                                deleted_counts[table] = await self._delete_rows(
+                                    conn, table, "guild_id = $1", [guild_id], deleted_ranges)
                                 logger.info(
                                     f"Deleted from {table}: {deleted_counts[table]} rows")
                             except Exception as e:
@@ -118,7 +197,10 @@ class DatabaseManager:
                                     f"Error deleting from {table}: {e}")
                                 deleted_counts[table] = "0 (error)"
 
-                    return deleted_counts
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_server_all: {e}")
@@ -133,6 +215,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_server_messages: guild={guild_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1"]
@@ -150,12 +234,16 @@ class DatabaseManager:
                         param_counter += 1
 
                     where_clause = " AND ".join(conditions)
-                    result = await conn.execute(f"DELETE FROM message_tracking WHERE {where_clause}", *params)
+                    deleted_count = await self._delete_rows(
+                        conn, 'message_tracking', where_clause, params, deleted_ranges)
 
-                    deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} rows from message_tracking")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_count
 
         except Exception as e:
             logger.error(f"Error in delete_server_messages: {e}")
@@ -170,6 +258,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_server_voice: guild={guild_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1"]
@@ -190,14 +280,18 @@ class DatabaseManager:
 
                     deleted_counts = {}
 
-                    result1 = await conn.execute(f"DELETE FROM voice_session_history WHERE {where_clause}", *params)
-                    deleted_counts['voice_session_history'] = result1.split()[-1]
+                    deleted_counts['voice_session_history'] = await self._delete_rows(
+                        conn, 'voice_session_history', where_clause, params, deleted_ranges)
 
-                    result2 = await conn.execute(f"DELETE FROM voice_active_sessions WHERE {where_clause}", *params)
-                    deleted_counts['voice_active_sessions'] = result2.split()[-1]
+                    deleted_counts['voice_active_sessions'] = await self._delete_rows(
+                        conn, 'voice_active_sessions', where_clause, params, deleted_ranges)
 
                     logger.info(f"Deleted voice stats: {deleted_counts}")
-                    return deleted_counts
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_server_voice: {e}")
@@ -216,7 +310,9 @@ class DatabaseManager:
                     deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} rows from invite_tracking")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+            await self._finish_reset(guild_id, {})
+            return int(deleted_count) if deleted_count.isdigit() else 0
 
         except Exception as e:
             logger.error(f"Error in delete_server_invites: {e}")
@@ -231,6 +327,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_server_emoji: guild={guild_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1"]
@@ -248,12 +346,16 @@ class DatabaseManager:
                         param_counter += 1
 
                     where_clause = " AND ".join(conditions)
-                    result = await conn.execute(f"DELETE FROM emoji_usage WHERE {where_clause}", *params)
+                    deleted_count = await self._delete_rows(
+                        conn, 'emoji_usage', where_clause, params, deleted_ranges)
 
-                    deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} rows from emoji_usage")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_count
 
         except Exception as e:
             logger.error(f"Error in delete_server_emoji: {e}")
@@ -265,19 +367,22 @@ class DatabaseManager:
         try:
             logger.info(f"delete_server_activity: guild={guild_id}")
 
-            async with self.db_pool.acquire() as conn:
+            deleted_ranges = {}
+
+            async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     deleted_counts = {}
 
-                    result1 = await conn.execute(f"DELETE FROM activity_active_sessions WHERE guild_id = $1", guild_id)
-                    deleted_counts['activity_active_sessions'] = result1.split(
-                    )[-1]
+                    deleted_counts['activity_active_sessions'] = await self._delete_rows(
+                        conn, 'activity_active_sessions', "guild_id = $1", [guild_id], deleted_ranges)
 
-                    result2 = await conn.execute(f"DELETE FROM activity_sessions WHERE guild_id = $1", guild_id)
-                    deleted_counts['activity_sessions'] = result2.split()[-1]
+                    deleted_counts['activity_sessions'] = await self._delete_rows(
+                        conn, 'activity_sessions', "guild_id = $1", [guild_id], deleted_ranges)
 
                     logger.info(f"Deleted activity stats: {deleted_counts}")
-                    return deleted_counts
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_server_activity: {e}")
@@ -314,7 +419,9 @@ class DatabaseManager:
                     deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} rows from user_mentions")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+            await self._finish_reset(guild_id, {})
+            return int(deleted_count) if deleted_count.isdigit() else 0
 
         except Exception as e:
             logger.error(f"Error in delete_server_mentions: {e}")
@@ -331,6 +438,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_user_all: guild={guild_id}, user={user_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1", "user_id = $2"]
@@ -360,8 +469,8 @@ class DatabaseManager:
 
                     for table in tables:
                         try:
-                            result = await conn.execute(f"DELETE FROM {table} WHERE {where_clause}", *params)
-                            deleted_counts[table] = result.split()[-1]
+                            deleted_counts[table] = await self._delete_rows(
+                                conn, table, where_clause, params, deleted_ranges)
                             logger.info(
                                 f"Deleted from {table}: {deleted_counts[table]} rows")
                         except Exception as e:
@@ -397,18 +506,20 @@ class DatabaseManager:
                         """, guild_id, user_id)
                         deleted_counts['invite_tracking'] = result.split()[-1]
 
-                        result1 = await conn.execute(f"DELETE FROM activity_active_sessions WHERE guild_id = $1 AND user_id = $2",
-                                                     guild_id, user_id)
-                        deleted_counts['activity_active_sessions'] = result1.split(
-                        )[-1]
+                        deleted_counts['activity_active_sessions'] = await self._delete_rows(
+                            conn, 'activity_active_sessions', "guild_id = $1 AND user_id = $2",
+                            [guild_id, user_id], deleted_ranges)
 
-                        result2 = await conn.execute(f"DELETE FROM activity_sessions WHERE guild_id = $1 AND user_id = $2",
-                                                     guild_id, user_id)
-                        deleted_counts['activity_sessions'] = result2.split(
-                        )[-1]
+                        deleted_counts['activity_sessions'] = await self._delete_rows(
+                            conn, 'activity_sessions', "guild_id = $1 AND user_id = $2",
+                            [guild_id, user_id], deleted_ranges)
 
                     logger.info(f"Deleted user stats: {deleted_counts}")
-                    return deleted_counts
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_user_all: {e}")
@@ -423,6 +534,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_user_messages: guild={guild_id}, user={user_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1", "user_id = $2"]
@@ -440,12 +553,16 @@ class DatabaseManager:
                         param_counter += 1
 
                     where_clause = " AND ".join(conditions)
-                    result = await conn.execute(f"DELETE FROM message_tracking WHERE {where_clause}", *params)
+                    deleted_count = await self._delete_rows(
+                        conn, 'message_tracking', where_clause, params, deleted_ranges)
 
-                    deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} rows from message_tracking for user {user_id}")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_count
 
         except Exception as e:
             logger.error(f"Error in delete_user_messages: {e}")
@@ -460,6 +577,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_user_voice: guild={guild_id}, user={user_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1", "user_id = $2"]
@@ -479,15 +598,19 @@ class DatabaseManager:
                     where_clause = " AND ".join(conditions)
 
                     deleted_counts = {}
-                    result1 = await conn.execute(f"DELETE FROM voice_session_history WHERE {where_clause}", *params)
-                    deleted_counts['voice_session_history'] = result1.split()[-1]
+                    deleted_counts['voice_session_history'] = await self._delete_rows(
+                        conn, 'voice_session_history', where_clause, params, deleted_ranges)
 
-                    result2 = await conn.execute(f"DELETE FROM voice_active_sessions WHERE {where_clause}", *params)
-                    deleted_counts['voice_active_sessions'] = result2.split()[-1]
+                    deleted_counts['voice_active_sessions'] = await self._delete_rows(
+                        conn, 'voice_active_sessions', where_clause, params, deleted_ranges)
 
                     logger.info(
                         f"Deleted voice stats for user {user_id}: {deleted_counts}")
-                    return deleted_counts
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_user_voice: {e}")
@@ -510,7 +633,9 @@ class DatabaseManager:
                     deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} invite records for user {user_id}")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+            await self._finish_reset(guild_id, {})
+            return int(deleted_count) if deleted_count.isdigit() else 0
 
         except Exception as e:
             logger.error(f"Error in delete_user_invites: {e}")
@@ -525,6 +650,8 @@ class DatabaseManager:
             logger.info(
                 f"delete_user_emoji: guild={guild_id}, user={user_id}, channel={channel_id}, category={category_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     conditions = ["guild_id = $1", "user_id = $2"]
@@ -542,12 +669,16 @@ class DatabaseManager:
                         param_counter += 1
 
                     where_clause = " AND ".join(conditions)
-                    result = await conn.execute(f"DELETE FROM emoji_usage WHERE {where_clause}", *params)
+                    deleted_count = await self._delete_rows(
+                        conn, 'emoji_usage', where_clause, params, deleted_ranges)
 
-                    deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} emoji records for user {user_id}")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+                    await self._rebuild_derived_rows(conn, guild_id, where_clause, params, deleted_ranges)
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_count
 
         except Exception as e:
             logger.error(f"Error in delete_user_emoji: {e}")
@@ -560,22 +691,25 @@ class DatabaseManager:
             logger.info(
                 f"delete_user_activity: guild={guild_id}, user={user_id}")
 
+            deleted_ranges = {}
+
             async with self.pool.acquire() as conn:
                 async with conn.transaction():
                     deleted_counts = {}
 
-                    result1 = await conn.execute(f"DELETE FROM activity_active_sessions WHERE guild_id = $1 AND user_id = $2",
-                                                 guild_id, user_id)
-                    deleted_counts['activity_active_sessions'] = result1.split(
-                    )[-1]
+                    deleted_counts['activity_active_sessions'] = await self._delete_rows(
+                        conn, 'activity_active_sessions', "guild_id = $1 AND user_id = $2",
+                        [guild_id, user_id], deleted_ranges)
 
-                    result2 = await conn.execute(f"DELETE FROM activity_sessions WHERE guild_id = $1 AND user_id = $2",
-                                                 guild_id, user_id)
-                    deleted_counts['activity_sessions'] = result2.split()[-1]
+                    deleted_counts['activity_sessions'] = await self._delete_rows(
+                        conn, 'activity_sessions', "guild_id = $1 AND user_id = $2",
+                        [guild_id, user_id], deleted_ranges)
 
                     logger.info(
                         f"Deleted activity stats for user {user_id}: {deleted_counts}")
-                    return deleted_counts
+
+            await self._finish_reset(guild_id, deleted_ranges)
+            return deleted_counts
 
         except Exception as e:
             logger.error(f"Error in delete_user_activity: {e}")
@@ -613,7 +747,9 @@ class DatabaseManager:
                     deleted_count = result.split()[-1]
                     logger.info(
                         f"Deleted {deleted_count} mention records involving user {user_id}")
-                    return int(deleted_count) if deleted_count.isdigit() else 0
+
+            await self._finish_reset(guild_id, {})
+            return int(deleted_count) if deleted_count.isdigit() else 0
 
         except Exception as e:
             logger.error(f"Error in delete_user_mentions: {e}")
@@ -1243,7 +1379,7 @@ class ResetStats(commands.Cog):
                 version = await conn.fetchval('SELECT version()')
                 logger.info(f"Database connected: {version.split()[0]}")
 
-            self.db_manager = DatabaseManager(self.db_pool)
+            self.db_manager = DatabaseManager(self.db_pool, self.bot)
 
             logger.info(
                 "✅ ResetStats: Database connection established and verified!")
@@ -4,19 +4,38 @@ from discord import app_commands
 from datetime import timedelta, datetime, timezone
 import time
 import asyncio
-from PIL import Image, ImageDraw, ImageFont
-import io
-import aiohttp
+from PIL import Image, ImageDraw
 import os
 from dotenv import load_dotenv
 from pilmoji import Pilmoji
 import traceback
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (draw_text_with_stroke, draw_text_centered, step_offsets,
+                                  fit_text_to_rectangle, paste_avatar)
+from utils.emoji_store import emoji_source
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 load_dotenv()
 
+FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
+
+# Fitted text: sizes tried largest first, nudged down as the text shrinks
+SERVER_NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+SERVER_NAME_OFFSETS = step_offsets(SERVER_NAME_FONT_SIZES, (40, 30, 20, 16))
+
+USERNAME_FONT_SIZES = (26, 24, 22, 20, 18, 16)
+USERNAME_OFFSETS = step_offsets(USERNAME_FONT_SIZES, (26, 20, 16))
+
+CHANNEL_FONT_SIZES = (24, 22, 20, 18, 16, 14, 12, 10, 8)
+CHANNEL_OFFSETS = step_offsets(CHANNEL_FONT_SIZES, (20, 16))
+
 
 # FORMAT
 
@@ -48,1177 +67,434 @@ def format_message_count(count):
         return str(count)
 
 
-# DRAWING FUNCTIONS
-
-def draw_text_centered(draw, text, position, font, fill, max_width=None):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    x = position[0] - text_width // 2
-    y = position[1] - text_height // 2
-
-    if max_width and text_width > max_width:
-        while text_width > max_width and len(text) > 1:
-            text = text[:-1]
-            bbox = draw.textbbox((0, 0), text + "...", font=font)
-            text_width = bbox[2] - bbox[0]
-        text = text + "..."
-
-    draw.text((x, y), text, fill=fill, font=font)
-
-
+@cached_render('server_stats')
 async def create_user_stats_image(guild, stats_data, days_back=30, role_id=None):
-    template_path = BASE_DIR / "assets" / "images" / "server stats final png.png"
-    try:
-        image = Image.open(template_path)
-    except FileNotFoundError:
-        image = Image.new('RGB', (800, 800), color='#2C2F33')
-
-    draw = ImageDraw.Draw(image)
-
-    # FONTS
-
-    try:
-        font_paths = [BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-        font_loaded = False
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    font_large = ImageFont.truetype(font_path, 24)
-                    font_medium = ImageFont.truetype(font_path, 20)
-                    font_small = ImageFont.truetype(font_path, 16)
-                    font_larger = ImageFont.truetype(font_path, 30)
-                    font_huge = ImageFont.truetype(font_path, 40)
-                    font_horndon_medium = ImageFont.truetype(font_path, 20)
-                    arial_small = ImageFont.truetype("arial.ttf", 16)
-                    emoji_font = ImageFont.truetype("arial.ttf", 24)
-
-                    font_horndon_tiny = ImageFont.truetype(font_path, 8)
-                    font_horndon_extra_small = ImageFont.truetype(
-                        font_path, 10)
-                    font_horndon_small = ImageFont.truetype(font_path, 12)
-                    font_horndon_medium_small = ImageFont.truetype(
-                        font_path, 14)
-                    font_horndon_medium = ImageFont.truetype(font_path, 16)
-                    font_horndon_large = ImageFont.truetype(font_path, 18)
-                    font_horndon_larger = ImageFont.truetype(font_path, 20)
-                    font_horndon_xlarge = ImageFont.truetype(font_path, 22)
-                    font_horndon_xxlarge = ImageFont.truetype(font_path, 24)
-                    font_horndon_huge = ImageFont.truetype(font_path, 30)
-                    font_horndon_giant = ImageFont.truetype(font_path, 40)
-                    font_loaded = True
-                    break
-                except:
-                    continue
-
-        if not font_loaded:
-            font_large = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_larger = ImageFont.load_default()
-            font_huge = ImageFont.load_default()
-            font_horndon_medium = ImageFont.load_default()
-            arial_small = ImageFont.load_default()
-            emoji_font = ImageFont.load_default()
-
-            font_horndon_tiny = ImageFont.load_default()
-            font_horndon_extra_small = ImageFont.load_default()
-            font_horndon_small = ImageFont.load_default()
-            font_horndon_medium_small = ImageFont.load_default()
-            font_horndon_medium = ImageFont.load_default()
-            font_horndon_large = ImageFont.load_default()
-            font_horndon_larger = ImageFont.load_default()
-            font_horndon_xlarge = ImageFont.load_default()
-            font_horndon_xxlarge = ImageFont.load_default()
-            font_horndon_huge = ImageFont.load_default()
-            font_horndon_giant = ImageFont.load_default()
-
-    except:
-        font_large = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-        font_larger = ImageFont.load_default()
-        font_huge = ImageFont.load_default()
-        font_horndon_medium = ImageFont.load_default()
-        arial_small = ImageFont.load_default()
-        emoji_font = ImageFont.load_default()
-
-        font_horndon_tiny = ImageFont.load_default()
-        font_horndon_extra_small = ImageFont.load_default()
-        font_horndon_small = ImageFont.load_default()
-        font_horndon_medium_small = ImageFont.load_default()
-        font_horndon_medium = ImageFont.load_default()
-        font_horndon_large = ImageFont.load_default()
-        font_horndon_larger = ImageFont.load_default()
-        font_horndon_xlarge = ImageFont.load_default()
-        font_horndon_xxlarge = ImageFont.load_default()
-        font_horndon_huge = ImageFont.load_default()
-        font_horndon_giant = ImageFont.load_default()
-
-    # INVISIBLE RECTANGLE FUNCTIONS
-
-    def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-        rect_left = rect_center_x - (rect_width // 2)
-        rect_right = rect_center_x + (rect_width // 2)
-        rect_top = rect_center_y - (rect_height // 2)
-        rect_bottom = rect_center_y + (rect_height // 2)
-
-        bbox = draw.textbbox((text_x, text_y), text, font=font)
-        text_left = bbox[0]
-        text_right = bbox[2]
-        text_top = bbox[1]
-        text_bottom = bbox[3]
-
-        exceeds_width = (text_left < rect_left) or (text_right > rect_right)
-        exceeds_height = (text_top < rect_top) or (text_bottom > rect_bottom)
-
-        return exceeds_width or exceeds_height
-
-    def fit_text_to_rectangle(text, text_center_x, text_center_y, rect_center_x, rect_center_y, rect_width, rect_height, is_channel=False, is_username=False):
-
-        if is_username:
-            font_sizes = [26, 24, 22, 20, 18, 16]
-        elif is_channel:
-            font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-        else:
-            font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-
-        for font_size in font_sizes:
-            try:
-                font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_center_x - (text_width // 2)
-            text_y = text_center_y - (text_height // 2)
-
-            vertical_offset = 0
-
-            if is_username:
-                if font_size <= 26:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-            elif is_channel:
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-            else:
-                if font_size <= 12:
-                    vertical_offset += 1
-
-            text_y += vertical_offset
-
-            if not check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                return text, font, (text_x, text_y)
-
-        smallest_font = font_sizes[-1]
+    # Template with the server icon and name, drawn once per guild
+    async def build_base():
+        template_path = BASE_DIR / "assets" / "images" / "server stats final png.png"
         try:
-            font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                font_paths[0]) else ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
-
-        truncated_text = text
-        while len(truncated_text) > 3:
-            truncated_text = truncated_text[:-4] + "..."
-            bbox = draw.textbbox((0, 0), truncated_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_center_x - (text_width // 2)
-            text_y = text_center_y - (text_height // 2)
-
-            vertical_offset = 0
-            if is_username:
-                if smallest_font <= 26:
-                    vertical_offset += 1
-                if smallest_font <= 20:
-                    vertical_offset += 1
-                if smallest_font <= 16:
-                    vertical_offset += 1
-            elif is_channel:
-                if smallest_font <= 20:
-                    vertical_offset += 1
-                if smallest_font <= 16:
-                    vertical_offset += 1
-            else:
-                if smallest_font <= 12:
-                    vertical_offset += 1
-
-            text_y += vertical_offset
-
-            if not check_text_against_rectangle(truncated_text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                return truncated_text, font, (text_x, text_y)
-
-        if len(text) > 3:
-            final_text = text[:3] + "..."
-        elif text:
-            final_text = text
-        else:
-            final_text = "-"
-
-        bbox = draw.textbbox((0, 0), final_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = text_center_x - (text_width // 2)
-        text_y = text_center_y - (text_height // 2)
-
-        vertical_offset = 0
-        if is_channel and smallest_font <= 20:
-            vertical_offset += 1
-        if is_channel and smallest_font <= 16:
-            vertical_offset += 1
-        text_y += vertical_offset
-
-        return final_text, font, (text_x, text_y)
-
-    text_channel_rectangles_left = [
-        {"center": (70, 325), "width": 120, "height": 50},
-        {"center": (70, 380), "width": 120, "height": 50},
-        {"center": (70, 435), "width": 120, "height": 50}
-    ]
-
-    text_channel_rectangles_right = [
-        {"center": (325, 325), "width": 120, "height": 50},
-        {"center": (325, 380), "width": 120, "height": 50},
-        {"center": (325, 435), "width": 120, "height": 50}
-    ]
-
-    voice_channel_rectangles_left = [
-        {"center": (70, 540), "width": 120, "height": 50},
-        {"center": (70, 595), "width": 120, "height": 50},
-        {"center": (70, 650), "width": 120, "height": 50}
-    ]
-
-    voice_channel_rectangles_right = [
-        {"center": (325, 540), "width": 120, "height": 50},
-        {"center": (325, 595), "width": 120, "height": 50},
-        {"center": (325, 650), "width": 120, "height": 50}
-    ]
-
-    server_name_rectangle = {"center": (150, 30), "width": 183, "height": 35}
-
-    with Pilmoji(image) as pilmoji:
-        # Server profile picture
-        server_name = guild.name
+            base = template_registry.get(template_path, "RGB")
+        except FileNotFoundError:
+            base = Image.new('RGB', (800, 800), color='#2C2F33')
 
         try:
             if guild.icon:
-                icon_url = guild.icon.url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(icon_url) as response:
-                        icon_data = await response.read()
-
-                icon_image = Image.open(io.BytesIO(icon_data))
                 icon_size = (60, 60)
-                icon_image = icon_image.resize(
-                    icon_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', icon_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse((0, 0, icon_size[0], icon_size[1]), fill=255)
-                icon_image.putalpha(mask)
+                icon_image = await asset_cache.get_image(guild.icon, icon_size, circle=True)
 
                 icon_x = 7
                 icon_y = 25 - 20
 
-                icon_area = image.crop(
-                    (icon_x, icon_y, icon_x + icon_size[0], icon_y + icon_size[1])).convert('RGBA')
-                icon_with_bg = Image.new('RGBA', icon_size, (0, 0, 0, 0))
-                icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                icon_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                image.paste(icon_area.convert('RGB'), (icon_x, icon_y))
+                paste_avatar(base, icon_image, (icon_x, icon_y))
+        except Exception as e:
+            print(f"Error with server icon/name: {e}")
 
-                server_name_font_sizes = [
-                    40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
+        server_name_rectangle = {"center": (150, 30), "width": 183, "height": 35}
+        fitted_text, server_name_font, final_pos = fit_text_to_rectangle(
+            guild.name or "-", FONT_PATH, SERVER_NAME_FONT_SIZES, (75, 25),
+            server_name_rectangle, offsets=SERVER_NAME_OFFSETS)
 
-                fitted_text = server_name
-                server_name_font = None
-                final_pos = None
+        with Pilmoji(base, source=emoji_source) as pilmoji:
+            draw_text_with_stroke(pilmoji, final_pos, fitted_text,
+                                  server_name_font, "white", "black", 1,
+                                  emoji_position_offset=(0, 0))
+        return base
 
-                rect_center_x = server_name_rectangle["center"][0]
-                rect_center_y = server_name_rectangle["center"][1]
-                rect_width = server_name_rectangle["width"]
-                rect_height = server_name_rectangle["height"]
+    image = await layer_cache.get(guild, 'server_stats', build_base)
 
-                text_start_x = 75
-                text_start_y = 25
+    def compose():
 
-                for font_size in server_name_font_sizes:
-                    try:
-                        font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                            font_paths[0]) else ImageFont.load_default()
-                    except:
-                        font = ImageFont.load_default()
+        draw = ImageDraw.Draw(image)
 
-                    bbox = draw.textbbox((0, 0), server_name, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
+        # FONTS
 
-                    text_x = text_start_x
-                    text_y = text_start_y - \
-                        (text_height // 2)
-
-                    vertical_offset = 0
-                    if font_size <= 40:
-                        vertical_offset += 1
-                    if font_size <= 30:
-                        vertical_offset += 1
-                    if font_size <= 20:
-                        vertical_offset += 1
-                    if font_size <= 16:
-                        vertical_offset += 1
-                    text_y += vertical_offset
-
-                    if not check_text_against_rectangle(server_name, font, text_x, text_y,
-                                                        rect_center_x, rect_center_y,
-                                                        rect_width, rect_height):
-                        fitted_text = server_name
-                        server_name_font = font
-                        final_pos = (text_x, text_y)
-                        break
-
-                if not server_name_font:
-                    smallest_font = server_name_font_sizes[-1]
+        try:
+            font_paths = [BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
+            font_loaded = False
+            for font_path in font_paths:
+                if os.path.exists(font_path):
                     try:
-                        server_name_font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                            font_paths[0]) else ImageFont.load_default()
+                        font_large = get_font(font_path, 24)
+                        font_medium = get_font(font_path, 20)
+                        font_small = get_font(font_path, 16)
+                        font_larger = get_font(font_path, 30)
+                        font_huge = get_font(font_path, 40)
+                        font_horndon_medium = get_font(font_path, 20)
+                        arial_small = get_font("arial.ttf", 16)
+                        emoji_font = get_font("arial.ttf", 24)
+
+                        font_horndon_tiny = get_font(font_path, 8)
+                        font_horndon_extra_small = get_font(
+                            font_path, 10)
+                        font_horndon_small = get_font(font_path, 12)
+                        font_horndon_medium_small = get_font(
+                            font_path, 14)
+                        font_horndon_medium = get_font(font_path, 16)
+                        font_horndon_large = get_font(font_path, 18)
+                        font_horndon_larger = get_font(font_path, 20)
+                        font_horndon_xlarge = get_font(font_path, 22)
+                        font_horndon_xxlarge = get_font(font_path, 24)
+                        font_horndon_huge = get_font(font_path, 30)
+                        font_horndon_giant = get_font(font_path, 40)
+                        font_loaded = True
+                        break
                     except:
-                        server_name_font = ImageFont.load_default()
-
-                    rect_left = rect_center_x - (rect_width // 2)
-                    rect_right = rect_center_x + (rect_width // 2)
-
-                    truncated_text = server_name
-                    for i in range(len(server_name)):
-
-                        test_text = server_name[:len(server_name)-i] + "..."
-                        bbox = draw.textbbox(
-                            (0, 0), test_text, font=server_name_font)
-                        text_width = bbox[2] - bbox[0]
-                        text_height = bbox[3] - bbox[1]
-
-                        text_x = text_start_x
-                        text_y = text_start_y - (text_height // 2)
-
-                        vertical_offset = 0
-                        if smallest_font <= 40:
-                            vertical_offset += 1
-                        if smallest_font <= 30:
-                            vertical_offset += 1
-                        if smallest_font <= 20:
-                            vertical_offset += 1
-                        if smallest_font <= 16:
-                            vertical_offset += 1
-                        text_y += vertical_offset
-
-                        if (text_x >= rect_left) and ((text_x + text_width) <= rect_right):
-                            fitted_text = test_text
-                            final_pos = (text_x, text_y)
-                            break
-
-                    if not final_pos:
-                        if len(server_name) > 3:
-                            fitted_text = server_name[:3] + "..."
-                        elif server_name:
-                            fitted_text = server_name
-                        else:
-                            fitted_text = "-"
-
-                        bbox = draw.textbbox(
-                            (0, 0), fitted_text, font=server_name_font)
-                        text_width = bbox[2] - bbox[0]
-                        text_height = bbox[3] - bbox[1]
-
-                        text_x = text_start_x
-                        text_y = text_start_y - (text_height // 2)
-
-                        vertical_offset = 0
-                        if smallest_font <= 40:
-                            vertical_offset += 1
-                        if smallest_font <= 30:
-                            vertical_offset += 1
-                        if smallest_font <= 20:
-                            vertical_offset += 1
-                        if smallest_font <= 16:
-                            vertical_offset += 1
-                        text_y += vertical_offset
-
-                        final_pos = (text_x, text_y)
-
-                if fitted_text and final_pos:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((final_pos[0] + dx, final_pos[1] + dy),
-                                             fitted_text, "black", server_name_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(final_pos, fitted_text, "white", server_name_font,
-                                 emoji_position_offset=(0, 0))
+                        continue
+
+            if not font_loaded:
+                font_large = default_font()
+                font_medium = default_font()
+                font_small = default_font()
+                font_larger = default_font()
+                font_huge = default_font()
+                font_horndon_medium = default_font()
+                arial_small = default_font()
+                emoji_font = default_font()
+
+                font_horndon_tiny = default_font()
+                font_horndon_extra_small = default_font()
+                font_horndon_small = default_font()
+                font_horndon_medium_small = default_font()
+                font_horndon_medium = default_font()
+                font_horndon_large = default_font()
+                font_horndon_larger = default_font()
+                font_horndon_xlarge = default_font()
+                font_horndon_xxlarge = default_font()
+                font_horndon_huge = default_font()
+                font_horndon_giant = default_font()
 
-            else:
-
-                server_name_font_sizes = [
-                    40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-                fitted_text = server_name
-                server_name_font = None
-                final_pos = None
-
-                rect_center_x = server_name_rectangle["center"][0]
-                rect_center_y = server_name_rectangle["center"][1]
-                rect_width = server_name_rectangle["width"]
-                rect_height = server_name_rectangle["height"]
-
-                text_start_x = 75
-                text_start_y = 25
+        except:
+            font_large = default_font()
+            font_medium = default_font()
+            font_small = default_font()
+            font_larger = default_font()
+            font_huge = default_font()
+            font_horndon_medium = default_font()
+            arial_small = default_font()
+            emoji_font = default_font()
+
+            font_horndon_tiny = default_font()
+            font_horndon_extra_small = default_font()
+            font_horndon_small = default_font()
+            font_horndon_medium_small = default_font()
+            font_horndon_medium = default_font()
+            font_horndon_large = default_font()
+            font_horndon_larger = default_font()
+            font_horndon_xlarge = default_font()
+            font_horndon_xxlarge = default_font()
+            font_horndon_huge = default_font()
+            font_horndon_giant = default_font()
+
+        # INVISIBLE RECTANGLE FUNCTIONS
+
+        def fit_card_text(text, position, rect, is_channel=False, is_username=False):
 
-                for font_size in server_name_font_sizes:
-                    try:
-                        font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                            font_paths[0]) else ImageFont.load_default()
-                    except:
-                        font = ImageFont.load_default()
+            if is_username:
+                font_sizes, offsets = USERNAME_FONT_SIZES, USERNAME_OFFSETS
+            else:
+                font_sizes, offsets = CHANNEL_FONT_SIZES, CHANNEL_OFFSETS
 
-                    bbox = draw.textbbox((0, 0), server_name, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
+            return fit_text_to_rectangle(text or "-", FONT_PATH, font_sizes, position, rect,
+                                         offsets=offsets, centered=True)
 
-                    text_x = text_start_x
-                    text_y = text_start_y - (text_height // 2)
-
-                    vertical_offset = 0
-                    if font_size <= 40:
-                        vertical_offset += 1
-                    if font_size <= 30:
-                        vertical_offset += 1
-                    if font_size <= 20:
-                        vertical_offset += 1
-                    if font_size <= 16:
-                        vertical_offset += 1
-                    text_y += vertical_offset
-
-                    if not check_text_against_rectangle(server_name, font, text_x, text_y,
-                                                        rect_center_x, rect_center_y,
-                                                        rect_width, rect_height):
-                        fitted_text = server_name
-                        server_name_font = font
-                        final_pos = (text_x, text_y)
-                        break
+        text_channel_rectangles_left = [
+            {"center": (70, 325), "width": 120, "height": 50},
+            {"center": (70, 380), "width": 120, "height": 50},
+            {"center": (70, 435), "width": 120, "height": 50}
+        ]
 
-                if not server_name_font:
-                    smallest_font = server_name_font_sizes[-1]
-                    try:
-                        server_name_font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                            font_paths[0]) else ImageFont.load_default()
-                    except:
-                        server_name_font = ImageFont.load_default()
-
-                    rect_left = rect_center_x - (rect_width // 2)
-                    rect_right = rect_center_x + (rect_width // 2)
-
-                    truncated_text = server_name
-                    for i in range(len(server_name)):
-
-                        test_text = server_name[:len(server_name)-i] + "..."
-                        bbox = draw.textbbox(
-                            (0, 0), test_text, font=server_name_font)
-                        text_width = bbox[2] - bbox[0]
-                        text_height = bbox[3] - bbox[1]
-
-                        text_x = text_start_x
-                        text_y = text_start_y - (text_height // 2)
-
-                        vertical_offset = 0
-                        if smallest_font <= 40:
-                            vertical_offset += 1
-                        if smallest_font <= 30:
-                            vertical_offset += 1
-                        if smallest_font <= 20:
-                            vertical_offset += 1
-                        if smallest_font <= 16:
-                            vertical_offset += 1
-                        text_y += vertical_offset
-
-                        if (text_x >= rect_left) and ((text_x + text_width) <= rect_right):
-                            fitted_text = test_text
-                            final_pos = (text_x, text_y)
-                            break
-
-                    if not final_pos:
-                        if len(server_name) > 3:
-                            fitted_text = server_name[:3] + "..."
-                        elif server_name:
-                            fitted_text = server_name
-                        else:
-                            fitted_text = "-"
-
-                        bbox = draw.textbbox(
-                            (0, 0), fitted_text, font=server_name_font)
-                        text_width = bbox[2] - bbox[0]
-                        text_height = bbox[3] - bbox[1]
-
-                        text_x = text_start_x
-                        text_y = text_start_y - (text_height // 2)
-
-                        vertical_offset = 0
-                        if smallest_font <= 40:
-                            vertical_offset += 1
-                        if smallest_font <= 30:
-                            vertical_offset += 1
-                        if smallest_font <= 20:
-                            vertical_offset += 1
-                        if smallest_font <= 16:
-                            vertical_offset += 1
-                        text_y += vertical_offset
-
-                        final_pos = (text_x, text_y)
-
-                if fitted_text and final_pos:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((final_pos[0] + dx, final_pos[1] + dy),
-                                             fitted_text, "black", server_name_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(final_pos, fitted_text, "white", server_name_font,
-                                 emoji_position_offset=(0, 0))
+        text_channel_rectangles_right = [
+            {"center": (325, 325), "width": 120, "height": 50},
+            {"center": (325, 380), "width": 120, "height": 50},
+            {"center": (325, 435), "width": 120, "height": 50}
+        ]
 
-        except Exception as e:
-            print(f"Error with server icon/name: {e}")
+        voice_channel_rectangles_left = [
+            {"center": (70, 540), "width": 120, "height": 50},
+            {"center": (70, 595), "width": 120, "height": 50},
+            {"center": (70, 650), "width": 120, "height": 50}
+        ]
 
-            server_name_font_sizes = [40, 38, 36, 34,
-                                      32, 30, 28, 26, 24, 22, 20, 18, 16]
+        voice_channel_rectangles_right = [
+            {"center": (325, 540), "width": 120, "height": 50},
+            {"center": (325, 595), "width": 120, "height": 50},
+            {"center": (325, 650), "width": 120, "height": 50}
+        ]
 
-            fitted_text = server_name
-            server_name_font = None
-            final_pos = None
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            # CREATED ON
+            current_date = datetime.now().strftime("%B %d, %Y")
+            draw_text_centered(draw, current_date, (605, 45),
+                               font_horndon_medium, "white", max_width=150,
+                               stroke_fill="black", stroke_width=1)
+
+            # TIME PERIOD
+            time_period_text = f"{days_back} days"
+            draw_text_centered(draw, time_period_text, (147, 713),
+                               font_horndon_medium, "white", max_width=100,
+                               stroke_fill="black", stroke_width=1)
+
+            # ROLE FILTER
+            role_text = "No Filter"
+            if role_id and role_id != "none":
+                try:
+                    role = guild.get_role(int(role_id))
+                    role_text = role.name if role else "Unknown Role"
+                except (ValueError, TypeError):
+                    role_text = "Unknown Role"
 
-            rect_center_x = server_name_rectangle["center"][0]
-            rect_center_y = server_name_rectangle["center"][1]
-            rect_width = server_name_rectangle["width"]
-            rect_height = server_name_rectangle["height"]
+            draw_text_centered(draw, role_text, (357, 712),
+                               font_horndon_medium, "white", max_width=150,
+                               stroke_fill="black", stroke_width=1)
 
-            text_start_x = 75
-            text_start_y = 25
+            # TOP EMOJIS
+            top_emojis = stats_data.get('top_emojis', [])
+            emoji_positions = [(50, 155), (50, 195), (50, 235)]
+            uses_positions = [(155, 150), (155, 190), (155, 230)]
 
-            for font_size in server_name_font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), server_name, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 40:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                if not check_text_against_rectangle(server_name, font, text_x, text_y,
-                                                    rect_center_x, rect_center_y,
-                                                    rect_width, rect_height):
-                    fitted_text = server_name
-                    server_name_font = font
-                    final_pos = (text_x, text_y)
-                    break
-
-            if not server_name_font:
-                smallest_font = server_name_font_sizes[-1]
-                try:
-                    server_name_font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    server_name_font = ImageFont.load_default()
+            for i in range(3):
+                if i < len(top_emojis):
+                    emoji_data = top_emojis[i]
+                    emoji_str = emoji_data.get('emoji', '❓')
+                    uses = emoji_data.get('uses', 0)
 
-                rect_left = rect_center_x - (rect_width // 2)
-                rect_right = rect_center_x + (rect_width // 2)
+                    try:
+                        emoji_x = emoji_positions[i][0] - 15
+                        emoji_y = emoji_positions[i][1] - 15
+                        pilmoji.text((emoji_x, emoji_y), emoji_str,
+                                     (255, 255, 255), emoji_font)
+                    except Exception:
+                        draw_text_centered(draw, emoji_str, emoji_positions[i],
+                                           font_medium, "white", max_width=80,
+                                           stroke_fill="black", stroke_width=1)
+
+                    uses_str = str(uses)
+                    draw_text_centered(draw, uses_str, uses_positions[i],
+                                       font_medium, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+                else:
+                    placeholder = "-"
+                    draw_text_centered(draw, placeholder, emoji_positions[i],
+                                       font_medium, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+
+                    zero_str = "0"
+                    draw_text_centered(draw, zero_str, uses_positions[i],
+                                       font_medium, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+
+            # TOTALS
+            total_messages = stats_data.get('total_messages', 0)
+            total_voice = stats_data.get('total_seconds', 0)
+
+            total_messages_text = format_message_count(total_messages)
+            draw_text_centered(draw, total_messages_text, (450, 160),
+                               font_large, "white", max_width=100,
+                               stroke_fill="black", stroke_width=1)
+
+            total_voice_text = format_time(total_voice)
+            draw_text_centered(draw, total_voice_text, (450, 215),
+                               font_large, "white", max_width=100,
+                               stroke_fill="black", stroke_width=1)
+
+            # MESSAGES OVER TIME
+            messages_over_time = stats_data.get('messages_over_time', {})
+            message_time_positions = {
+                1: (675, 160),
+                5: (675, 215),
+                10: (675, 270),
+                20: (675, 320),
+                30: (675, 370)
+            }
 
-                for i in range(len(server_name)):
+            for days, pos in message_time_positions.items():
+                count = messages_over_time.get(
+                    days, messages_over_time.get(f'{days}d', 0))
+                count_text = format_message_count(count)
+
+                draw_text_centered(draw, count_text, pos,
+                                   font_large, "white", max_width=80,
+                                   stroke_fill="black", stroke_width=1)
+
+            # VOICE OVER TIME
+            voice_over_time = stats_data.get('voice_over_time', {})
+            voice_time_positions = {
+                1: (675, 475),
+                5: (675, 530),
+                10: (675, 590),
+                20: (675, 645),
+                30: (675, 695)
+            }
 
-                    test_text = server_name[:len(server_name)-i] + "..."
-                    bbox = draw.textbbox(
-                        (0, 0), test_text, font=server_name_font)
+            for days, pos in voice_time_positions.items():
+                seconds = voice_over_time.get(
+                    days, voice_over_time.get(f'{days}d', 0))
+                voice_time_text = format_time(seconds)
+
+                draw_text_centered(draw, voice_time_text, pos,
+                                   font_large, "white", max_width=80,
+                                   stroke_fill="black", stroke_width=1)
+
+            # TOP USERS BY MESSAGES
+            top_users_messages = stats_data.get('top_users_messages', [])
+            user_msg_positions = [(65, 325), (65, 380), (65, 435)]
+            user_msg_count_positions = [(190, 325), (190, 380), (190, 435)]
+
+            for i in range(3):
+                if i < len(top_users_messages):
+                    user_data = top_users_messages[i]
+                    username = user_data.get('name', 'Unknown')
+                    messages = user_data.get('messages', 0)
+
+                    rect_info = text_channel_rectangles_left[i]
+                    fitted_text, user_font, user_pos = fit_card_text(
+                        username, user_msg_positions[i], rect_info, is_username=True)
+
+                    if fitted_text:
+                        draw_text_with_stroke(pilmoji, user_pos, fitted_text,
+                                              user_font, "white", "black", 1,
+                                              emoji_position_offset=(0, 0))
+
+                    messages_text = format_message_count(messages)
+                    draw_text_centered(draw, messages_text, user_msg_count_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+                else:
+                    placeholder = "-"
+                    draw_text_centered(draw, placeholder, user_msg_positions[i],
+                                       font_large, "white", max_width=120,
+                                       stroke_fill="black", stroke_width=1)
+
+                    zero_str = "0"
+                    draw_text_centered(draw, zero_str, user_msg_count_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+
+            # TOP USERS BY VOICE
+            top_users_voice = stats_data.get('top_users_voice', [])
+            user_voice_positions = [(65, 540), (65, 595), (65, 650)]
+            user_voice_time_positions = [(190, 540), (190, 595), (190, 650)]
+
+            for i in range(3):
+                if i < len(top_users_voice):
+                    user_data = top_users_voice[i]
+                    username = user_data.get('name', 'Unknown')
+                    voice_time = user_data.get('voice_time', 0)
+
+                    rect_info = voice_channel_rectangles_left[i]
+                    fitted_text, user_font, user_pos = fit_card_text(
+                        username, user_voice_positions[i], rect_info, is_username=True)
+
+                    if fitted_text:
+                        draw_text_with_stroke(pilmoji, user_pos, fitted_text,
+                                              user_font, "white", "black", 1,
+                                              emoji_position_offset=(0, 0))
+
+                    voice_time_text = format_time(voice_time)
+                    draw_text_centered(draw, voice_time_text, user_voice_time_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+                else:
+                    placeholder = "-"
+                    draw_text_centered(draw, placeholder, user_voice_positions[i],
+                                       font_large, "white", max_width=120,
+                                       stroke_fill="black", stroke_width=1)
+
+                    zero_str = "0s"
+                    draw_text_centered(draw, zero_str, user_voice_time_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+
+            # TOP TEXT CHANNELS
+            top_text_channels = stats_data.get('top_text_channels', [])
+            text_channel_positions = [(325, 325), (325, 380), (325, 435)]
+            text_channel_msg_positions = [(450, 325), (450, 380), (450, 435)]
+
+            for i in range(3):
+                text_pos = text_channel_positions[i]
+                rect_info = text_channel_rectangles_right[i]
+
+                if i < len(top_text_channels):
+                    channel_data = top_text_channels[i]
+                    channel_name = channel_data.get('name', '[deleted channel]')
+                    messages = channel_data.get('messages', 0)
+
+                    fitted_text, channel_font, final_pos = fit_card_text(
+                        channel_name, text_pos, rect_info, is_channel=True)
+
+                    if fitted_text:
+                        draw_text_with_stroke(pilmoji, final_pos, fitted_text,
+                                              channel_font, "white", "black", 1,
+                                              emoji_position_offset=(0, 0))
+
+                    messages_text = format_message_count(messages)
+                    draw_text_centered(draw, messages_text, text_channel_msg_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+                else:
+                    placeholder_font = font_large
+                    bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
                     text_width = bbox[2] - bbox[0]
                     text_height = bbox[3] - bbox[1]
-
-                    text_x = text_start_x
-                    text_y = text_start_y - (text_height // 2)
-
-                    vertical_offset = 0
-                    if smallest_font <= 40:
-                        vertical_offset += 1
-                    if smallest_font <= 30:
-                        vertical_offset += 1
-                    if smallest_font <= 20:
-                        vertical_offset += 1
-                    if smallest_font <= 16:
-                        vertical_offset += 1
-                    text_y += vertical_offset
-
-                    if (text_x >= rect_left) and ((text_x + text_width) <= rect_right):
-                        fitted_text = test_text
-                        final_pos = (text_x, text_y)
-                        break
-
-                if not final_pos:
-                    if len(server_name) > 3:
-                        fitted_text = server_name[:3] + "..."
-                    elif server_name:
-                        fitted_text = server_name
-                    else:
-                        fitted_text = "-"
-
-                    bbox = draw.textbbox(
-                        (0, 0), fitted_text, font=server_name_font)
+                    placeholder_x = text_pos[0] - (text_width // 2)
+                    placeholder_y = text_pos[1] - (text_height // 2)
+
+                    draw_text_with_stroke(draw, (placeholder_x, placeholder_y),
+                                          "-", placeholder_font, "white", "black",
+                                          1)
+
+                    zero_str = "0"
+                    draw_text_centered(draw, zero_str, text_channel_msg_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+
+            # TOP VOICE CHANNELS
+            top_voice_channels = stats_data.get('top_voice_channels', [])
+            voice_channel_positions = [(325, 540), (325, 595), (325, 650)]
+            voice_channel_time_positions = [(450, 540), (450, 595), (450, 650)]
+
+            for i in range(3):
+                text_pos = voice_channel_positions[i]
+                rect_info = voice_channel_rectangles_right[i]
+
+                if i < len(top_voice_channels):
+                    channel_data = top_voice_channels[i]
+                    channel_name = channel_data.get('name', '[deleted channel]')
+                    voice_time = channel_data.get('voice_time', 0)
+
+                    fitted_text, channel_font, final_pos = fit_card_text(
+                        channel_name, text_pos, rect_info, is_channel=True)
+
+                    if fitted_text:
+                        draw_text_with_stroke(pilmoji, final_pos, fitted_text,
+                                              channel_font, "white", "black", 1,
+                                              emoji_position_offset=(0, 0))
+
+                    time_text = format_time(voice_time)
+                    draw_text_centered(draw, time_text, voice_channel_time_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
+                else:
+                    placeholder_font = font_large
+                    bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
                     text_width = bbox[2] - bbox[0]
                     text_height = bbox[3] - bbox[1]
+                    placeholder_x = text_pos[0] - (text_width // 2)
+                    placeholder_y = text_pos[1] - (text_height // 2)
 
-                    text_x = text_start_x
-                    text_y = text_start_y - (text_height // 2)
-
-                    vertical_offset = 0
-                    if smallest_font <= 40:
-                        vertical_offset += 1
-                    if smallest_font <= 30:
-                        vertical_offset += 1
-                    if smallest_font <= 20:
-                        vertical_offset += 1
-                    if smallest_font <= 16:
-                        vertical_offset += 1
-                    text_y += vertical_offset
-
-                    final_pos = (text_x, text_y)
-
-            if fitted_text and final_pos:
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((final_pos[0] + dx, final_pos[1] + dy),
-                                         fitted_text, "black", server_name_font,
-                                         emoji_position_offset=(0, 0))
-
-                pilmoji.text(final_pos, fitted_text, "white", server_name_font,
-                             emoji_position_offset=(0, 0))
-
-        # CREATED ON
-        current_date = datetime.now().strftime("%B %d, %Y")
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw_text_centered(draw, current_date, (605 + dx, 45 + dy),
-                                       font_horndon_medium, "black", max_width=150)
-
-        draw_text_centered(draw, current_date, (605, 45),
-                           font_horndon_medium, "white", max_width=150)
-
-        # TIME PERIOD
-        time_period_text = f"{days_back} days"
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw_text_centered(draw, time_period_text, (147 + dx, 713 + dy),
-                                       font_horndon_medium, "black", max_width=100)
-
-        draw_text_centered(draw, time_period_text, (147, 713),
-                           font_horndon_medium, "white", max_width=100)
-
-        # ROLE FILTER
-        role_text = "No Filter"
-        if role_id and role_id != "none":
-            try:
-                role = guild.get_role(int(role_id))
-                role_text = role.name if role else "Unknown Role"
-            except (ValueError, TypeError):
-                role_text = "Unknown Role"
-
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw_text_centered(draw, role_text, (357 + dx, 712 + dy),
-                                       font_horndon_medium, "black", max_width=150)
-
-        draw_text_centered(draw, role_text, (357, 712),
-                           font_horndon_medium, "white", max_width=150)
-
-        # TOP EMOJIS
-        top_emojis = stats_data.get('top_emojis', [])
-        emoji_positions = [(50, 155), (50, 195), (50, 235)]
-        uses_positions = [(155, 150), (155, 190), (155, 230)]
+                    draw_text_with_stroke(draw, (placeholder_x, placeholder_y),
+                                          "-", placeholder_font, "white", "black",
+                                          1)
 
-        for i in range(3):
-            if i < len(top_emojis):
-                emoji_data = top_emojis[i]
-                emoji_str = emoji_data.get('emoji', '❓')
-                uses = emoji_data.get('uses', 0)
+                    zero_str = "0s"
+                    draw_text_centered(draw, zero_str, voice_channel_time_positions[i],
+                                       font_large, "white", max_width=80,
+                                       stroke_fill="black", stroke_width=1)
 
-                try:
-                    emoji_x = emoji_positions[i][0] - 15
-                    emoji_y = emoji_positions[i][1] - 15
-                    pilmoji.text((emoji_x, emoji_y), emoji_str,
-                                 (255, 255, 255), emoji_font)
-                except Exception:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                draw_text_centered(draw, emoji_str, (emoji_positions[i][0] + dx, emoji_positions[i][1] + dy),
-                                                   font_medium, "black", max_width=80)
-
-                    draw_text_centered(draw, emoji_str, emoji_positions[i],
-                                       font_medium, "white", max_width=80)
-
-                stroke_width = 1
-                uses_str = str(uses)
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, uses_str, (uses_positions[i][0] + dx, uses_positions[i][1] + dy),
-                                               font_medium, "black", max_width=80)
-
-                draw_text_centered(draw, uses_str, uses_positions[i],
-                                   font_medium, "white", max_width=80)
-            else:
-                stroke_width = 1
-                placeholder = "-"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, placeholder, (emoji_positions[i][0] + dx, emoji_positions[i][1] + dy),
-                                               font_medium, "black", max_width=80)
-
-                draw_text_centered(draw, placeholder, emoji_positions[i],
-                                   font_medium, "white", max_width=80)
-
-                stroke_width = 1
-                zero_str = "0"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, zero_str, (uses_positions[i][0] + dx, uses_positions[i][1] + dy),
-                                               font_medium, "black", max_width=80)
-
-                draw_text_centered(draw, zero_str, uses_positions[i],
-                                   font_medium, "white", max_width=80)
-
-        # TOTALS
-        total_messages = stats_data.get('total_messages', 0)
-        total_voice = stats_data.get('total_seconds', 0)
-
-        total_messages_text = format_message_count(total_messages)
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw_text_centered(draw, total_messages_text, (450 + dx, 160 + dy),
-                                       font_large, "black", max_width=100)
-
-        draw_text_centered(draw, total_messages_text, (450, 160),
-                           font_large, "white", max_width=100)
-
-        total_voice_text = format_time(total_voice)
-        stroke_width = 1
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw_text_centered(draw, total_voice_text, (450 + dx, 215 + dy),
-                                       font_large, "black", max_width=100)
-
-        draw_text_centered(draw, total_voice_text, (450, 215),
-                           font_large, "white", max_width=100)
-
-        # MESSAGES OVER TIME
-        messages_over_time = stats_data.get('messages_over_time', {})
-        message_time_positions = {
-            1: (675, 160),
-            5: (675, 215),
-            10: (675, 270),
-            20: (675, 320),
-            30: (675, 370)
-        }
-
-        for days, pos in message_time_positions.items():
-            count = messages_over_time.get(
-                days, messages_over_time.get(f'{days}d', 0))
-            count_text = format_message_count(count)
-
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        draw_text_centered(draw, count_text, (pos[0] + dx, pos[1] + dy),
-                                           font_large, "black", max_width=80)
-
-            draw_text_centered(draw, count_text, pos,
-                               font_large, "white", max_width=80)
-
-        # VOICE OVER TIME
-        voice_over_time = stats_data.get('voice_over_time', {})
-        voice_time_positions = {
-            1: (675, 475),
-            5: (675, 530),
-            10: (675, 590),
-            20: (675, 645),
-            30: (675, 695)
-        }
-
-        for days, pos in voice_time_positions.items():
-            seconds = voice_over_time.get(
-                days, voice_over_time.get(f'{days}d', 0))
-            voice_time_text = format_time(seconds)
-
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        draw_text_centered(draw, voice_time_text, (pos[0] + dx, pos[1] + dy),
-                                           font_large, "black", max_width=80)
-
-            draw_text_centered(draw, voice_time_text, pos,
-                               font_large, "white", max_width=80)
-
-        # TOP USERS BY MESSAGES
-        top_users_messages = stats_data.get('top_users_messages', [])
-        user_msg_positions = [(65, 325), (65, 380), (65, 435)]
-        user_msg_count_positions = [(190, 325), (190, 380), (190, 435)]
-
-        for i in range(3):
-            if i < len(top_users_messages):
-                user_data = top_users_messages[i]
-                username = user_data.get('name', 'Unknown')
-                messages = user_data.get('messages', 0)
-
-                rect_info = text_channel_rectangles_left[i]
-                fitted_text, user_font, user_pos = fit_text_to_rectangle(
-                    username,
-                    user_msg_positions[i][0],
-                    user_msg_positions[i][1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=False,
-                    is_username=True
-                )
+        return image
 
-                if fitted_text:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((user_pos[0] + dx, user_pos[1] + dy),
-                                             fitted_text, "black", user_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(user_pos, fitted_text, "white", user_font,
-                                 emoji_position_offset=(0, 0))
-
-                messages_text = format_message_count(messages)
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, messages_text,
-                                               (user_msg_count_positions[i][0] + dx,
-                                                user_msg_count_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, messages_text, user_msg_count_positions[i],
-                                   font_large, "white", max_width=80)
-            else:
-                stroke_width = 1
-                placeholder = "-"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, placeholder,
-                                               (user_msg_positions[i][0] + dx,
-                                                user_msg_positions[i][1] + dy),
-                                               font_large, "black", max_width=120)
-
-                draw_text_centered(draw, placeholder, user_msg_positions[i],
-                                   font_large, "white", max_width=120)
-
-                stroke_width = 1
-                zero_str = "0"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, zero_str,
-                                               (user_msg_count_positions[i][0] + dx,
-                                                user_msg_count_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, zero_str, user_msg_count_positions[i],
-                                   font_large, "white", max_width=80)
-
-        # TOP USERS BY VOICE
-        top_users_voice = stats_data.get('top_users_voice', [])
-        user_voice_positions = [(65, 540), (65, 595), (65, 650)]
-        user_voice_time_positions = [(190, 540), (190, 595), (190, 650)]
-
-        for i in range(3):
-            if i < len(top_users_voice):
-                user_data = top_users_voice[i]
-                username = user_data.get('name', 'Unknown')
-                voice_time = user_data.get('voice_time', 0)
-
-                rect_info = voice_channel_rectangles_left[i]
-                fitted_text, user_font, user_pos = fit_text_to_rectangle(
-                    username,
-                    user_voice_positions[i][0],
-                    user_voice_positions[i][1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=False,
-                    is_username=True
-                )
-
-                if fitted_text:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((user_pos[0] + dx, user_pos[1] + dy),
-                                             fitted_text, "black", user_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(user_pos, fitted_text, "white", user_font,
-                                 emoji_position_offset=(0, 0))
-
-                voice_time_text = format_time(voice_time)
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, voice_time_text,
-                                               (user_voice_time_positions[i][0] + dx,
-                                                user_voice_time_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, voice_time_text, user_voice_time_positions[i],
-                                   font_large, "white", max_width=80)
-            else:
-                stroke_width = 1
-                placeholder = "-"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, placeholder,
-                                               (user_voice_positions[i][0] + dx,
-                                                user_voice_positions[i][1] + dy),
-                                               font_large, "black", max_width=120)
-
-                draw_text_centered(draw, placeholder, user_voice_positions[i],
-                                   font_large, "white", max_width=120)
-
-                stroke_width = 1
-                zero_str = "0s"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, zero_str,
-                                               (user_voice_time_positions[i][0] + dx,
-                                                user_voice_time_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, zero_str, user_voice_time_positions[i],
-                                   font_large, "white", max_width=80)
-
-        # TOP TEXT CHANNELS
-        top_text_channels = stats_data.get('top_text_channels', [])
-        text_channel_positions = [(325, 325), (325, 380), (325, 435)]
-        text_channel_msg_positions = [(450, 325), (450, 380), (450, 435)]
-
-        for i in range(3):
-            text_pos = text_channel_positions[i]
-            rect_info = text_channel_rectangles_right[i]
-
-            if i < len(top_text_channels):
-                channel_data = top_text_channels[i]
-                channel_name = channel_data.get('name', '[deleted channel]')
-                messages = channel_data.get('messages', 0)
-
-                fitted_text, channel_font, final_pos = fit_text_to_rectangle(
-                    channel_name,
-                    text_pos[0],
-                    text_pos[1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=True
-                )
-
-                if fitted_text:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((final_pos[0] + dx, final_pos[1] + dy),
-                                             fitted_text, "black", channel_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(final_pos, fitted_text, "white", channel_font,
-                                 emoji_position_offset=(0, 0))
-
-                messages_text = format_message_count(messages)
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, messages_text,
-                                               (text_channel_msg_positions[i][0] + dx,
-                                                text_channel_msg_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, messages_text, text_channel_msg_positions[i],
-                                   font_large, "white", max_width=80)
-            else:
-                placeholder_font = font_large
-                bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                placeholder_x = text_pos[0] - (text_width // 2)
-                placeholder_y = text_pos[1] - (text_height // 2)
-
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw.text((placeholder_x + dx, placeholder_y + dy), "-",
-                                      fill="black", font=placeholder_font)
-
-                draw.text((placeholder_x, placeholder_y), "-",
-                          fill="white", font=placeholder_font)
-
-                stroke_width = 1
-                zero_str = "0"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, zero_str,
-                                               (text_channel_msg_positions[i][0] + dx,
-                                                text_channel_msg_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, zero_str, text_channel_msg_positions[i],
-                                   font_large, "white", max_width=80)
-
-        # TOP VOICE CHANNELS
-        top_voice_channels = stats_data.get('top_voice_channels', [])
-        voice_channel_positions = [(325, 540), (325, 595), (325, 650)]
-        voice_channel_time_positions = [(450, 540), (450, 595), (450, 650)]
-
-        for i in range(3):
-            text_pos = voice_channel_positions[i]
-            rect_info = voice_channel_rectangles_right[i]
-
-            if i < len(top_voice_channels):
-                channel_data = top_voice_channels[i]
-                channel_name = channel_data.get('name', '[deleted channel]')
-                voice_time = channel_data.get('voice_time', 0)
-
-                fitted_text, channel_font, final_pos = fit_text_to_rectangle(
-                    channel_name,
-                    text_pos[0],
-                    text_pos[1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=True
-                )
-
-                if fitted_text:
-                    stroke_width = 1
-                    for dx in [-stroke_width, 0, stroke_width]:
-                        for dy in [-stroke_width, 0, stroke_width]:
-                            if dx != 0 or dy != 0:
-                                pilmoji.text((final_pos[0] + dx, final_pos[1] + dy),
-                                             fitted_text, "black", channel_font,
-                                             emoji_position_offset=(0, 0))
-
-                    pilmoji.text(final_pos, fitted_text, "white", channel_font,
-                                 emoji_position_offset=(0, 0))
-
-                time_text = format_time(voice_time)
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, time_text,
-                                               (voice_channel_time_positions[i][0] + dx,
-                                                voice_channel_time_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, time_text, voice_channel_time_positions[i],
-                                   font_large, "white", max_width=80)
-            else:
-                placeholder_font = font_large
-                bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                placeholder_x = text_pos[0] - (text_width // 2)
-                placeholder_y = text_pos[1] - (text_height // 2)
-
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw.text((placeholder_x + dx, placeholder_y + dy), "-",
-                                      fill="black", font=placeholder_font)
-
-                draw.text((placeholder_x, placeholder_y), "-",
-                          fill="white", font=placeholder_font)
-
-                stroke_width = 1
-                zero_str = "0s"
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw_text_centered(draw, zero_str,
-                                               (voice_channel_time_positions[i][0] + dx,
-                                                voice_channel_time_positions[i][1] + dy),
-                                               font_large, "black", max_width=80)
-
-                draw_text_centered(draw, zero_str, voice_channel_time_positions[i],
-                                   font_large, "white", max_width=80)
-
-    return image
+    img_bytes = await render_service.render_card(compose, guild.id)
+    return img_bytes
 
 
 # ROLE FILTER DROPDOWN MENU
@@ -1273,11 +549,7 @@ class ServerRoleSelectMenu(discord.ui.Select):
             if stats_data:
                 image_stats_data = view.cog._convert_to_image_format(
                     stats_data, view.guild)
-                image = await create_user_stats_image(view.guild, image_stats_data, view.current_days, view.selected_role_id)
-
-                img_bytes = io.BytesIO()
-                image.save(img_bytes, format='PNG')
-                img_bytes.seek(0)
+                img_bytes = await create_user_stats_image(view.guild, image_stats_data, view.current_days, view.selected_role_id)
 
                 file = discord.File(img_bytes, filename='server_stats.png')
                 view._update_buttons()
@@ -1321,11 +593,7 @@ class ServerTimeModal(discord.ui.Modal, title='Custom Time Period'):
                 if stats_data:
                     image_stats_data = self.cog._convert_to_image_format(
                         stats_data, self.guild)
-                    image = await create_user_stats_image(self.guild, image_stats_data, days)
-
-                    img_bytes = io.BytesIO()
-                    image.save(img_bytes, format='PNG')
-                    img_bytes.seek(0)
+                    img_bytes = await create_user_stats_image(self.guild, image_stats_data, days)
 
                     file = discord.File(img_bytes, filename='server_stats.png')
                     await interaction.edit_original_response(attachments=[file], view=view)
@@ -1455,14 +723,11 @@ class ServerStatsView(discord.ui.View):
             image_stats_data = self.cog._convert_to_image_format(
                 stats_data, self.guild
             )
-            image = await create_user_stats_image(
+            img_bytes = await create_user_stats_image(
                 self.guild, image_stats_data, self.current_days, self.selected_role_id
             )
 
             self._update_buttons()
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
 
             file = discord.File(img_bytes, filename="server_stats.png")
             await interaction.edit_original_response(attachments=[file], view=self)
@@ -1676,78 +941,23 @@ class ServerStats(commands.Cog):
                 'top_voice_channels': []
             }
 
-            messages_result = await db_cog.q_server_total_messages(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['total_messages'] = messages_result.get(
-                'total_messages', 0)
-
-            voice_result = await db_cog.q_server_total_voice(
+            dashboard = await db_cog.q_server_dashboard(
                 guild_id=guild_id,
                 role_filter_ids=role_ids,
                 start_time=start_time,
                 end_time=end_time
             )
-            stats_data['total_seconds'] = voice_result.get('total_seconds', 0)
 
-            messages_over_time = await db_cog.q_server_timeseries_messages_1d_5d_10d_20d_30d(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['messages_over_time'] = messages_over_time
-
-            voice_over_time = await db_cog.q_server_timeseries_voice_1d_5d_10d_20d_30d(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['voice_over_time'] = voice_over_time
+            stats_data['total_messages'] = (
+                dashboard['total_messages'] or {}).get('total_messages', 0)
+            stats_data['total_seconds'] = (
+                dashboard['total_voice'] or {}).get('total_seconds', 0)
 
-            top_emojis = await db_cog.q_server_top3_emojis(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['top_emojis'] = top_emojis
-
-            top_users_messages = await db_cog.q_server_top3_users_messages(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['top_users_messages'] = top_users_messages
-
-            top_users_voice = await db_cog.q_server_top3_users_voice(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['top_users_voice'] = top_users_voice
-
-            top_text_channels = await db_cog.q_server_top3_text_channels(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['top_text_channels'] = top_text_channels
-
-            top_voice_channels = await db_cog.q_server_top3_voice_channels(
-                guild_id=guild_id,
-                role_filter_ids=role_ids,
-                start_time=start_time,
-                end_time=end_time
-            )
-            stats_data['top_voice_channels'] = top_voice_channels
+            for key in ('messages_over_time', 'voice_over_time', 'top_emojis',
+                        'top_users_messages', 'top_users_voice',
+                        'top_text_channels', 'top_voice_channels'):
+                if dashboard[key] is not None:
+                    stats_data[key] = dashboard[key]
 
             stats_data['timestamp'] = end_time.isoformat()
 
@@ -1771,11 +981,7 @@ class ServerStats(commands.Cog):
 
         image_stats_data = self._convert_to_image_format(
             stats_data, interaction.guild)
-        image = await create_user_stats_image(interaction.guild, image_stats_data, 14)
-
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        img_bytes = await create_user_stats_image(interaction.guild, image_stats_data, 14)
 
         file = discord.File(img_bytes, filename='server_stats.png')
 
@@ -1,7 +1,5 @@
 from pilmoji import Pilmoji
-import aiohttp
-import io
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageOps
 from dotenv import load_dotenv
 import os
 from typing import Optional, List
@@ -13,6 +11,15 @@ from discord import app_commands
 from discord.ext import commands
 import discord
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (get_fonts, draw_text_with_stroke, draw_rounded_rectangle,
+                                  step_offsets, fit_text_to_rectangle, paste_avatar)
+from utils.emoji_store import emoji_source
 
 
 # CONFIGURATION
@@ -34,6 +41,10 @@ class ShipConfig:
     SHIP_TEMPLATE_PATH = BASE_DIR / "assets" / "images" / "ship final png.png"
     FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
+    # Server name: tried largest first, nudged down as it shrinks
+    NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+    NAME_OFFSETS = step_offsets(NAME_FONT_SIZES, (40, 30, 20, 16))
+
     SERVER_UI_POSITIONS = {
         'avatar': {'x': 7, 'y': 10, 'size': (60, 60)},
         'text_start': {'x': 85, 'y': 30},
@@ -356,135 +367,6 @@ class ServerUIIntegration:
 
         draw = ImageDraw.Draw(image)
 
-        def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            bbox = draw.textbbox((text_x, text_y), text, font=font)
-            text_left = bbox[0]
-            text_right = bbox[2]
-            text_top = bbox[1]
-            text_bottom = bbox[3]
-
-            exceeds_left = text_left < rect_left
-            exceeds_right = text_right > rect_right
-            exceeds_top = text_top < rect_top
-            exceeds_bottom = text_bottom > rect_bottom
-
-            return exceeds_left or exceeds_right or exceeds_top or exceeds_bottom
-
-        def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
-
-            font_paths = [ShipConfig.FONT_PATH]
-
-            initial_font_size = 40
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            font_sizes = [40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16]
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if font_size <= 40:
-                    vertical_offset += 1
-                if font_size <= 30:
-                    vertical_offset += 1
-                if font_size <= 20:
-                    vertical_offset += 1
-                if font_size <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                text_fits_horizontally = (
-                    text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-                text_fits_vertically = (
-                    text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                if text_fits_horizontally and text_fits_vertically:
-                    return text, font, (text_x, text_y)
-
-            smallest_font = 16
-            try:
-                font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-
-            vertical_offset = 0
-            if smallest_font <= 40:
-                vertical_offset += 1
-            if smallest_font <= 30:
-                vertical_offset += 1
-            if smallest_font <= 20:
-                vertical_offset += 1
-            if smallest_font <= 16:
-                vertical_offset += 1
-            text_y += vertical_offset
-
-            text_fits_horizontally = (
-                text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-            text_fits_vertically = (
-                text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-            if text_fits_horizontally and text_fits_vertically:
-
-                return text, font, (text_x, text_y)
-
-            current_text = text
-            while len(current_text) > 3:
-                current_text = current_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), current_text, font=font)
-                text_width = bbox[2] - bbox[0]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                text_y += vertical_offset
-
-                if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-                    return current_text, font, (text_x, text_y)
-
-            if len(text) > 3:
-                final_text = text[:3] + "..."
-            else:
-                final_text = text
-
-            bbox = draw.textbbox((0, 0), final_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            text_x = text_start_x
-            text_y = text_start_y - (text_height // 2)
-            text_y += vertical_offset
-
-            return final_text, font, (text_x, text_y)
-
         if is_compatibility:
 
             positions = ShipConfig.COMPATIBILITY_UI_POSITIONS
@@ -506,55 +388,22 @@ class ServerUIIntegration:
         # Server profile picture
         try:
             if guild.icon:
-                icon_url = guild.icon.url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(icon_url) as response:
-                        icon_data = await response.read()
-
-                icon_image = Image.open(io.BytesIO(icon_data))
-                icon_image = icon_image.resize(
-                    avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', avatar_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse(
-                    (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                icon_image.putalpha(mask)
-
-                avatar_area = image.crop(
-                    (avatar_x, avatar_y, avatar_x +
-                     avatar_size[0], avatar_y + avatar_size[1])
-                ).convert('RGBA')
-
-                icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
+                icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
+
+                paste_avatar(image, icon_image, (avatar_x, avatar_y))
 
         except Exception as e:
             print(f"❌ Could not add server icon: {e}")
 
         fitted_text, text_font, text_pos = fit_text_to_rectangle(
-            target_name,
-            text_start_x,
-            text_start_y,
-            username_rectangle["center"][0],
-            username_rectangle["center"][1],
-            username_rectangle["width"],
-            username_rectangle["height"],
-            is_username=True
-        )
+            target_name, ShipConfig.FONT_PATH, ShipConfig.NAME_FONT_SIZES,
+            (text_start_x, text_start_y), username_rectangle,
+            offsets=ShipConfig.NAME_OFFSETS, ink=False, tolerance=1)
 
         if fitted_text and text_font:
 
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        draw.text((text_pos[0] + dx, text_pos[1] + dy),
-                                  fitted_text, font=text_font, fill="black")
-
-            draw.text(text_pos, fitted_text, font=text_font, fill="white")
+            draw_text_with_stroke(draw, text_pos, fitted_text, text_font,
+                                  "white", "black", 1)
         else:
 
             draw.text((text_start_x, text_start_y),
@@ -1391,139 +1240,155 @@ class ShipCog(commands.Cog):
 
     # IMAGE GENERATION
 
+    @cached_render('ship_leaderboard')
     async def generate_ship_leaderboard_image(self, guild: discord.Guild, leaderboard_data: list,
                                               days_back: int, role_id: str = None, page: int = 0):
 
-        try:
-            image = Image.open(ShipConfig.TEMPLATE_PATH)
-        except FileNotFoundError:
-            image = Image.new('RGB', (800, 600), color='#2F3136')
-
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        draw = ImageDraw.Draw(image)
-        font_small, font_medium, font_large, font_larger, font_huge, font_giant = self.get_fonts()
-
-        await ServerUIIntegration.add_server_profile_pic_and_name(
-            image, guild, guild.name, font_huge, is_compatibility=False
-        )
-
-        # ROLE FILTER
-        role_text = "No Filter"
-        if role_id and role_id != "none":
-            role = guild.get_role(int(role_id))
-            role_text = role.name if role else "Unknown Role"
-        self.draw_text_with_stroke(draw, (70, 424), role_text,
-                                   font_small, "white", "black", 1)
-
-        # TIME PERIOD
-        self.draw_text_with_stroke(
-            draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
-
-        # DATE
-        self.draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
-            "%B %d, %Y"), font_small, "white", "black", 1)
-
-        # PAGINATION
-        if leaderboard_data:
-            total_ships = len(leaderboard_data)
-            total_pages = max(
-                1, (total_ships + self.ships_per_page - 1) // self.ships_per_page)
-            self.draw_text_with_stroke(
-                draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
-        else:
-            total_pages = 1
-
-        # LEADERBOARD CONTENT
-        if leaderboard_data:
-            start_idx = page * self.ships_per_page
-            end_idx = min(start_idx + self.ships_per_page,
-                          len(leaderboard_data))
-            page_data = leaderboard_data[start_idx:end_idx]
+        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(ShipConfig.FONT_PATH)
 
-            display_data = []
-            for ship in page_data:
-                user1 = guild.get_member(ship['user1_id'])
-                user2 = guild.get_member(ship['user2_id'])
-
-                user1_name = user1.name if user1 else f"User {ship['user1_id']}"
-                user2_name = user2.name if user2 else f"User {ship['user2_id']}"
+        async def build_base():
+            try:
+                base = template_registry.get(ShipConfig.TEMPLATE_PATH, "RGB")
+            except FileNotFoundError:
+                base = Image.new('RGB', (800, 600), color='#2F3136')
 
-                score_percent = int(ship['compatibility_score'] * 100)
-                ship_tier = self._get_ship_tier(ship['compatibility_score'])
+            await ServerUIIntegration.add_server_profile_pic_and_name(
+                base, guild, guild.name, font_huge, is_compatibility=False
+            )
+            return base
 
-                display_name = f"{user1_name} × {user2_name}"
-                value_text = f"{score_percent}%"
+        # Template, icon and server name are drawn once per guild
+        image = await layer_cache.get(guild, 'ship_leaderboard', build_base)
 
-                display_data.append(
-                    (display_name, value_text, score_percent, ship_tier['emoji']))
+        def compose():
 
-            image_width, _ = image.size
+            draw = ImageDraw.Draw(image)
 
-            if len(display_data) <= 4:
-                positions = [(60, 100 + i * 65)
-                             for i in range(len(display_data))]
-                box_width, box_height = 600, 40
+            # ROLE FILTER
+            role_text = "No Filter"
+            if role_id and role_id != "none":
+                role = guild.get_role(int(role_id))
+                role_text = role.name if role else "Unknown Role"
+            draw_text_with_stroke(draw, (70, 424), role_text,
+                                  font_small, "white", "black", 1)
+
+            # TIME PERIOD
+            draw_text_with_stroke(
+                draw, (630, 422), f"{days_back} days", font_small, "white", "black", 1)
+
+            # DATE
+            draw_text_with_stroke(draw, (550, 38), datetime.now().strftime(
+                "%B %d, %Y"), font_small, "white", "black", 1)
+
+            # PAGINATION
+            if leaderboard_data:
+                total_ships = len(leaderboard_data)
+                total_pages = max(
+                    1, (total_ships + self.ships_per_page - 1) // self.ships_per_page)
+                draw_text_with_stroke(
+                    draw, (400, 450), f"Page {page + 1}/{total_pages}", font_medium, "white", "black", 1)
             else:
-                box_width, box_height = 280, 40
-                box_spacing = 65
-                start_y = 100
-                total_box_width = (2 * box_width) + 15
-                start_x = (image_width - total_box_width) // 2
-                positions = [
-                    (start_x + (i % 2) * (box_width + 15),
-                     start_y + (i // 2) * box_spacing)
-                    for i in range(len(display_data))
-                ]
-
-            for i, ((display_name, value_text, score_percent, heart_emoji), (box_x, box_y)) in enumerate(zip(display_data, positions)):
-                global_rank = start_idx + i + 1
-
-                self.draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
-                                            radius=8, fill=(0, 0, 0, 220), outline=None)
-
-                placement_width = 35
-                if global_rank == 1:
-                    placement_color = (255, 215, 0, 220)  # Gold
-                elif global_rank == 2:
-                    placement_color = (192, 192, 192, 220)  # Silver
-                elif global_rank == 3:
-                    placement_color = (205, 127, 50, 220)  # Bronze
-                else:
-                    placement_color = (93, 0, 136, 255)  # Purple
+                total_pages = 1
 
-                self.draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
-                                            radius=8, fill=placement_color, outline=None)
+            # LEADERBOARD CONTENT
+            if leaderboard_data:
+                start_idx = page * self.ships_per_page
+                end_idx = min(start_idx + self.ships_per_page,
+                              len(leaderboard_data))
+                page_data = leaderboard_data[start_idx:end_idx]
 
-                rank_text = f"#{global_rank}"
-                rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
-                rank_width = rank_bbox[2] - rank_bbox[0]
+                display_data = []
+                for ship in page_data:
+                    user1 = guild.get_member(ship['user1_id'])
+                    user2 = guild.get_member(ship['user2_id'])
 
-                value_bbox = draw.textbbox(
-                    (0, 0), value_text, font=font_medium)
-                value_width = value_bbox[2] - value_bbox[0]
+                    user1_name = user1.name if user1 else f"User {ship['user1_id']}"
+                    user2_name = user2.name if user2 else f"User {ship['user2_id']}"
 
-                available_name_width = box_width - placement_width - \
-                    value_width - 40
+                    score_percent = int(ship['compatibility_score'] * 100)
+                    ship_tier = self._get_ship_tier(ship['compatibility_score'])
 
-                current_display_name = display_name
-                name_bbox = draw.textbbox(
-                    (0, 0), current_display_name, font=font_medium)
-                name_width = name_bbox[2] - name_bbox[0]
+                    display_name = f"{user1_name} × {user2_name}"
+                    value_text = f"{score_percent}%"
 
-                if name_width > available_name_width:
+                    display_data.append(
+                        (display_name, value_text, score_percent, ship_tier['emoji']))
 
-                    try:
-                        smaller_font = ImageFont.truetype(font_medium.path, 16) if hasattr(
-                            font_medium, 'path') else font_small
-                        smaller_bbox = draw.textbbox(
-                            (0, 0), current_display_name, font=smaller_font)
-                        smaller_width = smaller_bbox[2] - smaller_bbox[0]
+                image_width, _ = image.size
 
-                        if smaller_width <= available_name_width:
-                            name_font = smaller_font
-                        else:
+                if len(display_data) <= 4:
+                    positions = [(60, 100 + i * 65)
+                                 for i in range(len(display_data))]
+                    box_width, box_height = 600, 40
+                else:
+                    box_width, box_height = 280, 40
+                    box_spacing = 65
+                    start_y = 100
+                    total_box_width = (2 * box_width) + 15
+                    start_x = (image_width - total_box_width) // 2
+                    positions = [
+                        (start_x + (i % 2) * (box_width + 15),
+                         start_y + (i // 2) * box_spacing)
+                        for i in range(len(display_data))
+                    ]
+
+                for i, ((display_name, value_text, score_percent, heart_emoji), (box_x, box_y)) in enumerate(zip(display_data, positions)):
+                    global_rank = start_idx + i + 1
+
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + box_width, box_y + box_height],
+                                           radius=8, fill=(0, 0, 0, 220), outline=None)
+
+                    placement_width = 35
+                    if global_rank == 1:
+                        placement_color = (255, 215, 0, 220)  # Gold
+                    elif global_rank == 2:
+                        placement_color = (192, 192, 192, 220)  # Silver
+                    elif global_rank == 3:
+                        placement_color = (205, 127, 50, 220)  # Bronze
+                    else:
+                        placement_color = (93, 0, 136, 255)  # Purple
+
+                    draw_rounded_rectangle(draw, [box_x, box_y, box_x + placement_width, box_y + box_height],
+                                           radius=8, fill=placement_color, outline=None)
+
+                    rank_text = f"#{global_rank}"
+                    rank_bbox = draw.textbbox((0, 0), rank_text, font=font_medium)
+                    rank_width = rank_bbox[2] - rank_bbox[0]
+
+                    value_bbox = draw.textbbox(
+                        (0, 0), value_text, font=font_medium)
+                    value_width = value_bbox[2] - value_bbox[0]
+
+                    available_name_width = box_width - placement_width - \
+                        value_width - 40
+
+                    current_display_name = display_name
+                    name_bbox = draw.textbbox(
+                        (0, 0), current_display_name, font=font_medium)
+                    name_width = name_bbox[2] - name_bbox[0]
+
+                    if name_width > available_name_width:
+
+                        try:
+                            smaller_font = get_font(font_medium.path, 16) if hasattr(
+                                font_medium, 'path') else font_small
+                            smaller_bbox = draw.textbbox(
+                                (0, 0), current_display_name, font=smaller_font)
+                            smaller_width = smaller_bbox[2] - smaller_bbox[0]
+
+                            if smaller_width <= available_name_width:
+                                name_font = smaller_font
+                            else:
+                                name_font = font_medium
+                                while len(current_display_name) > 3:
+                                    current_display_name = current_display_name[:-4] + "..."
+                                    truncated_bbox = draw.textbbox(
+                                        (0, 0), current_display_name, font=name_font)
+                                    truncated_width = truncated_bbox[2] - \
+                                        truncated_bbox[0]
+                                    if truncated_width <= available_name_width:
+                                        break
+                        except:
                             name_font = font_medium
                             while len(current_display_name) > 3:
                                 current_display_name = current_display_name[:-4] + "..."
@@ -1533,305 +1398,200 @@ class ShipCog(commands.Cog):
                                     truncated_bbox[0]
                                 if truncated_width <= available_name_width:
                                     break
-                    except:
+                    else:
                         name_font = font_medium
-                        while len(current_display_name) > 3:
-                            current_display_name = current_display_name[:-4] + "..."
-                            truncated_bbox = draw.textbbox(
-                                (0, 0), current_display_name, font=name_font)
-                            truncated_width = truncated_bbox[2] - \
-                                truncated_bbox[0]
-                            if truncated_width <= available_name_width:
-                                break
-                else:
-                    name_font = font_medium
-
-                rank_height = rank_bbox[3] - rank_bbox[1]
-                name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
-                    (0, 0), current_display_name, font=name_font)[3] - draw.textbbox((0, 0), current_display_name, font=name_font)[1]
-                value_height = value_bbox[3] - value_bbox[1]
-
-                rank_y = box_y + (box_height - rank_height) // 2
-                name_y = box_y + (box_height - name_height) // 2
-                value_y = box_y + (box_height - value_height) // 2
-
-                # Rank number
-                rank_x = box_x + (placement_width - rank_width) // 2
-                self.draw_text_with_stroke(draw, (rank_x, rank_y), rank_text,
-                                           font_medium, "white", "black", 1)
-
-                # Usernames
-                name_x = box_x + placement_width + 8
-                self.draw_text_with_stroke(draw, (name_x, name_y),
-                                           current_display_name, name_font, "white", "black", 1)
-
-                # Score percentage
-                value_x = box_x + box_width - value_width - 30
-                self.draw_text_with_stroke(draw, (value_x, value_y), value_text,
-                                           font_medium, "white", "black", 1)
-
-                # Heart emoji
-                heart_x = box_x + box_width - 25
-                heart_y = box_y + (box_height - 15) // 2
-
-                with Pilmoji(image) as pilmoji:
-                    pilmoji.text((heart_x, heart_y), heart_emoji,
-                                 font=font_medium, embedded_color=True)
-        else:
-            cx, cy = image.size[0] // 2, image.size[1] // 2
-            self.draw_text_with_stroke(draw, (cx - 150, cy - 30), "NO DATA AVAILABLE",
-                                       font_giant, "white", "black", 3)
 
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+                    rank_height = rank_bbox[3] - rank_bbox[1]
+                    name_height = name_bbox[3] - name_bbox[1] if name_font == font_medium else draw.textbbox(
+                        (0, 0), current_display_name, font=name_font)[3] - draw.textbbox((0, 0), current_display_name, font=name_font)[1]
+                    value_height = value_bbox[3] - value_bbox[1]
+
+                    rank_y = box_y + (box_height - rank_height) // 2
+                    name_y = box_y + (box_height - name_height) // 2
+                    value_y = box_y + (box_height - value_height) // 2
+
+                    # Rank number
+                    rank_x = box_x + (placement_width - rank_width) // 2
+                    draw_text_with_stroke(draw, (rank_x, rank_y), rank_text,
+                                          font_medium, "white", "black", 1)
+
+                    # Usernames
+                    name_x = box_x + placement_width + 8
+                    draw_text_with_stroke(draw, (name_x, name_y),
+                                          current_display_name, name_font, "white", "black", 1)
+
+                    # Score percentage
+                    value_x = box_x + box_width - value_width - 30
+                    draw_text_with_stroke(draw, (value_x, value_y), value_text,
+                                          font_medium, "white", "black", 1)
+
+                    # Heart emoji
+                    heart_x = box_x + box_width - 25
+                    heart_y = box_y + (box_height - 15) // 2
+
+                    with Pilmoji(image, source=emoji_source) as pilmoji:
+                        pilmoji.text((heart_x, heart_y), heart_emoji,
+                                     font=font_medium, embedded_color=True)
+            else:
+                cx, cy = image.size[0] // 2, image.size[1] // 2
+                draw_text_with_stroke(draw, (cx - 150, cy - 30), "NO DATA AVAILABLE",
+                                      font_giant, "white", "black", 3)
+
+            return image
+
+        img_bytes = await render_service.render_card(compose, guild.id)
         return img_bytes
 
+    @cached_render('ship_compatibility')
     async def generate_ship_compatibility_image(self, guild: discord.Guild, user1: discord.Member, user2: discord.Member, compatibility_data: dict):
 
-        try:
-            image = Image.open(ShipConfig.SHIP_TEMPLATE_PATH).convert('RGB')
-        except FileNotFoundError:
-            print(f"❌ Template not found at {ShipConfig.SHIP_TEMPLATE_PATH}")
+        font_small, font_medium, font_large, font_larger, font_huge, font_giant = get_fonts(ShipConfig.FONT_PATH)
 
-            image = Image.new('RGB', (800, 600), color='#2F3136')
-            draw = ImageDraw.Draw(image)
-            font_large = ImageFont.load_default()
-            draw.text((400, 300), "Ship Compatibility",
-                      fill="white", font=font_large, anchor="mm")
+        async def build_base():
+            try:
+                base = template_registry.get(ShipConfig.SHIP_TEMPLATE_PATH, "RGB")
+            except FileNotFoundError:
+                print(f"❌ Template not found at {ShipConfig.SHIP_TEMPLATE_PATH}")
 
-        draw = ImageDraw.Draw(image)
-        font_small, font_medium, font_large, font_larger, font_huge, font_giant = self.get_fonts()
+                base = Image.new('RGB', (800, 600), color='#2F3136')
+                ImageDraw.Draw(base).text((400, 300), "Ship Compatibility",
+                                          fill="white", font=default_font(), anchor="mm")
 
-        await ServerUIIntegration.add_server_profile_pic_and_name(
-            image, guild, guild.name, font_huge, is_compatibility=True
-        )
+            await ServerUIIntegration.add_server_profile_pic_and_name(
+                base, guild, guild.name, font_huge, is_compatibility=True
+            )
+            return base
 
-        # CREATED ON DATE
-        self.draw_text_with_stroke(draw, (570, 38), datetime.now().strftime(
-            "%B %d, %Y"), font_small, "white", "black", 1)
+        # Template, icon and server name are drawn once per guild
+        image = await layer_cache.get(guild, 'ship_compatibility', build_base)
 
-        # USER 1 INFO
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(user1.display_avatar.url) as response:
-                    avatar1_data = await response.read()
-            avatar1 = Image.open(io.BytesIO(avatar1_data)).resize(
-                (180, 180), Image.Resampling.LANCZOS).convert('RGBA')
-
-            mask = Image.new('L', (180, 180), 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse((0, 0, 180, 180), fill=255)
-            avatar1.putalpha(mask)
-
-            avatar_area = image.crop((80, 100, 260, 280)).convert('RGBA')
-            avatar_with_bg = Image.new('RGBA', (180, 180), (0, 0, 0, 0))
-            avatar_with_bg.paste(avatar1, (0, 0), avatar1)
-            avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-            image.paste(avatar_area.convert('RGB'), (80, 100))
+        # Avatars fetched up front, since the drawing below runs in a render thread
+        avatars = {}
+        for key, user in (('user1', user1), ('user2', user2)):
+            try:
+                avatars[key] = await asset_cache.get_image(user.display_avatar, (180, 180), circle=True)
+            except Exception as e:
+                print(f"❌ Could not load {key} avatar: {e}")
 
-        except Exception as e:
-            print(f"❌ Could not load user1 avatar: {e}")
+        def compose():
 
-        user1_name = user1.name
-        name_font = font_larger
-        max_width = 200
+            draw = ImageDraw.Draw(image)
 
-        bbox = draw.textbbox((0, 0), user1_name, font=name_font)
-        name_width = bbox[2] - bbox[0]
+            # CREATED ON DATE
+            draw_text_with_stroke(draw, (570, 38), datetime.now().strftime(
+                "%B %d, %Y"), font_small, "white", "black", 1)
 
-        while name_width > max_width and name_font.size > 16:
-            try:
-                name_font = ImageFont.truetype(
-                    name_font.path, name_font.size - 2)
-                bbox = draw.textbbox((0, 0), user1_name, font=name_font)
-                name_width = bbox[2] - bbox[0]
-            except:
-                break
-
-        username1_x = 80 + (180 - name_width) // 2
-        self.draw_text_with_stroke(draw, (username1_x, 290), user1_name,
-                                   name_font, "white", "black", 2)
-
-        # USER 2 INFO
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(user2.display_avatar.url) as response:
-                    avatar2_data = await response.read()
-            avatar2 = Image.open(io.BytesIO(avatar2_data)).resize(
-                (180, 180), Image.Resampling.LANCZOS).convert('RGBA')
-
-            mask = Image.new('L', (180, 180), 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse((0, 0, 180, 180), fill=255)
-            avatar2.putalpha(mask)
-
-            avatar_area = image.crop((490, 100, 670, 280)).convert('RGBA')
-            avatar_with_bg = Image.new('RGBA', (180, 180), (0, 0, 0, 0))
-            avatar_with_bg.paste(avatar2, (0, 0), avatar2)
-            avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-            image.paste(avatar_area.convert('RGB'), (490, 100))
+            # USER 1 INFO
+            if 'user1' in avatars:
+                paste_avatar(image, avatars['user1'], (80, 100))
 
-        except Exception as e:
-            print(f"❌ Could not load user2 avatar: {e}")
+            user1_name = user1.name
+            name_font = font_larger
+            max_width = 200
 
-        user2_name = user2.name
-        name_font = font_larger
-        max_width = 200
+            bbox = draw.textbbox((0, 0), user1_name, font=name_font)
+            name_width = bbox[2] - bbox[0]
 
-        bbox = draw.textbbox((0, 0), user2_name, font=name_font)
-        name_width = bbox[2] - bbox[0]
+            while name_width > max_width and name_font.size > 16:
+                try:
+                    name_font = get_font(
+                        name_font.path, name_font.size - 2)
+                    bbox = draw.textbbox((0, 0), user1_name, font=name_font)
+                    name_width = bbox[2] - bbox[0]
+                except:
+                    break
 
-        while name_width > max_width and name_font.size > 16:
-            try:
-                name_font = ImageFont.truetype(
-                    name_font.path, name_font.size - 2)
-                bbox = draw.textbbox((0, 0), user2_name, font=name_font)
-                name_width = bbox[2] - bbox[0]
-            except:
-                break
+            username1_x = 80 + (180 - name_width) // 2
+            draw_text_with_stroke(draw, (username1_x, 290), user1_name,
+                                  name_font, "white", "black", 2)
 
-        username2_x = 490 + (180 - name_width) // 2
-        self.draw_text_with_stroke(draw, (username2_x, 290), user2_name,
-                                   name_font, "white", "black", 2)
+            # USER 2 INFO
+            if 'user2' in avatars:
+                paste_avatar(image, avatars['user2'], (490, 100))
 
-        # COMPATIBILITY SCORE
-        final_score = compatibility_data['final_score']
-        ship_tier = self._get_ship_tier(final_score)
-        compatibility_percentage = f"{int(final_score * 100)}%"
+            user2_name = user2.name
+            name_font = font_larger
+            max_width = 200
 
-        score_color = self._get_hex_color(ship_tier['color'])
+            bbox = draw.textbbox((0, 0), user2_name, font=name_font)
+            name_width = bbox[2] - bbox[0]
 
-        compatibility_font = font_huge
-        score_x = 335
+            while name_width > max_width and name_font.size > 16:
+                try:
+                    name_font = get_font(
+                        name_font.path, name_font.size - 2)
+                    bbox = draw.textbbox((0, 0), user2_name, font=name_font)
+                    name_width = bbox[2] - bbox[0]
+                except:
+                    break
 
-        self.draw_text_with_stroke(draw, (score_x, 255), compatibility_percentage,
-                                   compatibility_font, score_color, "black", 2)
+            username2_x = 490 + (180 - name_width) // 2
+            draw_text_with_stroke(draw, (username2_x, 290), user2_name,
+                                  name_font, "white", "black", 2)
 
-        bbox = draw.textbbox(
-            (0, 0), compatibility_percentage, font=compatibility_font)
-        text_width = bbox[2] - bbox[0]
-        heart_x = score_x + text_width + 10
+            # COMPATIBILITY SCORE
+            final_score = compatibility_data['final_score']
+            ship_tier = self._get_ship_tier(final_score)
+            compatibility_percentage = f"{int(final_score * 100)}%"
 
-        heart_font = font_larger
+            score_color = self._get_hex_color(ship_tier['color'])
 
-        with Pilmoji(image) as pilmoji:
-            pilmoji.text((heart_x, 265), ship_tier['emoji'],
-                         font=heart_font, embedded_color=True)
+            compatibility_font = font_huge
+            score_x = 335
 
-        # COMPATIBILITY SCORES BREAKDOWN
-        breakdown = compatibility_data['breakdown']
+            draw_text_with_stroke(draw, (score_x, 255), compatibility_percentage,
+                                  compatibility_font, score_color, "black", 2)
 
-        mentions_score = f"{int(breakdown['mentions']['score'] * 100)}%"
-        activity_score = f"{int(breakdown['activity_overlap']['score'] * 100)}%"
-        channels_score = f"{int(breakdown['shared_channels']['score'] * 100)}%"
-        vc_score = f"{int(breakdown['vc_time']['score'] * 100)}%"
-        recentness_score = f"{int(breakdown['recentness']['score'] * 100)}%"
+            bbox = draw.textbbox(
+                (0, 0), compatibility_percentage, font=compatibility_font)
+            text_width = bbox[2] - bbox[0]
+            heart_x = score_x + text_width + 10
 
-        score_font = font_medium
+            heart_font = font_larger
 
-        # Mentions score
-        self.draw_text_with_stroke(draw, (102, 368), mentions_score,
-                                   score_font, "white", "black", 1)
+            with Pilmoji(image, source=emoji_source) as pilmoji:
+                pilmoji.text((heart_x, 265), ship_tier['emoji'],
+                             font=heart_font, embedded_color=True)
 
-        # Activity overlap score
-        self.draw_text_with_stroke(draw, (415, 368), activity_score,
-                                   score_font, "white", "black", 1)
+            # COMPATIBILITY SCORES BREAKDOWN
+            breakdown = compatibility_data['breakdown']
 
-        # Shared channels score
-        self.draw_text_with_stroke(draw, (665, 368), channels_score,
-                                   score_font, "white", "black", 1)
+            mentions_score = f"{int(breakdown['mentions']['score'] * 100)}%"
+            activity_score = f"{int(breakdown['activity_overlap']['score'] * 100)}%"
+            channels_score = f"{int(breakdown['shared_channels']['score'] * 100)}%"
+            vc_score = f"{int(breakdown['vc_time']['score'] * 100)}%"
+            recentness_score = f"{int(breakdown['recentness']['score'] * 100)}%"
 
-        # VC time score
-        self.draw_text_with_stroke(draw, (195, 410), vc_score,
-                                   score_font, "white", "black", 1)
+            score_font = font_medium
 
-        # Recent activity score
-        self.draw_text_with_stroke(draw, (540, 410), recentness_score,
-                                   score_font, "white", "black", 1)
+            # Mentions score
+            draw_text_with_stroke(draw, (102, 368), mentions_score,
+                                  score_font, "white", "black", 1)
 
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        return img_bytes
+            # Activity overlap score
+            draw_text_with_stroke(draw, (415, 368), activity_score,
+                                  score_font, "white", "black", 1)
 
-    def _get_hex_color(self, color_int: int) -> str:
+            # Shared channels score
+            draw_text_with_stroke(draw, (665, 368), channels_score,
+                                  score_font, "white", "black", 1)
 
-        return f"#{color_int:06x}"
+            # VC time score
+            draw_text_with_stroke(draw, (195, 410), vc_score,
+                                  score_font, "white", "black", 1)
 
-    # FONTS
+            # Recent activity score
+            draw_text_with_stroke(draw, (540, 410), recentness_score,
+                                  score_font, "white", "black", 1)
 
-    def get_fonts(self):
+            return image
 
-        try:
-            if os.path.exists(ShipConfig.FONT_PATH):
-                font_small = ImageFont.truetype(ShipConfig.FONT_PATH, 16)
-                font_medium = ImageFont.truetype(ShipConfig.FONT_PATH, 20)
-                font_large = ImageFont.truetype(ShipConfig.FONT_PATH, 24)
-                font_larger = ImageFont.truetype(ShipConfig.FONT_PATH, 30)
-                font_huge = ImageFont.truetype(ShipConfig.FONT_PATH, 40)
-                font_giant = ImageFont.truetype(ShipConfig.FONT_PATH, 60)
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except:
-            pass
+        img_bytes = await render_service.render_card(compose, guild.id)
+        return img_bytes
 
-        try:
-            font_small = ImageFont.truetype("arial.ttf", 16)
-            font_medium = ImageFont.truetype("arial.ttf", 20)
-            font_large = ImageFont.truetype("arial.ttf", 24)
-            font_larger = ImageFont.truetype("arial.ttf", 30)
-            font_huge = ImageFont.truetype("arial.ttf", 40)
-            font_giant = ImageFont.truetype("arial.ttf", 60)
-            return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-        except:
-            try:
-                font_small = ImageFont.truetype("Helvetica.ttf", 16)
-                font_medium = ImageFont.truetype("Helvetica.ttf", 20)
-                font_large = ImageFont.truetype("Helvetica.ttf", 24)
-                font_larger = ImageFont.truetype("Helvetica.ttf", 30)
-                font_huge = ImageFont.truetype("Helvetica.ttf", 40)
-                font_giant = ImageFont.truetype("Helvetica.ttf", 60)
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-            except:
-                font_small = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_large = ImageFont.load_default()
-                font_larger = ImageFont.load_default()
-                font_huge = ImageFont.load_default()
-                font_giant = ImageFont.load_default()
-                return font_small, font_medium, font_large, font_larger, font_huge, font_giant
-
-    # STROKE
-
-    def draw_text_with_stroke(self, draw, position, text, font, fill, stroke_fill, stroke_width):
-
-        x, y = position
-
-        for dx in [-stroke_width, 0, stroke_width]:
-            for dy in [-stroke_width, 0, stroke_width]:
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text,
-                              font=font, fill=stroke_fill)
-
-        draw.text((x, y), text, font=font, fill=fill)
-
-    # INVISBLE RECTANGLEFUNCTION
-
-    def draw_rounded_rectangle(self, draw, xy, radius, fill=None, outline=None):
-
-        x1, y1, x2, y2 = xy
-        draw.rectangle([x1 + radius, y1, x2 - radius, y2],
-                       fill=fill, outline=outline)
-        draw.rectangle([x1, y1 + radius, x2, y2 - radius],
-                       fill=fill, outline=outline)
-        draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2],
-                      180, 270, fill=fill, outline=outline)
-        draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2],
-                      270, 360, fill=fill, outline=outline)
-        draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2],
-                      90, 180, fill=fill, outline=outline)
-        draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2],
-                      0, 90, fill=fill, outline=outline)
+    def _get_hex_color(self, color_int: int) -> str:
+
+        return f"#{color_int:06x}"
 
     # COMMANDS
 
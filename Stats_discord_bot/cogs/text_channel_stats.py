@@ -6,417 +6,279 @@ from datetime import datetime, timedelta
 import time
 import asyncio
 import os
-from PIL import Image, ImageDraw, ImageFont
-import io
-import aiohttp
+from PIL import Image, ImageDraw
 from typing import Tuple, List, Dict, Any, Optional
 import traceback
 from pilmoji import Pilmoji
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import draw_text_with_stroke, fit_text_to_rectangle
+from utils.emoji_store import emoji_source
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
+
+
+# INVISIBLE RECTANGLE
+
+CHANNEL_NAME_FONT_SIZES = [40, 38, 36, 34, 32, 30, 28,
+                           26, 24, 22, 20, 18, 16, 14, 12, 10, 8]
+REGULAR_FONT_SIZES = [24, 22, 20, 18, 16, 14, 12, 10, 8]
+
+
+def fit_channel_name(text, text_x, text_y, rect):
+
+    # One pixel lower for every size step down
+    return fit_text_to_rectangle(text, FONT_PATH, CHANNEL_NAME_FONT_SIZES, (text_x, text_y), rect,
+                                 offsets=range(len(CHANNEL_NAME_FONT_SIZES)), middle=False)
+
+
+def fit_regular_text(text, text_x, text_y, rect):
+
+    # One pixel lower for every two size steps down
+    return fit_text_to_rectangle(text, FONT_PATH, REGULAR_FONT_SIZES, (text_x, text_y), rect,
+                                 offsets=[idx // 2 for idx in range(len(REGULAR_FONT_SIZES))], middle=False)
+
 
 # IMAGE GENERATION
 
+@cached_render('text_channel_stats')
 async def generate_channel_stats_image(guild: discord.Guild, channel: discord.TextChannel, channel_data: dict, days_back: int, role_id: str = None):
 
     template_path = BASE_DIR / "assets" / "images" / \
         "text channel stats final png.png"
     try:
-        image = Image.open(template_path)
+        image = template_registry.get(template_path, "RGB")
     except FileNotFoundError:
         image = Image.new('RGB', (800, 600), color='#2F3136')
 
-    draw = ImageDraw.Draw(image)
+    # Fetched up front, since the drawing below runs in a render thread
+    icon_image = None
+    if guild.icon:
+        try:
+            icon_image = await asset_cache.get_image(guild.icon, (20, 20))
+        except Exception as e:
+            print(f"❌ Could not load server icon: {e}")
 
-    # Fonts
-    try:
-        font_paths = [BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    font_medium = ImageFont.truetype(font_path, 20)
-                    font_small = ImageFont.truetype(font_path, 16)
-                    font_small_arial = ImageFont.truetype("arial.ttf", 16)
-                    font_large = ImageFont.truetype(font_path, 24)
-                    font_huge = ImageFont.truetype(font_path, 40)
-                    font_horndon_8 = ImageFont.truetype(font_path, 8)
-                    font_horndon_10 = ImageFont.truetype(font_path, 10)
-                    font_horndon_12 = ImageFont.truetype(font_path, 12)
-                    font_horndon_14 = ImageFont.truetype(font_path, 14)
-                    font_horndon_16 = ImageFont.truetype(font_path, 16)
-                    font_horndon_18 = ImageFont.truetype(font_path, 18)
-                    font_horndon_20 = ImageFont.truetype(font_path, 20)
-                    font_horndon_22 = ImageFont.truetype(font_path, 22)
-                    font_horndon_24 = ImageFont.truetype(font_path, 24)
-                    font_horndon_26 = ImageFont.truetype(font_path, 26)
-                    font_horndon_28 = ImageFont.truetype(font_path, 28)
-                    font_horndon_30 = ImageFont.truetype(font_path, 30)
-                    font_horndon_32 = ImageFont.truetype(font_path, 32)
-                    font_horndon_34 = ImageFont.truetype(font_path, 34)
-                    font_horndon_36 = ImageFont.truetype(font_path, 36)
-                    break
-                except Exception:
-                    continue
-        else:
-            font_medium = ImageFont.truetype("arial.ttf", 20)
-            font_small = ImageFont.truetype("arial.ttf", 16)
-            font_small_arial = ImageFont.truetype("arial.ttf", 16)
-            font_large = ImageFont.truetype("arial.ttf", 24)
-            font_huge = ImageFont.truetype("arial.ttf", 40)
-            font_horndon_8 = ImageFont.truetype("arial.ttf", 8)
-            font_horndon_10 = ImageFont.truetype("arial.ttf", 10)
-            font_horndon_12 = ImageFont.truetype("arial.ttf", 12)
-            font_horndon_14 = ImageFont.truetype("arial.ttf", 14)
-            font_horndon_16 = ImageFont.load_default()
-            font_horndon_18 = ImageFont.load_default()
-            font_horndon_20 = ImageFont.load_default()
-            font_horndon_22 = ImageFont.load_default()
-            font_horndon_24 = ImageFont.load_default()
-            font_horndon_26 = ImageFont.load_default()
-            font_horndon_28 = ImageFont.load_default()
-            font_horndon_30 = ImageFont.load_default()
-            font_horndon_32 = ImageFont.load_default()
-            font_horndon_34 = ImageFont.load_default()
-            font_horndon_36 = ImageFont.load_default()
-    except Exception:
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-        font_small_arial = ImageFont.load_default()
-        font_large = ImageFont.load_default()
-        font_huge = ImageFont.load_default()
-        font_horndon_8 = ImageFont.load_default()
-        font_horndon_10 = ImageFont.load_default()
-        font_horndon_12 = ImageFont.load_default()
-        font_horndon_14 = ImageFont.load_default()
-        font_horndon_16 = ImageFont.load_default()
-        font_horndon_18 = ImageFont.load_default()
-        font_horndon_20 = ImageFont.load_default()
-        font_horndon_22 = ImageFont.load_default()
-        font_horndon_24 = ImageFont.load_default()
-        font_horndon_26 = ImageFont.load_default()
-        font_horndon_28 = ImageFont.load_default()
-        font_horndon_30 = ImageFont.load_default()
-        font_horndon_32 = ImageFont.load_default()
-        font_horndon_34 = ImageFont.load_default()
-        font_horndon_36 = ImageFont.load_default()
-
-    # RECTANGLE FUNCTIONS
-    def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-        rect_left = rect_center_x - (rect_width // 2)
-        rect_right = rect_center_x + (rect_width // 2)
-        rect_top = rect_center_y - (rect_height // 2)
-        rect_bottom = rect_center_y + (rect_height // 2)
-
-        bbox = draw.textbbox((text_x, text_y), text, font=font)
-        text_left = bbox[0]
-        text_right = bbox[2]
-        text_top = bbox[1]
-        text_bottom = bbox[3]
-
-        exceeds_width = (text_left < rect_left) or (text_right > rect_right)
-        exceeds_height = (text_top < rect_top) or (text_bottom > rect_bottom)
-
-        return exceeds_width or exceeds_height
-
-    def fit_text_to_position(text, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height, text_type="username"):
-
-        if text_type == "channel_name":
-            font_sizes = [40, 38, 36, 34, 32, 30, 28,
-                          26, 24, 22, 20, 18, 16, 14, 12, 10, 8]
-        elif text_type == "username":
-            font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-        else:
-            font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-
-        for idx, font_size in enumerate(font_sizes):
-            try:
-                font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-            if text_type == "channel_name":
-                vertical_offset = idx
+    def compose():
+
+        draw = ImageDraw.Draw(image)
+
+        # Fonts
+        try:
+            font_paths = [BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
+            for font_path in font_paths:
+                if os.path.exists(font_path):
+                    try:
+                        font_medium = get_font(font_path, 20)
+                        font_small = get_font(font_path, 16)
+                        font_small_arial = get_font("arial.ttf", 16)
+                        font_large = get_font(font_path, 24)
+                        font_huge = get_font(font_path, 40)
+                        font_horndon_8 = get_font(font_path, 8)
+                        font_horndon_10 = get_font(font_path, 10)
+                        font_horndon_12 = get_font(font_path, 12)
+                        font_horndon_14 = get_font(font_path, 14)
+                        font_horndon_16 = get_font(font_path, 16)
+                        font_horndon_18 = get_font(font_path, 18)
+                        font_horndon_20 = get_font(font_path, 20)
+                        font_horndon_22 = get_font(font_path, 22)
+                        font_horndon_24 = get_font(font_path, 24)
+                        font_horndon_26 = get_font(font_path, 26)
+                        font_horndon_28 = get_font(font_path, 28)
+                        font_horndon_30 = get_font(font_path, 30)
+                        font_horndon_32 = get_font(font_path, 32)
+                        font_horndon_34 = get_font(font_path, 34)
+                        font_horndon_36 = get_font(font_path, 36)
+                        break
+                    except Exception:
+                        continue
             else:
-                resizes_done = idx
-                vertical_offset = resizes_done // 2
+                font_medium = get_font("arial.ttf", 20)
+                font_small = get_font("arial.ttf", 16)
+                font_small_arial = get_font("arial.ttf", 16)
+                font_large = get_font("arial.ttf", 24)
+                font_huge = get_font("arial.ttf", 40)
+                font_horndon_8 = get_font("arial.ttf", 8)
+                font_horndon_10 = get_font("arial.ttf", 10)
+                font_horndon_12 = get_font("arial.ttf", 12)
+                font_horndon_14 = get_font("arial.ttf", 14)
+                font_horndon_16 = default_font()
+                font_horndon_18 = default_font()
+                font_horndon_20 = default_font()
+                font_horndon_22 = default_font()
+                font_horndon_24 = default_font()
+                font_horndon_26 = default_font()
+                font_horndon_28 = default_font()
+                font_horndon_30 = default_font()
+                font_horndon_32 = default_font()
+                font_horndon_34 = default_font()
+                font_horndon_36 = default_font()
+        except Exception:
+            font_medium = default_font()
+            font_small = default_font()
+            font_small_arial = default_font()
+            font_large = default_font()
+            font_huge = default_font()
+            font_horndon_8 = default_font()
+            font_horndon_10 = default_font()
+            font_horndon_12 = default_font()
+            font_horndon_14 = default_font()
+            font_horndon_16 = default_font()
+            font_horndon_18 = default_font()
+            font_horndon_20 = default_font()
+            font_horndon_22 = default_font()
+            font_horndon_24 = default_font()
+            font_horndon_26 = default_font()
+            font_horndon_28 = default_font()
+            font_horndon_30 = default_font()
+            font_horndon_32 = default_font()
+            font_horndon_34 = default_font()
+            font_horndon_36 = default_font()
+
+        # INVISIBLE RECTANGLE COORDINATES
+        channel_name_rect = {"center": (135, 30), "width": 245, "height": 45}
+
+        username_rectangles = [
+            {"center": (330, 165), "width": 122, "height": 45},  # First username
+            {"center": (330, 220), "width": 122, "height": 45},  # Second username
+            {"center": (330, 270), "width": 122, "height": 45},  # Third username
+            {"center": (330, 325), "width": 122, "height": 45},  # Fourth username
+            {"center": (330, 375), "width": 122, "height": 45}   # Fifth username
+        ]
+
+        channel_name = f"#{channel.name}"
+
+        fitted_channel_name, channel_name_font, channel_name_pos = fit_channel_name(
+            channel_name, 30, 7, channel_name_rect)
+
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            draw_text_with_stroke(pilmoji, channel_name_pos, fitted_channel_name,
+                                  channel_name_font, "white", "black", 1)
+
+        # Server name and icon
+        server_name = guild.name
+        try:
+            if icon_image:
+                bbox = draw.textbbox((0, 0), server_name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
+                icon_x = 375 - (text_width // 2) - 29
+                icon_y = 75 - 10
+                image.paste(icon_image, (int(icon_x), int(icon_y)))
+
+                text_x = 375 - (text_width // 2)
+                with Pilmoji(image, source=emoji_source) as pilmoji:
+
+                    draw_text_with_stroke(pilmoji, (text_x, 75 - 13), server_name,
+                                          font_medium, "white", "black", 1)
+            else:
+                bbox = draw.textbbox((0, 0), server_name, font=font_medium)
+                text_width = bbox[2] - bbox[0]
+                text_x = 375 - (text_width // 2)
+                with Pilmoji(image, source=emoji_source) as pilmoji:
 
-            adjusted_y = text_y + vertical_offset
+                    draw_text_with_stroke(pilmoji, (text_x, 75), server_name,
+                                          font_medium, "white", "black", 1)
+        except Exception as e:
+            print(f"❌ Could not add server icon: {e}")
+            bbox = draw.textbbox((0, 0), server_name, font=font_medium)
+            text_width = bbox[2] - bbox[0]
+            text_x = 375 - (text_width // 2)
+            with Pilmoji(image, source=emoji_source) as pilmoji:
 
-            if not check_text_against_rectangle(text, font, text_x, adjusted_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                return text, font, (text_x, adjusted_y), font_size
+                draw_text_with_stroke(pilmoji, (text_x, 75), server_name,
+                                      font_medium, "white", "black", 1)
 
-        smallest_font = font_sizes[-1]
-        try:
-            font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                font_paths[0]) else ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
+        total_messages = channel_data.get('total', 0)
+        total_hours = days_back * 24
+        messages_per_hour = total_messages / total_hours if total_hours > 0 else 0
 
-        truncated_text = text
-        while len(truncated_text) > 3:
-            truncated_text = truncated_text[:-4] + "..."
+        with Pilmoji(image, source=emoji_source) as pilmoji:
 
-            if text_type == "channel_name":
-                vertical_offset = len(font_sizes) - 1
-            else:
-                resizes_done = len(font_sizes) - 1
-                vertical_offset = resizes_done // 2
-
-            adjusted_y = text_y + vertical_offset
-
-            if not check_text_against_rectangle(truncated_text, font, text_x, adjusted_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                return truncated_text, font, (text_x, adjusted_y), smallest_font
-
-        if text_type == "channel_name":
-            vertical_offset = len(font_sizes) - 1
-        else:
-            resizes_done = len(font_sizes) - 1
-            vertical_offset = resizes_done // 2
-
-        final_text = text[:3] + "..." if len(text) > 3 else text
-        return final_text, font, (text_x, text_y + vertical_offset), smallest_font
-
-    def draw_text_with_stroke_and_emoji(pilmoji, text, position, font, fill="white", stroke_fill="black", stroke_width=1, font_size=24):
-
-        x, y = position
-
-        with Pilmoji(pilmoji.image) as pilmoji_stroke:
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        pilmoji_stroke.text(
-                            (x + dx, y + dy), text, fill=stroke_fill, font=font)
-
-        pilmoji.text((x, y), text, fill=fill, font=font)
-
-    # INVISIBLE RECTANGLE COORDINATES
-    channel_name_rect = {"center": (135, 30), "width": 245, "height": 45}
-
-    username_rectangles = [
-        {"center": (330, 165), "width": 122, "height": 45},  # First username
-        {"center": (330, 220), "width": 122, "height": 45},  # Second username
-        {"center": (330, 270), "width": 122, "height": 45},  # Third username
-        {"center": (330, 325), "width": 122, "height": 45},  # Fourth username
-        {"center": (330, 375), "width": 122, "height": 45}   # Fifth username
-    ]
-
-    channel_name = f"#{channel.name}"
-
-    fitted_channel_name, channel_name_font, channel_name_pos, channel_font_size = fit_text_to_position(
-        channel_name,
-        30,
-        7,
-        channel_name_rect["center"][0],
-        channel_name_rect["center"][1],
-        channel_name_rect["width"],
-        channel_name_rect["height"],
-        text_type="channel_name"
-    )
+            messages_per_hour_text = f"{messages_per_hour:.1f}"
+            draw_text_with_stroke(pilmoji, (105, 155), messages_per_hour_text,
+                                  font_huge, "white", "black", 1)
 
-    with Pilmoji(image) as pilmoji:
-        draw_text_with_stroke_and_emoji(
-            pilmoji, fitted_channel_name, channel_name_pos, channel_name_font, font_size=channel_font_size)
+            total_messages_text = f"{total_messages:,}"
+            draw_text_with_stroke(pilmoji, (105, 315), total_messages_text,
+                                  font_huge, "white", "black", 1)
 
-    # Server name and icon
-    server_name = guild.name
-    try:
-        if guild.icon:
-            icon_url = guild.icon.url
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as response:
-                    icon_data = await response.read()
+        # ROLE FILTER
 
-            icon_image = Image.open(io.BytesIO(icon_data))
-            icon_image = icon_image.resize((20, 20), Image.Resampling.LANCZOS)
+        role_text = "No Filter"
+        if role_id and role_id != "none":
+            role = guild.get_role(int(role_id))
+            role_text = role.name if role else "Unknown Role"
 
-            bbox = draw.textbbox((0, 0), server_name, font=font_medium)
-            text_width = bbox[2] - bbox[0]
-            icon_x = 375 - (text_width // 2) - 29
-            icon_y = 75 - 10
-            image.paste(icon_image, (int(icon_x), int(icon_y)))
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            draw_text_with_stroke(pilmoji, (70, 424), role_text, font_small,
+                                  "white", "black", 1)
 
-            text_x = 375 - (text_width // 2)
-            with Pilmoji(image) as pilmoji:
+        # Time period
 
-                for dx in [-1, 0, 1]:
-                    for dy in [-1, 0, 1]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((text_x + dx, 75 - 13 + dy),
-                                         server_name, fill="black", font=font_medium)
+        time_period_text = f"{days_back} days"
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            draw_text_with_stroke(pilmoji, (630, 422), time_period_text,
+                                  font_small, "white", "black", 1)
 
-                pilmoji.text((text_x, 75 - 13), server_name,
-                             fill="white", font=font_medium)
-        else:
-            bbox = draw.textbbox((0, 0), server_name, font=font_medium)
-            text_width = bbox[2] - bbox[0]
-            text_x = 375 - (text_width // 2)
-            with Pilmoji(image) as pilmoji:
-
-                for dx in [-1, 0, 1]:
-                    for dy in [-1, 0, 1]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text(
-                                (text_x + dx, 75 + dy), server_name, fill="black", font=font_medium)
-
-                pilmoji.text((text_x, 75), server_name,
-                             fill="white", font=font_medium)
-    except Exception as e:
-        print(f"❌ Could not add server icon: {e}")
-        bbox = draw.textbbox((0, 0), server_name, font=font_medium)
-        text_width = bbox[2] - bbox[0]
-        text_x = 375 - (text_width // 2)
-        with Pilmoji(image) as pilmoji:
-
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx != 0 or dy != 0:
-                        pilmoji.text((text_x + dx, 75 + dy),
-                                     server_name, fill="black", font=font_medium)
-
-            pilmoji.text((text_x, 75), server_name,
-                         fill="white", font=font_medium)
-
-    total_messages = channel_data.get('total', 0)
-    total_hours = days_back * 24
-    messages_per_hour = total_messages / total_hours if total_hours > 0 else 0
-
-    with Pilmoji(image) as pilmoji:
-
-        messages_per_hour_text = f"{messages_per_hour:.1f}"
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:
-                    pilmoji.text(
-                        (105 + dx, 155 + dy), messages_per_hour_text, fill="black", font=font_huge)
-        pilmoji.text((105, 155), messages_per_hour_text,
-                     fill="white", font=font_huge)
-
-        total_messages_text = f"{total_messages:,}"
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:
-                    pilmoji.text(
-                        (105 + dx, 315 + dy), total_messages_text, fill="black", font=font_huge)
-        pilmoji.text((105, 315), total_messages_text,
-                     fill="white", font=font_huge)
-
-    # ROLE FILTER
-
-    role_text = "No Filter"
-    if role_id and role_id != "none":
-        role = guild.get_role(int(role_id))
-        role_text = role.name if role else "Unknown Role"
-
-    with Pilmoji(image) as pilmoji:
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:
-                    pilmoji.text((70 + dx, 424 + dy), role_text,
-                                 fill="black", font=font_small)
-        pilmoji.text((70, 424), role_text, fill="white", font=font_small)
-
-    # Time period
-
-    time_period_text = f"{days_back} days"
-    with Pilmoji(image) as pilmoji:
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:
-                    pilmoji.text((630 + dx, 422 + dy), time_period_text,
-                                 fill="black", font=font_small)
-        pilmoji.text((630, 422), time_period_text,
-                     fill="white", font=font_small)
-
-    # CREATED ON
-
-    current_date = datetime.now().strftime("%B %d, %Y")
-    with Pilmoji(image) as pilmoji:
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx != 0 or dy != 0:
-                    pilmoji.text((550 + dx, 38 + dy), current_date,
-                                 fill="black", font=font_small)
-        pilmoji.text((550, 38), current_date, fill="white", font=font_small)
-
-    # Top 5 users
-
-    top_users = channel_data.get('users', Counter()).most_common(5)
-    user_positions = [(275, 150), (275, 205), (275, 255),
-                      (275, 315), (275, 365)]
-    message_positions = [(405, 150), (405, 205),
-                         (405, 255), (405, 315), (405, 365)]
-
-    with Pilmoji(image) as pilmoji:
-        for i, ((user_id, count), (user_x, user_y), (msg_x, msg_y)) in enumerate(zip(top_users, user_positions, message_positions)):
-            member = guild.get_member(int(user_id))
-            username = member.name if member else f"User {user_id}"
-
-            rect_info = username_rectangles[i]
-
-            fitted_username, username_font, username_pos, username_font_size = fit_text_to_position(
-                username,
-                user_x,
-                user_y,
-                rect_info["center"][0],
-                rect_info["center"][1],
-                rect_info["width"],
-                rect_info["height"],
-                text_type="username"
-            )
+        # CREATED ON
+
+        current_date = datetime.now().strftime("%B %d, %Y")
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            draw_text_with_stroke(pilmoji, (550, 38), current_date, font_small,
+                                  "white", "black", 1)
+
+        # Top 5 users
+
+        top_users = channel_data.get('users', Counter()).most_common(5)
+        user_positions = [(275, 150), (275, 205), (275, 255),
+                          (275, 315), (275, 365)]
+        message_positions = [(405, 150), (405, 205),
+                             (405, 255), (405, 315), (405, 365)]
+
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+            for i, ((user_id, count), (user_x, user_y), (msg_x, msg_y)) in enumerate(zip(top_users, user_positions, message_positions)):
+                member = guild.get_member(int(user_id))
+                username = member.name if member else f"User {user_id}"
+
+                rect_info = username_rectangles[i]
+
+                fitted_username, username_font, username_pos = fit_regular_text(
+                    username, user_x, user_y, rect_info)
+
+                draw_text_with_stroke(pilmoji, username_pos, fitted_username,
+                                      username_font, "white", "black", 1)
 
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx != 0 or dy != 0:
-                        pilmoji.text((username_pos[0] + dx, username_pos[1] + dy),
-                                     fitted_username, fill="black", font=username_font)
-
-            pilmoji.text(username_pos, fitted_username,
-                         fill="white", font=username_font)
-
-            count_text = f"{count:,}"
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if dx != 0 or dy != 0:
-                        pilmoji.text((msg_x + dx, msg_y + dy),
-                                     count_text, fill="black", font=font_large)
-            pilmoji.text((msg_x, msg_y), count_text,
-                         fill="white", font=font_large)
-
-    timeseries_data = channel_data.get('timeseries', {})
-    time_positions = {1: (645, 150), 5: (645, 210), 10: (
-        645, 260), 20: (645, 315), 30: (645, 365)}
-
-    with Pilmoji(image) as pilmoji:
-
-        for days, position in time_positions.items():
-            if days <= days_back:
-                count = timeseries_data.get(f'{days}d', 0)
                 count_text = f"{count:,}"
+                draw_text_with_stroke(pilmoji, (msg_x, msg_y), count_text,
+                                      font_large, "white", "black", 1)
 
-                for dx in [-1, 0, 1]:
-                    for dy in [-1, 0, 1]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text(
-                                (position[0] + dx, position[1] + dy), count_text, fill="black", font=font_large)
+        timeseries_data = channel_data.get('timeseries', {})
+        time_positions = {1: (645, 150), 5: (645, 210), 10: (
+            645, 260), 20: (645, 315), 30: (645, 365)}
 
-                pilmoji.text(position, count_text,
-                             fill="white", font=font_large)
-            else:
+        with Pilmoji(image, source=emoji_source) as pilmoji:
+
+            for days, position in time_positions.items():
+                if days <= days_back:
+                    count = timeseries_data.get(f'{days}d', 0)
+                    count_text = f"{count:,}"
+
+                    draw_text_with_stroke(pilmoji, position, count_text,
+                                          font_large, "white", "black", 1)
+                else:
 
-                for dx in [-1, 0, 1]:
-                    for dy in [-1, 0, 1]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text(
-                                (position[0] + dx, position[1] + dy), "0", fill="black", font=font_large)
+                    draw_text_with_stroke(pilmoji, position, "0", font_large,
+                                          "white", "black", 1)
 
-                pilmoji.text(position, "0", fill="white", font=font_large)
+        return image
 
-    img_bytes = io.BytesIO()
-    image.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
+    img_bytes = await render_service.render_card(compose, guild.id)
     return img_bytes
 
 
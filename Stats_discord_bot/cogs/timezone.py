@@ -1,4 +1,3 @@
-import os
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -7,13 +6,21 @@ import matplotlib.pyplot as plt
 import numpy as np
 from io import BytesIO
 import asyncio
-from PIL import Image, ImageDraw, ImageFont
-import aiohttp
-import io
+from PIL import Image, ImageDraw
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.layer_cache import layer_cache
+from utils.render_service import render_service
+from utils.render_toolkit import draw_text_with_stroke, step_offsets, fit_text_to_rectangle, paste_avatar
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Server name: tried largest first, nudged down as it shrinks
+NAME_FONT_SIZES = (40, 38, 36, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16)
+NAME_OFFSETS = step_offsets(NAME_FONT_SIZES, (40, 30, 20, 16))
+
 
 # INITIALIZATION
 
@@ -140,295 +147,142 @@ class TimezoneDistribution(commands.Cog):
 
         return activity_levels
 
-    # DRAWING FUNCTIONS
-
-    def draw_text_with_stroke(self, draw, position, text, font, fill_color, stroke_color, stroke_width):
-
-        x, y = position
-
-        for dx in range(-stroke_width, stroke_width + 1):
-            for dy in range(-stroke_width, stroke_width + 1):
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text,
-                              font=font, fill=stroke_color)
-
-        draw.text((x, y), text, font=font, fill=fill_color)
-
     async def create_clock_pie_chart(self, activity_levels: list, timezone: str, activity_type: str, guild: discord.Guild, days_back: int):
 
         # FONTS
 
         try:
 
-            background = Image.open(self.background_image_path).convert('RGBA')
-            image = background.copy()
-            draw = ImageDraw.Draw(image)
-
             try:
-                font_huge = ImageFont.truetype(self.font_path, 40)
-                font_large = ImageFont.truetype(self.font_path, 24)
-                font_medium = ImageFont.truetype(self.font_path, 20)
-                font_small = ImageFont.truetype(self.font_path, 16)
-                font_clock = ImageFont.truetype(self.font_path, 16)
+                font_huge = get_font(self.font_path, 40)
+                font_large = get_font(self.font_path, 24)
+                font_medium = get_font(self.font_path, 20)
+                font_small = get_font(self.font_path, 16)
+                font_clock = get_font(self.font_path, 16)
             except Exception as font_error:
                 print(f"Font loading error: {font_error}")
-                font_huge = ImageFont.load_default()
-                font_large = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
-                font_small = ImageFont.load_default()
-                font_clock = ImageFont.load_default()
+                font_huge = default_font()
+                font_large = default_font()
+                font_medium = default_font()
+                font_small = default_font()
+                font_clock = default_font()
 
-            def draw_text_with_stroke_fixed(draw, position, text, font, fill, stroke_fill, stroke_width):
+            async def build_base():
+                base = template_registry.get(self.background_image_path)
+                draw = ImageDraw.Draw(base)
 
-                x, y = position
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            draw.text((x + dx, y + dy), text,
-                                      font=font, fill=stroke_fill)
+                # Profile picture
+                avatar_x, avatar_y = 7, 10
+                avatar_size = (60, 60)
 
-                draw.text((x, y), text, font=font, fill=fill)
+                # Server name
+                text_start_x = 85
+                text_start_y = 30
 
-            def fit_text_to_rectangle(text, text_start_x, text_start_y, rect_center_x, rect_center_y, rect_width, rect_height, is_username=False):
+                # Invisible Rectangle
+                username_rectangle = {"center": (
+                    150, 30), "width": 183, "height": 35}
 
-                font_paths = [self.font_path] if os.path.exists(
-                    self.font_path) else []
+                # SERVER PROFILE PICTURE
 
-                rect_left = rect_center_x - (rect_width // 2)
-                rect_right = rect_center_x + (rect_width // 2)
-                rect_top = rect_center_y - (rect_height // 2)
-                rect_bottom = rect_center_y + (rect_height // 2)
-
-                font_sizes = [40, 38, 36, 34, 32,
-                              30, 28, 26, 24, 22, 20, 18, 16]
-
-                for font_size in font_sizes:
-                    try:
-                        font = ImageFont.truetype(
-                            font_paths[0], font_size) if font_paths else ImageFont.load_default()
-                    except:
-                        font = ImageFont.load_default()
-
-                    bbox = draw.textbbox((0, 0), text, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-
-                    text_x = text_start_x
-                    text_y = text_start_y - (text_height // 2)
-
-                    vertical_offset = 0
-                    if font_size <= 40:
-                        vertical_offset += 1
-                    if font_size <= 30:
-                        vertical_offset += 1
-                    if font_size <= 20:
-                        vertical_offset += 1
-                    if font_size <= 16:
-                        vertical_offset += 1
-                    text_y += vertical_offset
-
-                    text_fits_horizontally = (
-                        text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-                    text_fits_vertically = (
-                        text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                    if text_fits_horizontally and text_fits_vertically:
-                        return text, font, (text_x, text_y)
-
-                smallest_font = 16
                 try:
-                    font = ImageFont.truetype(
-                        font_paths[0], smallest_font) if font_paths else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-
-                vertical_offset = 0
-                if smallest_font <= 40:
-                    vertical_offset += 1
-                if smallest_font <= 30:
-                    vertical_offset += 1
-                if smallest_font <= 20:
-                    vertical_offset += 1
-                if smallest_font <= 16:
-                    vertical_offset += 1
-                text_y += vertical_offset
-
-                text_fits_horizontally = (
-                    text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1)
-                text_fits_vertically = (
-                    text_y >= rect_top - 1) and (text_y + text_height <= rect_bottom + 1)
-
-                if text_fits_horizontally and text_fits_vertically:
-                    return text, font, (text_x, text_y)
-
-                current_text = text
-                while len(current_text) > 3:
-                    current_text = current_text[:-4] + "..."
-                    bbox = draw.textbbox((0, 0), current_text, font=font)
-                    text_width = bbox[2] - bbox[0]
-
-                    text_x = text_start_x
-                    text_y = text_start_y - (text_height // 2)
-                    text_y += vertical_offset
-
-                    if (text_x >= rect_left - 1) and (text_x + text_width <= rect_right + 1):
-                        return current_text, font, (text_x, text_y)
-
-                if len(text) > 3:
-                    final_text = text[:3] + "..."
-                else:
-                    final_text = text
+                    if guild.icon:
+                        icon_image = await asset_cache.get_image(guild.icon, avatar_size, circle=True)
 
-                bbox = draw.textbbox((0, 0), final_text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
+                        paste_avatar(base, icon_image, (avatar_x, avatar_y))
 
-                text_x = text_start_x
-                text_y = text_start_y - (text_height // 2)
-                text_y += vertical_offset
+                except Exception as e:
+                    print(f"❌ Could not load server icon: {e}")
 
-                return final_text, font, (text_x, text_y)
+                server_name = guild.name
+                fitted_text, text_font, text_pos = fit_text_to_rectangle(
+                    server_name, self.font_path, NAME_FONT_SIZES,
+                    (text_start_x, text_start_y), username_rectangle,
+                    offsets=NAME_OFFSETS, ink=False, tolerance=1)
 
-            # Profile picture
-            avatar_x, avatar_y = 7, 10
-            avatar_size = (60, 60)
-
-            # Server name
-            text_start_x = 85
-            text_start_y = 30
-
-            # Invisible Rectangle
-            username_rectangle = {"center": (
-                150, 30), "width": 183, "height": 35}
+                if fitted_text and text_font:
+                    draw_text_with_stroke(draw, text_pos, fitted_text, text_font,
+                                          "white", "black", 1)
+                else:
 
-            # SERVER PROFILE PICTURE
+                    draw_text_with_stroke(draw, (text_start_x, text_start_y), server_name,
+                                          font_huge, "white", "black", 1)
 
-            try:
-                if guild.icon:
-                    icon_url = guild.icon.url
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(icon_url) as response:
-                            icon_data = await response.read()
-
-                    icon_image = Image.open(io.BytesIO(icon_data))
-                    icon_image = icon_image.resize(
-                        avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                    mask = Image.new('L', avatar_size, 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse(
-                        (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                    icon_image.putalpha(mask)
-
-                    avatar_area = image.crop(
-                        (avatar_x, avatar_y, avatar_x +
-                         avatar_size[0], avatar_y + avatar_size[1])
-                    ).convert('RGBA')
-
-                    icon_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                    icon_with_bg.paste(icon_image, (0, 0), icon_image)
-                    avatar_area.paste(icon_with_bg, (0, 0), icon_with_bg)
-                    image.paste(avatar_area.convert(
-                        'RGB'), (avatar_x, avatar_y))
+                return base
 
-            except Exception as e:
-                print(f"❌ Could not load server icon: {e}")
-
-            server_name = guild.name
-            fitted_text, text_font, text_pos = fit_text_to_rectangle(
-                server_name,
-                text_start_x,
-                text_start_y,
-                username_rectangle["center"][0],
-                username_rectangle["center"][1],
-                username_rectangle["width"],
-                username_rectangle["height"],
-                is_username=True
-            )
+            # Template, icon and server name are drawn once per guild
+            image = await layer_cache.get(guild, 'timezone', build_base)
 
-            if fitted_text and text_font:
-                draw_text_with_stroke_fixed(draw, text_pos, fitted_text, text_font,
-                                            "white", "black", 1)
-            else:
+            def compose():
 
-                draw_text_with_stroke_fixed(draw, (text_start_x, text_start_y), server_name,
-                                            font_huge, "white", "black", 1)
+                draw = ImageDraw.Draw(image)
 
-            # CREATED ON DATE
-            draw_text_with_stroke_fixed(draw, (560, 38), datetime.now().strftime("%B %d, %Y"),
-                                        font_small, "white", "black", 1)
+                # CREATED ON DATE
+                draw_text_with_stroke(draw, (560, 38), datetime.now().strftime("%B %d, %Y"),
+                                      font_small, "white", "black", 1)
 
-            # TIME PERIOD
-            time_period_text = f"{days_back} days"
-            draw_text_with_stroke_fixed(
-                draw, (105, 423), time_period_text, font_medium, "white", "black", 1)
+                # TIME PERIOD
+                time_period_text = f"{days_back} days"
+                draw_text_with_stroke(
+                    draw, (105, 423), time_period_text, font_medium, "white", "black", 1)
 
-            # ACTIVITY LEVEL DRAWING
+                # ACTIVITY LEVEL DRAWING
 
-            colors = {
-                "Peak Activity": (255, 215, 0, 255),
-                "High Activity": (255, 107, 107, 255),
-                "Medium Activity": (81, 207, 102, 255),
-                "Low Activity": (134, 142, 150, 255)
-            }
+                colors = {
+                    "Peak Activity": (255, 215, 0, 255),
+                    "High Activity": (255, 107, 107, 255),
+                    "Medium Activity": (81, 207, 102, 255),
+                    "Low Activity": (134, 142, 150, 255)
+                }
 
-            center_x, center_y = 380, 240
-            radius = 180
+                center_x, center_y = 380, 240
+                radius = 180
 
-            clock_layer = Image.new('RGBA', image.size, (0, 0, 0, 0))
-            clock_draw = ImageDraw.Draw(clock_layer)
+                clock_layer = Image.new('RGBA', image.size, (0, 0, 0, 0))
+                clock_draw = ImageDraw.Draw(clock_layer)
 
-            for i, (category, _) in enumerate(activity_levels):
-                start_angle = i * 15 - 90
-                end_angle = (i + 1) * 15 - 90
+                for i, (category, _) in enumerate(activity_levels):
+                    start_angle = i * 15 - 90
+                    end_angle = (i + 1) * 15 - 90
 
-                color = colors[category]
+                    color = colors[category]
 
-                clock_draw.pieslice([center_x - radius, center_y - radius,
-                                     center_x + radius, center_y + radius],
-                                    start_angle, end_angle, fill=color, outline="white", width=1)
+                    clock_draw.pieslice([center_x - radius, center_y - radius,
+                                         center_x + radius, center_y + radius],
+                                        start_angle, end_angle, fill=color, outline="white", width=1)
 
-            inner_radius = 10
-            clock_draw.ellipse([center_x - inner_radius, center_y - inner_radius,
-                                center_x + inner_radius, center_y + inner_radius],
-                               fill=(0, 0, 0, 255))
+                inner_radius = 10
+                clock_draw.ellipse([center_x - inner_radius, center_y - inner_radius,
+                                    center_x + inner_radius, center_y + inner_radius],
+                                   fill=(0, 0, 0, 255))
 
-            # CLOCK NUMBERS
+                # CLOCK NUMBERS
 
-            number_radius = radius + 15
+                number_radius = radius + 15
 
-            for i in range(24):
-                angle = np.radians(i * 15 - 90)
+                for i in range(24):
+                    angle = np.radians(i * 15 - 90)
 
-                x = center_x + number_radius * np.cos(angle)
-                y = center_y + number_radius * np.sin(angle)
+                    x = center_x + number_radius * np.cos(angle)
+                    y = center_y + number_radius * np.sin(angle)
 
-                try:
-                    bbox = clock_draw.textbbox(
-                        (0, 0), str(i+1), font=font_clock)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                    text_x = x - text_width / 2
-                    text_y = y - text_height / 2
-                except:
-                    text_x = x - 8
-                    text_y = y - 8
+                    try:
+                        bbox = clock_draw.textbbox(
+                            (0, 0), str(i+1), font=font_clock)
+                        text_width = bbox[2] - bbox[0]
+                        text_height = bbox[3] - bbox[1]
+                        text_x = x - text_width / 2
+                        text_y = y - text_height / 2
+                    except:
+                        text_x = x - 8
+                        text_y = y - 8
 
-                draw_text_with_stroke_fixed(clock_draw, (text_x, text_y), str(i+1),
-                                            font_clock, "white", "black", 2)
+                    draw_text_with_stroke(clock_draw, (text_x, text_y), str(i+1),
+                                          font_clock, "white", "black", 2)
 
-            image = Image.alpha_composite(image, clock_layer)
+                return Image.alpha_composite(image, clock_layer)
 
-            buffer = BytesIO()
-            image.save(buffer, format='PNG')
-            buffer.seek(0)
+            buffer = await render_service.render_card(compose, guild.id)
 
             return buffer
 
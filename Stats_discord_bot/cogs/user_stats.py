@@ -2,43 +2,37 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 from datetime import datetime, timedelta
-import aiohttp
 import io
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 from pilmoji import Pilmoji
-from pilmoji.source import AppleEmojiSource
 import os
 import asyncio
 import traceback
 import time
 import logging
 from pathlib import Path
+from utils.assets import asset_cache
+from utils.fonts import get_font, default_font
+from utils.templates import template_registry
+from utils.render_service import render_service
+from utils.render_cache import cached_render
+from utils.render_toolkit import (draw_text_with_stroke, draw_text_centered, step_offsets,
+                                  fit_text_to_rectangle, paste_avatar)
+from utils.emoji_store import apple_emoji_source
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 logger = logging.getLogger(__name__)
 
+FONT_PATH = BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"
 
-# TEXT CENTERING
+# Fitted text: sizes tried largest first, nudged down as the text shrinks
+USERNAME_FONT_SIZES = (34, 32, 30, 28, 26, 24, 22, 20, 18, 16, 14)
+USERNAME_OFFSETS = step_offsets(USERNAME_FONT_SIZES, (30, 20, 16))
 
-def draw_text_centered(pilmoji_instance, text, position, font, fill, max_width=None):
+CHANNEL_FONT_SIZES = (24, 22, 20, 18, 16, 14, 12, 10, 8)
+CHANNEL_OFFSETS = step_offsets(CHANNEL_FONT_SIZES, (20, 16))
 
-    draw = pilmoji_instance.draw
-    center_x, center_y = position
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    x = center_x - (text_width // 2)
-    y = center_y - (text_height // 2)
-
-    if max_width and text_width > max_width:
-        while text_width > max_width and len(text) > 1:
-            text = text[:-1]
-            bbox = draw.textbbox((0, 0), text + "...", font=font)
-            text_width = bbox[2] - bbox[0]
-        text = text + "..."
-
-    pilmoji_instance.text((x, y), text, fill=fill, font=font)
 
 # FORMATTING
 
@@ -250,7 +244,7 @@ class UserStats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_user_stats_sessions = {}
-        self.emoji_source = AppleEmojiSource
+        self.emoji_source = apple_emoji_source
 
     user_group = app_commands.Group(
         name="user",
@@ -326,114 +320,25 @@ class UserStats(commands.Cog):
             start_time = datetime.utcnow() - timedelta(days=days_back)
             end_time = datetime.utcnow()
 
-            messages_leaderboard_data = await db_cog.q_server_top3_users_messages(
-                guild_id=guild.id,
-                role_filter_ids=None,
-                start_time=start_time,
-                end_time=end_time
-            )
-
-            total_message_users = 0
-            message_counts = {}
+            periods = [period_days for period_days in [1, 5, 10, 20, 30]
+                       if period_days <= days_back]
 
-            try:
-                async with db_cog.pool.acquire() as conn:
-                    query = '''
-                        SELECT user_id, COUNT(*) as message_count
-                        FROM message_tracking
-                        WHERE guild_id = $1 
-                        AND NOT is_bot
-                        AND created_at >= $2
-                        AND created_at <= $3
-                        GROUP BY user_id
-                        ORDER BY message_count DESC
-                    '''
-                    rows = await conn.fetch(query, guild.id, start_time, end_time)
-
-                    total_message_users = len(rows)
-                    message_rank = 0
-                    for idx, row in enumerate(rows, 1):
-                        user_id = row['user_id']
-                        if user_id == member.id:
-                            message_rank = idx
-                            break
-            except Exception as e:
-                logger.error(f"Error getting message rank: {e}")
-                message_rank = 0
-                total_message_users = 0
-
-            voice_leaderboard_data = await db_cog.q_server_top3_users_voice(
-                guild_id=guild.id,
-                role_filter_ids=None,
-                start_time=start_time,
-                end_time=end_time
-            )
-
-            total_voice_users = 0
-            voice_rank = 0
-
-            try:
-                async with db_cog.pool.acquire() as conn:
-                    query = '''
-                        SELECT user_id, SUM(duration_seconds) as total_seconds
-                        FROM voice_session_history
-                        WHERE guild_id = $1 
-                        AND join_time >= $2
-                        AND join_time <= $3
-                        GROUP BY user_id
-                        HAVING SUM(duration_seconds) > 0
-                        ORDER BY total_seconds DESC
-                    '''
-                    rows = await conn.fetch(query, guild.id, start_time, end_time)
-
-                    total_voice_users = len(rows)
-                    for idx, row in enumerate(rows, 1):
-                        user_id = row['user_id']
-                        if user_id == member.id:
-                            voice_rank = idx
-                            break
-            except Exception as e:
-                logger.error(f"Error getting voice rank: {e}")
-                voice_rank = 0
-                total_voice_users = 0
-
-            total_messages_data = await db_cog.q_user_total_messages(
+            profile = await db_cog.q_user_profile(
                 guild_id=guild.id,
                 user_id=member.id,
-                role_filter_ids=None,
+                windows=periods,
                 start_time=start_time,
                 end_time=end_time
             )
-            total_messages = total_messages_data.get(
-                'total_messages', 0) if total_messages_data else 0
 
-            total_voice_data = await db_cog.q_user_total_voice(
-                guild_id=guild.id,
-                user_id=member.id,
-                role_filter_ids=None,
-                start_time=start_time,
-                end_time=end_time
-            )
-            total_voice_seconds = total_voice_data.get(
-                'total_seconds', 0) if total_voice_data else 0
-
-            top_text_channels_raw = await db_cog.q_user_top3_text_channels(
-                guild_id=guild.id,
-                user_id=member.id,
-                role_filter_ids=None,
-                start_time=start_time,
-                end_time=end_time
-            )
-            top_text_channels_raw = top_text_channels_raw if top_text_channels_raw else []
-
-            top_voice_channels_raw = await db_cog.q_user_top3_voice_channels(
-                guild_id=guild.id,
-                user_id=member.id,
-                role_filter_ids=None,
-                start_time=start_time,
-                end_time=end_time
-            )
-            top_voice_channels_raw = top_voice_channels_raw if top_voice_channels_raw else []
+            message_rank = profile['message_rank']
+            voice_rank = profile['voice_rank']
+            total_message_users = profile['total_message_users']
+            total_voice_users = profile['total_voice_users']
+            total_messages = profile['total_messages']
+            total_voice_seconds = profile['total_voice_seconds']
+            top_text_channels_raw = profile['top_text_channels']
+            top_voice_channels_raw = profile['top_voice_channels']
 
             top_text_channels = []
             for channel_data in top_text_channels_raw[:3]:
@@ -464,47 +369,11 @@ class UserStats(commands.Cog):
             total_voice_hours = total_voice_seconds / 3600
             voice_hours_per_hour = total_voice_hours / total_hours if total_hours > 0 else 0
 
-            message_periods_data = {}
-            for period_days in [1, 5, 10, 20, 30]:
-                if period_days > days_back:
-                    message_periods_data[f'{period_days}d'] = 0
-                    continue
-                period_end = end_time
-                period_start = end_time - timedelta(days=period_days)
-
-                if period_start < start_time:
-                    period_start = start_time
-
-                period_data = await db_cog.q_user_total_messages(
-                    guild_id=guild.id,
-                    user_id=member.id,
-                    role_filter_ids=None,
-                    start_time=period_start,
-                    end_time=period_end
-                )
-                message_periods_data[f'{period_days}d'] = period_data.get(
-                    'total_messages', 0) if period_data else 0
-
-            voice_periods_data = {}
-            for period_days in [1, 5, 10, 20, 30]:
-                if period_days > days_back:
-                    voice_periods_data[f'{period_days}d'] = 0
-                    continue
-                period_end = end_time
-                period_start = end_time - timedelta(days=period_days)
-
-                if period_start < start_time:
-                    period_start = start_time
-
-                period_data = await db_cog.q_user_total_voice(
-                    guild_id=guild.id,
-                    user_id=member.id,
-                    role_filter_ids=None,
-                    start_time=period_start,
-                    end_time=period_end
-                )
-                voice_periods_data[f'{period_days}d'] = period_data.get(
-                    'total_seconds', 0) if period_data else 0
+            message_periods_data = {f'{period_days}d': 0 for period_days in [
+                1, 5, 10, 20, 30]}
+            voice_periods_data = dict(message_periods_data)
+            message_periods_data.update(profile['message_periods'])
+            voice_periods_data.update(profile['voice_periods'])
 
             result = {
                 'total_messages': total_messages,
@@ -535,12 +404,16 @@ class UserStats(commands.Cog):
     async def _generate_user_stats_image(self, guild: discord.Guild, member: discord.Member, days_back: int = 14):
 
         data = await self._get_user_stats_data(guild, member, days_back)
+        return await self._render_user_stats_image(guild, member, days_back, data)
+
+    @cached_render('user_stats')
+    async def _render_user_stats_image(self, guild: discord.Guild, member: discord.Member,
+                                       days_back: int, data: dict):
 
         if "error" in data:
             image = Image.new('RGB', (800, 800), color='#2C2F33')
 
             with Pilmoji(image, source=self.emoji_source) as pilmoji:
-                draw = pilmoji.draw
                 try:
                     font_paths = [
                         BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
@@ -548,16 +421,16 @@ class UserStats(commands.Cog):
                     for font_path in font_paths:
                         if os.path.exists(font_path):
                             try:
-                                error_font = ImageFont.truetype(font_path, 30)
+                                error_font = get_font(font_path, 30)
                                 font_loaded = True
                                 break
                             except:
                                 continue
 
                     if not font_loaded:
-                        error_font = ImageFont.load_default()
+                        error_font = default_font()
                 except:
-                    error_font = ImageFont.load_default()
+                    error_font = default_font()
 
                 error_text = data["error"]
                 if len(error_text) > 50:
@@ -580,17 +453,17 @@ class UserStats(commands.Cog):
             logger.error(f"Template image not found at: {template_path}")
             image = Image.new('RGB', (800, 800), color='black')
             with Pilmoji(image, source=self.emoji_source) as pilmoji:
-                font = ImageFont.load_default()
+                font = default_font()
                 draw_text_centered(
                     pilmoji, "Template image not found", (400, 400), font, "white")
         else:
             try:
-                image = Image.open(template_path)
+                image = template_registry.get(template_path, "RGB")
             except Exception as e:
                 logger.error(f"Error loading template image: {e}")
                 image = Image.new('RGB', (800, 800), color='black')
                 with Pilmoji(image, source=self.emoji_source) as pilmoji:
-                    font = ImageFont.load_default()
+                    font = default_font()
                     draw_text_centered(
                         pilmoji, "Error loading template", (400, 400), font, "white")
                 image_buffer = io.BytesIO()
@@ -598,353 +471,214 @@ class UserStats(commands.Cog):
                 image_buffer.seek(0)
                 return image_buffer
 
-        pilmoji = Pilmoji(image, source=self.emoji_source)
-        draw = pilmoji.draw
-
-        # FONTS
-
+        # Avatar and icon fetched up front, since the drawing below runs in a
+        # render thread
+        avatar_image = icon_image = None
         try:
-            font_paths = [
-                BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
-
-            font_loaded = False
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    try:
-                        font_horndon_tiny = ImageFont.truetype(font_path, 8)
-                        font_horndon_extra_small = ImageFont.truetype(
-                            font_path, 10)
-                        font_horndon_small = ImageFont.truetype(font_path, 12)
-                        font_horndon_medium_small = ImageFont.truetype(
-                            font_path, 14)
-                        font_horndon_medium = ImageFont.truetype(font_path, 16)
-                        font_horndon_large = ImageFont.truetype(font_path, 18)
-                        font_horndon_larger = ImageFont.truetype(font_path, 20)
-                        font_horndon_xlarge = ImageFont.truetype(font_path, 22)
-                        font_horndon_xxlarge = ImageFont.truetype(
-                            font_path, 24)
-                        font_horndon_huge = ImageFont.truetype(font_path, 30)
-                        font_horndon_giant = ImageFont.truetype(font_path, 40)
-                        font_horndon_massive = ImageFont.truetype(
-                            font_path, 50)
-                        font_loaded = True
-                        break
-                    except:
-                        continue
-
-            if not font_loaded:
-                font_horndon_tiny = ImageFont.load_default()
-                font_horndon_extra_small = ImageFont.load_default()
-                font_horndon_small = ImageFont.load_default()
-                font_horndon_medium_small = ImageFont.load_default()
-                font_horndon_medium = ImageFont.load_default()
-                font_horndon_large = ImageFont.load_default()
-                font_horndon_larger = ImageFont.load_default()
-                font_horndon_xlarge = ImageFont.load_default()
-                font_horndon_xxlarge = ImageFont.load_default()
-                font_horndon_huge = ImageFont.load_default()
-                font_horndon_giant = ImageFont.load_default()
-                font_horndon_massive = ImageFont.load_default()
-
+            if member.avatar:
+                avatar_image = await asset_cache.get_image(member.avatar, (60, 60), circle=True)
         except Exception as e:
-            logger.error(f"Error loading fonts: {e}")
-            font_horndon_tiny = ImageFont.load_default()
-            font_horndon_extra_small = ImageFont.load_default()
-            font_horndon_small = ImageFont.load_default()
-            font_horndon_medium_small = ImageFont.load_default()
-            font_horndon_medium = ImageFont.load_default()
-            font_horndon_large = ImageFont.load_default()
-            font_horndon_larger = ImageFont.load_default()
-            font_horndon_xlarge = ImageFont.load_default()
-            font_horndon_xxlarge = ImageFont.load_default()
-            font_horndon_huge = ImageFont.load_default()
-            font_horndon_giant = ImageFont.load_default()
-            font_horndon_massive = ImageFont.load_default()
-
-        # INVISIBLE RECTANGLE FUNCTIONS
-
-        def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-
-            rect_left = rect_center_x - (rect_width // 2)
-            rect_right = rect_center_x + (rect_width // 2)
-            rect_top = rect_center_y - (rect_height // 2)
-            rect_bottom = rect_center_y + (rect_height // 2)
-
-            bbox = draw.textbbox((text_x, text_y), text, font=font)
-            text_left = bbox[0]
-            text_right = bbox[2]
-            text_top = bbox[1]
-            text_bottom = bbox[3]
-            exceeds_width = (text_left < rect_left) or (
-                text_right > rect_right)
-            exceeds_height = (text_top < rect_top) or (
-                text_bottom > rect_bottom)
-
-            return exceeds_width or exceeds_height
-
-        def fit_text_to_rectangle(text, text_center_x, text_center_y, rect_center_x, rect_center_y, rect_width, rect_height, is_channel=False, is_username=False):
-
-            if is_username:
-                font_sizes = [34, 32, 30, 28, 26, 24, 22, 20, 18, 16, 14]
-            elif is_channel:
-                font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-            else:
-                font_sizes = [24, 22, 20, 18, 16, 14, 12, 10, 8]
-
-            for font_size in font_sizes:
-                try:
-                    font = ImageFont.truetype(font_paths[0], font_size) if os.path.exists(
-                        font_paths[0]) else ImageFont.load_default()
-                except:
-                    font = ImageFont.load_default()
-
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                text_x = text_center_x - (text_width // 2)
-                text_y = text_center_y - (text_height // 2)
-
-                vertical_offset = 0
+            logger.error(f"Could not load member avatar: {e}")
+        try:
+            if guild.icon:
+                icon_image = await asset_cache.get_image(guild.icon, (20, 20), circle=True)
+        except Exception as e:
+            logger.error(f"Could not load server icon: {e}")
 
-                if is_username:
-                    if font_size <= 30:
-                        vertical_offset += 1
-                    if font_size <= 20:
-                        vertical_offset += 1
-                    if font_size <= 16:
-                        vertical_offset += 1
-                elif is_channel:
-                    if font_size <= 20:
-                        vertical_offset += 1
-                    if font_size <= 16:
-                        vertical_offset += 1
-                else:
-                    if font_size <= 12:
-                        vertical_offset += 1
+        def compose():
 
-                text_y += vertical_offset
+            pilmoji = Pilmoji(image, source=self.emoji_source)
+            draw = pilmoji.draw
 
-                if not check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                    return text, font, (text_x, text_y)
+            # FONTS
 
-            smallest_font = font_sizes[-1]
             try:
-                font = ImageFont.truetype(font_paths[0], smallest_font) if os.path.exists(
-                    font_paths[0]) else ImageFont.load_default()
-            except:
-                font = ImageFont.load_default()
-
-            truncated_text = text
-            while len(truncated_text) > 3:
-                truncated_text = truncated_text[:-4] + "..."
-                bbox = draw.textbbox((0, 0), truncated_text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
+                font_paths = [
+                    BASE_DIR / "assets" / "fonts" / "HorndonD.ttf"]
+
+                font_loaded = False
+                for font_path in font_paths:
+                    if os.path.exists(font_path):
+                        try:
+                            font_horndon_tiny = get_font(font_path, 8)
+                            font_horndon_extra_small = get_font(
+                                font_path, 10)
+                            font_horndon_small = get_font(font_path, 12)
+                            font_horndon_medium_small = get_font(
+                                font_path, 14)
+                            font_horndon_medium = get_font(font_path, 16)
+                            font_horndon_large = get_font(font_path, 18)
+                            font_horndon_larger = get_font(font_path, 20)
+                            font_horndon_xlarge = get_font(font_path, 22)
+                            font_horndon_xxlarge = get_font(
+                                font_path, 24)
+                            font_horndon_huge = get_font(font_path, 30)
+                            font_horndon_giant = get_font(font_path, 40)
+                            font_horndon_massive = get_font(
+                                font_path, 50)
+                            font_loaded = True
+                            break
+                        except:
+                            continue
+
+                if not font_loaded:
+                    font_horndon_tiny = default_font()
+                    font_horndon_extra_small = default_font()
+                    font_horndon_small = default_font()
+                    font_horndon_medium_small = default_font()
+                    font_horndon_medium = default_font()
+                    font_horndon_large = default_font()
+                    font_horndon_larger = default_font()
+                    font_horndon_xlarge = default_font()
+                    font_horndon_xxlarge = default_font()
+                    font_horndon_huge = default_font()
+                    font_horndon_giant = default_font()
+                    font_horndon_massive = default_font()
 
-                text_x = text_center_x - (text_width // 2)
-                text_y = text_center_y - (text_height // 2)
+            except Exception as e:
+                logger.error(f"Error loading fonts: {e}")
+                font_horndon_tiny = default_font()
+                font_horndon_extra_small = default_font()
+                font_horndon_small = default_font()
+                font_horndon_medium_small = default_font()
+                font_horndon_medium = default_font()
+                font_horndon_large = default_font()
+                font_horndon_larger = default_font()
+                font_horndon_xlarge = default_font()
+                font_horndon_xxlarge = default_font()
+                font_horndon_huge = default_font()
+                font_horndon_giant = default_font()
+                font_horndon_massive = default_font()
+
+            # INVISIBLE RECTANGLE FUNCTIONS
+
+            def fit_card_text(text, position, rect, is_channel=False, is_username=False):
 
-                vertical_offset = 0
                 if is_username:
-                    if smallest_font <= 30:
-                        vertical_offset += 1
-                    if smallest_font <= 20:
-                        vertical_offset += 1
-                    if smallest_font <= 16:
-                        vertical_offset += 1
-                elif is_channel:
-                    if smallest_font <= 20:
-                        vertical_offset += 1
-                    if smallest_font <= 16:
-                        vertical_offset += 1
+                    font_sizes, offsets = USERNAME_FONT_SIZES, USERNAME_OFFSETS
                 else:
-                    if smallest_font <= 12:
-                        vertical_offset += 1
+                    font_sizes, offsets = CHANNEL_FONT_SIZES, CHANNEL_OFFSETS
 
-                text_y += vertical_offset
+                return fit_text_to_rectangle(text, FONT_PATH, font_sizes, position, rect,
+                                             offsets=offsets, centered=True)
 
-                if not check_text_against_rectangle(truncated_text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height):
-                    return truncated_text, font, (text_x, text_y)
+            # INVISIBLE RECTANGLE SIZES AND POSITIONS
 
-            return "", font, (text_center_x, text_center_y)
+            text_channel_rectangles = [
+                {"center": (70, 508), "width": 120, "height": 50},
+                {"center": (70, 560), "width": 120, "height": 50},
+                {"center": (70, 620), "width": 120, "height": 50}
+            ]
 
-        # INVISIBLE RECTANGLE SIZES AND POSITIONS
+            voice_channel_rectangles = [
+                {"center": (330, 508), "width": 120, "height": 50},
+                {"center": (330, 560), "width": 120, "height": 50},
+                {"center": (330, 720), "width": 120, "height": 50}
+            ]
 
-        text_channel_rectangles = [
-            {"center": (70, 508), "width": 120, "height": 50},
-            {"center": (70, 560), "width": 120, "height": 50},
-            {"center": (70, 620), "width": 120, "height": 50}
-        ]
+            username_rectangle = {"center": (160, 35), "width": 183, "height": 35}
 
-        voice_channel_rectangles = [
-            {"center": (330, 508), "width": 120, "height": 50},
-            {"center": (330, 560), "width": 120, "height": 50},
-            {"center": (330, 720), "width": 120, "height": 50}
-        ]
+            # USER PROFILE PICTURE AND NAME
 
-        username_rectangle = {"center": (160, 35), "width": 183, "height": 35}
+            member_name = f"{member.name}" if isinstance(
+                member, discord.Member) else member.name
 
-        # USER PROFILE PICTURE AND NAME
+            username_text_center = (91, 27)
 
-        member_name = f"{member.name}" if isinstance(
-            member, discord.Member) else member.name
+            try:
+                if avatar_image:
+                    avatar_x = 7
+                    avatar_y = 25 - 20
 
-        try:
-            if member.avatar:
-                avatar_url = member.avatar.url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(avatar_url) as response:
-                        avatar_data = await response.read()
-
-                avatar_image = Image.open(io.BytesIO(avatar_data))
-
-                avatar_size = (60, 60)
-                avatar_image = avatar_image.resize(
-                    avatar_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', avatar_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse(
-                    (0, 0, avatar_size[0], avatar_size[1]), fill=255)
-                avatar_image.putalpha(mask)
-
-                avatar_x = 7
-                avatar_y = 25 - 20
-
-                avatar_area = image.crop(
-                    (avatar_x, avatar_y, avatar_x + avatar_size[0], avatar_y + avatar_size[1])).convert('RGBA')
-
-                avatar_with_bg = Image.new('RGBA', avatar_size, (0, 0, 0, 0))
-                avatar_with_bg.paste(avatar_image, (0, 0), avatar_image)
-
-                avatar_area.paste(avatar_with_bg, (0, 0), avatar_with_bg)
-                image.paste(avatar_area.convert('RGB'), (avatar_x, avatar_y))
-
-                username_text_center = (150, 25)
-
-                fitted_text, username_font, username_pos = fit_text_to_rectangle(
-                    member_name,
-                    username_text_center[0],
-                    username_text_center[1],
-                    username_rectangle["center"][0],
-                    username_rectangle["center"][1],
-                    username_rectangle["width"],
-                    username_rectangle["height"],
-                    is_channel=False,
-                    is_username=True
-                )
-
-                pilmoji.text(username_pos, fitted_text,
-                             fill="white", font=username_font)
-
-            else:
-                username_text_center = (91, 27)
-
-                fitted_text, username_font, username_pos = fit_text_to_rectangle(
-                    member_name,
-                    username_text_center[0],
-                    username_text_center[1],
-                    username_rectangle["center"][0],
-                    username_rectangle["center"][1],
-                    username_rectangle["width"],
-                    username_rectangle["height"],
-                    is_channel=False,
-                    is_username=True
-                )
-
-                pilmoji.text(username_pos, fitted_text,
-                             fill="white", font=username_font)
+                    paste_avatar(image, avatar_image, (avatar_x, avatar_y))
 
-        except Exception as e:
-            logger.error(f"Could not add member avatar: {e}")
-            username_text_center = (91, 27)
+                    username_text_center = (150, 25)
+
+            except Exception as e:
+                logger.error(f"Could not add member avatar: {e}")
+
+            fitted_text, username_font, username_pos = fit_card_text(
+                member_name, username_text_center, username_rectangle, is_username=True)
 
-            fitted_text, username_font, username_pos = fit_text_to_rectangle(
-                member_name,
-                username_text_center[0],
-                username_text_center[1],
-                username_rectangle["center"][0],
-                username_rectangle["center"][1],
-                username_rectangle["width"],
-                username_rectangle["height"],
-                is_channel=False,
-                is_username=True
-            )
             pilmoji.text(username_pos, fitted_text,
                          fill="white", font=username_font)
 
-        # CREATED ON
-        current_date = datetime.now().strftime("%B %d, %Y")
-        draw_text_centered(pilmoji, current_date, (605, 45),
-                           font_horndon_medium, "white", max_width=150)
-
-        # TIME PERIOD
-        time_period_text = f"{days_back} days"
-        draw_text_centered(pilmoji, time_period_text, (147, 713),
-                           font_horndon_medium, "white", max_width=100)
-
-        # RANKS
-        messages_rank_text = f"#{data['message_rank']}" if data['message_rank'] > 0 else "Not ranked"
-        draw_text_centered(pilmoji, messages_rank_text, (190, 155),
-                           font_horndon_xlarge, "white", max_width=150)
-
-        # Voice rank
-        voice_rank_text = f"#{data['voice_rank']}" if data['voice_rank'] > 0 else "Not ranked"
-        draw_text_centered(pilmoji, voice_rank_text, (190, 215),
-                           font_horndon_xlarge, "white", max_width=150)
-
-        # TOTALS
-        total_messages_text = str(data['total_messages'])
-        draw_text_centered(pilmoji, total_messages_text, (450, 155),
-                           font_horndon_xlarge, "white", max_width=150)
-
-        # Total voice time
-        voice_time_text = format_voice_time(data['total_voice_seconds'])
-        draw_text_centered(pilmoji, voice_time_text, (450, 215),
-                           font_horndon_xlarge, "white", max_width=150)
-
-        # HOURLY RATES
-        messages_per_hour_text = f"{data['messages_per_hour']:.2f}"
-        draw_text_centered(pilmoji, messages_per_hour_text, (130, 340),
-                           font_horndon_huge, "white", max_width=150)
-
-        voice_per_hour_text = format_voice_hours_per_hour(
-            data['voice_hours_per_hour'])
-        draw_text_centered(pilmoji, voice_per_hour_text, (385, 340),
-                           font_horndon_huge, "white", max_width=150)
-
-        # TEXT CHANNELS
-        text_channel_positions = [(65, 500), (65, 555), (65, 610)]
-        text_message_positions = [(190, 500), (190, 555), (190, 610)]
-
-        for i in range(3):
-            text_pos = text_channel_positions[i]
-            rect_info = text_channel_rectangles[i]
-
-            if i < len(data['top_text_channels']):
-                channel = data['top_text_channels'][i]
-                channel_name = channel.get(
-                    'channel_name', f"#{channel.get('channel_id', '?')}")
-
-                if channel_name.startswith('#'):
-                    display_name = channel_name
-                else:
-                    display_name = f"#{channel_name}"
-
-                fitted_text, channel_font, final_pos = fit_text_to_rectangle(
-                    display_name,
-                    text_pos[0],
-                    text_pos[1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=True
-                )
-
-                if fitted_text:
-                    pilmoji.text(final_pos, fitted_text,
-                                 fill="white", font=channel_font)
+            # CREATED ON
+            current_date = datetime.now().strftime("%B %d, %Y")
+            draw_text_centered(pilmoji, current_date, (605, 45),
+                               font_horndon_medium, "white", max_width=150)
+
+            # TIME PERIOD
+            time_period_text = f"{days_back} days"
+            draw_text_centered(pilmoji, time_period_text, (147, 713),
+                               font_horndon_medium, "white", max_width=100)
+
+            # RANKS
+            messages_rank_text = f"#{data['message_rank']}" if data['message_rank'] > 0 else "Not ranked"
+            draw_text_centered(pilmoji, messages_rank_text, (190, 155),
+                               font_horndon_xlarge, "white", max_width=150)
+
+            # Voice rank
+            voice_rank_text = f"#{data['voice_rank']}" if data['voice_rank'] > 0 else "Not ranked"
+            draw_text_centered(pilmoji, voice_rank_text, (190, 215),
+                               font_horndon_xlarge, "white", max_width=150)
+
+            # TOTALS
+            total_messages_text = str(data['total_messages'])
+            draw_text_centered(pilmoji, total_messages_text, (450, 155),
+                               font_horndon_xlarge, "white", max_width=150)
+
+            # Total voice time
+            voice_time_text = format_voice_time(data['total_voice_seconds'])
+            draw_text_centered(pilmoji, voice_time_text, (450, 215),
+                               font_horndon_xlarge, "white", max_width=150)
+
+            # HOURLY RATES
+            messages_per_hour_text = f"{data['messages_per_hour']:.2f}"
+            draw_text_centered(pilmoji, messages_per_hour_text, (130, 340),
+                               font_horndon_huge, "white", max_width=150)
+
+            voice_per_hour_text = format_voice_hours_per_hour(
+                data['voice_hours_per_hour'])
+            draw_text_centered(pilmoji, voice_per_hour_text, (385, 340),
+                               font_horndon_huge, "white", max_width=150)
+
+            # TEXT CHANNELS
+            text_channel_positions = [(65, 500), (65, 555), (65, 610)]
+            text_message_positions = [(190, 500), (190, 555), (190, 610)]
+
+            for i in range(3):
+                text_pos = text_channel_positions[i]
+                rect_info = text_channel_rectangles[i]
+
+                if i < len(data['top_text_channels']):
+                    channel = data['top_text_channels'][i]
+                    channel_name = channel.get(
+                        'channel_name', f"#{channel.get('channel_id', '?')}")
+
+                    if channel_name.startswith('#'):
+                        display_name = channel_name
+                    else:
+                        display_name = f"#{channel_name}"
+
+                    fitted_text, channel_font, final_pos = fit_card_text(
+                        display_name, text_pos, rect_info, is_channel=True)
+
+                    if fitted_text:
+                        pilmoji.text(final_pos, fitted_text,
+                                     fill="white", font=channel_font)
+                    else:
+                        placeholder_font = font_horndon_xlarge
+                        bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
+                        text_width = bbox[2] - bbox[0]
+                        text_height = bbox[3] - bbox[1]
+                        placeholder_x = text_pos[0] - (text_width // 2)
+                        placeholder_y = text_pos[1] - (text_height // 2)
+                        pilmoji.text((placeholder_x, placeholder_y), "-",
+                                     fill="white", font=placeholder_font)
+
+                    draw_text_centered(pilmoji, str(channel.get('activity_count', 0)),
+                                       text_message_positions[i], font_horndon_xlarge, "white", max_width=80)
                 else:
                     placeholder_font = font_horndon_xlarge
                     bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
@@ -955,53 +689,47 @@ class UserStats(commands.Cog):
                     pilmoji.text((placeholder_x, placeholder_y), "-",
                                  fill="white", font=placeholder_font)
 
-                draw_text_centered(pilmoji, str(channel.get('activity_count', 0)),
-                                   text_message_positions[i], font_horndon_xlarge, "white", max_width=80)
-            else:
-                placeholder_font = font_horndon_xlarge
-                bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                placeholder_x = text_pos[0] - (text_width // 2)
-                placeholder_y = text_pos[1] - (text_height // 2)
-                pilmoji.text((placeholder_x, placeholder_y), "-",
-                             fill="white", font=placeholder_font)
-
-                draw_text_centered(pilmoji, "0", text_message_positions[i],
-                                   font_horndon_xlarge, "white", max_width=80)
-
-        # VOICE CHANNELS
-        voice_channel_positions = [(325, 500), (325, 555), (325, 610)]
-        voice_time_positions = [(455, 500), (455, 555), (455, 610)]
-
-        for i in range(3):
-            text_pos = voice_channel_positions[i]
-            rect_info = voice_channel_rectangles[i]
-
-            if i < len(data['top_voice_channels']):
-                channel = data['top_voice_channels'][i]
-                channel_name = channel.get(
-                    'channel_name', f"#{channel.get('channel_id', '?')}")
-
-                if channel_name.startswith('#'):
-                    display_name = channel_name[1:]
-                else:
-                    display_name = channel_name
-
-                fitted_text, channel_font, final_pos = fit_text_to_rectangle(
-                    display_name,
-                    text_pos[0],
-                    text_pos[1],
-                    rect_info["center"][0],
-                    rect_info["center"][1],
-                    rect_info["width"],
-                    rect_info["height"],
-                    is_channel=True
-                )
-
-                if fitted_text:
-                    pilmoji.text(final_pos, fitted_text,
-                                 fill="white", font=channel_font)
+                    draw_text_centered(pilmoji, "0", text_message_positions[i],
+                                       font_horndon_xlarge, "white", max_width=80)
+
+            # VOICE CHANNELS
+            voice_channel_positions = [(325, 500), (325, 555), (325, 610)]
+            voice_time_positions = [(455, 500), (455, 555), (455, 610)]
+
+            for i in range(3):
+                text_pos = voice_channel_positions[i]
+                rect_info = voice_channel_rectangles[i]
+
+                if i < len(data['top_voice_channels']):
+                    channel = data['top_voice_channels'][i]
+                    channel_name = channel.get(
+                        'channel_name', f"#{channel.get('channel_id', '?')}")
+
+                    if channel_name.startswith('#'):
+                        display_name = channel_name[1:]
+                    else:
+                        display_name = channel_name
+
+                    fitted_text, channel_font, final_pos = fit_card_text(
+                        display_name, text_pos, rect_info, is_channel=True)
+
+                    if fitted_text:
+                        pilmoji.text(final_pos, fitted_text,
+                                     fill="white", font=channel_font)
+                    else:
+                        placeholder_font = font_horndon_xlarge
+                        bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
+                        text_width = bbox[2] - bbox[0]
+                        text_height = bbox[3] - bbox[1]
+                        placeholder_x = text_pos[0] - (text_width // 2)
+                        placeholder_y = text_pos[1] - (text_height // 2)
+                        pilmoji.text((placeholder_x, placeholder_y), "-",
+                                     fill="white", font=placeholder_font)
+
+                    seconds = channel.get('activity_count', 0)
+                    time_text = format_voice_time(seconds)
+                    draw_text_centered(pilmoji, time_text, voice_time_positions[i],
+                                       font_horndon_xlarge, "white", max_width=80)
                 else:
                     placeholder_font = font_horndon_xlarge
                     bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
@@ -1012,147 +740,88 @@ class UserStats(commands.Cog):
                     pilmoji.text((placeholder_x, placeholder_y), "-",
                                  fill="white", font=placeholder_font)
 
-                seconds = channel.get('activity_count', 0)
-                time_text = format_voice_time(seconds)
-                draw_text_centered(pilmoji, time_text, voice_time_positions[i],
-                                   font_horndon_xlarge, "white", max_width=80)
-            else:
-                placeholder_font = font_horndon_xlarge
-                bbox = draw.textbbox((0, 0), "-", font=placeholder_font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                placeholder_x = text_pos[0] - (text_width // 2)
-                placeholder_y = text_pos[1] - (text_height // 2)
-                pilmoji.text((placeholder_x, placeholder_y), "-",
-                             fill="white", font=placeholder_font)
+                    draw_text_centered(pilmoji, "0s", voice_time_positions[i],
+                                       font_horndon_xlarge, "white", max_width=80)
+
+            # MESSAGES OVER TIME
+            message_time_positions = {
+                '1d': (675, 155),
+                '5d': (675, 215),
+                '10d': (675, 270),
+                '20d': (675, 323),
+                '30d': (675, 375)
+            }
 
-                draw_text_centered(pilmoji, "0s", voice_time_positions[i],
+            for period, position in message_time_positions.items():
+                count = data['message_periods'].get(period, 0)
+                draw_text_centered(pilmoji, str(count), position,
                                    font_horndon_xlarge, "white", max_width=80)
 
-        # MESSAGES OVER TIME
-        message_time_positions = {
-            '1d': (675, 155),
-            '5d': (675, 215),
-            '10d': (675, 270),
-            '20d': (675, 323),
-            '30d': (675, 375)
-        }
-
-        for period, position in message_time_positions.items():
-            count = data['message_periods'].get(period, 0)
-            draw_text_centered(pilmoji, str(count), position,
-                               font_horndon_xlarge, "white", max_width=80)
-
-        # VOICE TIME OVER TIME
-        voice_time_positions = {
-            '1d': (675, 475),
-            '5d': (675, 533),
-            '10d': (675, 590),
-            '20d': (675, 643),
-            '30d': (675, 695)
-        }
-
-        for period, position in voice_time_positions.items():
-            seconds = data['voice_periods'].get(period, 0)
-            voice_time_formatted = format_voice_time(seconds)
-            draw_text_centered(pilmoji, voice_time_formatted, position,
-                               font_horndon_xlarge, "white", max_width=80)
-
-        # SERVER NAME AND ICON
-        server_name = guild.name
+            # VOICE TIME OVER TIME
+            voice_time_positions = {
+                '1d': (675, 475),
+                '5d': (675, 533),
+                '10d': (675, 590),
+                '20d': (675, 643),
+                '30d': (675, 695)
+            }
 
-        try:
-            if guild.icon:
-                icon_url = guild.icon.url
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(icon_url) as response:
-                        icon_data = await response.read()
-
-                icon_image = Image.open(io.BytesIO(icon_data))
-                icon_size = (20, 20)
-                icon_image = icon_image.resize(
-                    icon_size, Image.Resampling.LANCZOS).convert('RGBA')
-
-                mask = Image.new('L', icon_size, 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse((0, 0, icon_size[0], icon_size[1]), fill=255)
-                icon_image.putalpha(mask)
-
-                bbox = draw.textbbox((0, 0), server_name,
-                                     font=font_horndon_medium)
-                text_width = bbox[2] - bbox[0]
+            for period, position in voice_time_positions.items():
+                seconds = data['voice_periods'].get(period, 0)
+                voice_time_formatted = format_voice_time(seconds)
+                draw_text_centered(pilmoji, voice_time_formatted, position,
+                                   font_horndon_xlarge, "white", max_width=80)
 
-                icon_x = 375 - (text_width // 2) - \
-                    25
-                icon_y = 75 - 10
+            # SERVER NAME AND ICON
+            server_name = guild.name
 
-                icon_area = image.crop((int(icon_x), int(icon_y), int(
-                    icon_x) + icon_size[0], int(icon_y) + icon_size[1])).convert('RGBA')
+            try:
+                if icon_image:
+                    bbox = draw.textbbox((0, 0), server_name,
+                                         font=font_horndon_medium)
+                    text_width = bbox[2] - bbox[0]
 
-                icon_with_bg = Image.new('RGBA', icon_size, (0, 0, 0, 0))
-                icon_with_bg.paste(icon_image, (0, 0), icon_image)
+                    icon_x = 375 - (text_width // 2) - \
+                        25
+                    icon_y = 75 - 10
 
-                icon_area.paste(icon_with_bg, (0, 0), icon_with_bg)
+                    paste_avatar(image, icon_image, (int(icon_x), int(icon_y)))
 
-                image.paste(icon_area.convert('RGB'),
-                            (int(icon_x), int(icon_y)))
+                    text_x = 375 - (text_width // 2)
+                    text_y = 75 - 10
 
-                text_x = 375 - (text_width // 2)
-                text_y = 75 - 10
+                    draw_text_with_stroke(pilmoji, (text_x, text_y), server_name,
+                                          font_horndon_medium, "white", "black", 1)
 
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((text_x + dx, text_y + dy), server_name,
-                                         fill="black", font=font_horndon_medium)
+                else:
+                    text_y = 78
+                    text_x = 375
+
+                    bbox = draw.textbbox((0, 0), server_name,
+                                         font=font_horndon_medium)
+                    text_width = bbox[2] - bbox[0]
+                    text_x = 375 - (text_width // 2)
 
-                pilmoji.text((text_x, text_y), server_name,
-                             fill="white", font=font_horndon_medium)
+                    draw_text_with_stroke(pilmoji, (text_x, text_y), server_name,
+                                          font_horndon_medium, "white", "black", 1)
 
-            else:
+            except Exception as e:
+                logger.error(f"Could not add server icon: {e}")
                 text_y = 78
                 text_x = 375
 
-                bbox = draw.textbbox((0, 0), server_name,
-                                     font=font_horndon_medium)
+                bbox = draw.textbbox((0, 0), server_name, font=font_horndon_medium)
                 text_width = bbox[2] - bbox[0]
                 text_x = 375 - (text_width // 2)
 
-                stroke_width = 1
-                for dx in [-stroke_width, 0, stroke_width]:
-                    for dy in [-stroke_width, 0, stroke_width]:
-                        if dx != 0 or dy != 0:
-                            pilmoji.text((text_x + dx, text_y + dy), server_name,
-                                         fill="black", font=font_horndon_medium)
-
-                pilmoji.text((text_x, text_y), server_name,
-                             fill="white", font=font_horndon_medium)
-
-        except Exception as e:
-            logger.error(f"Could not add server icon: {e}")
-            text_y = 78
-            text_x = 375
-
-            bbox = draw.textbbox((0, 0), server_name, font=font_horndon_medium)
-            text_width = bbox[2] - bbox[0]
-            text_x = 375 - (text_width // 2)
-
-            stroke_width = 1
-            for dx in [-stroke_width, 0, stroke_width]:
-                for dy in [-stroke_width, 0, stroke_width]:
-                    if dx != 0 or dy != 0:
-                        pilmoji.text((text_x + dx, text_y + dy), server_name,
-                                     fill="black", font=font_horndon_medium)
+                draw_text_with_stroke(pilmoji, (text_x, text_y), server_name,
+                                      font_horndon_medium, "white", "black", 1)
 
-            pilmoji.text((text_x, text_y), server_name,
-                         fill="white", font=font_horndon_medium)
+            pilmoji.close()
 
-        pilmoji.close()
+            return image
 
-        image_buffer = io.BytesIO()
-        image.save(image_buffer, format='PNG')
-        image_buffer.seek(0)
+        image_buffer = await render_service.render_card(compose, guild.id)
 
         return image_buffer
 
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Tests import the bot's modules the way the bot does (utils.x, cogs/...)
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
@@ -0,0 +1,188 @@
+import math
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.query_builders import (
+    fold_series_rows, series_bucket_sql, series_bucket_starts, trailing_window_starts,
+    user_rank_result, user_rank_sql, windowed_select_sql
+)
+
+# Shaped like the database cog's METRIC_SOURCES['messages'] over the rollups
+MESSAGES = {
+    'time_column': 'bucket',
+    'user_column': 'user_id',
+    'value': 'COALESCE(SUM(message_count), 0)',
+    'windowed_value': 'COALESCE(SUM(message_count) FILTER (WHERE {cond}), 0)'
+}
+
+END = datetime(2024, 6, 20, 14, 0)
+
+
+def database(rows):
+
+    # (user_id, bucket, message_count); the window and rank SQL is portable
+    # enough to run unchanged on SQLite, $n placeholders included
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE message_stats (user_id INTEGER, bucket TEXT, message_count INTEGER)")
+    conn.executemany("INSERT INTO message_stats VALUES (?, ?, ?)",
+                     [(user_id, bucket.isoformat(" "), count) for user_id, bucket, count in rows])
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def bind(params):
+    return {str(idx): value.isoformat(" ") if isinstance(value, datetime) else value
+            for idx, value in enumerate(params, 1)}
+
+
+# TRAILING WINDOWS
+
+def test_window_starts_reach_back_from_the_end():
+
+    assert trailing_window_starts([1, 5, 30], END) == [
+        END - timedelta(days=1), END - timedelta(days=5), END - timedelta(days=30)]
+
+
+def test_window_starts_stop_at_start_time():
+
+    start_time = END - timedelta(days=3)
+    assert trailing_window_starts([1, 5, 30], END, start_time) == [
+        END - timedelta(days=1), start_time, start_time]
+
+
+def test_windowed_counts_filter_each_window():
+
+    rows = [
+        (1, END - timedelta(hours=2), 4),
+        (1, END - timedelta(days=1), 3),                 # exactly on the 1d boundary
+        (2, END - timedelta(days=4, hours=23), 5),
+        (2, END - timedelta(days=5, seconds=1), 7),      # just outside 5d
+        (3, END - timedelta(days=29), 2),
+        (3, END - timedelta(days=31), 100),              # outside every window
+    ]
+    windows = [1, 5, 30]
+    starts = trailing_window_starts(windows, END)
+
+    query = (f"SELECT {windowed_select_sql(MESSAGES, len(windows))} FROM message_stats "
+             f"WHERE bucket >= ${len(starts) + 1}")
+    row = database(rows).execute(query, bind(starts + [min(starts)])).fetchone()
+
+    assert [row[f"w{idx}"] for idx in range(1, 4)] == [7, 12, 21]
+
+
+# BUCKETED SERIES
+
+def bucket_index(moment, first_start, bucket):
+
+    # What series_bucket_sql computes: FLOOR(epoch difference / width)
+    return math.floor((moment - first_start).total_seconds() / bucket.total_seconds())
+
+
+def test_series_buckets_are_anchored_on_the_end():
+
+    starts = series_bucket_starts(END - timedelta(days=7), END, timedelta(days=1))
+
+    assert len(starts) == 7
+    assert starts[-1] + timedelta(days=1) == END
+    assert starts[0] == END - timedelta(days=7)
+    assert all(later - earlier == timedelta(days=1) for earlier, later in zip(starts, starts[1:]))
+
+
+def test_series_bucket_count_rounds_to_whole_buckets():
+
+    # A window a few minutes short of a whole number of buckets still yields
+    # that many; the first bucket starts before start_time instead
+    starts = series_bucket_starts(END - timedelta(hours=23, minutes=55), END, timedelta(hours=1))
+
+    assert len(starts) == 24
+    assert starts[0] == END - timedelta(hours=24)
+
+
+def test_series_bucket_sql_floors_from_the_first_bucket():
+
+    select_sql = series_bucket_sql(MESSAGES)
+
+    assert select_sql.startswith("FLOOR(EXTRACT(EPOCH FROM (bucket - $1::timestamptz)) / $2::float8)::int")
+    assert select_sql.endswith("AS value")
+
+
+def test_series_rows_fold_into_half_open_buckets():
+
+    bucket = timedelta(hours=6)
+    starts = series_bucket_starts(END - timedelta(days=1), END, bucket)
+    moments = {
+        starts[0]: 1,                                    # first bucket opens at its start
+        starts[1] - timedelta(seconds=1): 10,            # still the first bucket
+        starts[1]: 100,                                  # a boundary opens the next bucket
+        starts[3] + timedelta(hours=2): 1000,
+        END: 10000,                                      # end_time joins the last bucket
+        starts[0] - timedelta(seconds=1): 99999,         # before the series
+        END + timedelta(seconds=1): 99999,               # after it
+    }
+
+    # Rows past END never reach the fold (the scoped query ends there); a
+    # row before the first bucket gets a negative index, which it skips
+    rows = {}
+    for moment, value in moments.items():
+        if moment > END:
+            continue
+        idx = bucket_index(moment, starts[0], bucket)
+        rows[idx] = rows.get(idx, 0) + value
+
+    values = fold_series_rows(
+        [{'bucket_idx': idx, 'value': value} for idx, value in rows.items()], len(starts))
+
+    assert values == [11, 100, 0, 11000]
+
+
+def test_series_fold_skips_null_buckets_and_values():
+
+    rows = [{'bucket_idx': None, 'value': 5}, {'bucket_idx': 0, 'value': None},
+            {'bucket_idx': 1, 'value': 2}]
+
+    assert fold_series_rows(rows, 2) == [0, 2]
+
+
+# SINGLE-USER RANKS
+
+def user_rank(rows, user_id):
+
+    inner_query = ("SELECT user_id AS ranked_user, COALESCE(SUM(message_count), 0) AS total "
+                   "FROM message_stats WHERE bucket >= '2024-01-01'")
+    query = user_rank_sql(inner_query, MESSAGES['user_column'], MESSAGES['value'])
+    row = database(rows).execute(query, bind([user_id])).fetchone()
+    return user_rank_result(dict(row))
+
+
+RANK_ROWS = [
+    (1, datetime(2024, 6, 1), 50),
+    (2, datetime(2024, 6, 1), 30), (2, datetime(2024, 6, 2), 20),   # ties with user 1
+    (3, datetime(2024, 6, 3), 20),
+    (4, datetime(2024, 6, 3), 5),
+    (5, datetime(2024, 6, 3), 0),                                   # no activity: not ranked
+    (6, datetime(2023, 6, 3), 500),                                 # outside the window
+]
+
+
+@pytest.mark.parametrize("user_id, rank, value", [
+    (1, 1, 50),
+    (2, 1, 50),
+    (3, 3, 20),
+    (4, 4, 5),
+])
+def test_rank_ties_share_a_rank(user_id, rank, value):
+
+    assert user_rank(RANK_ROWS, user_id) == {'rank': rank, 'total_users': 4, 'value': value}
+
+
+@pytest.mark.parametrize("user_id", [5, 6, 7])
+def test_rank_of_user_without_rows(user_id):
+
+    assert user_rank(RANK_ROWS, user_id) == {'rank': 0, 'total_users': 4, 'value': 0}
+
+
+def test_rank_with_no_rows_at_all():
+
+    assert user_rank([], 1) == {'rank': 0, 'total_users': 0, 'value': 0}
@@ -0,0 +1,145 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from utils.query_cache import (
+    QueryCacheVersions, decode_cached_value, encode_cached_value, normalize_cache_arguments,
+    query_cache_key
+)
+
+HOUR = timedelta(hours=1)
+
+
+def normalized(**arguments):
+    normalize_cache_arguments(arguments, HOUR)
+    return arguments
+
+
+# KEYS
+
+def test_window_widens_to_whole_hours():
+
+    arguments = normalized(guild_id=1, start_time=datetime(2024, 6, 1, 9, 41, 7),
+                           end_time=datetime(2024, 6, 8, 9, 41, 7))
+
+    assert arguments['start_time'] == datetime(2024, 6, 1, 9)
+    # end_time is inclusive, so it runs to the end of its hour
+    assert arguments['end_time'] == datetime(2024, 6, 8, 9, 59, 59, 999999)
+
+
+def test_calls_moments_apart_share_a_key():
+
+    first = normalized(guild_id=1, start_time=datetime(2024, 6, 1, 9, 1),
+                       end_time=datetime(2024, 6, 8, 9, 1), role_filter_ids=[3, 1, 2])
+    second = normalized(guild_id=1, start_time=datetime(2024, 6, 1, 9, 58),
+                        end_time=datetime(2024, 6, 8, 9, 58), role_filter_ids=[2, 3, 1])
+
+    assert query_cache_key("q_test", 1, ("r1", "r0"), first) == \
+        query_cache_key("q_test", 1, ("r1", "r0"), second)
+
+
+def test_aware_times_normalize_to_naive_utc():
+
+    aware = normalized(start_time=datetime(2024, 6, 1, 11, 30, tzinfo=timezone(timedelta(hours=2))))
+    naive = normalized(start_time=datetime(2024, 6, 1, 9, 30))
+
+    assert aware == naive == {'start_time': datetime(2024, 6, 1, 9)}
+
+
+def test_whole_hour_end_is_kept():
+
+    assert normalized(end_time=datetime(2024, 6, 1, 9))['end_time'] == datetime(2024, 6, 1, 9)
+
+
+@pytest.mark.parametrize("extra", [{'bucket': HOUR}, {'timezone_str': 'UTC'}])
+def test_series_windows_are_left_exact(extra):
+
+    start_time = datetime(2024, 6, 1, 9, 41)
+    arguments = normalized(start_time=start_time, role_filter_ids=[2, 1], **extra)
+
+    assert arguments['start_time'] == start_time
+    assert arguments['role_filter_ids'] == [1, 2]
+
+
+def test_key_depends_on_versions_and_arguments():
+
+    arguments = normalized(guild_id=1, days_back=30)
+    key = query_cache_key("q_test", 1, ("r1", "r0"), arguments)
+
+    assert key.startswith("qc:1:q_test:")
+    assert key != query_cache_key("q_test", 1, ("r2", "r0"), arguments)
+    assert key != query_cache_key("q_test", 1, ("r1", "r1"), arguments)
+    assert key != query_cache_key("q_other", 1, ("r1", "r0"), arguments)
+    assert key != query_cache_key("q_test", 1, ("r1", "r0"), normalized(guild_id=1, days_back=7))
+
+
+# VALUES
+
+def test_values_survive_a_json_round_trip():
+
+    value = {
+        'when': datetime(2024, 6, 1, 9, 30),
+        'day': date(2024, 6, 1),
+        'average': Decimal('1.50'),
+        'top': [(1, 'a'), (2, 'b')],
+        'hours': {0: 4, 23: 1},
+        'nested': [{'none': None, 'flag': True, 'ratio': 0.5}]
+    }
+
+    restored = decode_cached_value(json.loads(json.dumps(encode_cached_value(value))))
+
+    assert restored == value
+    assert isinstance(restored['top'][0], tuple)
+
+
+def test_unknown_values_are_refused():
+
+    with pytest.raises(TypeError):
+        encode_cached_value({'members': {1, 2}})
+
+
+# VERSIONS
+
+def test_local_versions_bump_per_kind():
+
+    versions = QueryCacheVersions(read_ttl=2.0)
+    assert versions.local_versions(1) == ("l0", "l0")
+
+    versions.bump('data', [1])
+    versions.bump('blacklist', [1, 2])
+    versions.bump('data', [1])
+
+    assert versions.local_versions(1) == ("l2", "l1")
+    assert versions.local_versions(2) == ("l0", "l1")
+
+
+def test_redis_reads_are_reused_until_a_bump():
+
+    versions = QueryCacheVersions(read_ttl=60.0)
+
+    assert versions.remember(1, ("4", None), versions.bumps) == ("r4", "r0")
+    assert versions.recent(1) == ("r4", "r0")
+
+    versions.bump('data', [1])
+    versions.forget([1])
+    assert versions.recent(1) is None
+
+
+def test_read_overlapping_a_bump_is_not_reused():
+
+    versions = QueryCacheVersions(read_ttl=60.0)
+
+    bumps_before = versions.bumps
+    versions.bump('data', [1])                      # lands while the read is in flight
+    assert versions.remember(1, ("4", "0"), bumps_before) == ("r4", "r0")
+    assert versions.recent(1) is None
+
+
+def test_redis_reads_expire():
+
+    versions = QueryCacheVersions(read_ttl=0.0)
+    versions.remember(1, ("4", "0"), versions.bumps)
+
+    assert versions.recent(1) is None
@@ -0,0 +1,91 @@
+import asyncio
+import importlib.util
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+# Needs a primary and a streaming standby of it; tests/replica_harness.sh
+# starts both in docker and runs this module against them
+PRIMARY_DSN = os.getenv("STATS_TEST_PRIMARY_DSN")
+REPLICA_DSN = os.getenv("STATS_TEST_REPLICA_DSN")
+if not (PRIMARY_DSN and REPLICA_DSN):
+    pytest.skip("STATS_TEST_PRIMARY_DSN / STATS_TEST_REPLICA_DSN not set", allow_module_level=True)
+
+for module_name in ("discord", "asyncpg", "redis", "cryptography", "pytz",
+                    "dotenv", "matplotlib", "numpy", "emoji"):
+    pytest.importorskip(module_name)
+
+import asyncpg  # noqa: E402
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+
+spec = importlib.util.spec_from_file_location("database_cog", BOT_DIR / "cogs" / "1- database.py")
+database = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(database)
+
+DatabaseStats = database.DatabaseStats
+
+
+async def wait_for(condition, timeout=10.0):
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.1)
+
+
+async def routing_follows_replay():
+
+    stats = DatabaseStats.__new__(DatabaseStats)
+    stats.pool = await asyncpg.create_pool(PRIMARY_DSN, min_size=1, max_size=2)
+    stats.read_pool = await asyncpg.create_pool(REPLICA_DSN, min_size=1, max_size=2)
+    stats.replica_lag = None
+    stats.replica_lag_checked_at = 0.0
+    stats.primary_write_lsn = 0
+    stats.replica_replay_lsn = None
+    stats.replica_lsn_checked_at = 0.0
+    stats.replica_lsn_check = None
+
+    async with stats.pool.acquire() as conn:
+        await conn.execute("CREATE TABLE IF NOT EXISTS replica_probe (value int)")
+
+    try:
+        await stats._note_primary_write_lsn()
+        await wait_for(lambda: stats._read_pool() is stats.read_pool)
+
+        # Hold replay on the standby so the next write can't reach it
+        async with stats.read_pool.acquire() as conn:
+            await conn.execute("SELECT pg_wal_replay_pause()")
+        try:
+            async with stats.pool.acquire() as conn:
+                await conn.execute("INSERT INTO replica_probe VALUES (1)")
+            await stats._note_primary_write_lsn()
+
+            # Within the lag budget, but behind the write: reads stay on the
+            # primary, where the new row is visible
+            await stats._check_replica_lag()
+            assert stats.replica_lag <= database.Constants.REPLICA_STALENESS_BUDGET
+            assert stats._read_pool() is stats.pool
+            async with stats._read_pool().acquire() as conn:
+                assert await conn.fetchval("SELECT count(*) FROM replica_probe") == 1
+        finally:
+            async with stats.read_pool.acquire() as conn:
+                await conn.execute("SELECT pg_wal_replay_resume()")
+
+        # Once replayed, the polling in _read_pool moves reads back
+        await wait_for(lambda: stats._read_pool() is stats.read_pool)
+        async with stats._read_pool().acquire() as conn:
+            assert await conn.fetchval("SELECT count(*) FROM replica_probe") == 1
+
+    finally:
+        async with stats.pool.acquire() as conn:
+            await conn.execute("DROP TABLE replica_probe")
+        await stats.read_pool.close()
+        await stats.pool.close()
+
+
+def test_reads_stay_on_primary_until_replica_replays_write():
+
+    asyncio.run(routing_follows_replay())
@@ -0,0 +1,66 @@
+import asyncio
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import utils.render_cache
+from utils.render_cache import RenderCache, cached_render, render_key
+
+
+# KEYS
+
+def member(display_name="Ann", avatar="a1"):
+    return SimpleNamespace(id=42, display_name=display_name,
+                           display_avatar=SimpleNamespace(key=avatar))
+
+
+def test_render_key_is_stable():
+
+    parts = ({'messages': 10, 'since': datetime(2024, 6, 1)}, member())
+
+    assert render_key("card", 1, *parts) == render_key("card", 1, *parts)
+    assert render_key("card", 1, *parts).startswith("card-v1-")
+
+
+def test_render_key_ignores_dict_order():
+
+    assert render_key("card", 1, {'a': 1, 'b': 2}) == render_key("card", 1, {'b': 2, 'a': 1})
+
+
+def test_render_key_follows_what_the_card_shows():
+
+    base = render_key("card", 1, {'messages': 10}, member())
+
+    assert base != render_key("card", 2, {'messages': 10}, member())
+    assert base != render_key("other", 1, {'messages': 10}, member())
+    assert base != render_key("card", 1, {'messages': 11}, member())
+    assert base != render_key("card", 1, {'messages': 10}, member(display_name="Bo"))
+    assert base != render_key("card", 1, {'messages': 10}, member(avatar="a2"))
+
+
+def test_render_key_refuses_unkeyable_parts():
+
+    # Mixed key types can't be sorted into a stable payload
+    assert render_key("card", 1, {1: 'a', 'b': 2}) is None
+
+
+# CACHED RENDERS
+
+def test_error_cards_are_not_cached(monkeypatch):
+
+    monkeypatch.setattr(utils.render_cache, "render_cache", RenderCache(disk_dir=None))
+    renders = []
+
+    @cached_render("test_card")
+    async def render(data):
+        renders.append(data)
+        return io.BytesIO(b"png")
+
+    async def run():
+        for data in ({'error': "Database not connected"}, {'error': "Database not connected"},
+                     {'messages': 10}, {'messages': 10}):
+            assert (await render(data)).getvalue() == b"png"
+
+    asyncio.run(run())
+
+    assert renders == [{'error': "Database not connected"}] * 2 + [{'messages': 10}]
@@ -0,0 +1,201 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.query_builders import BUCKET_ORIGIN, plan_rollup_ranges
+from utils.sketches import HyperLogLog, SketchConfig, SpaceSaving
+
+
+# HYPERLOGLOG
+
+def snowflakes(count, start=0):
+
+    # Sequential IDs shaped like Discord snowflakes
+    base = 175928847299117063
+    return [base + ((start + index) << 22) for index in range(count)]
+
+
+@pytest.mark.parametrize("cardinality", [0, 1, 50, 5_000, 200_000])
+def test_hll_estimate_within_error_bound(cardinality):
+
+    sketch = HyperLogLog().add(snowflakes(cardinality))
+
+    # Standard error is 1.04 / sqrt(m); allow four of them
+    tolerance = 4 * 1.04 / (1 << SketchConfig.HLL_PRECISION) ** 0.5
+    assert abs(sketch.count() - cardinality) <= max(1, cardinality * tolerance)
+
+
+def test_hll_ignores_duplicates():
+
+    values = snowflakes(10_000)
+    once = HyperLogLog().add(values)
+    repeated = HyperLogLog().add(values).add(values[::-1])
+
+    assert (once.registers == repeated.registers).all()
+
+
+def test_hll_merge_matches_union():
+
+    first, second = snowflakes(60_000), snowflakes(60_000, start=30_000)
+    merged = HyperLogLog().add(first).merge(HyperLogLog().add(second))
+    union = HyperLogLog().add(first + second)
+
+    assert (merged.registers == union.registers).all()
+    assert abs(merged.count() - 90_000) <= 90_000 * 0.05
+
+
+def test_hll_bytes_round_trip():
+
+    sketch = HyperLogLog().add(snowflakes(25_000))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+
+    assert (restored.registers == sketch.registers).all()
+    assert restored.count() == sketch.count()
+
+    # The restored registers are writable and independent of the original
+    restored.add(snowflakes(1_000, start=25_000))
+    assert restored.count() > sketch.count()
+
+
+# SPACE-SAVING
+
+def skewed_stream(length, seed):
+
+    # Zipf-like: item i is drawn with weight 1 / (i + 1)
+    rng = random.Random(seed)
+    items = [f"item{index}" for index in range(2_000)]
+    weights = [1 / (index + 1) for index in range(len(items))]
+    return rng.choices(items, weights=weights, k=length)
+
+
+def exact_counts(stream):
+
+    counts = {}
+    for item in stream:
+        counts[item] = counts.get(item, 0) + 1
+    return counts
+
+
+def assert_error_bounds(summary, counts, total):
+
+    for item, (count, error) in summary.counters.items():
+        assert count - error <= counts.get(item, 0) <= count
+
+    # Anything above total / capacity is guaranteed to be tracked
+    for item, true_count in counts.items():
+        if true_count > total / summary.capacity:
+            assert item in summary.counters
+
+
+def test_space_saving_error_bounds():
+
+    stream = skewed_stream(50_000, seed=1)
+    summary = SpaceSaving()
+    for item in stream:
+        summary.add(item)
+
+    counts = exact_counts(stream)
+    assert_error_bounds(summary, counts, len(stream))
+
+    expected = sorted(counts, key=counts.get, reverse=True)[:3]
+    assert [item for item, _ in summary.top(3)] == expected
+
+
+def test_space_saving_weighted_add():
+
+    summary = SpaceSaving(capacity=2)
+    summary.add("a", 5).add("b", 3).add("c", 1)
+
+    # "c" replaces the smallest counter and inherits its count as error
+    assert summary.counters == {"a": [5, 0], "c": [4, 3]}
+
+
+def test_space_saving_merge_keeps_bounds():
+
+    first, second = skewed_stream(30_000, seed=2), skewed_stream(30_000, seed=3)
+    merged = SpaceSaving()
+    for item in first:
+        merged.add(item)
+    other = SpaceSaving()
+    for item in second:
+        other.add(item)
+    merged.merge(other)
+
+    assert len(merged.counters) <= merged.capacity
+    assert_error_bounds(merged, exact_counts(first + second), len(first) + len(second))
+
+
+def test_space_saving_json_round_trip():
+
+    summary = SpaceSaving()
+    for item in skewed_stream(5_000, seed=4):
+        summary.add(item)
+
+    restored = SpaceSaving.from_json(summary.to_json())
+
+    assert restored.counters == summary.counters
+    assert restored.top(10) == summary.top(10)
+
+
+# ROLLUP PLANNING
+
+# The tiers the database cog reads, coarsest first
+TIERS = [("weekly_message_stats", timedelta(days=7)),
+         ("daily_message_stats", timedelta(days=1)),
+         ("hourly_message_stats", timedelta(hours=1))]
+WIDTHS = dict(TIERS)
+HOUR = timedelta(hours=1)
+
+
+def plan_ranges(start_time, end_time, time_cuts=()):
+    return plan_rollup_ranges(TIERS, start_time, end_time, list(time_cuts))
+
+
+@pytest.mark.parametrize("start_time, end_time, time_cuts", [
+    (datetime(2024, 3, 5, 13, 27), datetime(2024, 5, 20, 8, 41), []),
+    (datetime(2024, 3, 5, 13, 27), datetime(2024, 5, 20, 8, 41),
+     [datetime(2024, 4, 1), datetime(2024, 4, 17, 9, 30)]),
+    (datetime(2024, 6, 3), datetime(2024, 6, 17), []),
+    (datetime(2024, 6, 3, 10, 5), datetime(2024, 6, 3, 10, 55), []),
+    (None, datetime(2024, 5, 20, 8, 41), [datetime(2024, 5, 1, 12)]),
+])
+def test_rollup_plan_aligns_buckets(start_time, end_time, time_cuts):
+
+    plan, raw_ranges = plan_ranges(start_time, end_time, time_cuts)
+    origin = BUCKET_ORIGIN
+
+    for view_name, ranges in plan.items():
+        width = WIDTHS[view_name]
+        for bucket_start, bucket_end in ranges:
+            assert (bucket_end - origin) % width == timedelta()
+            if bucket_start is not None:
+                assert (bucket_start - origin) % width == timedelta()
+                if width == timedelta(days=7):
+                    assert bucket_start.weekday() == 0
+
+    # Raw rows only cover what's left below a whole hour
+    for range_start, range_end in raw_ranges:
+        assert range_start is not None
+        assert range_end - range_start < HOUR
+
+    # Together the pieces tile the range exactly, with no cut inside a piece
+    pieces = [piece for ranges in plan.values() for piece in ranges] + raw_ranges
+    pieces.sort(key=lambda piece: (piece[0] is not None, piece[0] or datetime.min))
+    assert pieces[0][0] == start_time
+    assert pieces[-1][1] == end_time
+    for (_, previous_end), (next_start, _) in zip(pieces, pieces[1:]):
+        assert previous_end == next_start
+    for cut in time_cuts:
+        assert not any((piece_start is None or piece_start < cut) and cut < piece_end
+                       for piece_start, piece_end in pieces)
+
+
+def test_rollup_plan_prefers_coarsest_tier():
+
+    # Monday to Monday is two whole weeks: nothing finer is read
+    plan, raw_ranges = plan_ranges(datetime(2024, 6, 3), datetime(2024, 6, 17))
+
+    assert plan == {"weekly_message_stats": [(datetime(2024, 6, 3), datetime(2024, 6, 17))],
+                    "daily_message_stats": [], "hourly_message_stats": []}
+    assert raw_ranges == []
@@ -0,0 +1,120 @@
+import io
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+import aiohttp
+import discord
+from PIL import Image
+
+from utils.render_toolkit import circle_mask
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class AssetCacheConfig:
+    # Decoded, resized and masked images kept in memory
+    MAX_IMAGES = 512
+
+    # Shared HTTP session
+    CONNECTION_LIMIT = 20
+    DNS_CACHE_TTL = 300
+    TIMEOUT = 10
+
+
+def _cdn_size(size: Tuple[int, int]) -> int:
+
+    # Smallest CDN size (a power of two, 16-4096) that still downscales
+    wanted = max(size)
+    cdn_size = 16
+    while cdn_size < wanted and cdn_size < 4096:
+        cdn_size *= 2
+    return cdn_size
+
+
+# ASSET CACHE
+
+class AssetCache:
+
+    def __init__(self, max_images: int = AssetCacheConfig.MAX_IMAGES):
+        self.max_images = max_images
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        # (asset hash or url, size, circle) -> RGBA image
+        self.images: OrderedDict[Tuple, Image.Image] = OrderedDict()
+        self.flights = SingleFlight()
+
+    def http_session(self) -> aiohttp.ClientSession:
+
+        # One pooled session for every renderer, so connections (and their
+        # TLS handshakes) to the CDN are reused across cards
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=AssetCacheConfig.CONNECTION_LIMIT,
+                    ttl_dns_cache=AssetCacheConfig.DNS_CACHE_TTL
+                ),
+                timeout=aiohttp.ClientTimeout(total=AssetCacheConfig.TIMEOUT)
+            )
+        return self.session
+
+    async def fetch_bytes(self, url: str) -> bytes:
+
+        async with self.http_session().get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    @staticmethod
+    def _decode(data: bytes, size: Optional[Tuple[int, int]], circle: bool) -> Image.Image:
+
+        image = Image.open(io.BytesIO(data))
+        if size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        image = image.convert('RGBA')
+
+        if circle:
+            image.putalpha(circle_mask(image.size))
+
+        return image
+
+    async def get_image(self, source: Union[discord.Asset, str],
+                        size: Optional[Tuple[int, int]] = None,
+                        circle: bool = False) -> Image.Image:
+
+        # Returns a copy the caller may draw on. Raises if the download or
+        # decode fails, like the inline fetches this replaces.
+        size = tuple(size) if size else None
+
+        if isinstance(source, str):
+            source_key, url = source, source
+        else:
+            # Asset hashes change whenever the avatar or icon does
+            source_key = source.key
+            url = source.with_size(_cdn_size(size)).url if size else source.url
+
+        key = (source_key, size, circle)
+        image = self.images.get(key)
+        if image is None:
+            async def load() -> Image.Image:
+                return self._decode(await self.fetch_bytes(url), size, circle)
+
+            image = await self.flights.do(key, load)
+
+            self.images[key] = image
+            while len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+
+        self.images.move_to_end(key)
+        return image.copy()
+
+    async def close(self):
+
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.images.clear()
+
+
+asset_cache = AssetCache()
@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import urllib.request
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from pilmoji.source import AppleEmojiSource, BaseSource, Twemoji
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class EmojiStoreConfig:
+    STORE_DIR = Path(os.getenv("EMOJI_STORE_DIR", BASE_DIR / "assets" / "emoji"))
+
+    # Twemoji PNGs named by code point the way Twemoji ships them
+    # (1f600.png, 1f468-200d-1f4bb.png), imported into the store on startup
+    TWEMOJI_DIR = STORE_DIR / "twemoji"
+
+    # Release whose 72x72 set `python -m utils.emoji_store` downloads into
+    # the store (graphics CC-BY 4.0, https://github.com/jdecked/twemoji)
+    TWEMOJI_VERSION = os.getenv("TWEMOJI_VERSION", "15.1.0")
+    TWEMOJI_ARCHIVE_URL = "https://github.com/jdecked/twemoji/archive/refs/tags/v{version}.tar.gz"
+
+    # Glyph bytes kept in memory, least recently used evicted first. A 72x72
+    # Twemoji PNG is 1-4KB.
+    MAX_GLYPHS = 1024
+
+
+ZWJ = "\u200d"
+VARIATION_SELECTOR = "\ufe0f"
+
+
+def twemoji_key(emoji: str) -> str:
+
+    # Twemoji's file name for an emoji: its code points in hex joined by
+    # dashes, with the variation selector dropped unless it's a ZWJ sequence
+    if ZWJ not in emoji:
+        emoji = emoji.replace(VARIATION_SELECTOR, "")
+    return "-".join(f"{ord(char):x}" for char in emoji)
+
+
+def discord_key(emoji_id: int) -> str:
+
+    return f"discord/{int(emoji_id)}"
+
+
+# GLYPH STORE
+
+class GlyphStore:
+
+    def __init__(self, root: Union[str, os.PathLike] = EmojiStoreConfig.STORE_DIR,
+                 max_glyphs: int = EmojiStoreConfig.MAX_GLYPHS):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self.max_glyphs = max_glyphs
+
+        # glyph key -> sha256 of its bytes; identical images share one object
+        self.index: Dict[str, str] = {}
+        self.loaded = False
+
+        # sha256 -> glyph bytes
+        self.glyphs: OrderedDict[str, bytes] = OrderedDict()
+
+        # Renders may run in worker threads
+        self.lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> Path:
+
+        return self.objects_dir / digest[:2] / digest
+
+    def _load_index(self):
+
+        if self.loaded:
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                self.index = json.load(file)
+        except FileNotFoundError:
+            self.index = {}
+        except (OSError, ValueError) as e:
+            logger.warning("Emoji index %s unreadable, starting empty: %s", self.index_path, e)
+            self.index = {}
+        self.loaded = True
+
+    def _save_index(self):
+
+        # Written aside and swapped in so a crash never leaves half an index
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.index, file, separators=(",", ":"))
+        os.replace(temp_path, self.index_path)
+
+    def _write_object(self, data: bytes) -> str:
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{digest}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        return digest
+
+    def __len__(self) -> int:
+
+        with self.lock:
+            self._load_index()
+            return len(self.index)
+
+    def __contains__(self, key: str) -> bool:
+
+        with self.lock:
+            self._load_index()
+            return key in self.index
+
+    def put(self, key: str, data: bytes) -> str:
+
+        # Stores the glyph under key and returns its digest
+        with self.lock:
+            self._load_index()
+            digest = self._write_object(data)
+            if self.index.get(key) != digest:
+                self.index[key] = digest
+                self._save_index()
+            return digest
+
+    def get(self, key: str) -> Optional[bytes]:
+
+        with self.lock:
+            self._load_index()
+            digest = self.index.get(key)
+            if digest is None:
+                return None
+
+            data = self.glyphs.get(digest)
+            if data is not None:
+                self.glyphs.move_to_end(digest)
+                return data
+
+            try:
+                data = self._object_path(digest).read_bytes()
+            except OSError as e:
+                logger.warning("Emoji glyph %s missing from the store: %s", key, e)
+                return None
+
+            self.glyphs[digest] = data
+            while len(self.glyphs) > self.max_glyphs:
+                self.glyphs.popitem(last=False)
+            return data
+
+    def import_glyphs(self, glyphs: Iterable[Tuple[str, bytes]]) -> int:
+
+        # Adds the (key, bytes) pairs whose key isn't in the store yet, with
+        # one index write at the end; returns how many were added
+        added = 0
+        with self.lock:
+            self._load_index()
+            for key, data in glyphs:
+                if key in self.index:
+                    continue
+                self.index[key] = self._write_object(data)
+                added += 1
+
+            if added:
+                self._save_index()
+        return added
+
+    def import_directory(self, directory: Union[str, os.PathLike, None] = None) -> int:
+
+        # Adds every PNG in directory not yet in the store, keyed by its file
+        # name; returns how many were added
+        directory = Path(directory or EmojiStoreConfig.TWEMOJI_DIR)
+        if not directory.is_dir():
+            return 0
+
+        def read_glyphs():
+            for path in directory.glob("*.png"):
+                try:
+                    yield path.stem, path.read_bytes()
+                except OSError as e:
+                    logger.warning("Could not import emoji %s: %s", path, e)
+
+        return self.import_glyphs(read_glyphs())
+
+    def download_twemoji(self, version: str = EmojiStoreConfig.TWEMOJI_VERSION) -> int:
+
+        # One-time fill from a Twemoji release's 72x72 PNGs; returns how many
+        # glyphs were added
+        url = EmojiStoreConfig.TWEMOJI_ARCHIVE_URL.format(version=version)
+
+        with tempfile.TemporaryFile() as archive_file:
+            with urllib.request.urlopen(url) as response:
+                shutil.copyfileobj(response, archive_file)
+            archive_file.seek(0)
+
+            with tarfile.open(fileobj=archive_file, mode="r:gz") as archive:
+                def read_glyphs():
+                    for member in archive:
+                        path = Path(member.name)
+                        if member.isfile() and path.parent.name == "72x72" and path.suffix == ".png":
+                            yield path.stem, archive.extractfile(member).read()
+
+                return self.import_glyphs(read_glyphs())
+
+
+emoji_store = GlyphStore()
+
+
+# PILMOJI SOURCE
+
+class OfflineEmojiSource(BaseSource):
+
+    # Serves Pilmoji from the glyph store. A glyph the store doesn't have
+    # yet comes from fallback (the HTTP source cards used before) and is
+    # kept, so each emoji is fetched at most once; without a fallback it
+    # comes back as None, which Pilmoji draws as plain text. namespace keeps
+    # another style's Unicode glyphs apart from the Twemoji set.
+    def __init__(self, store: GlyphStore = emoji_store,
+                 fallback: Optional[BaseSource] = None, namespace: str = ""):
+        self.store = store
+        self.fallback = fallback
+        self.namespace = namespace
+
+    def _lookup(self, key: str, fetch) -> Optional[BytesIO]:
+
+        data = self.store.get(key)
+        if data is None and self.fallback is not None:
+            try:
+                stream = fetch()
+            except Exception as e:
+                logger.warning("Could not fetch emoji %s: %s", key, e)
+                stream = None
+
+            if stream is None:
+                return None
+            data = stream.getvalue()
+            self.store.put(key, data)
+
+        # A fresh stream per call: Pilmoji closes the ones it's handed
+        return BytesIO(data) if data is not None else None
+
+    def get_emoji(self, emoji: str, /) -> Optional[BytesIO]:
+
+        key = f"{self.namespace}/{twemoji_key(emoji)}" if self.namespace else twemoji_key(emoji)
+        return self._lookup(key, lambda: self.fallback.get_emoji(emoji))
+
+    def get_discord_emoji(self, id: int, /) -> Optional[BytesIO]:
+
+        return self._lookup(discord_key(id), lambda: self.fallback.get_discord_emoji(id))
+
+
+emoji_source = OfflineEmojiSource(fallback=Twemoji())
+
+# User stats cards draw Apple's emoji set
+apple_emoji_source = OfflineEmojiSource(fallback=AppleEmojiSource(), namespace="apple")
+
+
+# CUSTOM EMOJIS
+
+async def sync_guild_emojis(guild) -> int:
+
+    # Downloads the guild's custom emojis the store doesn't have yet, ahead
+    # of any render that needs them; returns how many were added. Animated
+    # emojis are stored as their GIF; a card shows the first frame.
+    added = 0
+    for emoji in getattr(guild, 'emojis', ()):
+        key = discord_key(emoji.id)
+        if key in emoji_store:
+            continue
+        try:
+            data = await emoji.read()
+        except Exception as e:
+            logger.warning("Could not download emoji %s from %s: %s", emoji.id, guild.id, e)
+            continue
+
+        await asyncio.to_thread(emoji_store.put, key, data)
+        added += 1
+    return added
+
+
+if __name__ == "__main__":
+    # One-time fill of the glyph store, run from the bot's directory:
+    #   python -m utils.emoji_store [twemoji version]
+    logging.basicConfig(level=logging.INFO)
+    added = emoji_store.download_twemoji(*sys.argv[1:2])
+    print(f"✅ Added {added} Twemoji glyphs to {emoji_store.root}")
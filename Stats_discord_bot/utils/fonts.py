@@ -0,0 +1,103 @@
+import functools
+import os
+from typing import Callable, Optional, Sequence, Tuple, TypeVar, Union
+
+from PIL import ImageFont
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+# CONFIGURATION
+
+class FontCacheConfig:
+    # Loaded (path, size) faces; the cards use a few paths at ~40 sizes
+    MAX_FONTS = 512
+
+    # Memoized (text, font) bounding boxes
+    MAX_MEASUREMENTS = 16384
+
+
+# FONTS
+
+@functools.lru_cache(maxsize=FontCacheConfig.MAX_FONTS)
+def _load_font(path: str, size: int) -> Union[ImageFont.FreeTypeFont, OSError]:
+
+    # Failures are cached too: a missing "arial.ttf" makes Pillow walk the
+    # system font directories, which shouldn't happen on every render
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError as e:
+        return e
+
+
+def get_font(path: Union[str, os.PathLike], size: int) -> ImageFont.FreeTypeFont:
+
+    # Same contract as ImageFont.truetype (raises OSError when the font can't
+    # be loaded), but each (path, size) is parsed once per process
+    font = _load_font(os.fspath(path), size)
+    if isinstance(font, OSError):
+        raise font
+    return font
+
+
+@functools.lru_cache(maxsize=1)
+def default_font() -> ImageFont.ImageFont:
+    return ImageFont.load_default()
+
+
+def font_or_default(path: Union[str, os.PathLike], size: int) -> ImageFont.ImageFont:
+
+    try:
+        return get_font(path, size)
+    except (OSError, ValueError):
+        return default_font()
+
+
+# MEASUREMENT
+
+@functools.lru_cache(maxsize=FontCacheConfig.MAX_MEASUREMENTS)
+def text_bbox(text: str, font: ImageFont.ImageFont) -> Tuple[int, int, int, int]:
+
+    # Single-line equivalent of draw.textbbox((0, 0), text, font=font). Keyed
+    # on the font object, which is stable because get_font hands out one
+    # object per (path, size)
+    return font.getbbox(text)
+
+
+def text_size(text: str, font: ImageFont.ImageFont) -> Tuple[int, int]:
+
+    left, top, right, bottom = text_bbox(text, font)
+    return right - left, bottom - top
+
+
+# FITTING
+
+def first_fitting(candidates: Sequence[T], attempt: Callable[[T], Optional[R]]) -> Optional[R]:
+
+    # candidates are ordered largest font first and attempt() returns a
+    # result when the text fits at that candidate, None otherwise. Text that
+    # fits at one size fits at every smaller one, so a binary search lands on
+    # the same candidate as walking the list, in log2(n) attempts.
+    low, high = 0, len(candidates)
+    best = None
+    while low < high:
+        middle = (low + high) // 2
+        result = attempt(candidates[middle])
+        if result is None:
+            low = middle + 1
+        else:
+            best = result
+            high = middle
+    return best
+
+
+def fit_font_to_width(path: Union[str, os.PathLike], text: str, max_width: int,
+                      sizes: Sequence[int]) -> Optional[ImageFont.FreeTypeFont]:
+
+    # Largest of sizes (descending) at which text is at most max_width wide
+    def attempt(size):
+        font = get_font(path, size)
+        return font if text_size(text, font)[0] <= max_width else None
+
+    return first_fitting(sizes, attempt)
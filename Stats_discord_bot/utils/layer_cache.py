@@ -0,0 +1,92 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Tuple
+
+from PIL import Image
+
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class LayerCacheConfig:
+    # Pre-composited card bases kept in memory, least recently used evicted
+    # first. An 800x600 RGB base is about 1.4MB.
+    MAX_LAYERS = 64
+
+    # on_guild_update drops a guild's bases as soon as its icon or name
+    # changes; the TTL bounds how long a base built while the icon couldn't
+    # be fetched keeps being reused
+    TTL = 3600
+
+
+def guild_fingerprint(guild) -> Tuple:
+
+    # What a base shows of the guild, so a rename or new icon is never
+    # served from a stale base even if the update event was missed
+    icon = getattr(guild, 'icon', None)
+    return (guild.name, getattr(icon, 'key', None))
+
+
+# LAYER CACHE
+
+class LayerCache:
+
+    def __init__(self, max_layers: int = LayerCacheConfig.MAX_LAYERS,
+                 ttl: int = LayerCacheConfig.TTL):
+        self.max_layers = max_layers
+        self.ttl = ttl
+
+        # (guild id, card type, variant) -> (guild fingerprint, expires_at, image)
+        self.layers: OrderedDict[Tuple, Tuple] = OrderedDict()
+        self.flights = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, guild, card_type: str, build: Callable[[], Awaitable[Image.Image]],
+                  variant: Hashable = None) -> Image.Image:
+
+        # A private copy of the card's static base for guild: the template
+        # with the icon, server name and fixed captions already drawn. build
+        # makes a fresh one on a miss. variant tells apart bases of one card
+        # that show more than the guild, e.g. a channel name in the header.
+        key = (guild.id, card_type, variant)
+        fingerprint = guild_fingerprint(guild)
+
+        entry = self.layers.get(key)
+        if entry and entry[0] == fingerprint and entry[1] > time.time():
+            self.layers.move_to_end(key)
+            self.hits += 1
+            return entry[2].copy()
+
+        self.misses += 1
+
+        async def build_and_store() -> Image.Image:
+            image = await build()
+
+            self.layers[key] = (fingerprint, time.time() + self.ttl, image)
+            self.layers.move_to_end(key)
+            while len(self.layers) > self.max_layers:
+                self.layers.popitem(last=False)
+            return image
+
+        image = await self.flights.do((key, fingerprint), build_and_store)
+        return image.copy()
+
+    def invalidate(self, guild_id: int) -> int:
+
+        # Drops every base drawn for the guild; returns how many
+        stale = [key for key in self.layers if key[0] == guild_id]
+        for key in stale:
+            del self.layers[key]
+        return len(stale)
+
+    def clear(self):
+        self.layers.clear()
+
+
+layer_cache = LayerCache()
@@ -0,0 +1,153 @@
+import io
+from datetime import datetime, time, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+
+
+# CONFIGURATION
+
+class LineChartConfig:
+    # The cards were first drawn with matplotlib: a 6x2.5in figure at 300dpi
+    # cropped to its axes (1395x577px), lines 4pt wide with round caps and
+    # joins, single points as 3pt markers. Widths below are in those pixels
+    # and get scaled to the size the card pastes the chart at.
+    REFERENCE_SIZE = (1395, 577)
+    LINE_WIDTH = 4 / 72 * 300
+    MARKER_SIZE = 3 / 72 * 300
+    MARKER_ALPHA = 0.7
+
+    # Autoscale margin on each side of the data, as matplotlib's default
+    MARGIN = 0.05
+
+    # Smoothed lines: resampled to this many points, then a gaussian blur
+    SMOOTH_POINTS = 500
+    SMOOTH_SIGMA = 2
+    SMOOTH_TRUNCATE = 4.0
+
+    # Lines are drawn this many times larger, then box-filtered down
+    SUPERSAMPLE = 4
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def date_to_number(value) -> float:
+
+    # Days since 1970-01-01 UTC, as matplotlib's date2num (naive = UTC)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH).total_seconds() / 86400
+
+
+def gaussian_smooth(values: np.ndarray, sigma: float = LineChartConfig.SMOOTH_SIGMA,
+                    truncate: float = LineChartConfig.SMOOTH_TRUNCATE) -> np.ndarray:
+
+    # Same result as scipy.ndimage.gaussian_filter1d (reflected edges)
+    radius = int(truncate * sigma + 0.5)
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    padded = np.pad(values, radius, mode='symmetric')
+    return np.convolve(padded, kernel, mode='valid')
+
+
+def _limits(low: float, high: float) -> Tuple[float, float]:
+
+    # Margin on both sides; a flat range is centred instead
+    span = high - low
+    if span > 0:
+        return low - span * LineChartConfig.MARGIN, high + span * LineChartConfig.MARGIN
+    if low == 0:
+        return -LineChartConfig.MARGIN, LineChartConfig.MARGIN
+    return low - abs(low) * LineChartConfig.MARGIN, high + abs(high) * LineChartConfig.MARGIN
+
+
+def _to_png(image: Image.Image) -> bytes:
+
+    # Only crosses the process boundary to be pasted on a card, so fast
+    # compression beats small output
+    output = io.BytesIO()
+    image.save(output, format='PNG', compress_level=1)
+    return output.getvalue()
+
+
+# LINE CHART JOB
+
+def render_line_chart(spec: Dict) -> bytes:
+
+    # Render worker job: plain lists in, PNG bytes out. spec holds "size"
+    # (the size the card pastes the chart at) and "series", each with
+    # "x" (day numbers, see date_to_number), "y", "color", optional "alpha"
+    # and "smooth" (resample to 500 points and gaussian-blur the line).
+    width, height = spec['size']
+    scale = LineChartConfig.SUPERSAMPLE
+    canvas_size = (width * scale, height * scale)
+
+    pixel_scale = (width / LineChartConfig.REFERENCE_SIZE[0] +
+                   height / LineChartConfig.REFERENCE_SIZE[1]) / 2
+    line_width = max(1, round(LineChartConfig.LINE_WIDTH * pixel_scale * scale))
+    marker_size = LineChartConfig.MARKER_SIZE * pixel_scale * scale
+
+    lines: List[Tuple[np.ndarray, np.ndarray, Dict]] = []
+    for series in spec['series']:
+        x = np.asarray(series['x'], dtype=float)
+        y = np.asarray(series['y'], dtype=float)
+        if len(x) == 0:
+            continue
+
+        if len(x) > 1 and series.get('smooth'):
+            x_smooth = np.linspace(x.min(), x.max(), LineChartConfig.SMOOTH_POINTS)
+            y = gaussian_smooth(np.interp(x_smooth, x, y))
+            x = x_smooth
+
+        lines.append((x, y, series))
+
+    chart_img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    if not lines:
+        return _to_png(chart_img)
+
+    # Shared limits across series, like one matplotlib axes
+    x_low, x_high = _limits(min(x.min() for x, _, _ in lines),
+                            max(x.max() for x, _, _ in lines))
+    y_low, y_high = _limits(min(y.min() for _, y, _ in lines),
+                            max(y.max() for _, y, _ in lines))
+
+    for x, y, series in lines:
+        px = (x - x_low) / (x_high - x_low) * canvas_size[0]
+        py = (1 - (y - y_low) / (y_high - y_low)) * canvas_size[1]
+
+        mask = Image.new('L', canvas_size, 0)
+        draw = ImageDraw.Draw(mask)
+
+        if len(x) > 1:
+            # Smoothed lines have a vertex every few pixels, where round
+            # joins (a pie slice per vertex) cost more than they show
+            points = list(zip(px.tolist(), py.tolist()))
+            joint = None if series.get('smooth') else 'curve'
+            draw.line(points, fill=255, width=line_width, joint=joint)
+
+            # Round caps
+            radius = line_width / 2
+            for cx, cy in (points[0], points[-1]):
+                draw.ellipse((cx - radius, cy - radius, cx + radius, cy + radius), fill=255)
+            alpha = series.get('alpha')
+        else:
+            radius = marker_size / 2
+            draw.ellipse((px[0] - radius, py[0] - radius,
+                          px[0] + radius, py[0] + radius), fill=255)
+            alpha = LineChartConfig.MARKER_ALPHA
+
+        mask = mask.resize((width, height), Image.Resampling.BOX)
+        if alpha is not None:
+            mask = mask.point([round(level * alpha) for level in range(256)])
+
+        layer = Image.new('RGBA', (width, height), ImageColor.getrgb(series['color']))
+        layer.putalpha(mask)
+        chart_img = Image.alpha_composite(chart_img, layer)
+
+    return _to_png(chart_img)
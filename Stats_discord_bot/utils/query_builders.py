@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Pure pieces of the stats queries: bucket alignment, rollup planning and the
+# SQL around windowed counts, bucketed series and single-user ranks. The
+# database cog runs what these build.
+
+
+# BUCKETS
+
+# time_bucket()'s default origin for timestamptz, a Monday
+BUCKET_ORIGIN = datetime(2000, 1, 3)
+
+
+def floor_to_bucket(moment: datetime, width: timedelta) -> datetime:
+
+    # Same alignment as time_bucket() on timestamptz (weeks start on Monday)
+    return BUCKET_ORIGIN + ((moment - BUCKET_ORIGIN) // width) * width
+
+
+def plan_rollup_ranges(tiers: List[Tuple[str, timedelta]],
+                       start_time: Optional[datetime], end_time: datetime,
+                       time_cuts: List[datetime]) -> Tuple[Dict[str, List[Tuple]], List[Tuple]]:
+
+    # Splits [start_time, end_time) at every cut point and covers each piece
+    # with the coarsest whole buckets that fit. The leftover edges go to the
+    # next finer tier, and whatever is left below an hour goes to raw rows.
+    plan = {view_name: [] for view_name, _ in tiers}
+    raw_ranges = []
+
+    def cover(range_start, range_end, level):
+        for idx in range(level, len(tiers)):
+            view_name, width = tiers[idx]
+            bucket_end = floor_to_bucket(range_end, width)
+            bucket_start = None
+            if range_start is not None:
+                bucket_start = floor_to_bucket(range_start, width)
+                if bucket_start < range_start:
+                    bucket_start += width
+                if bucket_start >= bucket_end:
+                    continue
+
+            plan[view_name].append((bucket_start, bucket_end))
+            if range_start is not None and range_start < bucket_start:
+                cover(range_start, bucket_start, idx + 1)
+            if bucket_end < range_end:
+                cover(bucket_end, range_end, idx + 1)
+            return
+
+        raw_ranges.append((range_start, range_end))
+
+    cuts = sorted({cut for cut in time_cuts
+                   if (start_time is None or cut > start_time) and cut < end_time})
+    edges = [start_time] + cuts + [end_time]
+    for range_start, range_end in zip(edges, edges[1:]):
+        cover(range_start, range_end, 0)
+
+    return plan, raw_ranges
+
+
+# TRAILING WINDOWS
+
+def trailing_window_starts(windows: Sequence[int], end_time: datetime,
+                           start_time: Optional[datetime] = None) -> List[datetime]:
+
+    # Each window reaches days back from end_time, but never before start_time
+    starts = []
+    for days in windows:
+        window_start = end_time - timedelta(days=days)
+        if start_time and window_start < start_time:
+            window_start = start_time
+        starts.append(window_start)
+    return starts
+
+
+def windowed_select_sql(source: Mapping[str, Any], window_count: int) -> str:
+
+    # One filtered aggregate per window, w1..wN, reading the window starts
+    # from $1..$N; the scan itself covers the widest window
+    return ', '.join(
+        source['windowed_value'].format(cond=f"{source['time_column']} >= ${idx}") + f" AS w{idx}"
+        for idx in range(1, window_count + 1)
+    )
+
+
+# BUCKETED SERIES
+
+def series_bucket_starts(start_time: datetime, end_time: datetime,
+                         bucket: timedelta) -> List[datetime]:
+
+    # Anchored on end_time: the last bucket ends exactly there
+    bucket_count = max(1, round((end_time - start_time).total_seconds() / bucket.total_seconds()))
+    return [end_time - bucket * (idx + 1) for idx in reversed(range(bucket_count))]
+
+
+def series_bucket_sql(source: Mapping[str, Any]) -> str:
+
+    # Bucket index from the first bucket's start ($1) and the width in
+    # seconds ($2). FLOOR keeps buckets half-open: a row on a boundary opens
+    # the next bucket.
+    return (
+        f"FLOOR(EXTRACT(EPOCH FROM ({source['time_column']} - $1::timestamptz)) "
+        f"/ $2::float8)::int AS bucket_idx, {source['value']} AS value"
+    )
+
+
+def fold_series_rows(rows: Sequence[Mapping[str, Any]], bucket_count: int) -> List[int]:
+
+    # Rows at end_time itself get index bucket_count and join the last bucket
+    values = [0] * bucket_count
+    for row in rows:
+        idx = row['bucket_idx']
+        if idx is not None and 0 <= idx <= bucket_count:
+            values[min(idx, bucket_count - 1)] += row['value'] or 0
+    return values
+
+
+# SINGLE-USER RANKS
+
+def user_rank_sql(inner_query: str, user_column: str, value_sql: str) -> str:
+
+    # inner_query selects ranked_user and total with the user's ID as $1.
+    # Ties share a rank: it's one more than the users strictly ahead.
+    return f'''
+        WITH totals AS (
+            {inner_query}
+            GROUP BY {user_column}
+            HAVING {value_sql} > 0
+        ), mine AS (
+            SELECT total FROM totals WHERE ranked_user = $1
+        )
+        SELECT
+            (SELECT total FROM mine) AS value,
+            COUNT(*) AS total_users,
+            COUNT(*) FILTER (WHERE total > (SELECT total FROM mine)) AS users_ahead
+        FROM totals
+    '''
+
+
+def user_rank_result(row: Mapping[str, Any]) -> Dict[str, Any]:
+
+    # A user with nothing in the window is unranked (rank 0)
+    if row['value'] is None:
+        return {'rank': 0, 'total_users': row['total_users'] or 0, 'value': 0}
+
+    return {
+        'rank': (row['users_ahead'] or 0) + 1,
+        'total_users': row['total_users'] or 0,
+        'value': row['value']
+    }
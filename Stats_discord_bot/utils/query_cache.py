@@ -0,0 +1,149 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.query_builders import floor_to_bucket
+
+# The parts of the database cog's q_* result cache that don't touch Redis or
+# PostgreSQL: argument normalization, keys, value encoding and versions.
+
+
+# KEYS
+
+def normalize_cache_arguments(arguments: Dict[str, Any], width: timedelta):
+
+    # Widen the window to whole buckets of width so calls made moments apart
+    # share a key. Series keep their exact window, since their bucket
+    # boundaries follow it; callers anchor it on an hour boundary instead.
+    if arguments.get('role_filter_ids'):
+        arguments['role_filter_ids'] = sorted(arguments['role_filter_ids'])
+
+    if 'bucket' in arguments or 'timezone_str' in arguments:
+        return
+
+    start_time = arguments.get('start_time')
+    if isinstance(start_time, datetime):
+        if start_time.tzinfo is not None:
+            start_time = start_time.astimezone(timezone.utc).replace(tzinfo=None)
+        arguments['start_time'] = floor_to_bucket(start_time, width)
+
+    end_time = arguments.get('end_time')
+    if isinstance(end_time, datetime):
+        if end_time.tzinfo is not None:
+            end_time = end_time.astimezone(timezone.utc).replace(tzinfo=None)
+        floored = floor_to_bucket(end_time, width)
+        if floored != end_time:
+            # end_time is inclusive
+            end_time = floored + width - timedelta(microseconds=1)
+        arguments['end_time'] = end_time
+
+
+def query_cache_key(name: str, guild_id: int, versions: Tuple[str, str],
+                    arguments: Dict[str, Any]) -> str:
+
+    digest = hashlib.sha1(json.dumps(
+        [*versions, arguments], default=str, sort_keys=True
+    ).encode()).hexdigest()
+    return f"qc:{guild_id}:{name}:{digest}"
+
+
+# VALUES
+
+def encode_cached_value(value: Any) -> Any:
+
+    # Tags the types JSON would otherwise flatten, so Redis hits match misses
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode_cached_value(item) for item in value]}
+    if isinstance(value, list):
+        return [encode_cached_value(item) for item in value]
+    if isinstance(value, dict):
+        # As pairs, so int keys (hours, weekdays) survive the round trip
+        return {'__dict__': [[encode_cached_value(key), encode_cached_value(item)]
+                             for key, item in value.items()]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Can't cache {type(value).__name__}")
+
+
+def decode_cached_value(value: Any) -> Any:
+
+    if isinstance(value, list):
+        return [decode_cached_value(item) for item in value]
+    if isinstance(value, dict):
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        if '__date__' in value:
+            return date.fromisoformat(value['__date__'])
+        if '__decimal__' in value:
+            return Decimal(value['__decimal__'])
+        if '__tuple__' in value:
+            return tuple(decode_cached_value(item) for item in value['__tuple__'])
+        return {decode_cached_value(key): decode_cached_value(item)
+                for key, item in value['__dict__']}
+    return value
+
+
+# VERSIONS
+
+class QueryCacheVersions:
+
+    # Per-guild (data, blacklist) versions that every key includes. Redis
+    # holds the shared counters; the local ones stand in while it's down.
+    # Versions read from Redis are reused for read_ttl seconds, but a read
+    # that overlapped a bump from this process is never reused.
+
+    KINDS = ('data', 'blacklist')
+
+    def __init__(self, read_ttl: float):
+        self.read_ttl = read_ttl
+        self.local: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        self.reads: Dict[int, Tuple[float, Tuple[str, str]]] = {}
+        self.bumps = 0
+
+    def local_versions(self, guild_id: int) -> Tuple[str, str]:
+
+        data_version, blacklist_version = self.local[guild_id]
+        return f"l{data_version}", f"l{blacklist_version}"
+
+    def recent(self, guild_id: int) -> Optional[Tuple[str, str]]:
+
+        entry = self.reads.get(guild_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def remember(self, guild_id: int, raw_versions: Iterable[Optional[str]],
+                 bumps_before: int) -> Tuple[str, str]:
+
+        # raw_versions are the Redis counters (None before the first bump);
+        # bumps_before is self.bumps from just before they were read
+        data_version, blacklist_version = raw_versions
+        versions = (f"r{data_version or 0}", f"r{blacklist_version or 0}")
+        if bumps_before == self.bumps:
+            self.reads[guild_id] = (time.monotonic() + self.read_ttl, versions)
+        return versions
+
+    def bump(self, kind: str, guild_ids: Iterable[int]):
+
+        # Before the shared counters move, so no read taken meanwhile is kept
+        index = self.KINDS.index(kind)
+        for guild_id in guild_ids:
+            self.local[guild_id][index] += 1
+        self.bumps += 1
+
+    def forget(self, guild_ids: Iterable[int]):
+
+        # After the shared counters moved
+        self.bumps += 1
+        for guild_id in guild_ids:
+            self.reads.pop(guild_id, None)
@@ -0,0 +1,272 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import io
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from utils.single_flight import SingleFlight
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class RenderCacheConfig:
+    # Encoded PNGs kept in memory, least recently used evicted first
+    MEMORY_BYTES = 64 * 1024 * 1024
+
+    # Second tier on disk, shared across restarts
+    DISK_DIR = BASE_DIR / "cache" / "renders"
+    DISK_BYTES = 512 * 1024 * 1024
+    DISK_PRUNE_EVERY = 200
+
+    # Numbers are part of the key, but names, avatars and role names are
+    # resolved while drawing; the TTL bounds how long those can go stale
+    TTL = 600
+
+
+# FINGERPRINTS
+
+def _fingerprint_default(value: Any) -> Any:
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha1(value).hexdigest()
+
+    # Discord objects: what the card shows of them, not their identity alone
+    if hasattr(value, 'id'):
+        avatar = getattr(value, 'display_avatar', None) or getattr(value, 'icon', None)
+        return [
+            type(value).__name__,
+            value.id,
+            str(value),
+            getattr(value, 'display_name', None),
+            getattr(avatar, 'key', None)
+        ]
+
+    # Unknown objects fall back to repr(); an unstable repr only costs hits
+    return repr(value)
+
+
+def render_key(card_type: str, layout_version: int, *parts: Any) -> Optional[str]:
+
+    # Cards print today's date, so it's part of every key. None when the
+    # parts can't be fingerprinted (e.g. mixed key types), i.e. don't cache
+    try:
+        payload = json.dumps(
+            [datetime.now(timezone.utc).date().isoformat(), list(parts)],
+            default=_fingerprint_default, sort_keys=True
+        )
+    except (TypeError, ValueError):
+        return None
+
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f"{card_type}-v{layout_version}-{digest}"
+
+
+# CACHE
+
+class RenderCache:
+
+    def __init__(self, memory_bytes: int = RenderCacheConfig.MEMORY_BYTES,
+                 disk_dir: Optional[Path] = RenderCacheConfig.DISK_DIR,
+                 disk_bytes: int = RenderCacheConfig.DISK_BYTES,
+                 ttl: int = RenderCacheConfig.TTL):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+
+        # key -> (expires_at, png)
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+        self.size = 0
+        self.puts_since_prune = 0
+
+        self.flights = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, png: bytes, expires_at: float):
+
+        if len(png) > self.memory_bytes:
+            return
+
+        previous = self.entries.pop(key, None)
+        if previous:
+            self.size -= len(previous[1])
+
+        self.entries[key] = (expires_at, png)
+        self.size += len(png)
+
+        while self.size > self.memory_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.png"
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+
+        path = self._disk_path(key)
+        try:
+            expires_at = path.stat().st_mtime + self.ttl
+            if expires_at <= time.time():
+                path.unlink(missing_ok=True)
+                return None
+            return expires_at, path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, png: bytes):
+
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_bytes(png)
+        os.replace(temp_path, path)
+
+    def _prune_disk(self):
+
+        # Drop expired files, then the oldest until the tier fits its budget
+        files = []
+        now = time.time()
+        for path in self.disk_dir.glob("*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    async def get(self, key: str) -> Optional[io.BytesIO]:
+
+        entry = self.entries.get(key)
+        if entry:
+            if entry[0] > time.time():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return io.BytesIO(entry[1])
+            self.entries.pop(key)
+            self.size -= len(entry[1])
+
+        if self.disk_dir:
+            try:
+                entry = await asyncio.to_thread(self._read_disk, key)
+            except Exception as e:
+                logger.warning(f"Render cache read failed for {key}: {e}")
+                entry = None
+
+            if entry:
+                self._remember(key, entry[1], entry[0])
+                self.hits += 1
+                return io.BytesIO(entry[1])
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, image_bytes: io.BytesIO) -> io.BytesIO:
+
+        # Stores the rendered PNG and hands back a rewound buffer to send
+        png = image_bytes.getvalue()
+        self._remember(key, png, time.time() + self.ttl)
+
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, png)
+
+                self.puts_since_prune += 1
+                if self.puts_since_prune >= RenderCacheConfig.DISK_PRUNE_EVERY:
+                    self.puts_since_prune = 0
+                    await asyncio.to_thread(self._prune_disk)
+            except Exception as e:
+                logger.warning(f"Render cache write failed for {key}: {e}")
+
+        return io.BytesIO(png)
+
+    async def get_or_render(self, key: str,
+                            render: Callable[[], Awaitable[Optional[io.BytesIO]]]) -> Optional[io.BytesIO]:
+
+        # Identical renders in flight at once run once; every caller gets its
+        # own buffer over the same PNG bytes
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        async def render_and_store() -> Optional[bytes]:
+            image_bytes = await render()
+            if image_bytes is None:
+                return None
+            return (await self.put(key, image_bytes)).getvalue()
+
+        png = await self.flights.do(key, render_and_store)
+        return io.BytesIO(png) if png is not None else None
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+render_cache = RenderCache()
+
+
+def _reports_error(arguments: dict) -> bool:
+
+    # Data loaders hand failures to the renderer as {"error": ...}
+    return any(isinstance(value, dict) and "error" in value for value in arguments.values())
+
+
+def cached_render(card_type: str, layout_version: int = 1):
+
+    # For render functions that draw only from their arguments and return a
+    # PNG buffer. Bump layout_version whenever the card's layout changes.
+    # Error cards are drawn fresh each time so a transient failure isn't
+    # served again from the cache.
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+
+            if _reports_error(arguments):
+                return await func(*args, **kwargs)
+
+            key = render_key(card_type, layout_version, arguments)
+            if key is None:
+                return await func(*args, **kwargs)
+
+            return await render_cache.get_or_render(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,189 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class RenderServiceConfig:
+    # Worker processes for render jobs; RENDER_WORKERS=0 runs them in a
+    # thread instead. Card drawing and PNG encoding always run in threads.
+    WORKERS = int(os.getenv("RENDER_WORKERS", max(1, min(4, (os.cpu_count() or 2) - 1))))
+
+    # Jobs queued or running at once, across all guilds
+    MAX_CONCURRENT = max(1, WORKERS) * 2
+
+    # Jobs a single guild may hold at once, so one busy guild can't take
+    # every slot while the others wait behind it
+    MAX_PER_GUILD = 2
+
+    # Seconds a job may wait for a slot plus run before the caller gives up
+    TIMEOUT = 30
+
+
+# JOBS
+
+def _encode_png(image: Image.Image) -> bytes:
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+# SERVICE
+
+class RenderService:
+
+    # Runs CPU-heavy render steps off the event loop. Process jobs are
+    # module-level functions taking a plain, picklable render spec and
+    # returning PNG bytes; they're pickled by reference, so a worker imports
+    # the job's module the first time it runs one. Card drawing works on
+    # live PIL images and fonts, and zlib releases the GIL while encoding,
+    # so those run in threads instead.
+
+    def __init__(self, workers: int = RenderServiceConfig.WORKERS,
+                 max_concurrent: int = RenderServiceConfig.MAX_CONCURRENT,
+                 max_per_guild: int = RenderServiceConfig.MAX_PER_GUILD,
+                 timeout: float = RenderServiceConfig.TIMEOUT):
+        self.workers = workers
+        self.max_per_guild = max_per_guild
+        self.timeout = timeout
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        # Created on first use, inside the bot's event loop
+        self.max_concurrent = max_concurrent
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.guild_slots: Dict[Hashable, asyncio.Semaphore] = {}
+        self.guild_jobs: Dict[Hashable, int] = defaultdict(int)
+
+    def _pool(self) -> ProcessPoolExecutor:
+
+        # Spawned rather than forked: the bot process has a running event
+        # loop, DB/Redis connections and threads that a fork would copy
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self.executor
+
+    async def _acquire_slot(self, guild_id: Hashable) -> Callable[[], None]:
+
+        # A guild slot first, then a global one: semaphores wake waiters in
+        # order, and no guild can hold more than max_per_guild global slots.
+        # Returns the function that gives both back.
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_concurrent)
+
+        semaphore = self.guild_slots.get(guild_id)
+        if semaphore is None:
+            semaphore = self.guild_slots[guild_id] = asyncio.Semaphore(self.max_per_guild)
+
+        self.guild_jobs[guild_id] += 1
+        try:
+            await semaphore.acquire()
+            try:
+                await self.slots.acquire()
+            except BaseException:
+                semaphore.release()
+                raise
+        except BaseException:
+            self._forget_job(guild_id)
+            raise
+
+        def release():
+            self.slots.release()
+            semaphore.release()
+            self._forget_job(guild_id)
+
+        return release
+
+    def _forget_job(self, guild_id: Hashable):
+
+        self.guild_jobs[guild_id] -= 1
+        if not self.guild_jobs[guild_id]:
+            del self.guild_jobs[guild_id]
+            self.guild_slots.pop(guild_id, None)
+
+    async def _run_in_slot(self, start: Callable[[], asyncio.Future], guild_id: Hashable) -> Any:
+
+        # Work can't be stopped once a thread or worker has it, so its slot
+        # stays taken until it finishes, even after the caller times out
+        release = await self._acquire_slot(guild_id)
+        try:
+            future = start()
+        except BaseException:
+            release()
+            raise
+
+        def finished(done: asyncio.Future):
+            release()
+            # Retrieved so an abandoned job's failure isn't reported as unhandled
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    async def _run(self, job: Callable[[Any], bytes], payload: Any, guild_id: Hashable) -> bytes:
+
+        if self.workers <= 0:
+            return await self._run_in_slot(
+                lambda: asyncio.ensure_future(asyncio.to_thread(job, payload)), guild_id)
+
+        try:
+            return await self._run_in_slot(
+                lambda: asyncio.wrap_future(self._pool().submit(job, payload)), guild_id)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool next time
+            logger.error("Render worker pool broke, restarting it")
+            executor, self.executor = self.executor, None
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def render(self, job: Callable[[Any], bytes], spec: Any,
+                     guild_id: Optional[int] = None) -> bytes:
+
+        # Raises asyncio.TimeoutError past the timeout. A job still waiting
+        # for a slot is dropped; one already handed to a worker runs to the
+        # end and keeps its slot until then.
+        return await asyncio.wait_for(self._run(job, spec, guild_id), self.timeout)
+
+    async def _run_in_thread(self, func: Callable[[], Any], guild_id: Hashable) -> Any:
+
+        return await self._run_in_slot(lambda: asyncio.ensure_future(asyncio.to_thread(func)), guild_id)
+
+    async def render_card(self, compose: Callable[[], Image.Image],
+                          guild_id: Optional[int] = None) -> io.BytesIO:
+
+        # Runs a card's synchronous Pillow/Pilmoji drawing and its PNG encode
+        # in one worker thread. compose draws on images the caller already
+        # fetched and returns the finished card; it must not touch the loop.
+        return io.BytesIO(await asyncio.wait_for(
+            self._run_in_thread(lambda: _encode_png(compose()), guild_id), self.timeout))
+
+    async def encode_png(self, image: Image.Image, guild_id: Optional[int] = None) -> io.BytesIO:
+
+        # PNG compression is the most expensive step of most cards
+        return await self.render_card(lambda: image, guild_id)
+
+    def close(self):
+
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+render_service = RenderService()
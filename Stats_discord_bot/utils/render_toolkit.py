@@ -0,0 +1,217 @@
+import functools
+import os
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageFont
+
+from utils.fonts import default_font, first_fitting, fit_font_to_width, font_or_default, get_font, text_bbox, text_size
+
+FontPath = Union[str, os.PathLike, None]
+
+
+# CONFIGURATION
+
+class RenderToolkitConfig:
+    # small, medium, large, larger, huge, giant
+    FONT_SIZES = (16, 20, 24, 30, 40, 60)
+
+    # Tried in order when a card's own font can't be loaded
+    FALLBACK_FONTS = ("arial.ttf", "Helvetica.ttf")
+
+    # Corner and circle masks, keyed by (size, radius)
+    MAX_MASKS = 128
+
+
+# FONTS
+
+def get_fonts(font_path: FontPath = None,
+              sizes: Sequence[int] = RenderToolkitConfig.FONT_SIZES) -> Tuple[ImageFont.ImageFont, ...]:
+
+    # One font per size from the first path that loads, falling back to
+    # Arial, Helvetica and finally Pillow's default font
+    for path in (font_path, *RenderToolkitConfig.FALLBACK_FONTS):
+        if path is None:
+            continue
+        try:
+            return tuple(get_font(path, size) for size in sizes)
+        except (OSError, ValueError):
+            continue
+
+    return tuple(default_font() for _ in sizes)
+
+
+# TEXT
+
+def draw_text_with_stroke(draw, position, text, font, fill="white", stroke_fill="black", stroke_width=2, **kwargs):
+
+    # One pass with Pillow's native stroke instead of eight offset copies.
+    # draw can be an ImageDraw or a Pilmoji, which hands the stroke on to
+    # each text run (and pastes its emoji once instead of nine times).
+    draw.text(position, text, font=font, fill=fill,
+              stroke_width=stroke_width, stroke_fill=stroke_fill, **kwargs)
+
+
+def draw_text_centered_with_stroke(draw, text, center_position, font, fill="white", stroke_fill="black", stroke_width=2, max_width=None, **kwargs):
+
+    # Centred on center_position; text wider than max_width is drawn at the
+    # largest smaller size (2pt steps) that fits
+    if max_width and text_size(text, font)[0] > max_width and getattr(font, 'path', None):
+        font = fit_font_to_width(font.path, text, max_width, range(font.size - 2, 8, -2)) or font
+
+    text_width, text_height = text_size(text, font)
+    x = center_position[0] - (text_width // 2)
+    y = center_position[1] - (text_height // 2)
+
+    draw_text_with_stroke(draw, (x, y), text, font, fill, stroke_fill, stroke_width, **kwargs)
+
+
+def draw_text_centered(draw, text, center_position, font, fill, max_width=None, stroke_fill=None, stroke_width=0, ellipsis="...", **kwargs):
+
+    # Centred on center_position at a fixed size; text wider than max_width
+    # is cut to its longest prefix that fits with the ellipsis, drawn where
+    # the full text would have started
+    text_width, text_height = text_size(text, font)
+    x = center_position[0] - (text_width // 2)
+    y = center_position[1] - (text_height // 2)
+
+    if max_width and text_width > max_width:
+        length = first_fitting(
+            range(len(text) - 1, 0, -1),
+            lambda length: length
+            if text_size(text[:length] + ellipsis, font)[0] <= max_width else None
+        ) or 1
+        text = text[:length] + ellipsis
+
+    draw.text((x, y), text, font=font, fill=fill,
+              stroke_width=stroke_width, stroke_fill=stroke_fill, **kwargs)
+
+
+# INVISIBLE RECTANGLES
+
+def rect_bounds(rect_center_x, rect_center_y, rect_width, rect_height) -> Tuple[int, int, int, int]:
+
+    return (rect_center_x - (rect_width // 2), rect_center_y - (rect_height // 2),
+            rect_center_x + (rect_width // 2), rect_center_y + (rect_height // 2))
+
+
+def check_text_against_rectangle(text, font, text_x, text_y, rect_center_x, rect_center_y, rect_width, rect_height) -> bool:
+
+    # True when the text's ink box drawn at (text_x, text_y) leaves the rectangle
+    rect_left, rect_top, rect_right, rect_bottom = rect_bounds(
+        rect_center_x, rect_center_y, rect_width, rect_height)
+
+    left, top, right, bottom = text_bbox(text, font)
+
+    exceeds_width = (left + text_x < rect_left) or (right + text_x > rect_right)
+    exceeds_height = (top + text_y < rect_top) or (bottom + text_y > rect_bottom)
+
+    return exceeds_width or exceeds_height
+
+
+def step_offsets(font_sizes: Sequence[int], thresholds: Sequence[int]) -> Tuple[int, ...]:
+
+    # Per-size downward nudge: one pixel for every threshold the size is at
+    # or below, so smaller text sits on the same baseline as larger text
+    return tuple(sum(size <= threshold for threshold in thresholds) for size in font_sizes)
+
+
+def fit_text_to_rectangle(text, font_path: FontPath, font_sizes: Sequence[int], position, rect,
+                          offsets: Optional[Sequence[int]] = None, centered=False, middle=True,
+                          ink=True, tolerance=0, padding=0, ellipsis="..."):
+
+    # Largest of font_sizes (descending) at which text fits rect, given as
+    # (center_x, center_y, width, height) or a {"center", "width", "height"}
+    # dict like the cards' rectangle tables. The text starts at position's x,
+    # or is centred on it, and is vertically centred on position's y unless
+    # middle is off; offsets nudges it down per size. ink checks the glyph
+    # box from text_bbox, otherwise the text's width and height from
+    # (x, y), either with tolerance pixels of slack and padding pixels kept
+    # clear on the right. When nothing fits, the text is shortened with an
+    # ellipsis at the smallest size.
+    # Returns (text, font, (x, y)).
+    if isinstance(rect, dict):
+        rect = (*rect["center"], rect["width"], rect["height"])
+
+    rect_left, rect_top, rect_right, rect_bottom = rect_bounds(*rect)
+    rect_left, rect_top = rect_left - tolerance, rect_top - tolerance
+    rect_right, rect_bottom = rect_right + tolerance - padding, rect_bottom + tolerance
+
+    def locate(candidate, index):
+        font = font_or_default(font_path, font_sizes[index])
+        text_width, text_height = text_size(candidate, font)
+
+        x = position[0] - (text_width // 2) if centered else position[0]
+        y = position[1] - (text_height // 2) if middle else position[1]
+        if offsets:
+            y += offsets[index]
+
+        if ink:
+            left, top, right, bottom = text_bbox(candidate, font)
+            box = (x + left, y + top, x + right, y + bottom)
+        else:
+            box = (x, y, x + text_width, y + text_height)
+
+        return font, (x, y), box
+
+    def place(candidate, index):
+        font, xy, box = locate(candidate, index)
+        if box[0] >= rect_left and box[2] <= rect_right and box[1] >= rect_top and box[3] <= rect_bottom:
+            return candidate, font, xy
+
+    placement = first_fitting(range(len(font_sizes)), lambda index: place(text, index))
+    if placement:
+        return placement
+
+    # Longest prefix that fits with the ellipsis at the smallest size
+    smallest = len(font_sizes) - 1
+    placement = first_fitting(
+        range(len(text) - 1, 0, -1),
+        lambda length: place(text[:length] + ellipsis, smallest))
+    if placement:
+        return placement
+
+    final_text = text[:3] + ellipsis if len(text) > 3 else text
+    font, xy, _ = locate(final_text, smallest)
+    return final_text, font, xy
+
+
+# SHAPES
+
+def draw_rounded_rectangle(draw, xy, radius, fill=None, outline=None):
+
+    # Pillow's own rounded rectangle: one call instead of two rectangles and
+    # four pie slices
+    draw.rounded_rectangle(tuple(xy), radius, fill=fill, outline=outline)
+
+
+@functools.lru_cache(maxsize=RenderToolkitConfig.MAX_MASKS)
+def rounded_mask(size: Tuple[int, int], radius: float) -> Image.Image:
+
+    # 'L' mask of a rounded rectangle filling size, computed for every pixel
+    # at once. Shared between callers: use it as a paste/putalpha mask, never
+    # draw on it.
+    width, height = size
+    radius = min(radius, width / 2, height / 2)
+
+    # Distance of each pixel centre past the straight edges, per axis
+    xs = np.arange(width) + 0.5
+    ys = np.arange(height) + 0.5
+    dx = np.maximum(np.maximum(radius - xs, xs - (width - radius)), 0)
+    dy = np.maximum(np.maximum(radius - ys, ys - (height - radius)), 0)
+
+    inside = dx[np.newaxis, :] ** 2 + dy[:, np.newaxis] ** 2 <= radius ** 2
+    return Image.fromarray(inside.astype(np.uint8) * 255, 'L')
+
+
+def circle_mask(size: Tuple[int, int]) -> Image.Image:
+
+    return rounded_mask(tuple(size), min(size) / 2)
+
+
+# IMAGES
+
+def paste_avatar(image: Image.Image, avatar: Image.Image, position: Tuple[int, int]):
+
+    # Blends an RGBA avatar/icon onto the card through its own alpha
+    image.paste(avatar, tuple(position), avatar)
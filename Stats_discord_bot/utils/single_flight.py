@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+
+    # Concurrent calls with the same key share one run of the work. The work
+    # runs in its own task, so a caller whose interaction is cancelled doesn't
+    # cancel it for everyone else waiting on it.
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Task] = {}
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+        # Every waiter may have given up; don't warn about an unread error
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self.calls)
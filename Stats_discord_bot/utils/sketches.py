@@ -0,0 +1,166 @@
+import json
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# CONFIGURATION
+
+class SketchConfig:
+    # HyperLogLog registers = 2 ** precision; ~0.8% standard error at 14
+    HLL_PRECISION = 14
+
+    # Counters kept per Space-Saving summary
+    HEAVY_HITTER_CAPACITY = 100
+
+
+# HYPERLOGLOG
+
+class HyperLogLog:
+
+    def __init__(self, precision: int = SketchConfig.HLL_PRECISION,
+                 registers: Optional[np.ndarray] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(
+            self.size, dtype=np.uint8)
+
+    @staticmethod
+    def _hash(values) -> np.ndarray:
+
+        # splitmix64: spreads sequential snowflake IDs over all 64 bits
+        z = np.asarray(values, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+    def add(self, values) -> 'HyperLogLog':
+
+        hashes = self._hash(values)
+        if hashes.size == 0:
+            return self
+
+        value_bits = 64 - self.precision
+        indexes = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+
+        # rank = leading zeros in the remaining bits + 1
+        bit_length = np.zeros(hashes.shape, dtype=np.int64)
+        for shift in (32, 16, 8, 4, 2, 1):
+            over = remainder >= np.uint64(1 << shift)
+            bit_length[over] += shift
+            remainder[over] >>= np.uint64(shift)
+        bit_length += (remainder > 0)
+        ranks = (value_bits - bit_length + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, indexes, ranks)
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+
+        # Ertl's improved estimator: unbiased across the small and large
+        # ranges without the empirical bias tables of HLL++
+        value_bits = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=value_bits + 2)
+        m = float(self.size)
+
+        if histogram[0] == m:
+            return 0
+
+        def sigma(x):
+            if x == 1.0:
+                return float('inf')
+            y, z = 1.0, x
+            while True:
+                x *= x
+                previous = z
+                z += x * y
+                y += y
+                if z == previous:
+                    return z
+
+        def tau(x):
+            if x == 0.0 or x == 1.0:
+                return 0.0
+            y, z = 1.0, 1.0 - x
+            while True:
+                x = x ** 0.5
+                previous = z
+                y *= 0.5
+                z -= (1.0 - x) ** 2 * y
+                if z == previous:
+                    return z / 3
+
+        z = m * tau(1.0 - histogram[value_bits + 1] / m)
+        for rank in range(value_bits, 0, -1):
+            z = 0.5 * (z + histogram[rank])
+        z += m * sigma(histogram[0] / m)
+
+        return int(round(m * m / (2 * np.log(2) * z)))
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(self.registers.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = SketchConfig.HLL_PRECISION) -> 'HyperLogLog':
+        registers = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+        return cls(precision, registers)
+
+
+# SPACE-SAVING
+
+class SpaceSaving:
+
+    def __init__(self, capacity: int = SketchConfig.HEAVY_HITTER_CAPACITY,
+                 counters: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        # item -> [count, error]; count overestimates the true count by at most error
+        self.counters = counters if counters is not None else {}
+
+    def _floor(self) -> int:
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def add(self, item: str, weight: int = 1) -> 'SpaceSaving':
+
+        if item in self.counters:
+            self.counters[item][0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0]
+        else:
+            evicted = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(evicted)[0]
+            self.counters[item] = [floor + weight, floor]
+        return self
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+
+        # Mergeable summaries: an item missing from a full summary can have
+        # occurred at most that summary's minimum count times
+        own_floor, other_floor = self._floor(), other._floor()
+        combined = {}
+        for item in self.counters.keys() | other.counters.keys():
+            count, error = self.counters.get(item, [own_floor, own_floor])
+            other_count, other_error = other.counters.get(item, [other_floor, other_floor])
+            combined[item] = [count + other_count, error + other_error]
+
+        kept = sorted(combined, key=lambda key: combined[key][0], reverse=True)
+        self.counters = {item: combined[item] for item in kept[:self.capacity]}
+        return self
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        ranked = sorted(self.counters.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [(item, count) for item, (count, _) in ranked[:n]]
+
+    def to_json(self) -> str:
+        return json.dumps(self.counters)
+
+    @classmethod
+    def from_json(cls, data: str, capacity: int = SketchConfig.HEAVY_HITTER_CAPACITY) -> 'SpaceSaving':
+        return cls(capacity, json.loads(data))
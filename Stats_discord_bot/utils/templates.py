@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+from PIL import Image
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+logger = logging.getLogger(__name__)
+
+
+# CONFIGURATION
+
+class TemplateConfig:
+    IMAGES_DIR = BASE_DIR / "assets" / "images"
+
+    # Directory for raw pixel buffers that every process maps instead of
+    # decoding its own copy (e.g. a directory on /dev/shm). Unset keeps the
+    # decoded templates in this process only.
+    SHARED_DIR = os.getenv("TEMPLATE_SHARED_DIR")
+
+
+# Requested mode -> mode stored in a shared buffer. Pillow can only wrap a
+# mapped buffer without copying for 1 or 4 bytes per pixel, so RGB is kept
+# as RGBX; converting that back to RGB is the per-render copy anyway.
+_SHARED_MODES = {"RGBA": "RGBA", "RGB": "RGBX", "L": "L"}
+
+
+# REGISTRY
+
+class TemplateRegistry:
+
+    def __init__(self, shared_dir: Union[str, os.PathLike, None] = TemplateConfig.SHARED_DIR):
+        self.shared_dir = Path(shared_dir) if shared_dir else None
+
+        # (absolute path, mode) -> decoded template, never handed out directly
+        self.images: Dict[Tuple[str, str], Image.Image] = {}
+
+        # Renders may run in worker threads
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _decode(path: str, mode: str) -> Image.Image:
+
+        with Image.open(path) as image:
+            return image.convert(mode)
+
+    def _shared_path(self, path: str, stored_mode: str) -> Path:
+
+        # Keyed on the file's mtime and size so an edited template gets a
+        # fresh buffer instead of the stale one
+        stat = os.stat(path)
+        digest = hashlib.sha1(
+            f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+        return self.shared_dir / f"{digest}.{stored_mode}.raw"
+
+    def _map_shared(self, path: str, mode: str) -> Image.Image:
+
+        stored_mode = _SHARED_MODES[mode]
+        raw_path = self._shared_path(path, stored_mode)
+
+        with Image.open(path) as header:
+            size = header.size
+        expected_bytes = size[0] * size[1] * len(stored_mode)
+
+        if not raw_path.exists() or raw_path.stat().st_size != expected_bytes:
+            image = self._decode(path, stored_mode)
+            self.shared_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = raw_path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_bytes(image.tobytes())
+            os.replace(temp_path, raw_path)
+
+        with open(raw_path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Read-only image over the shared pages
+        return Image.frombuffer(stored_mode, size, buffer, "raw", stored_mode, 0, 1)
+
+    def _load(self, path: str, mode: str) -> Image.Image:
+
+        if self.shared_dir and mode in _SHARED_MODES:
+            try:
+                return self._map_shared(path, mode)
+            except FileNotFoundError:
+                raise
+            except Exception as e:
+                logger.warning(f"Shared template buffer failed for {path}: {e}")
+
+        return self._decode(path, mode)
+
+    def _cached(self, path: Union[str, os.PathLike], mode: str) -> Image.Image:
+
+        key = (os.path.abspath(path), mode)
+        image = self.images.get(key)
+        if image is None:
+            with self.lock:
+                image = self.images.get(key)
+                if image is None:
+                    image = self._load(*key)
+                    self.images[key] = image
+        return image
+
+    def get(self, path: Union[str, os.PathLike], mode: str = "RGBA") -> Image.Image:
+
+        # A private copy in the requested mode, safe to draw on. Raises
+        # FileNotFoundError like Image.open, so callers keep their fallbacks.
+        image = self._cached(path, mode)
+        if image.mode != mode:
+            return image.convert(mode)
+        return image.copy()
+
+    def preload(self, directory: Union[str, os.PathLike] = TemplateConfig.IMAGES_DIR) -> int:
+
+        # Decodes every template in its own mode (the one renderers ask for)
+        loaded = 0
+        for path in sorted(Path(directory).glob("*.png")):
+            try:
+                with Image.open(path) as header:
+                    mode = header.mode if header.mode in _SHARED_MODES else "RGBA"
+                self._cached(path, mode)
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Failed to preload template {path}: {e}")
+        return loaded
+
+
+template_registry = TemplateRegistry()